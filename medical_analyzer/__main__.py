@@ -27,7 +27,7 @@ from medical_analyzer.ui.main_window import MainWindow
 from medical_analyzer.error_handling.error_handler import ErrorHandler
 from medical_analyzer.utils.logging_setup import setup_logging
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread
 
 
 def print_error_with_suggestions(error_type: str, message: str, suggestions: list = None):
@@ -441,17 +441,25 @@ def run_gui_mode(config_manager: ConfigManager, app_settings: AppSettings) -> in
     # Set application style
     app.setStyle('Fusion')
     
-    # Create analysis orchestrator
+    # Create analysis orchestrator and run it on a worker thread, so the
+    # window stays responsive during long analyses
     from medical_analyzer.services.analysis_orchestrator import AnalysisOrchestrator
     analysis_orchestrator = AnalysisOrchestrator(config_manager, app_settings)
+    analysis_thread = QThread()
+    analysis_thread.setObjectName("AnalysisWorker")
+    analysis_orchestrator.moveToThread(analysis_thread)
+    analysis_thread.start()
     
     # Create and show main window
     main_window = MainWindow(config_manager, app_settings)
     
-    # Connect the analysis_requested signal to the orchestrator
+    # Mark the request pending right away, so a cancellation before the
+    # worker thread starts the analysis is not lost
     main_window.analysis_requested.connect(
-        lambda path, desc, files: analysis_orchestrator.start_analysis(path, desc, files)
+        analysis_orchestrator.mark_analysis_pending, Qt.ConnectionType.DirectConnection
     )
+    # Queued connection: the slot runs on the worker thread
+    main_window.analysis_requested.connect(analysis_orchestrator.start_analysis)
     
     # Connect orchestrator signals to main window for progress updates
     analysis_orchestrator.analysis_started.connect(
@@ -459,12 +467,18 @@ def run_gui_mode(config_manager: ConfigManager, app_settings: AppSettings) -> in
     )
     analysis_orchestrator.analysis_completed.connect(main_window.analysis_completed)
     analysis_orchestrator.analysis_failed.connect(main_window.analysis_failed)
+    analysis_orchestrator.analysis_cancelled.connect(
+        lambda: logger.info("Analysis stopped after cancellation")
+    )
     analysis_orchestrator.progress_updated.connect(
         lambda percentage: main_window.update_stage_progress("Analysis", percentage, "in_progress")
     )
     analysis_orchestrator.stage_started.connect(
         lambda stage: main_window.update_stage_progress(stage, 0, "in_progress")
     )
+    analysis_orchestrator.stage_progress.connect(
+        lambda stage, percentage: main_window.update_stage_progress(stage, percentage, "in_progress")
+    )
     analysis_orchestrator.stage_completed.connect(
         lambda stage, results: main_window.update_stage_progress(stage, 100, "completed")
     )
@@ -472,15 +486,24 @@ def run_gui_mode(config_manager: ConfigManager, app_settings: AppSettings) -> in
         lambda stage, error: main_window.update_stage_progress(stage, 0, "failed", error_message=error)
     )
     
-    # Connect cancellation signal
-    main_window.analysis_cancelled.connect(analysis_orchestrator.cancel_analysis)
+    # Direct connection: the worker thread is busy running the pipeline, so
+    # cancellation must not wait in its event queue
+    main_window.analysis_cancelled.connect(
+        analysis_orchestrator.cancel_analysis, Qt.ConnectionType.DirectConnection
+    )
     
     main_window.show()
     
     logger.info("GUI started successfully")
     
     # Run the application
-    return app.exec()
+    exit_code = app.exec()
+    
+    # Stop a running analysis before the process exits
+    analysis_orchestrator.cancel_analysis()
+    analysis_thread.quit()
+    analysis_thread.wait()
+    return exit_code
 
 
 def run_headless_mode(config_manager: ConfigManager, app_settings: AppSettings, args: argparse.Namespace) -> int:
@@ -548,7 +571,10 @@ def run_headless_mode(config_manager: ConfigManager, app_settings: AppSettings,
         
         ingestion_service = IngestionService()
         parser_service = ParserService()
-        feature_extractor = FeatureExtractor(llm_backend)
+        feature_extractor = FeatureExtractor(
+            llm_backend,
+            deduplicate_chunks=config_manager.get_custom_setting('deduplicate_chunks', False) is True
+        )
         hazard_identifier = HazardIdentifier(llm_backend)
         test_generator = TestGenerator()
         soup_service = SOUPService(db_manager)
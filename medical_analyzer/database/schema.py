@@ -6,16 +6,61 @@ import sqlite3
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Union
 from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import weakref
+
+
+class _ConnectionOwner:
+    """Held only by a thread's local storage, so it is dropped when the thread ends."""
+    __slots__ = ('__weakref__',)
+
+
+def _release_connection(connections: List[sqlite3.Connection], lock: threading.Lock,
+                        conn: sqlite3.Connection) -> None:
+    """Remove a thread's connection from the pool and close it."""
+    with lock:
+        if conn in connections:
+            connections.remove(conn)
+    conn.close()
 
 
 class DatabaseManager:
     """Manages SQLite database operations for the analysis tool."""
     
+    INSERT_TRACEABILITY_LINK_SQL = """
+        INSERT INTO traceability_links 
+        (analysis_run_id, source_type, source_id, target_type, 
+         target_id, link_type, confidence, metadata)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    # Applied to every pooled connection. WAL lets readers proceed while another
+    # connection writes; busy_timeout makes writers wait for the lock instead of
+    # failing with "database is locked".
+    CONNECTION_PRAGMAS = (
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA cache_size = -16000",  # 16 MB page cache
+        "PRAGMA mmap_size = 67108864",  # 64 MB memory-mapped I/O
+        "PRAGMA temp_store = MEMORY",
+    )
+    
+    # Per-connection statement cache; pooled connections keep prepared
+    # statements across calls
+    CACHED_STATEMENTS = 256
+    
     def __init__(self, db_path: str = "medical_analyzer.db"):
         """Initialize database manager with path to SQLite database."""
         self.db_path = db_path
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._writer_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._pool_generation = 0
         self.init_database()
     
     def init_database(self):
@@ -90,15 +135,99 @@ class DatabaseManager:
             
             conn.commit()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for the pool."""
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False,
+                               cached_statements=self.CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        conn.execute("PRAGMA journal_mode = WAL")
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
+    def _thread_connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's pooled connection, opening it on first use.
+        
+        The connection is closed when its thread ends, so short-lived worker
+        threads do not keep file handles and WAL readers open.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.generation != self._pool_generation:
+            conn = self._connect()
+            with self._pool_lock:
+                self._connections.append(conn)
+                self._local.generation = self._pool_generation
+            owner = _ConnectionOwner()
+            weakref.finalize(owner, _release_connection, self._connections, self._pool_lock, conn)
+            self._local.owner = owner
+            self._local.conn = conn
+            self._local.transaction_depth = 0
+        return conn
+    
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
+        """
+        Context manager for database connections.
+        
+        Each thread reuses one pooled connection. Callers commit their own
+        changes as before; anything left uncommitted when the block exits is
+        rolled back, as closing a connection did. Inside transaction() the
+        enclosing transaction's connection is returned and commits are
+        deferred to it.
+        """
+        conn = self._thread_connection()
+        if self._local.transaction_depth:
+            yield _TransactionConnection(conn)
+            return
+        
         try:
             yield conn
         finally:
-            conn.close()
+            if conn.in_transaction:
+                conn.rollback()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run several statements as one atomic unit.
+        
+        The transaction takes the write lock up front and is committed when
+        the block exits, or rolled back if it raises. Methods of this manager
+        called inside the block join the transaction. Nested transaction()
+        blocks join the outermost one.
+        
+        Yields:
+            The thread's connection
+        
+        Raises:
+            sqlite3.ProgrammingError: If an enclosing get_connection() block
+                on this thread has uncommitted changes
+        """
+        conn = self._thread_connection()
+        if self._local.transaction_depth:
+            self._local.transaction_depth += 1
+            try:
+                yield _TransactionConnection(conn)
+            finally:
+                self._local.transaction_depth -= 1
+            return
+        
+        if conn.in_transaction:
+            raise sqlite3.ProgrammingError(
+                "Cannot start a transaction while the connection has uncommitted changes; "
+                "commit them before calling transaction()"
+            )
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.transaction_depth = 1
+        try:
+            yield _TransactionConnection(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.transaction_depth = 0
     
     def create_project(self, name: str, root_path: str, description: str = "", 
                       metadata: Optional[Dict[str, Any]] = None) -> int:
@@ -177,6 +306,127 @@ class DatabaseManager:
             conn.commit()
             return cursor.lastrowid
     
+    def create_traceability_links(self, links: Iterable[Dict[str, Any]],
+                                  background: bool = False) -> Union[int, Future]:
+        """
+        Create many traceability links in a single transaction.
+        
+        Each link is a dict with the keyword arguments of
+        create_traceability_link. All rows are written with one executemany
+        call and one commit, so either every link is stored or none are.
+        
+        Args:
+            links: Link dicts with analysis_run_id, source_type, source_id,
+                target_type, target_id, link_type and optional confidence
+                and metadata
+            background: Write on the background writer thread and return
+                immediately
+        
+        Returns:
+            Number of links written, or a Future resolving to it when
+            background is True
+        """
+        rows = [self._traceability_link_row(link) for link in links]
+        
+        if background:
+            return self._get_writer().submit(self._insert_traceability_links, rows)
+        return self._insert_traceability_links(rows)
+    
+    def replace_traceability_links(self, analysis_run_id: int, artifact_type: str,
+                                   artifact_ids: Iterable[str],
+                                   links: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Replace the stored links of some artifacts in a single transaction.
+        
+        Every link of the analysis run that starts or ends at one of the
+        artifacts is deleted, together with transitive links derived through
+        one of them (metadata via_feature or via_user_requirement). The new
+        links are then inserted, so readers never see a partial update.
+        
+        Args:
+            analysis_run_id: ID of the analysis run
+            artifact_type: Type of the artifacts, e.g. 'requirement'
+            artifact_ids: IDs of the artifacts whose links are replaced
+            links: Link dicts as accepted by create_traceability_links
+        
+        Returns:
+            Tuple of (links deleted, links inserted)
+        """
+        ids = json.dumps(sorted(set(artifact_ids)))
+        rows = [self._traceability_link_row(link) for link in links]
+        
+        with self.get_connection() as conn:
+            try:
+                cursor = conn.execute("""
+                    DELETE FROM traceability_links
+                    WHERE analysis_run_id = ? AND (
+                        (source_type = ? AND source_id IN (SELECT value FROM json_each(?)))
+                        OR (target_type = ? AND target_id IN (SELECT value FROM json_each(?)))
+                        OR json_extract(metadata, '$.via_user_requirement') IN (SELECT value FROM json_each(?))
+                    )
+                """, (analysis_run_id, artifact_type, ids, artifact_type, ids, ids))
+                deleted = cursor.rowcount
+                conn.executemany(self.INSERT_TRACEABILITY_LINK_SQL, rows)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+        
+        return deleted, len(rows)
+    
+    @staticmethod
+    def _traceability_link_row(link: Dict[str, Any]) -> tuple:
+        """Convert a link dict to a traceability_links insert row."""
+        return (link['analysis_run_id'], link['source_type'], link['source_id'],
+                link['target_type'], link['target_id'], link['link_type'],
+                link.get('confidence', 1.0), json.dumps(link.get('metadata') or {}))
+    
+    def _insert_traceability_links(self, rows: List[tuple]) -> int:
+        """Insert prepared traceability link rows in one transaction."""
+        if not rows:
+            return 0
+        
+        with self.get_connection() as conn:
+            try:
+                conn.executemany(self.INSERT_TRACEABILITY_LINK_SQL, rows)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+        
+        return len(rows)
+    
+    def _get_writer(self) -> ThreadPoolExecutor:
+        """Get the single background writer thread, creating it on first use."""
+        with self._writer_lock:
+            if self._writer is None:
+                # One worker keeps background writes ordered and avoids lock contention
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+            return self._writer
+    
+    def wait_for_pending_writes(self):
+        """Block until all background writes submitted so far have finished."""
+        with self._writer_lock:
+            writer = self._writer
+        if writer is not None:
+            writer.submit(lambda: None).result()
+    
+    def close(self):
+        """Finish pending background writes, stop the writer thread and close pooled connections."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+        
+        with self._pool_lock:
+            # Emptied in place; finalizers of thread connections refer to this list
+            connections = list(self._connections)
+            self._connections.clear()
+            # Threads notice the new generation and reconnect on their next call
+            self._pool_generation += 1
+        for conn in connections:
+            conn.close()
+    
     def get_traceability_links(self, analysis_run_id: int) -> List[Dict[str, Any]]:
         """Get all traceability links for an analysis run."""
         with self.get_connection() as conn:
@@ -184,7 +434,7 @@ class DatabaseManager:
             cursor.execute("""
                 SELECT * FROM traceability_links 
                 WHERE analysis_run_id = ?
-                ORDER BY created_at
+                ORDER BY created_at, id
             """, (analysis_run_id,))
             links = []
             for row in cursor.fetchall():
@@ -194,6 +444,31 @@ class DatabaseManager:
             return links
 
 
+class _TransactionConnection:
+    """
+    Connection handed out inside DatabaseManager.transaction().
+    
+    Delegates to the pooled connection but leaves commit and rollback to the
+    enclosing transaction, so existing methods that commit their own
+    statements can take part in a larger unit.
+    """
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+    
+    def commit(self):
+        """Defer the commit to the enclosing transaction."""
+    
+    def rollback(self):
+        """Defer the rollback to the enclosing transaction, which the error propagates to."""
+    
+    def close(self):
+        """Pooled connections are closed by DatabaseManager.close()."""
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+
 def init_database(db_path: str = "medical_analyzer.db") -> DatabaseManager:
     """Initialize and return a database manager instance."""
     return DatabaseManager(db_path)
\ No newline at end of file
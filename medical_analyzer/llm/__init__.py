@@ -10,9 +10,10 @@ from .config import LLMConfig
 from .llama_cpp_backend import LlamaCppBackend
 from .local_server_backend import LocalServerBackend
 from .embedding_service import EmbeddingService, EmbeddingResult
+from .context_retriever import ContextRetriever
 
 __all__ = [
     'LLMBackend', 'ModelInfo', 'LLMError', 'LLMConfig',
     'FallbackLLMBackend', 'LlamaCppBackend', 'LocalServerBackend',
-    'EmbeddingService', 'EmbeddingResult'
+    'EmbeddingService', 'EmbeddingResult', 'ContextRetriever'
 ]
\ No newline at end of file
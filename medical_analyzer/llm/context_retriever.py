@@ -0,0 +1,186 @@
+"""
+Embedding-based selection of prompt context.
+
+Requirement and hazard prompts grow with the project: every related feature
+is pasted in, and backends drop context chunks once a prompt exceeds the
+model limits. ContextRetriever ranks candidates by embedding similarity, so
+each prompt carries a bounded number of the most relevant features or code
+chunks and prompt evaluation time stays independent of project size.
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.core import CodeChunk, Feature
+from .embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class ContextRetriever:
+    """Selects the top-k most relevant features and code chunks for a prompt."""
+    
+    def __init__(self, embedding_service: EmbeddingService, top_k: int = 8):
+        """
+        Initialize the context retriever.
+        
+        Args:
+            embedding_service: Service used to embed texts and search code chunks
+            top_k: Default number of items selected per prompt
+        """
+        self.embedding_service = embedding_service
+        self.top_k = max(1, top_k)
+    
+    def is_available(self) -> bool:
+        """Check whether texts can be embedded."""
+        return self.embedding_service.is_available()
+    
+    def has_code_index(self) -> bool:
+        """Check whether code chunks have been indexed for retrieval."""
+        return self.embedding_service.get_stats().get('num_chunks', 0) > 0
+    
+    def index_chunks(self, chunks: List[CodeChunk]) -> bool:
+        """
+        Index the code chunks of the analyzed project.
+        
+        Only chunks that changed since the last call are re-embedded.
+        
+        Args:
+            chunks: All code chunks of the project
+        
+        Returns:
+            True if the chunks were indexed, False otherwise
+        """
+        if not self.is_available():
+            return False
+        return self.embedding_service.update_chunks(chunks)
+    
+    @staticmethod
+    def _feature_text(feature: Feature) -> str:
+        """Build the text embedded for a feature."""
+        category = feature.category.name if hasattr(feature.category, 'name') else str(feature.category)
+        return f"{category}: {feature.description}"
+    
+    def _embed(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """Embed texts as a matrix of normalized vectors, None on failure."""
+        vectors = self.embedding_service.embed_texts(texts)
+        if len(vectors) != len(texts):
+            return None
+        return EmbeddingService._normalize(np.stack(vectors))
+    
+    def rank(self, query: str, texts: Sequence[str], k: Optional[int] = None) -> Optional[List[int]]:
+        """
+        Rank texts by similarity to a query.
+        
+        Args:
+            query: Text describing what the prompt is about
+            texts: Candidate texts
+            k: Number of texts to select, top_k by default
+        
+        Returns:
+            Indices of the k most similar texts, most similar first, or None
+            if the texts could not be embedded
+        """
+        k = min(k or self.top_k, len(texts))
+        if k <= 0:
+            return []
+        
+        vectors = self._embed([query, *texts])
+        if vectors is None:
+            return None
+        
+        scores = vectors[1:] @ vectors[0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind='stable')].tolist()
+    
+    def select_features(self, query: str, features: List[Feature], k: Optional[int] = None) -> List[Feature]:
+        """
+        Select the features most relevant to a query.
+        
+        The selection keeps the original feature order. If the features
+        cannot be embedded, all of them are returned.
+        
+        Args:
+            query: Text describing what the prompt is about
+            features: Candidate features
+            k: Number of features to select, top_k by default
+        
+        Returns:
+            Selected features
+        """
+        k = k or self.top_k
+        if len(features) <= k:
+            return features
+        
+        ranked = self.rank(query, [self._feature_text(feature) for feature in features], k)
+        if ranked is None:
+            return features
+        return [features[i] for i in sorted(ranked)]
+    
+    def group_features(self, features: List[Feature], k: Optional[int] = None) -> List[List[Feature]]:
+        """
+        Split features into groups of at most k related features.
+        
+        Each group starts at the first ungrouped feature and is filled with the
+        ungrouped features most similar to it, so every feature lands in
+        exactly one prompt. If the features cannot be embedded they are kept
+        in a single group, so prompts are built as without retrieval.
+        
+        Args:
+            features: Features to group
+            k: Maximum group size, top_k by default
+        
+        Returns:
+            Groups of features, each in the original order
+        """
+        k = k or self.top_k
+        if len(features) <= k:
+            return [features] if features else []
+        
+        vectors = self._embed([self._feature_text(feature) for feature in features])
+        if vectors is None:
+            return [features]
+        
+        remaining = np.arange(len(features))
+        groups = []
+        while len(remaining):
+            if len(remaining) <= k:
+                members = remaining
+            else:
+                scores = vectors[remaining] @ vectors[remaining[0]]
+                scores[0] = np.inf  # The seed always joins its own group
+                members = remaining[np.argpartition(-scores, k - 1)[:k]]
+            groups.append([features[i] for i in sorted(members.tolist())])
+            remaining = np.setdiff1d(remaining, members, assume_unique=True)
+        
+        return groups
+    
+    def relevant_chunks(self, queries: Sequence[str], k: Optional[int] = None,
+                        min_similarity: float = 0.0) -> List[Tuple[CodeChunk, float]]:
+        """
+        Find the indexed code chunks most relevant to a set of queries.
+        
+        All queries are searched in one batch and a chunk found by several
+        queries is ranked by its best similarity.
+        
+        Args:
+            queries: Texts describing what the prompt is about
+            k: Number of chunks to return, top_k by default
+            min_similarity: Minimum similarity threshold
+        
+        Returns:
+            List of (chunk, similarity) pairs, most similar first
+        """
+        k = k or self.top_k
+        if not queries or not self.has_code_index():
+            return []
+        
+        best: Dict[int, Tuple[CodeChunk, float]] = {}
+        for results in self.embedding_service.search_many(queries, k, min_similarity):
+            for result in results:
+                if result.index not in best or result.similarity > best[result.index][1]:
+                    best[result.index] = (result.chunk, result.similarity)
+        
+        return sorted(best.values(), key=lambda item: item[1], reverse=True)[:k]
@@ -0,0 +1,269 @@
+"""
+Persistent embedding cache keyed by model and content hash.
+
+Embedding code chunks is the most expensive step of building the semantic
+index. Vectors are therefore stored on disk keyed by (model_name,
+quantization, hash of the embedded text), so re-indexing a project only encodes chunks whose text
+actually changed.
+
+Vectors of each model are kept in one append-only matrix file that is read
+through a memory map; an SQLite table maps text hashes to rows of that
+matrix.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Disk-backed store of embedding vectors.
+    
+    Features:
+    - Content-based keys (SHA-256 of the embedded text) per model and quantization
+    - Vectors in a memory-mapped float32 or float16 matrix per model and quantization
+    - SQLite key index, safe to share between threads
+    """
+    
+    SUPPORTED_DTYPES = ('float32', 'float16')
+    
+    def __init__(self, cache_dir: str, model_name: str, dtype: str = 'float32',
+                 quantization: Optional[str] = None):
+        """
+        Initialize the embedding cache.
+        
+        Args:
+            cache_dir: Directory to store the key index and vector files
+            model_name: Name of the model the vectors belong to
+            dtype: Storage type of the vectors, 'float32' or 'float16'
+            quantization: Weight format of the model, None for float32; a
+                quantized model gives slightly different vectors
+        """
+        if dtype not in self.SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.quantization = quantization
+        self.dtype = np.dtype(dtype)
+        
+        self.db_path = self.cache_dir / "embedding_cache.db"
+        # Vectors of the float32 model keep the key they had before quantization was supported
+        model_id = f"{model_name}:{quantization}" if quantization else model_name
+        model_key = hashlib.sha256(f"{model_id}:{dtype}".encode('utf-8')).hexdigest()[:16]
+        self.vectors_path = self.cache_dir / f"vectors_{model_key}.bin"
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._vectors: Optional[np.memmap] = None
+        
+        self._init_database()
+    
+    def _init_database(self):
+        """Initialize the cache database."""
+        with self._transaction() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_keys (
+                    vectors_path TEXT NOT NULL,  -- matrix of the model, quantization and dtype
+                    text_hash TEXT NOT NULL,
+                    row INTEGER NOT NULL,
+                    PRIMARY KEY (vectors_path, text_hash)
+                )
+            """)
+            
+            # One vector matrix per model, quantization and storage type
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_matrices (
+                    vectors_path TEXT PRIMARY KEY,
+                    model_name TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    rows INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+    
+    @contextmanager
+    def _transaction(self):
+        """Run statements on the shared connection as one transaction."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+    
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """
+        Generate the cache key of an embedded text.
+        
+        Args:
+            text: Text that is passed to the model
+        
+        Returns:
+            SHA-256 hash as cache key
+        """
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def _matrix_info(self, cursor: sqlite3.Cursor) -> Optional[tuple]:
+        """Get (dimension, rows) of this model's vector matrix."""
+        cursor.execute(
+            "SELECT dimension, rows FROM embedding_matrices WHERE vectors_path = ?",
+            (self.vectors_path.name,)
+        )
+        return cursor.fetchone()
+    
+    def _read_vectors(self, dimension: int, rows: int) -> np.memmap:
+        """Get a memory map over the first rows of the vector matrix."""
+        if self._vectors is None or self._vectors.shape != (rows, dimension):
+            self._vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode='r', shape=(rows, dimension))
+        return self._vectors
+    
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up cached vectors.
+        
+        Args:
+            hashes: Text hashes to look up
+        
+        Returns:
+            Dictionary of hash to float32 vector for every hash that is cached
+        """
+        if not hashes:
+            return {}
+        
+        with self._lock:
+            cursor = self._conn.cursor()
+            info = self._matrix_info(cursor)
+            if not info or not info[1]:
+                return {}
+            dimension, rows = info
+            
+            cursor.execute("""
+                SELECT text_hash, row FROM embedding_keys
+                WHERE vectors_path = ? AND text_hash IN (SELECT value FROM json_each(?))
+                AND row < ?
+            """, (self.vectors_path.name, json.dumps(list(set(hashes))), rows))
+            found = cursor.fetchall()
+            if not found:
+                return {}
+            
+            vectors = self._read_vectors(dimension, rows)
+            matrix = np.asarray(vectors[[row for _, row in found]], dtype=np.float32)
+        
+        return {text_hash: matrix[i] for i, (text_hash, _) in enumerate(found)}
+    
+    def put_many(self, hashes: Sequence[str], vectors: np.ndarray) -> int:
+        """
+        Store vectors for text hashes that are not cached yet.
+        
+        Args:
+            hashes: Text hashes, one per vector
+            vectors: 2D array of vectors
+        
+        Returns:
+            Number of vectors written
+        """
+        vectors = np.asarray(vectors)
+        if not len(hashes):
+            return 0
+        if vectors.ndim != 2 or vectors.shape[0] != len(hashes):
+            raise ValueError("Expected one vector per hash")
+        
+        with self._transaction() as cursor:
+            info = self._matrix_info(cursor)
+            dimension = vectors.shape[1]
+            if info is None:
+                cursor.execute("""
+                    INSERT INTO embedding_matrices (vectors_path, model_name, dimension, rows)
+                    VALUES (?, ?, ?, 0)
+                """, (self.vectors_path.name, self.model_name, dimension))
+                rows = 0
+            else:
+                if info[0] != dimension:
+                    raise ValueError(f"Cached vectors have dimension {info[0]}, got {dimension}")
+                rows = info[1]
+            
+            cursor.execute("""
+                SELECT text_hash FROM embedding_keys
+                WHERE vectors_path = ? AND text_hash IN (SELECT value FROM json_each(?))
+            """, (self.vectors_path.name, json.dumps(list(set(hashes)))))
+            cached = {row[0] for row in cursor.fetchall()}
+            
+            new_rows = {}
+            for i, text_hash in enumerate(hashes):
+                if text_hash not in cached and text_hash not in new_rows:
+                    new_rows[text_hash] = i
+            if not new_rows:
+                return 0
+            
+            # Rows past the recorded count belong to an interrupted write and are overwritten
+            data = np.ascontiguousarray(vectors[list(new_rows.values())], dtype=self.dtype)
+            mode = 'r+b' if self.vectors_path.exists() else 'wb'
+            with open(self.vectors_path, mode) as f:
+                f.seek(rows * dimension * self.dtype.itemsize)
+                f.write(data.tobytes())
+            
+            cursor.executemany(
+                "INSERT OR REPLACE INTO embedding_keys (vectors_path, text_hash, row) VALUES (?, ?, ?)",
+                [(self.vectors_path.name, text_hash, rows + i) for i, text_hash in enumerate(new_rows)]
+            )
+            cursor.execute(
+                "UPDATE embedding_matrices SET rows = ? WHERE vectors_path = ?",
+                (rows + len(new_rows), self.vectors_path.name)
+            )
+        
+        return len(new_rows)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            info = self._matrix_info(self._conn.cursor())
+        return info[1] if info else 0
+    
+    def clear(self):
+        """Remove all cached vectors of this model."""
+        with self._transaction() as cursor:
+            cursor.execute("DELETE FROM embedding_keys WHERE vectors_path = ?", (self.vectors_path.name,))
+            cursor.execute("DELETE FROM embedding_matrices WHERE vectors_path = ?", (self.vectors_path.name,))
+            self._vectors = None
+            if self.vectors_path.exists():
+                os.remove(self.vectors_path)
+    
+    def close(self):
+        """Close the key index."""
+        with self._lock:
+            self._vectors = None
+            self._conn.close()
+    
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get statistics about the cache.
+        
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._lock:
+            info = self._matrix_info(self._conn.cursor())
+        return {
+            'cache_dir': str(self.cache_dir),
+            'dtype': self.dtype.name,
+            'quantization': self.quantization,
+            'entries': info[1] if info else 0,
+            'dimension': info[0] if info else None,
+            'size_bytes': self.vectors_path.stat().st_size if self.vectors_path.exists() else 0
+        }
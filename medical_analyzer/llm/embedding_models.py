@@ -0,0 +1,149 @@
+"""
+Process-wide registry of loaded embedding models.
+
+Loading a sentence-transformers model takes seconds and hundreds of
+megabytes, so models are loaded on first use and shared by every
+EmbeddingService in the process. Shared models serialize their encode calls,
+because tokenizers and model forward passes are not safe to run
+concurrently on one instance; callers get throughput from batching instead.
+"""
+
+import importlib.util
+import logging
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Checked without importing, so the availability check stays cheap
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+# Weight formats: None keeps float32, 'float16' halves memory (best on GPU),
+# 'int8' applies dynamic quantization to the linear layers (CPU)
+QUANTIZATION_MODES = (None, 'float16', 'int8')
+
+
+class SharedEmbeddingModel:
+    """Embedding model that can be used from several threads."""
+    
+    def __init__(self, model, model_name: str, quantization: Optional[str] = None):
+        """
+        Wrap a loaded model.
+        
+        Args:
+            model: Object with a sentence-transformers compatible encode method
+            model_name: Name the model was loaded under
+            quantization: Weight format of the model
+        """
+        self.model = model
+        self.model_name = model_name
+        self.quantization = quantization
+        self._lock = threading.Lock()
+    
+    def encode(self, texts: Sequence[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """
+        Encode texts in batches.
+        
+        Args:
+            texts: Texts to encode
+            batch_size: Number of texts per forward pass
+            kwargs: Further arguments of SentenceTransformer.encode
+        
+        Returns:
+            2D float32 array with one vector per text
+        """
+        kwargs.setdefault('convert_to_numpy', True)
+        with self._lock:
+            vectors = self.model.encode(list(texts), batch_size=batch_size, **kwargs)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+_models: Dict[Tuple[str, Optional[str]], SharedEmbeddingModel] = {}
+_load_locks: Dict[Tuple[str, Optional[str]], threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _quantize(model, quantization: Optional[str]):
+    """Convert model weights to the requested format."""
+    if quantization == 'float16':
+        return model.half()
+    if quantization == 'int8':
+        import torch
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+
+def get_embedding_model(model_name: str, cache_folder: Optional[str] = None,
+                        quantization: Optional[str] = None) -> SharedEmbeddingModel:
+    """
+    Get a loaded embedding model, loading it on the first request.
+    
+    Concurrent first requests for the same model load it once; requests for
+    other models are not blocked meanwhile.
+    
+    Args:
+        model_name: Name of the sentence-transformers model
+        cache_folder: Directory for downloaded model files
+        quantization: One of QUANTIZATION_MODES
+    
+    Returns:
+        Shared model
+    
+    Raises:
+        ValueError: If the quantization mode is unknown
+        ImportError: If sentence-transformers is not installed
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {quantization}")
+    
+    key = (model_name, quantization)
+    with _registry_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+    
+    with load_lock:
+        with _registry_lock:
+            model = _models.get(key)
+        if model is not None:
+            return model
+        
+        from sentence_transformers import SentenceTransformer
+        
+        logger.info(f"Loading embedding model: {model_name}" + (f" ({quantization})" if quantization else ""))
+        loaded = _quantize(SentenceTransformer(model_name, cache_folder=cache_folder), quantization)
+        model = SharedEmbeddingModel(loaded, model_name, quantization)
+        logger.info("Embedding model loaded successfully")
+        
+        with _registry_lock:
+            _models[key] = model
+        return model
+
+
+def register_embedding_model(model_name: str, model, quantization: Optional[str] = None) -> SharedEmbeddingModel:
+    """
+    Register an already loaded model, e.g. a custom or test model.
+    
+    Returns:
+        Shared model that get_embedding_model returns for this name
+    """
+    shared = model if isinstance(model, SharedEmbeddingModel) else SharedEmbeddingModel(model, model_name, quantization)
+    with _registry_lock:
+        _models[(model_name, quantization)] = shared
+    return shared
+
+
+def loaded_embedding_models() -> List[Tuple[str, Optional[str]]]:
+    """Get the (model name, quantization) pairs of the loaded models."""
+    with _registry_lock:
+        return list(_models)
+
+
+def release_embedding_models() -> None:
+    """Drop all shared models, so their memory is freed once no service uses them."""
+    with _registry_lock:
+        _models.clear()
+        _load_locks.clear()
@@ -7,12 +7,21 @@ using sentence-transformers and FAISS for medical device software analysis.
 
 import os
 import pickle
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any, Tuple
+import threading
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Sequence, Set, Union
 import numpy as np
 from dataclasses import dataclass
 
 from ..models.core import CodeChunk
+from .embedding_cache import EmbeddingCache
+from .embedding_models import QUANTIZATION_MODES, get_embedding_model
+from .index_store import index_paths, read_index_files, write_index_files
+from .vector_index import (
+    FaissIVFPQIndex, NumpyVectorIndex, VectorIndex, create_vector_index, index_options_for, load_vector_index,
+    select_index_type, validate_index_options
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,57 +42,114 @@ class EmbeddingService:
     for efficient vector storage and retrieval without cloud dependencies.
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_dir: Optional[str] = None):
+    # Order in which auto selection moves to more scalable index types
+    _INDEX_TYPE_RANK = {'flat': 0, 'hnsw': 1, 'ivfpq': 2}
+    
+    # Query vectors per index search call
+    SEARCH_BATCH_SIZE = 256
+    
+    # Vectors moved at a time when upgrading the index; an IVF-PQ index trains on the first batch
+    UPGRADE_BATCH_SIZE = FaissIVFPQIndex.MAX_TRAINING_VECTORS
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_dir: Optional[str] = None,
+                 use_embedding_cache: bool = True, cache_dtype: str = "float32",
+                 index_type: str = "auto", index_options: Optional[Dict[str, Any]] = None,
+                 batch_size: int = 32, quantization: Optional[str] = None):
         """
         Initialize the embedding service.
         
         Args:
             model_name: Name of the sentence-transformers model to use
             cache_dir: Directory to cache embeddings and model files
+            use_embedding_cache: Reuse chunk embeddings stored on disk, so only
+                chunks whose text changed are encoded
+            cache_dtype: Storage type of cached vectors, 'float32' or 'float16'
+            index_type: 'flat' for exact search, 'hnsw' for low-latency
+                approximate search, 'ivfpq' for compressed approximate search,
+                'numpy' for exact search without FAISS, or 'auto' to choose by
+                corpus size. Without FAISS every type uses the NumPy index.
+            index_options: Keyword arguments for the index, e.g. ef_search or nprobe;
+                each index type takes only its own
+            batch_size: Number of texts per model forward pass
+            quantization: Model weight format, None for float32, 'float16' or 'int8'
+        
+        The model is loaded on first use and shared with every other service
+        using the same model name and quantization.
         """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantization}")
+        validate_index_options(index_options or {})
+        
         self.model_name = model_name
         self.cache_dir = cache_dir or os.path.expanduser("~/.medical_analyzer/embeddings")
+        self.use_embedding_cache = use_embedding_cache
+        self.cache_dtype = cache_dtype
+        self.index_type = index_type
+        self.index_options = index_options or {}
+        self.batch_size = max(1, batch_size)
+        self.quantization = quantization
         self._model = None
-        self._index = None
+        self._model_load_failed = False
+        self._model_lock = threading.Lock()
+        self._index: Optional[VectorIndex] = None
+        # Indexed chunks and their stable IDs, aligned by position; the vectors live only in the index
         self._chunks: List[CodeChunk] = []
-        self._embeddings: Optional[np.ndarray] = None
+        self._chunk_ids: List[int] = []
+        self._positions: Dict[int, int] = {}
+        self._file_chunk_ids: Dict[str, Set[int]] = {}
+        self._embedding_cache: Optional[EmbeddingCache] = None
+        self.cache_stats = {'hits': 0, 'misses': 0}
         
         # Ensure cache directory exists
         os.makedirs(self.cache_dir, exist_ok=True)
-        
-        # Initialize model
-        self._initialize_model()
     
     def _initialize_model(self) -> None:
-        """Initialize the sentence-transformers model."""
+        """Load the sentence-transformers model, or get it from the shared registry."""
         try:
-            from sentence_transformers import SentenceTransformer
-            
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self._model = SentenceTransformer(
+            self._model = get_embedding_model(
                 self.model_name,
-                cache_folder=os.path.join(self.cache_dir, "models")
+                cache_folder=os.path.join(self.cache_dir, "models"),
+                quantization=self.quantization
             )
-            logger.info("Embedding model loaded successfully")
             
         except ImportError:
             logger.warning(
                 "sentence-transformers not available. "
                 "Install with: pip install sentence-transformers"
             )
-            self._model = None
+            self._model_load_failed = True
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
-            self._model = None
+            self._model_load_failed = True
+    
+    def _get_model(self):
+        """Get the embedding model, loading it on first use."""
+        if self._model is None and not self._model_load_failed:
+            with self._model_lock:
+                if self._model is None and not self._model_load_failed:
+                    self._initialize_model()
+        return self._model
+    
+    def _encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts with the model in batches of batch_size."""
+        model = self._get_model()
+        if model is None:
+            raise RuntimeError("Embedding model not available")
+        vectors = model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+                               show_progress_bar=len(texts) > 100)
+        return np.asarray(vectors, dtype=np.float32)
     
     def is_available(self) -> bool:
         """
         Check if the embedding service is available.
         
+        Loads the model if that has not been tried yet; a model that fails
+        to load makes the service unavailable from then on.
+        
         Returns:
             True if service is available, False otherwise
         """
-        return self._model is not None
+        return self._get_model() is not None
     
     def embed_text(self, text: str) -> Optional[np.ndarray]:
         """
@@ -95,57 +161,157 @@ class EmbeddingService:
         Returns:
             Embedding vector as numpy array, None if service unavailable
         """
-        if not self.is_available():
+        if self._get_model() is None:
             logger.warning("Embedding service not available")
             return None
         
         try:
-            embedding = self._model.encode([text], convert_to_numpy=True)
-            return embedding[0]
+            return self._encode([text])[0]
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             return None
     
-    def embed_chunks(self, chunks: List[CodeChunk]) -> List[np.ndarray]:
+    def _get_embedding_cache(self) -> Optional[EmbeddingCache]:
+        """Get the on-disk embedding cache, opening it on first use."""
+        if self.use_embedding_cache and self._embedding_cache is None:
+            try:
+                self._embedding_cache = EmbeddingCache(
+                    os.path.join(self.cache_dir, "vectors"), self.model_name, dtype=self.cache_dtype,
+                    quantization=self.quantization
+                )
+            except Exception as e:
+                logger.warning(f"Embedding cache unavailable, encoding all chunks: {e}")
+                self.use_embedding_cache = False
+        return self._embedding_cache
+    
+    @staticmethod
+    def _chunk_text(chunk: CodeChunk) -> str:
+        """Build the text embedded for a code chunk."""
+        # Combine file path, function name, and content for better context
+        text_parts = []
+        
+        if chunk.file_path:
+            text_parts.append(f"File: {chunk.file_path}")
+        
+        if chunk.function_name:
+            text_parts.append(f"Function: {chunk.function_name}")
+        
+        text_parts.append(f"Code: {chunk.content}")
+        
+        return " | ".join(text_parts)
+    
+    def embed_texts(self, texts: Sequence[str]) -> List[np.ndarray]:
         """
-        Generate embeddings for multiple code chunks.
+        Generate embeddings for multiple texts.
+        
+        Vectors already in the embedding cache are reused; only texts that
+        are not cached are encoded, and each distinct text only once.
         
         Args:
-            chunks: List of code chunks to embed
+            texts: Texts to embed
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, empty if the service is unavailable
         """
-        if not self.is_available():
+        if self._get_model() is None:
             logger.warning("Embedding service not available")
             return []
         
         try:
-            # Prepare texts for embedding
-            texts = []
-            for chunk in chunks:
-                # Combine file path, function name, and content for better context
-                text_parts = []
-                
-                if chunk.file_path:
-                    text_parts.append(f"File: {chunk.file_path}")
-                
-                if chunk.function_name:
-                    text_parts.append(f"Function: {chunk.function_name}")
-                
-                text_parts.append(f"Code: {chunk.content}")
-                
-                texts.append(" | ".join(text_parts))
+            hashes = [EmbeddingCache.text_hash(text) for text in texts]
+            
+            cache = self._get_embedding_cache()
+            vectors = cache.get_many(hashes) if cache is not None else {}
             
-            logger.info(f"Generating embeddings for {len(chunks)} chunks")
-            embeddings = self._model.encode(texts, convert_to_numpy=True, show_progress_bar=True)
+            missing = {}
+            for text_hash, text in zip(hashes, texts):
+                if text_hash not in vectors and text_hash not in missing:
+                    missing[text_hash] = text
             
-            return [embedding for embedding in embeddings]
+            self.cache_stats['hits'] += len(texts) - sum(1 for h in hashes if h in missing)
+            self.cache_stats['misses'] += len(missing)
+            
+            if missing:
+                logger.info(f"Generating embeddings for {len(missing)} of {len(texts)} texts")
+                encoded = self._encode(list(missing.values()))
+                vectors.update(zip(missing, encoded))
+                if cache is not None:
+                    cache.put_many(list(missing), encoded)
+            
+            return [vectors[text_hash] for text_hash in hashes]
             
         except Exception as e:
             logger.error(f"Failed to generate embeddings: {e}")
             return []
     
+    def embed_chunks(self, chunks: List[CodeChunk]) -> List[np.ndarray]:
+        """
+        Generate embeddings for multiple code chunks.
+        
+        Args:
+            chunks: List of code chunks to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        return self.embed_texts([self._chunk_text(chunk) for chunk in chunks])
+    
+    @staticmethod
+    def chunk_id(chunk: CodeChunk) -> int:
+        """
+        Get the stable ID of a code chunk in the index.
+        
+        Chunks are identified by file and line range, so an edited chunk keeps
+        its ID and its new vector replaces the old one.
+        
+        Args:
+            chunk: Code chunk
+            
+        Returns:
+            Non-negative 63-bit ID
+        """
+        key = f"{chunk.file_path}\0{chunk.start_line}\0{chunk.end_line}".encode('utf-8')
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little') & 0x7FFFFFFFFFFFFFFF
+    
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize vectors so inner product equals cosine similarity."""
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _create_index(self, dimension: int, corpus_size: int = 0) -> VectorIndex:
+        """Create an empty vector index of the configured type."""
+        index = create_vector_index(dimension, self.index_type, corpus_size, self.index_options)
+        logger.info(f"Creating {index.index_type} index with dimension {dimension}")
+        return index
+    
+    def _maybe_upgrade_index(self) -> None:
+        """
+        Move to a more scalable index type once the corpus has grown past its threshold.
+        
+        Only applies to automatic selection. The index is rebuilt from the
+        vectors of the current index a batch at a time, without encoding
+        anything.
+        """
+        if self.index_type != 'auto' or self._index is None:
+            return
+        
+        current = self._INDEX_TYPE_RANK.get(self._index.index_type)
+        target = select_index_type(len(self._chunks))
+        if current is None or self._INDEX_TYPE_RANK[target] <= current:
+            return
+        
+        index = self._create_index(self._index.dimension, len(self._chunks))
+        if index.index_type == self._index.index_type:
+            return
+        logger.info(f"Rebuilding {self._index.index_type} index as {index.index_type} for {len(self._chunks)} chunks")
+        for start in range(0, len(self._chunks), self.UPGRADE_BATCH_SIZE):
+            stop = start + self.UPGRADE_BATCH_SIZE
+            index.add(np.array(self._chunk_ids[start:stop], dtype=np.int64), self.stored_vectors(start, stop))
+        self._index = index
+    
     def build_index(self, chunks: List[CodeChunk]) -> bool:
         """
         Build FAISS index from code chunks.
@@ -160,46 +326,158 @@ class EmbeddingService:
             logger.warning("Embedding service not available")
             return False
         
-        try:
-            import faiss
+        self.clear_index()
+        if not self.add_chunks(chunks):
+            return False
+        
+        logger.info(f"Built index with {len(self._chunks)} chunks")
+        return True
+    
+    def add_chunks(self, chunks: List[CodeChunk]) -> bool:
+        """
+        Add code chunks to the index.
+        
+        Chunks whose ID is already indexed replace the stored chunk and vector.
+        The index is created on first use.
+        
+        Args:
+            chunks: Code chunks to add
             
+        Returns:
+            True if the chunks were indexed, False otherwise
+        """
+        if not self.is_available():
+            logger.warning("Embedding service not available")
+            return False
+        
+        if not chunks:
+            return True
+        
+        # The last chunk for a location wins
+        unique = {self.chunk_id(chunk): chunk for chunk in chunks}
+        
+        try:
             # Generate embeddings
-            embeddings = self.embed_chunks(chunks)
+            embeddings = self.embed_chunks(list(unique.values()))
             if not embeddings:
                 logger.error("No embeddings generated")
                 return False
             
-            # Convert to numpy array
-            embeddings_array = np.array(embeddings).astype('float32')
-            
-            # Create FAISS index
-            dimension = embeddings_array.shape[1]
-            logger.info(f"Creating FAISS index with dimension {dimension}")
-            
-            # Use IndexFlatIP for cosine similarity (after normalization)
-            index = faiss.IndexFlatIP(dimension)
-            
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings_array)
-            
-            # Add embeddings to index
-            index.add(embeddings_array)
-            
-            # Store index and chunks
-            self._index = index
-            self._chunks = chunks.copy()
-            self._embeddings = embeddings_array
+            vectors = self._normalize(embeddings)
+            if self._index is None:
+                self._index = self._create_index(vectors.shape[1], len(vectors))
             
-            logger.info(f"Built FAISS index with {len(chunks)} chunks")
+            ids = list(unique)
+            self._remove_ids([chunk_id for chunk_id in ids if chunk_id in self._positions])
+            self._index.add(np.array(ids, dtype=np.int64), vectors)
+            self._append(ids, list(unique.values()))
+            self._maybe_upgrade_index()
             return True
             
-        except ImportError:
-            logger.warning("FAISS not available. Install with: pip install faiss-cpu")
-            return False
         except Exception as e:
-            logger.error(f"Failed to build FAISS index: {e}")
+            logger.error(f"Failed to build vector index: {e}")
             return False
     
+    def remove_chunks(self, chunks: Iterable[Union[CodeChunk, int]]) -> int:
+        """
+        Remove code chunks from the index.
+        
+        Args:
+            chunks: Code chunks or chunk IDs to remove; unknown ones are ignored
+            
+        Returns:
+            Number of chunks removed
+        """
+        if self._index is None:
+            return 0
+        
+        ids = [self.chunk_id(chunk) if isinstance(chunk, CodeChunk) else int(chunk) for chunk in chunks]
+        return self._remove_ids(ids)
+    
+    def replace_file(self, file_path: str, chunks: List[CodeChunk]) -> bool:
+        """
+        Replace the indexed chunks of one file.
+        
+        Chunks of the file that are not in the new list are removed and the
+        new chunks are added, so the cost is proportional to the file rather
+        than the whole index.
+        
+        Args:
+            file_path: Path of the file whose chunks are replaced
+            chunks: Current chunks of the file; empty to drop the file
+            
+        Returns:
+            True if the index was updated, False otherwise
+        """
+        new_ids = {self.chunk_id(chunk) for chunk in chunks}
+        stale = self._file_chunk_ids.get(file_path, set()) - new_ids
+        self._remove_ids(stale)
+        return self.add_chunks(chunks)
+    
+    def stored_vectors(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """
+        Get the normalized vectors of indexed chunks by position.
+        
+        The vectors are read from the index, so for IVF-PQ indexes they are
+        PQ approximations of the originals.
+        
+        Args:
+            start: First position
+            stop: Position after the last one; the end if None
+        
+        Returns:
+            float32 array with one row per position
+        """
+        stop = len(self._chunks) if stop is None else min(stop, len(self._chunks))
+        if self._index is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._index.get_vectors(self._chunk_ids[start:stop])
+    
+    def _append(self, ids: List[int], chunks: List[CodeChunk]) -> None:
+        """Append indexed chunks to the aligned stores."""
+        for position, (chunk_id, chunk) in enumerate(zip(ids, chunks), len(self._chunks)):
+            self._positions[chunk_id] = position
+            self._file_chunk_ids.setdefault(chunk.file_path, set()).add(chunk_id)
+        self._chunks.extend(chunks)
+        self._chunk_ids.extend(ids)
+    
+    def _set_stored(self, ids: List[int], chunks: List[CodeChunk]) -> None:
+        """Replace the aligned stores."""
+        self._chunks = list(chunks)
+        self._chunk_ids = list(ids)
+        self._positions = {chunk_id: position for position, chunk_id in enumerate(self._chunk_ids)}
+        self._file_chunk_ids = {}
+        for chunk_id, chunk in zip(self._chunk_ids, self._chunks):
+            self._file_chunk_ids.setdefault(chunk.file_path, set()).add(chunk_id)
+    
+    def _remove_ids(self, ids: Iterable[int]) -> int:
+        """Remove chunks by ID from the index and the aligned stores."""
+        ids = [chunk_id for chunk_id in set(ids) if chunk_id in self._positions]
+        if not ids:
+            return 0
+        
+        self._index.remove(np.array(ids, dtype=np.int64))
+        
+        for chunk_id in ids:
+            # Move the last chunk into the freed position
+            position = self._positions.pop(chunk_id)
+            file_ids = self._file_chunk_ids.get(self._chunks[position].file_path)
+            if file_ids is not None:
+                file_ids.discard(chunk_id)
+                if not file_ids:
+                    del self._file_chunk_ids[self._chunks[position].file_path]
+            
+            last = len(self._chunks) - 1
+            if position != last:
+                moved_id = self._chunk_ids[last]
+                self._chunks[position] = self._chunks[last]
+                self._chunk_ids[position] = moved_id
+                self._positions[moved_id] = position
+            self._chunks.pop()
+            self._chunk_ids.pop()
+        
+        return len(ids)
+    
     def search(self, query: str, k: int = 5, min_similarity: float = 0.0) -> List[EmbeddingResult]:
         """
         Search for similar code chunks using embedding similarity.
@@ -212,44 +490,113 @@ class EmbeddingService:
         Returns:
             List of embedding results sorted by similarity
         """
+        return self.search_many([query], k, min_similarity)[0]
+    
+    def search_many(self, queries: Sequence[str], k: int = 5,
+                    min_similarity: float = 0.0) -> List[List[EmbeddingResult]]:
+        """
+        Search for chunks similar to several queries at once.
+        
+        The queries are encoded in one model call and looked up with batched
+        index searches.
+        
+        Args:
+            queries: Search query texts
+            k: Number of results per query
+            min_similarity: Minimum similarity threshold
+            
+        Returns:
+            One list of embedding results per query, sorted by similarity
+        """
+        empty = [[] for _ in queries]
+        if not queries:
+            return empty
         if not self.is_available() or self._index is None:
             logger.warning("Embedding service or index not available")
-            return []
+            return empty
         
         try:
-            import faiss
-            
-            # Generate query embedding
-            query_embedding = self.embed_text(query)
-            if query_embedding is None:
-                return []
-            
-            # Normalize query embedding
-            query_embedding = query_embedding.reshape(1, -1).astype('float32')
-            faiss.normalize_L2(query_embedding)
-            
-            # Search index
-            similarities, indices = self._index.search(query_embedding, min(k, len(self._chunks)))
+            return self._search_vectors(self._normalize(self._encode(queries)), k, min_similarity)
+        except Exception as e:
+            logger.error(f"Failed to search embeddings: {e}")
+            return empty
+    
+    def similar_for_all(self, k: int = 5, min_similarity: float = 0.0) -> List[List[EmbeddingResult]]:
+        """
+        Find the most similar other chunks for every indexed chunk.
+        
+        Uses the stored vectors, so nothing is re-encoded; useful for finding
+        near-duplicate code across a whole project.
+        
+        Args:
+            k: Number of similar chunks per chunk
+            min_similarity: Minimum similarity threshold
             
-            # Prepare results
+        Returns:
+            One list of embedding results per indexed chunk, aligned with
+            get_chunk_by_index positions
+        """
+        if self._index is None or not self._chunks:
+            return []
+        
+        try:
             results = []
-            for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-                if idx >= 0 and similarity >= min_similarity:
-                    results.append(EmbeddingResult(
-                        chunk=self._chunks[idx],
-                        similarity=float(similarity),
-                        index=int(idx)
-                    ))
-            
+            # Read the stored vectors one search batch at a time
+            for start in range(0, len(self._chunks), self.SEARCH_BATCH_SIZE):
+                stop = start + self.SEARCH_BATCH_SIZE
+                results.extend(self._search_vectors(self.stored_vectors(start, stop), k, min_similarity,
+                                                    exclude_ids=self._chunk_ids[start:stop]))
             return results
-            
         except Exception as e:
             logger.error(f"Failed to search embeddings: {e}")
-            return []
+            return [[] for _ in self._chunks]
+    
+    def _search_vectors(self, vectors: np.ndarray, k: int, min_similarity: float = 0.0,
+                        exclude_ids: Optional[Sequence[int]] = None) -> List[List[EmbeddingResult]]:
+        """
+        Search the index with normalized query vectors.
+        
+        Args:
+            vectors: 2D array of normalized query vectors
+            k: Number of results per query
+            min_similarity: Minimum similarity threshold
+            exclude_ids: Chunk ID to leave out of each query's results, aligned
+                with vectors
+            
+        Returns:
+            One list of embedding results per query vector
+        """
+        fetch = min(k + (1 if exclude_ids is not None else 0), len(self._chunks))
+        results = []
+        
+        # Bound the score matrix of exact searches over large corpora
+        for start in range(0, len(vectors), self.SEARCH_BATCH_SIZE):
+            batch = np.ascontiguousarray(vectors[start:start + self.SEARCH_BATCH_SIZE], dtype=np.float32)
+            similarities, ids = self._index.search(batch, fetch)
+            
+            for row, (row_similarities, row_ids) in enumerate(zip(similarities, ids)):
+                excluded = exclude_ids[start + row] if exclude_ids is not None else None
+                row_results = []
+                for similarity, chunk_id in zip(row_similarities.tolist(), row_ids.tolist()):
+                    position = self._positions.get(chunk_id)
+                    if position is None or chunk_id == excluded or similarity < min_similarity:
+                        continue
+                    row_results.append(EmbeddingResult(
+                        chunk=self._chunks[position],
+                        similarity=similarity,
+                        index=position
+                    ))
+                results.append(row_results[:k])
+        
+        return results
     
     def save_index(self, filepath: str) -> bool:
         """
-        Save the FAISS index and associated data to disk.
+        Save the index and associated data to disk.
+        
+        Chunk metadata goes to a SQLite table that references chunk text by
+        file and line range, FAISS indexes to a .faiss file and the vectors
+        of the NumPy index to a .npy matrix; see index_store for the layout.
         
         Args:
             filepath: Path to save the index
@@ -262,23 +609,23 @@ class EmbeddingService:
             return False
         
         try:
-            import faiss
-            
             # Ensure directory exists
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            
-            # Save FAISS index
-            faiss.write_index(self._index, f"{filepath}.faiss")
-            
-            # Save chunks and metadata
-            metadata = {
-                'chunks': self._chunks,
+            os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+            
+            # The NumPy index is rebuilt from the vector matrix on load; FAISS indexes hold their own vectors
+            vectors = None
+            if self._index.index_type == NumpyVectorIndex.index_type:
+                vectors = self.stored_vectors()
+                if not len(vectors):
+                    vectors = np.empty((0, self._index.dimension), dtype=np.float32)
+            else:
+                self._index.save(index_paths(filepath)['index'])
+            
+            write_index_files(filepath, self._chunks, self._chunk_ids, vectors, {
                 'model_name': self.model_name,
-                'embeddings_shape': self._embeddings.shape if self._embeddings is not None else None
-            }
-            
-            with open(f"{filepath}.pkl", 'wb') as f:
-                pickle.dump(metadata, f)
+                'index_type': self._index.index_type,
+                'dimension': self._index.dimension
+            })
             
             logger.info(f"Saved index to {filepath}")
             return True
@@ -289,7 +636,11 @@ class EmbeddingService:
     
     def load_index(self, filepath: str) -> bool:
         """
-        Load FAISS index and associated data from disk.
+        Load an index and associated data from disk.
+        
+        The vectors of a NumPy index are memory-mapped and chunk text is read
+        from the source files on first access. Indexes saved with pickled metadata by earlier
+        versions are still read.
         
         Args:
             filepath: Path to load the index from
@@ -297,27 +648,37 @@ class EmbeddingService:
         Returns:
             True if loaded successfully, False otherwise
         """
+        paths = index_paths(filepath)
         try:
-            import faiss
-            
-            # Check if files exist
-            if not os.path.exists(f"{filepath}.faiss") or not os.path.exists(f"{filepath}.pkl"):
+            if os.path.exists(paths['chunks']) and (os.path.exists(paths['vectors']) or os.path.exists(paths['index'])):
+                chunks, chunk_ids, vectors, info = read_index_files(filepath)
+                model_name = info.get('model_name')
+                
+                if info.get('index_type') == NumpyVectorIndex.index_type or not os.path.exists(paths['index']):
+                    if vectors is None:
+                        raise ValueError(f"Index at {filepath} has no vectors")
+                    # The index uses the mapped matrix as its storage
+                    index = NumpyVectorIndex.from_arrays(
+                        chunk_ids, vectors, **index_options_for(NumpyVectorIndex.index_type, self.index_options)
+                    )
+                else:
+                    index = load_vector_index(paths['index'])
+                    if len(index) != len(chunks):
+                        raise ValueError(f"Index has {len(chunks)} chunks but {len(index)} vectors")
+            elif os.path.exists(paths['index']) and os.path.exists(f"{filepath}.pkl"):
+                index, chunks, chunk_ids, model_name = self._read_pickled_index(filepath)
+            else:
                 logger.warning(f"Index files not found at {filepath}")
                 return False
             
-            # Load FAISS index
-            self._index = faiss.read_index(f"{filepath}.faiss")
-            
-            # Load metadata
-            with open(f"{filepath}.pkl", 'rb') as f:
-                metadata = pickle.load(f)
-            
-            self._chunks = metadata['chunks']
+            self.clear_index()
+            self._index = index
+            self._set_stored(chunk_ids, chunks)
             
             # Verify model compatibility
-            if metadata['model_name'] != self.model_name:
+            if model_name != self.model_name:
                 logger.warning(
-                    f"Model mismatch: saved with {metadata['model_name']}, "
+                    f"Model mismatch: saved with {model_name}, "
                     f"current is {self.model_name}"
                 )
             
@@ -331,6 +692,24 @@ class EmbeddingService:
             logger.error(f"Failed to load index: {e}")
             return False
     
+    def _read_pickled_index(self, filepath: str) -> Tuple[VectorIndex, List[CodeChunk], List[int], str]:
+        """Read an index saved with pickled metadata by earlier versions."""
+        index = load_vector_index(f"{filepath}.faiss")
+        with open(f"{filepath}.pkl", 'rb') as f:
+            metadata = pickle.load(f)
+        
+        chunks = list(metadata['chunks'])
+        chunk_ids = metadata.get('chunk_ids')
+        
+        if chunk_ids is None:
+            # Indexes saved before chunk IDs are keyed by position; re-key them
+            vectors = index.get_vectors(range(len(chunks)))
+            chunk_ids = [self.chunk_id(chunk) for chunk in chunks]
+            index = self._create_index(index.dimension, len(chunks))
+            index.add(np.array(chunk_ids, dtype=np.int64), vectors)
+        
+        return index, chunks, list(chunk_ids), metadata['model_name']
+    
     def get_chunk_by_index(self, index: int) -> Optional[CodeChunk]:
         """
         Get code chunk by its index in the vector store.
@@ -357,12 +736,16 @@ class EmbeddingService:
             'is_available': self.is_available(),
             'cache_dir': self.cache_dir,
             'index_built': self._index is not None,
+            'index_type': self._index.index_type if self._index is not None else None,
             'num_chunks': len(self._chunks),
             'embedding_dimension': None
         }
         
-        if self._embeddings is not None:
-            stats['embedding_dimension'] = self._embeddings.shape[1]
+        if self._index is not None:
+            stats['embedding_dimension'] = self._index.dimension
+        
+        if self._embedding_cache is not None:
+            stats['embedding_cache'] = dict(self._embedding_cache.get_stats(), **self.cache_stats)
         
         return stats
     
@@ -370,12 +753,18 @@ class EmbeddingService:
         """Clear the current index and associated data."""
         self._index = None
         self._chunks = []
-        self._embeddings = None
+        self._chunk_ids = []
+        self._positions = {}
+        self._file_chunk_ids = {}
         logger.info("Cleared embedding index")
     
     def update_chunks(self, chunks: List[CodeChunk]) -> bool:
         """
-        Update the index with new chunks (rebuilds the entire index).
+        Update the index with new chunks.
+        
+        Only the difference is applied: chunks that are gone are removed and
+        new or changed chunks are added, taking unchanged text from the
+        embedding cache.
         
         Args:
             chunks: New list of code chunks
@@ -384,8 +773,18 @@ class EmbeddingService:
             True if updated successfully, False otherwise
         """
         logger.info("Updating embedding index with new chunks")
-        self.clear_index()
-        return self.build_index(chunks)
+        if self._index is None:
+            return self.build_index(chunks)
+        
+        new_chunks = {self.chunk_id(chunk): chunk for chunk in chunks}
+        stale = [chunk_id for chunk_id in self._chunk_ids if chunk_id not in new_chunks]
+        changed = [
+            chunk for chunk_id, chunk in new_chunks.items()
+            if chunk_id not in self._positions or self._chunks[self._positions[chunk_id]] != chunk
+        ]
+        
+        self._remove_ids(stale)
+        return self.add_chunks(changed)
     
     def get_similar_chunks(
         self, 
@@ -396,6 +795,9 @@ class EmbeddingService:
         """
         Find chunks similar to the given chunk.
         
+        An indexed chunk is searched with its stored vector; other chunks are
+        encoded first.
+        
         Args:
             chunk: Reference chunk to find similar chunks for
             k: Number of similar chunks to return
@@ -404,17 +806,23 @@ class EmbeddingService:
         Returns:
             List of similar chunks
         """
-        # Use the chunk content as query
-        query_text = f"File: {chunk.file_path} | Function: {chunk.function_name} | Code: {chunk.content}"
-        results = self.search(query_text, k + (1 if exclude_self else 0))
+        if self._index is None:
+            logger.warning("Embedding service or index not available")
+            return []
         
-        if exclude_self:
-            # Filter out the exact same chunk
-            results = [
-                result for result in results 
-                if not (result.chunk.file_path == chunk.file_path and 
-                       result.chunk.start_line == chunk.start_line and
-                       result.chunk.end_line == chunk.end_line)
-            ][:k]
+        chunk_id = self.chunk_id(chunk)
+        position = self._positions.get(chunk_id)
+        if position is not None and self._chunks[position] == chunk:
+            # Indexed chunks are looked up by their stored vector
+            vectors = self.stored_vectors(position, position + 1)
+        else:
+            embedding = self.embed_text(self._chunk_text(chunk))
+            if embedding is None:
+                return []
+            vectors = self._normalize(embedding)
         
-        return results
\ No newline at end of file
+        try:
+            return self._search_vectors(vectors, k, exclude_ids=[chunk_id] if exclude_self else None)[0]
+        except Exception as e:
+            logger.error(f"Failed to search embeddings: {e}")
+            return []
\ No newline at end of file
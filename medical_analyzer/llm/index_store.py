@@ -0,0 +1,286 @@
+"""
+On-disk format of saved embedding indexes.
+
+A saved index consists of:
+
+- ``<path>.chunks.db``: SQLite table of chunk metadata, one row per chunk
+  in vector order. Chunk text is not duplicated when it can be read back
+  from its source file by line range; only chunks whose text differs from
+  the file (or whose file is gone) store their text, keyed by content hash.
+- ``<path>.vectors.npy``: float32 vector matrix of the NumPy index, opened
+  memory-mapped, so loading does not read the vectors.
+- ``<path>.faiss``: the FAISS index, for FAISS index types only. These
+  hold their own vectors, so no vector matrix is written for them.
+
+Loaded chunks read their text from the source file on first access, so
+load time scales with the number of chunks rather than the source size.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..models.core import CodeChunk
+from ..models.enums import ChunkType
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Where the text of a chunk comes from
+CONTENT_FROM_FILE = 'file'
+CONTENT_STORED = 'stored'
+
+_SCHEMA = """
+CREATE TABLE index_info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE files (file_id INTEGER PRIMARY KEY, path TEXT NOT NULL, source_path TEXT NOT NULL);
+CREATE TABLE chunks (
+    position INTEGER PRIMARY KEY,
+    chunk_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    function_name TEXT,
+    chunk_type TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    content_source TEXT NOT NULL,
+    metadata TEXT
+);
+CREATE TABLE contents (content_hash TEXT PRIMARY KEY, content TEXT NOT NULL);
+"""
+
+
+def content_hash(content: str) -> str:
+    """Hash chunk text the same way the embedding cache keys it."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _read_lines(source_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Read the lines of a source file; cached per file version."""
+    with open(source_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return tuple(f.read().split('\n'))
+
+
+def read_line_range(source_path: str, start_line: int, end_line: int) -> Optional[str]:
+    """
+    Read lines of a source file the way the parsers slice chunks.
+    
+    Args:
+        source_path: Path of the source file
+        start_line: First line, 1-based
+        end_line: Last line, inclusive
+    
+    Returns:
+        Text of the lines, or None if the file cannot be read
+    """
+    try:
+        lines = _read_lines(source_path, os.stat(source_path).st_mtime_ns)
+    except OSError:
+        return None
+    return '\n'.join(lines[max(start_line - 1, 0):end_line])
+
+
+class StoredCodeChunk(CodeChunk):
+    """
+    Code chunk loaded from a saved index.
+    
+    The text is read from the source file on first access. The chunk
+    compares equal to a CodeChunk with the same location and fields whose
+    text has the hash that was saved, so an edited source file shows up as
+    a changed chunk even though the lazy text would follow the edit.
+    """
+    
+    def __init__(self, file_path: str, start_line: int, end_line: int, function_name: Optional[str],
+                 chunk_type: ChunkType, metadata: Dict[str, Any], content_hash: str, source_path: str,
+                 content: Optional[str] = None):
+        self._content = content
+        self.content_hash = content_hash
+        self.source_path = source_path
+        self.file_path = file_path
+        self.start_line = start_line
+        self.end_line = end_line
+        self.function_name = function_name
+        self.chunk_type = chunk_type
+        self.metadata = metadata
+        self.embedding = None
+    
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            text = read_line_range(self.source_path, self.start_line, self.end_line)
+            if text is None:
+                logger.warning(f"Source of indexed chunk not found: {self.source_path}")
+                return ""
+            if content_hash(text) != self.content_hash:
+                logger.warning(
+                    f"{self.file_path}:{self.start_line}-{self.end_line} changed since the index was saved"
+                )
+            self._content = text
+        return self._content
+    
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+        self.content_hash = content_hash(value)
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CodeChunk):
+            return NotImplemented
+        other_hash = other.content_hash if isinstance(other, StoredCodeChunk) else content_hash(other.content)
+        return (
+            self.content_hash == other_hash and
+            (self.file_path, self.start_line, self.end_line, self.function_name,
+             self.chunk_type, self.metadata, self.embedding) ==
+            (other.file_path, other.start_line, other.end_line, other.function_name,
+             other.chunk_type, other.metadata, other.embedding)
+        )
+    
+    __hash__ = None
+    
+    def __reduce__(self):
+        # Pickle as a plain chunk, so copies do not depend on the source file
+        return (CodeChunk, (self.file_path, self.start_line, self.end_line, self.content,
+                            self.function_name, self.chunk_type, self.metadata, self.embedding))
+
+
+def index_paths(filepath: str) -> Dict[str, str]:
+    """Get the file paths of a saved index."""
+    return {
+        'chunks': f"{filepath}.chunks.db",
+        'vectors': f"{filepath}.vectors.npy",
+        'index': f"{filepath}.faiss",
+    }
+
+
+def write_index_files(filepath: str, chunks: Sequence[CodeChunk], chunk_ids: Sequence[int],
+                      vectors: Optional[np.ndarray], info: Dict[str, Any]) -> None:
+    """
+    Write the chunk table and vector matrix of an index.
+    
+    Args:
+        filepath: Base path of the index files
+        chunks: Indexed chunks in vector order
+        chunk_ids: IDs of the chunks
+        vectors: Vector matrix aligned with the chunks, or None to write no
+            matrix (and remove one left by an earlier save)
+        info: Extra key/value pairs stored with the index, e.g. model_name
+    """
+    paths = index_paths(filepath)
+    
+    # Write next to the target and rename, so a failed save keeps the old index
+    if vectors is not None:
+        np.save(paths['vectors'] + '.tmp.npy', np.ascontiguousarray(vectors, dtype=np.float32))
+    db_tmp = paths['chunks'] + '.tmp'
+    if os.path.exists(db_tmp):
+        os.remove(db_tmp)
+    
+    files: Dict[str, Tuple[int, str]] = {}
+    rows = []
+    contents = {}
+    for position, (chunk, chunk_id) in enumerate(zip(chunks, chunk_ids)):
+        if chunk.file_path not in files:
+            source_path = getattr(chunk, 'source_path', None) or os.path.abspath(chunk.file_path)
+            files[chunk.file_path] = (len(files), source_path)
+        file_id, source_path = files[chunk.file_path]
+        
+        text = chunk.content
+        # A loaded chunk keeps the hash its vector was computed from
+        digest = chunk.content_hash if isinstance(chunk, StoredCodeChunk) else content_hash(text)
+        if read_line_range(source_path, chunk.start_line, chunk.end_line) == text:
+            source = CONTENT_FROM_FILE
+        else:
+            source = CONTENT_STORED
+            contents[digest] = text
+        
+        chunk_type = chunk.chunk_type.name if isinstance(chunk.chunk_type, ChunkType) else str(chunk.chunk_type)
+        rows.append((
+            position, int(chunk_id), file_id, chunk.start_line, chunk.end_line,
+            chunk.function_name, chunk_type, digest, source,
+            json.dumps(chunk.metadata, default=str) if chunk.metadata else None
+        ))
+    
+    conn = sqlite3.connect(db_tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.executemany("INSERT INTO index_info VALUES (?, ?)",
+                         [(key, json.dumps(value)) for key, value in
+                          dict(info, format_version=FORMAT_VERSION, count=len(rows)).items()])
+        conn.executemany("INSERT INTO files VALUES (?, ?, ?)",
+                         [(file_id, path, source_path) for path, (file_id, source_path) in files.items()])
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO contents VALUES (?, ?)", contents.items())
+        conn.commit()
+    finally:
+        conn.close()
+    
+    if vectors is not None:
+        os.replace(paths['vectors'] + '.tmp.npy', paths['vectors'])
+    elif os.path.exists(paths['vectors']):
+        os.remove(paths['vectors'])
+    os.replace(db_tmp, paths['chunks'])
+
+
+def read_index_files(filepath: str) -> Tuple[List[StoredCodeChunk], List[int], Optional[np.ndarray], Dict[str, Any]]:
+    """
+    Read the chunk table and vector matrix of an index.
+    
+    Args:
+        filepath: Base path of the index files
+    
+    Returns:
+        Tuple of (chunks, chunk IDs, copy-on-write memory-mapped vectors or
+        None if the index has no vector matrix, info)
+    
+    Raises:
+        ValueError: If the files are inconsistent or of an unknown version
+    """
+    paths = index_paths(filepath)
+    conn = sqlite3.connect(f"file:{paths['chunks']}?mode=ro", uri=True)
+    try:
+        info = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM index_info")}
+        if info.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format version: {info.get('format_version')}")
+        
+        files = {file_id: (path, source_path)
+                 for file_id, path, source_path in conn.execute("SELECT file_id, path, source_path FROM files")}
+        contents = dict(conn.execute("SELECT content_hash, content FROM contents"))
+        rows = conn.execute(
+            "SELECT chunk_id, file_id, start_line, end_line, function_name, chunk_type, "
+            "content_hash, content_source, metadata FROM chunks ORDER BY position"
+        ).fetchall()
+    finally:
+        conn.close()
+    
+    chunk_types = {chunk_type.name: chunk_type for chunk_type in ChunkType}
+    chunks = []
+    chunk_ids = []
+    for chunk_id, file_id, start_line, end_line, function_name, chunk_type, digest, source, metadata in rows:
+        path, source_path = files[file_id]
+        chunks.append(StoredCodeChunk(
+            file_path=path,
+            start_line=start_line,
+            end_line=end_line,
+            function_name=function_name,
+            chunk_type=chunk_types.get(chunk_type, chunk_type),
+            metadata=json.loads(metadata) if metadata else {},
+            content_hash=digest,
+            source_path=source_path,
+            content=contents.get(digest) if source == CONTENT_STORED else None
+        ))
+        chunk_ids.append(chunk_id)
+    
+    if not os.path.exists(paths['vectors']):
+        return chunks, chunk_ids, None, info
+    
+    vectors = np.load(paths['vectors'], mmap_mode='c')
+    if len(vectors) != len(chunks):
+        raise ValueError(f"Index has {len(chunks)} chunks but {len(vectors)} vectors")
+    
+    return chunks, chunk_ids, vectors, info
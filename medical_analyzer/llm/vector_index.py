@@ -0,0 +1,651 @@
+"""
+Vector indexes for the embedding service.
+
+Indexes store L2-normalized float32 vectors under stable int64 IDs, so
+vectors can be added, replaced and removed one chunk at a time, and answer
+batched top-k inner-product (cosine similarity) queries.
+
+Three FAISS index types are available:
+- flat: exact search, O(N) per query, N x dim float32 memory
+- hnsw: graph-based approximate search with low latency
+- ivfpq: inverted lists over product-quantized codes, for corpora that do
+  not fit in memory as float32
+
+select_index_type picks one from the corpus size. When FAISS is not
+installed, every type falls back to NumpyVectorIndex, an exact index with
+the same interface.
+"""
+
+import logging
+import math
+import os
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ('auto', 'flat', 'hnsw', 'ivfpq', 'numpy')
+
+# Corpus sizes at which auto selection switches to an approximate index
+HNSW_MIN_VECTORS = 50_000
+IVFPQ_MIN_VECTORS = 1_000_000
+
+# Tuning options accepted by each index type
+INDEX_OPTIONS = {
+    'flat': (),
+    'hnsw': ('m', 'ef_construction', 'ef_search'),
+    'ivfpq': ('nlist', 'm', 'nbits', 'nprobe'),
+    'numpy': ('block_size',),
+}
+
+
+class VectorIndex(ABC):
+    """Abstract ID-keyed vector index with inner-product search."""
+    
+    index_type = "abstract"
+    
+    def __init__(self, dimension: int):
+        """
+        Initialize the index.
+        
+        Args:
+            dimension: Dimension of the stored vectors
+        """
+        self.dimension = dimension
+    
+    @abstractmethod
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Add vectors under the given IDs.
+        
+        Args:
+            ids: int64 array of IDs not yet in the index
+            vectors: float32 array of normalized vectors, one row per ID
+        """
+        pass
+    
+    @abstractmethod
+    def remove(self, ids: np.ndarray) -> int:
+        """
+        Remove vectors by ID.
+        
+        Args:
+            ids: int64 array of IDs to remove; unknown IDs are ignored
+        
+        Returns:
+            Number of vectors removed
+        """
+        pass
+    
+    @abstractmethod
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k most similar vectors for each query.
+        
+        Args:
+            queries: float32 array of normalized query vectors
+            k: Number of neighbours per query
+        
+        Returns:
+            Tuple of (similarities, ids) arrays of shape (len(queries), k),
+            best first; missing neighbours have ID -1
+        """
+        pass
+    
+    @abstractmethod
+    def get_vectors(self, ids: Iterable[int]) -> np.ndarray:
+        """
+        Get stored vectors by ID.
+        
+        Args:
+            ids: IDs of stored vectors
+        
+        Returns:
+            float32 array with one row per ID
+        """
+        pass
+    
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+    
+    @abstractmethod
+    def save(self, filepath: str) -> None:
+        """Write the index to a file."""
+        pass
+
+
+class FaissVectorIndex(VectorIndex):
+    """Exact inner-product index using FAISS IndexIDMap2 over IndexFlatIP."""
+    
+    index_type = "flat"
+    
+    def __init__(self, dimension: int, index=None):
+        """
+        Initialize the index.
+        
+        Args:
+            dimension: Dimension of the stored vectors
+            index: Existing FAISS index to wrap, e.g. one read from disk
+        """
+        super().__init__(dimension)
+        if not FAISS_AVAILABLE:
+            raise ImportError("FAISS not available. Install with: pip install faiss-cpu")
+        self._index = index if index is not None else faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+    
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        self._index.add_with_ids(
+            np.ascontiguousarray(vectors, dtype=np.float32),
+            np.ascontiguousarray(ids, dtype=np.int64)
+        )
+    
+    def remove(self, ids: np.ndarray) -> int:
+        if not len(ids):
+            return 0
+        return int(self._index.remove_ids(np.ascontiguousarray(ids, dtype=np.int64)))
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if k <= 0 or len(self) == 0:
+            return (np.zeros((len(queries), 0), dtype=np.float32),
+                    np.zeros((len(queries), 0), dtype=np.int64))
+        return self._index.search(queries, min(k, len(self)))
+    
+    def get_vectors(self, ids: Iterable[int]) -> np.ndarray:
+        vectors = [self._index.reconstruct(int(vector_id)) for vector_id in ids]
+        if not vectors:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32)
+    
+    def __len__(self) -> int:
+        return int(self._index.ntotal)
+    
+    def save(self, filepath: str) -> None:
+        faiss.write_index(self._index, filepath)
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'FaissVectorIndex':
+        """Read an index written by save."""
+        if not FAISS_AVAILABLE:
+            raise ImportError("FAISS not available. Install with: pip install faiss-cpu")
+        index = faiss.read_index(filepath)
+        return cls(index.d, index=index)
+
+
+class FaissHNSWIndex(VectorIndex):
+    """
+    Approximate inner-product index using a FAISS HNSW graph.
+    
+    HNSW graphs cannot delete vectors, so removed vectors are hidden from
+    results and the graph is rebuilt from the live vectors once a quarter of
+    it is deleted.
+    """
+    
+    index_type = "hnsw"
+    COMPACT_DELETED_FRACTION = 0.25
+    
+    def __init__(self, dimension: int, m: int = 32, ef_construction: int = 80,
+                 ef_search: int = 64, index=None, labels: Optional[np.ndarray] = None):
+        """
+        Initialize the index.
+        
+        Args:
+            dimension: Dimension of the stored vectors
+            m: Number of graph neighbours per vector
+            ef_construction: Search depth while inserting
+            ef_search: Search depth while querying; higher is slower and more accurate
+            index: Existing IndexHNSWFlat to wrap, e.g. one read from disk
+            labels: External ID of each vector in the existing index, -1 if removed
+        """
+        super().__init__(dimension)
+        if not FAISS_AVAILABLE:
+            raise ImportError("FAISS not available. Install with: pip install faiss-cpu")
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = index if index is not None else self._new_graph()
+        self._index.hnsw.efSearch = ef_search
+        
+        # Graph positions map to external IDs
+        self._labels = array('q', labels.tolist() if labels is not None else [])
+        self._positions = {int(label): position for position, label in enumerate(self._labels) if label >= 0}
+        self._deleted = len(self._labels) - len(self._positions)
+    
+    def _new_graph(self):
+        index = faiss.IndexHNSWFlat(self.dimension, self.m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = self.ef_construction
+        index.hnsw.efSearch = self.ef_search
+        return index
+    
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        start = len(self._labels)
+        self._index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+        self._labels.extend(int(vector_id) for vector_id in ids)
+        for position, vector_id in enumerate(ids, start):
+            self._positions[int(vector_id)] = position
+    
+    def remove(self, ids: np.ndarray) -> int:
+        removed = 0
+        for vector_id in ids:
+            position = self._positions.pop(int(vector_id), None)
+            if position is not None:
+                self._labels[position] = -1
+                removed += 1
+        self._deleted += removed
+        
+        if self._deleted > self.COMPACT_DELETED_FRACTION * max(len(self._labels), 1):
+            self._compact()
+        return removed
+    
+    def _compact(self) -> None:
+        """Rebuild the graph from the live vectors."""
+        ids = np.array(list(self._positions), dtype=np.int64)
+        vectors = self.get_vectors(ids)
+        self._index = self._new_graph()
+        self._labels = array('q')
+        self._positions = {}
+        self._deleted = 0
+        if len(ids):
+            self.add(ids, vectors)
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        k = min(k, len(self))
+        if k <= 0:
+            return (np.zeros((len(queries), 0), dtype=np.float32),
+                    np.zeros((len(queries), 0), dtype=np.int64))
+        
+        # Over-fetch to make up for removed vectors among the neighbours
+        fetch = min(len(self._labels), k + min(self._deleted, 4 * k + 16))
+        similarities, positions = self._index.search(queries, fetch)
+        labels = np.frombuffer(self._labels, dtype=np.int64)
+        ids = np.where(positions >= 0, labels[np.maximum(positions, 0)], -1)
+        
+        # Keep the first k live neighbours of each query, in order
+        order = np.argsort(ids < 0, axis=1, kind='stable')[:, :k]
+        ids = np.take_along_axis(ids, order, axis=1)
+        similarities = np.take_along_axis(similarities, order, axis=1)
+        similarities[ids < 0] = -np.inf
+        return similarities, ids
+    
+    def get_vectors(self, ids: Iterable[int]) -> np.ndarray:
+        vectors = [self._index.reconstruct(self._positions[int(vector_id)]) for vector_id in ids]
+        if not vectors:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32)
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+    
+    def save(self, filepath: str) -> None:
+        faiss.write_index(self._index, filepath)
+        np.save(f"{filepath}.ids.npy", np.frombuffer(self._labels, dtype=np.int64))
+
+
+class FaissIVFPQIndex(VectorIndex):
+    """
+    Approximate inner-product index using FAISS IVF with product quantization.
+    
+    Vectors are stored as compact PQ codes (m bytes each with 8-bit codes)
+    instead of float32. The coarse quantizer and codebooks are trained on
+    the first batch of vectors added, so the index should be created with
+    the whole corpus.
+    """
+    
+    index_type = "ivfpq"
+    MIN_TRAINING_VECTORS = 1000
+    MAX_TRAINING_VECTORS = 100_000
+    
+    def __init__(self, dimension: int, nlist: Optional[int] = None, m: Optional[int] = None,
+                 nbits: int = 8, nprobe: Optional[int] = None, index=None):
+        """
+        Initialize the index.
+        
+        Args:
+            dimension: Dimension of the stored vectors
+            nlist: Number of inverted lists; derived from the corpus size if not set
+            m: Number of PQ sub-quantizers; must divide the dimension
+            nbits: Bits per PQ code
+            nprobe: Inverted lists visited per query; higher is slower and more accurate
+            index: Existing trained IndexIVFPQ to wrap, e.g. one read from disk
+        """
+        super().__init__(dimension)
+        if not FAISS_AVAILABLE:
+            raise ImportError("FAISS not available. Install with: pip install faiss-cpu")
+        self.nlist = nlist
+        self.m = m or self._default_subquantizers(dimension)
+        self.nbits = nbits
+        self.nprobe = nprobe
+        self._index = index
+        if index is not None and nprobe:
+            index.nprobe = nprobe
+    
+    @staticmethod
+    def _default_subquantizers(dimension: int) -> int:
+        """Choose about 8 dimensions per sub-quantizer."""
+        for m in (64, 48, 32, 24, 16, 12, 8, 6, 4, 2):
+            if dimension % m == 0 and dimension // m >= 4:
+                return m
+        return 1
+    
+    def _train(self, vectors: np.ndarray) -> None:
+        """Create and train the index on the first vectors added."""
+        if len(vectors) < self.MIN_TRAINING_VECTORS:
+            raise ValueError(
+                f"IVF-PQ needs at least {self.MIN_TRAINING_VECTORS} vectors to train, got {len(vectors)}"
+            )
+        
+        nlist = self.nlist or int(4 * math.sqrt(len(vectors)))
+        nlist = max(1, min(nlist, len(vectors) // 39))
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        index = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, self.m, self.nbits,
+                                 faiss.METRIC_INNER_PRODUCT)
+        
+        sample = vectors
+        if len(vectors) > self.MAX_TRAINING_VECTORS:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), self.MAX_TRAINING_VECTORS, replace=False)]
+        logger.info(f"Training IVF-PQ index (nlist={nlist}, m={self.m}) on {len(sample)} vectors")
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+        
+        # A hash table direct map allows removal and reconstruction by ID
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        index.nprobe = self.nprobe or max(1, nlist // 16)
+        self._index = index
+    
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        if self._index is None:
+            self._train(vectors)
+        self._index.add_with_ids(
+            np.ascontiguousarray(vectors, dtype=np.float32),
+            np.ascontiguousarray(ids, dtype=np.int64)
+        )
+    
+    def remove(self, ids: np.ndarray) -> int:
+        if self._index is None or not len(ids):
+            return 0
+        return int(self._index.remove_ids(np.ascontiguousarray(ids, dtype=np.int64)))
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if k <= 0 or len(self) == 0:
+            return (np.zeros((len(queries), 0), dtype=np.float32),
+                    np.zeros((len(queries), 0), dtype=np.int64))
+        return self._index.search(queries, min(k, len(self)))
+    
+    def get_vectors(self, ids: Iterable[int]) -> np.ndarray:
+        """Get the stored vectors by ID; these are PQ approximations of the originals."""
+        vectors = [self._index.reconstruct(int(vector_id)) for vector_id in ids]
+        if not vectors:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32)
+    
+    def __len__(self) -> int:
+        return int(self._index.ntotal) if self._index is not None else 0
+    
+    def save(self, filepath: str) -> None:
+        faiss.write_index(self._index, filepath)
+
+
+class NumpyVectorIndex(VectorIndex):
+    """
+    Exact inner-product index in pure NumPy, used when FAISS is unavailable.
+    
+    Vectors live in one contiguous float32 matrix. Queries are scored in
+    blocks with a matrix multiplication and the top k of each block is
+    selected with argpartition, so memory use is bounded by the block size
+    and a batch of queries shares a single pass over the matrix.
+    """
+    
+    index_type = "numpy"
+    
+    def __init__(self, dimension: int, block_size: int = 65536):
+        """
+        Initialize the index.
+        
+        Args:
+            dimension: Dimension of the stored vectors
+            block_size: Number of stored vectors scored at a time
+        """
+        super().__init__(dimension)
+        self.block_size = block_size
+        self._vectors = np.empty((0, dimension), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._size = 0
+        self._positions: Dict[int, int] = {}
+    
+    def _reserve(self, size: int) -> None:
+        """Grow the storage geometrically to hold size vectors."""
+        if size <= len(self._vectors):
+            return
+        capacity = max(size, 2 * len(self._vectors), 1024)
+        vectors = np.empty((capacity, self.dimension), dtype=np.float32)
+        ids = np.empty(capacity, dtype=np.int64)
+        vectors[:self._size] = self._vectors[:self._size]
+        ids[:self._size] = self._ids[:self._size]
+        self._vectors, self._ids = vectors, ids
+    
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        ids = np.asarray(ids, dtype=np.int64)
+        start, end = self._size, self._size + len(ids)
+        self._reserve(end)
+        self._vectors[start:end] = vectors
+        self._ids[start:end] = ids
+        self._size = end
+        for position, vector_id in enumerate(ids.tolist(), start):
+            self._positions[vector_id] = position
+    
+    def remove(self, ids: np.ndarray) -> int:
+        removed = 0
+        for vector_id in np.asarray(ids, dtype=np.int64).tolist():
+            position = self._positions.pop(vector_id, None)
+            if position is None:
+                continue
+            # Move the last vector into the freed row
+            last = self._size - 1
+            if position != last:
+                self._vectors[position] = self._vectors[last]
+                self._ids[position] = self._ids[last]
+                self._positions[int(self._ids[position])] = position
+            self._size = last
+            removed += 1
+        return removed
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.ascontiguousarray(np.atleast_2d(queries), dtype=np.float32)
+        k = min(k, self._size)
+        if k <= 0:
+            return (np.zeros((len(queries), 0), dtype=np.float32),
+                    np.zeros((len(queries), 0), dtype=np.int64))
+        
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), k), dtype=np.int64)
+        
+        for start in range(0, self._size, self.block_size):
+            block = self._vectors[start:min(start + self.block_size, self._size)]
+            scores = queries @ block.T
+            
+            if len(block) > k:
+                top = np.argpartition(scores, -k, axis=1)[:, -k:]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(len(block)), scores.shape)
+            
+            # Merge the block's candidates with the best found so far
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, top + start], axis=1)
+            keep = np.argpartition(scores, -k, axis=1)[:, -k:]
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+        
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        return best_scores, self._ids[best_rows]
+    
+    def get_vectors(self, ids: Iterable[int]) -> np.ndarray:
+        rows = [self._positions[int(vector_id)] for vector_id in ids]
+        return self._vectors[rows].copy()
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def save(self, filepath: str) -> None:
+        with open(filepath, 'wb') as f:
+            np.savez(f, ids=self._ids[:self._size], vectors=self._vectors[:self._size])
+    
+    @classmethod
+    def from_arrays(cls, ids: np.ndarray, vectors: np.ndarray, block_size: int = 65536) -> 'NumpyVectorIndex':
+        """
+        Create an index that uses the given vector matrix as its storage.
+        
+        The matrix is not copied, so a memory-mapped matrix stays on disk
+        until searched; it must be writable (e.g. mmap_mode='c') for removals.
+        """
+        index = cls(vectors.shape[1], block_size=block_size)
+        index._vectors = vectors
+        index._ids = np.array(ids, dtype=np.int64)
+        index._size = len(index._ids)
+        index._positions = {vector_id: position for position, vector_id in enumerate(index._ids.tolist())}
+        return index
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'NumpyVectorIndex':
+        """Read an index written by save."""
+        with np.load(filepath) as data:
+            vectors = data['vectors']
+            index = cls(vectors.shape[1])
+            index.add(data['ids'], vectors)
+        return index
+
+
+def select_index_type(corpus_size: int) -> str:
+    """
+    Choose an index type for a corpus.
+    
+    Args:
+        corpus_size: Number of vectors to index
+    
+    Returns:
+        'flat' for small corpora, 'hnsw' from HNSW_MIN_VECTORS and 'ivfpq'
+        from IVFPQ_MIN_VECTORS vectors
+    """
+    if corpus_size >= IVFPQ_MIN_VECTORS:
+        return 'ivfpq'
+    if corpus_size >= HNSW_MIN_VECTORS:
+        return 'hnsw'
+    return 'flat'
+
+
+def validate_index_options(options: Dict[str, Any]) -> None:
+    """
+    Check that every option is accepted by some index type.
+    
+    Raises:
+        ValueError: If an option is unknown, e.g. misspelled
+    """
+    known = {name for names in INDEX_OPTIONS.values() for name in names}
+    unknown = sorted(set(options) - known)
+    if unknown:
+        raise ValueError(f"Unknown index options: {', '.join(unknown)}")
+
+
+def index_options_for(index_type: str, options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Select the options accepted by an index type.
+    
+    Options of other index types are dropped, so a single set of options
+    survives auto selection and the fallbacks between types.
+    
+    Args:
+        index_type: Concrete index type, a key of INDEX_OPTIONS
+        options: Options for any index type
+    
+    Returns:
+        Keyword arguments for the index class
+    
+    Raises:
+        ValueError: If an option is not accepted by any index type
+    """
+    options = options or {}
+    validate_index_options(options)
+    return {name: value for name, value in options.items() if name in INDEX_OPTIONS[index_type]}
+
+
+def create_vector_index(dimension: int, index_type: str = 'auto', corpus_size: int = 0,
+                        options: Optional[Dict[str, Any]] = None) -> VectorIndex:
+    """
+    Create an empty vector index.
+    
+    Args:
+        dimension: Dimension of the vectors
+        index_type: One of INDEX_TYPES
+        corpus_size: Expected number of vectors, used by 'auto' and to check
+            that an IVF-PQ index can be trained
+        options: Options of any index type, e.g. ef_search or nprobe; only
+            those of the created type are passed to it (see index_options_for)
+    
+    Returns:
+        Vector index
+    
+    Raises:
+        ValueError: If the index type or an option is unknown
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {index_type}")
+    if index_type == 'auto':
+        index_type = select_index_type(corpus_size)
+    
+    if index_type == 'numpy':
+        return NumpyVectorIndex(dimension, **index_options_for('numpy', options))
+    if not FAISS_AVAILABLE:
+        logger.info(f"FAISS not available, using an exact NumPy index instead of {index_type}")
+        return NumpyVectorIndex(dimension, **index_options_for('numpy', options))
+    
+    if index_type == 'ivfpq' and corpus_size < FaissIVFPQIndex.MIN_TRAINING_VECTORS:
+        logger.info(f"Corpus of {corpus_size} vectors is too small to train IVF-PQ, using a flat index")
+        index_type = 'flat'
+    
+    index_classes = {'flat': FaissVectorIndex, 'hnsw': FaissHNSWIndex, 'ivfpq': FaissIVFPQIndex}
+    return index_classes[index_type](dimension, **index_options_for(index_type, options))
+
+
+def load_vector_index(filepath: str) -> VectorIndex:
+    """
+    Read an index written by VectorIndex.save.
+    
+    NumPy indexes are stored as .npz archives and can be read without FAISS.
+    
+    Args:
+        filepath: Path of the index file
+    
+    Returns:
+        Vector index of the saved type
+    """
+    with open(filepath, 'rb') as f:
+        is_numpy_index = f.read(2) == b'PK'
+    if is_numpy_index:
+        return NumpyVectorIndex.load(filepath)
+    
+    if not FAISS_AVAILABLE:
+        raise ImportError("FAISS not available. Install with: pip install faiss-cpu")
+    
+    index = faiss.downcast_index(faiss.read_index(filepath))
+    if isinstance(index, faiss.IndexHNSWFlat):
+        labels_path = f"{filepath}.ids.npy"
+        labels = np.load(labels_path) if os.path.exists(labels_path) else np.arange(index.ntotal, dtype=np.int64)
+        return FaissHNSWIndex(index.d, m=index.hnsw.nb_neighbors(1), ef_construction=index.hnsw.efConstruction,
+                              ef_search=index.hnsw.efSearch, index=index, labels=labels)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return FaissIVFPQIndex(index.d, nlist=index.nlist, m=index.pq.M, nbits=index.pq.nbits, index=index)
+    return FaissVectorIndex(index.d, index=index)
@@ -18,6 +18,9 @@ class IEC62304SafetyClass(Enum):
 class DetectionMethod(Enum):
     """Methods used to detect SOUP components."""
     PACKAGE_JSON = "package.json"
+    PACKAGE_LOCK_JSON = "package-lock.json"
+    YARN_LOCK = "yarn.lock"
+    PNPM_LOCK = "pnpm-lock.yaml"
     REQUIREMENTS_TXT = "requirements.txt"
     CMAKE_LISTS = "CMakeLists.txt"
     GRADLE_BUILD = "build.gradle"
@@ -3,7 +3,7 @@ Parser service orchestrator for code chunking and metadata extraction.
 """
 
 import os
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -42,11 +42,14 @@ class ParserService:
         self.python_parser = PythonParser()
         self.supported_extensions = {'.c', '.h', '.js', '.ts', '.jsx', '.tsx', '.py', '.json'}
     
-    def parse_project(self, project_structure: ProjectStructure) -> List[ParsedFile]:
+    def parse_project(self, project_structure: ProjectStructure,
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> List[ParsedFile]:
         """Parse all selected files in a project.
         
         Args:
             project_structure: Project structure with selected files
+            progress_callback: Called with (files done, total files) after each
+                file; exceptions it raises stop the parsing
             
         Returns:
             List of parsed file containers
@@ -54,7 +57,8 @@ class ParserService:
         parsed_files = []
         failed_files = []
         
-        for file_path in project_structure.selected_files:
+        total_files = len(project_structure.selected_files)
+        for files_done, file_path in enumerate(project_structure.selected_files, 1):
             try:
                 parsed_file = self.parse_file(file_path)
                 if parsed_file:
@@ -74,7 +78,9 @@ class ParserService:
                     exception=e
                 )
                 failed_files.append(file_path)
-                continue
+            
+            if progress_callback is not None:
+                progress_callback(files_done, total_files)
         
         # Log summary of parsing results
         if failed_files:
@@ -6,9 +6,12 @@ to perform comprehensive medical software analysis.
 """
 
 import logging
+import json
+import threading
+import time
 from typing import Dict, List, Optional, Any
 from pathlib import Path
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 
 from medical_analyzer.services.ingestion import IngestionService
 from medical_analyzer.parsers.parser_service import ParserService
@@ -25,12 +28,21 @@ from medical_analyzer.services.traceability_service import TraceabilityService
 from medical_analyzer.services.soup_detector import SOUPDetector
 from medical_analyzer.services.project_persistence import ProjectPersistenceService
 from medical_analyzer.database.schema import DatabaseManager
+from medical_analyzer.models.core import RequirementType
+from medical_analyzer.utils.result_serialization import RESULTS_FORMAT, save_sectioned_results, open_results
 from medical_analyzer.llm.backend import LLMBackend
 from medical_analyzer.llm.cached_backend import CachedLLMBackend
 from medical_analyzer.llm.api_response_validator import APIResponseValidator
+from medical_analyzer.llm.embedding_service import EmbeddingService
+from medical_analyzer.llm.context_retriever import ContextRetriever
 # Analysis result models are created dynamically as dictionaries
 
 
+class AnalysisCancelledError(Exception):
+    """Raised inside the pipeline when the running analysis is cancelled."""
+    pass
+
+
 class AnalysisOrchestrator(QObject):
     """
     Orchestrates the complete analysis workflow for medical software projects.
@@ -48,9 +60,14 @@ class AnalysisOrchestrator(QObject):
     stage_started = pyqtSignal(str)     # stage_name
     stage_completed = pyqtSignal(str, dict)  # stage_name, results
     stage_failed = pyqtSignal(str, str)      # stage_name, error_message
-    analysis_completed = pyqtSignal(dict)    # final_results
+    analysis_completed = pyqtSignal(object)  # final_results, a dict or LazyResults
     analysis_failed = pyqtSignal(str)        # error_message
     progress_updated = pyqtSignal(int)       # percentage (0-100)
+    stage_progress = pyqtSignal(str, int)    # stage_name, percentage of the stage (0-100)
+    analysis_cancelled = pyqtSignal()
+    
+    # Minimum seconds between progress updates within a stage
+    PROGRESS_INTERVAL = 0.5
     
     def __init__(self, config_manager, app_settings):
         """
@@ -88,6 +105,18 @@ class AnalysisOrchestrator(QObject):
         # Analysis state
         self.current_analysis = None
         self.is_running = False
+        
+        # Set from any thread to stop the running analysis at the next check
+        self._cancel_event = threading.Event()
+        # An analysis was requested but its queued start has not run yet
+        self._analysis_pending = False
+        self._current_stage = None
+        self._progress = 0
+        self._stage_progress_range = (0, 0)
+        self._last_progress_time = 0.0
+        
+        # Wrap saved result files in a gzip container
+        self.compress_results = False
     
     def _initialize_services(self):
         """Initialize all required analysis services."""
@@ -95,23 +124,33 @@ class AnalysisOrchestrator(QObject):
             self.ingestion_service = IngestionService()
             self.parser_service = ParserService()
             self.soup_service = SOUPService(self.db_manager)
-            self.soup_detector = SOUPDetector(use_llm_classification=bool(self.llm_backend))
+            self.soup_detector = SOUPDetector(
+                use_llm_classification=bool(self.llm_backend),
+                classification_cache=self.soup_service.classification_cache
+            )
             self.export_service = ExportService(self.soup_service)
             self.traceability_service = TraceabilityService(self.db_manager)
             self.risk_register = RiskRegister()
             self.test_generator = CodeTestGenerator()
-            self.project_persistence = ProjectPersistenceService(self.db_manager.db_path)
+            self.project_persistence = ProjectPersistenceService(self.db_manager.db_path, db_manager=self.db_manager)
             
             # Services that require LLM backend
             if self.llm_backend:
-                self.feature_extractor = FeatureExtractor(self.llm_backend)
+                # Near-duplicate chunks share one LLM analysis when 'deduplicate_chunks' is set
+                self.feature_extractor = FeatureExtractor(
+                    self.llm_backend,
+                    deduplicate_chunks=self.config_manager.get_custom_setting('deduplicate_chunks', False) is True
+                )
+                
+                # Optional embedding retrieval keeps requirement and hazard prompts small
+                self.context_retriever = self._initialize_context_retriever()
                 
                 # Enhanced requirements generator with API validation
-                self.requirements_generator = RequirementsGenerator(self.llm_backend)
+                self.requirements_generator = RequirementsGenerator(self.llm_backend, self.context_retriever)
                 if self.api_validator:
                     self.requirements_generator.set_api_validator(self.api_validator)
                 
-                self.hazard_identifier = HazardIdentifier(self.llm_backend)
+                self.hazard_identifier = HazardIdentifier(self.llm_backend, context_retriever=self.context_retriever)
                 
                 # Enhanced test case generator with LLM support
                 self.test_case_generator = CaseGenerator(self.llm_backend)
@@ -120,6 +159,7 @@ class AnalysisOrchestrator(QObject):
                 )
             else:
                 self.feature_extractor = None
+                self.context_retriever = None
                 self.requirements_generator = None
                 self.hazard_identifier = None
                 
@@ -135,10 +175,50 @@ class AnalysisOrchestrator(QObject):
             self.logger.error(f"Failed to initialize analysis services: {e}")
             raise
     
+    def _initialize_context_retriever(self) -> Optional[ContextRetriever]:
+        """
+        Create the embedding retriever for prompt context if it is enabled.
+        
+        Enabled with the 'embedding_retrieval' custom setting; 'retrieval_top_k'
+        sets the number of features or code chunks per prompt.
+        """
+        try:
+            if self.config_manager.get_custom_setting('embedding_retrieval', False) is not True:
+                return None
+            top_k = self.config_manager.get_custom_setting('retrieval_top_k', 8)
+            
+            embedding_service = EmbeddingService()
+            if not embedding_service.is_available():
+                self.logger.warning("Embedding retrieval enabled but no embedding model is available")
+                return None
+            
+            self.logger.info(f"Embedding retrieval enabled with top_k={top_k}")
+            return ContextRetriever(embedding_service, top_k=top_k if isinstance(top_k, int) else 8)
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize embedding retrieval: {e}")
+            return None
+    
+    @pyqtSlot()
+    def mark_analysis_pending(self) -> None:
+        """
+        Record that an analysis was requested from another thread.
+        
+        Call on the requesting thread before start_analysis is queued, so a
+        cancellation arriving before the worker picks up the request is kept
+        instead of being cleared when the analysis starts.
+        """
+        self._cancel_event.clear()
+        self._analysis_pending = True
+    
+    @pyqtSlot(str, str, list)
     def start_analysis(self, project_path: str, description: str = "", selected_files: Optional[List[str]] = None) -> None:
         """
         Start the complete analysis workflow for a project.
         
+        The pipeline runs in the calling thread. The GUI moves the
+        orchestrator to a worker QThread and invokes this slot through a
+        queued connection, so the window stays responsive.
+        
         Args:
             project_path: Path to the project directory to analyze
             description: Optional project description
@@ -148,6 +228,16 @@ class AnalysisOrchestrator(QObject):
             self.logger.warning("Analysis already in progress")
             return
         
+        # A pending request was cancelled before it got here; otherwise a cancellation of an earlier run is stale
+        if self._analysis_pending:
+            self._analysis_pending = False
+            if self._cancel_event.is_set():
+                self.logger.info("Analysis cancelled before it started")
+                self.analysis_cancelled.emit()
+                return
+        else:
+            self._cancel_event.clear()
+        
         self.logger.info(f"Starting analysis for project: {project_path}")
         
         # Check for cached project results
@@ -173,6 +263,7 @@ class AnalysisOrchestrator(QObject):
                         return
         
         self.is_running = True
+        self._set_progress(0)
         self.current_analysis = {
             'project_path': project_path,
             'description': description,
@@ -202,6 +293,8 @@ class AnalysisOrchestrator(QObject):
             try:
                 self._run_stage("Project Ingestion", self._stage_project_ingestion, 10)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"Critical stage 'Project Ingestion' failed: {e}"
                 self.logger.error(error_msg)
@@ -213,6 +306,8 @@ class AnalysisOrchestrator(QObject):
             try:
                 self._run_stage("Code Parsing", self._stage_code_parsing, 20)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"Critical stage 'Code Parsing' failed: {e}"
                 self.logger.error(error_msg)
@@ -225,104 +320,120 @@ class AnalysisOrchestrator(QObject):
                 try:
                     self._run_stage("Feature Extraction", self._stage_feature_extraction, 40)
                     stages_completed += 1
+                except AnalysisCancelledError:
+                    raise
                 except Exception as e:
                     error_msg = f"Feature extraction failed: {e}"
                     self.logger.warning(error_msg)
                     pipeline_errors.append(error_msg)
                     self.stage_failed.emit("Feature Extraction", error_msg)
                     # Continue with analysis - this stage is optional
-                    self.progress_updated.emit(40)
+                    self._set_progress(40)
             else:
                 self.logger.warning("Skipping feature extraction - LLM backend not available")
                 self.stage_failed.emit("Feature Extraction", "LLM backend not available")
-                self.progress_updated.emit(40)
+                self._set_progress(40)
             
             # Stage 4: Requirements Generation (50%) - OPTIONAL STAGE
             if self.requirements_generator:
                 try:
                     self._run_stage("Requirements Generation", self._stage_requirements_generation, 50)
                     stages_completed += 1
+                except AnalysisCancelledError:
+                    raise
                 except Exception as e:
                     error_msg = f"Requirements generation failed: {e}"
                     self.logger.warning(error_msg)
                     pipeline_errors.append(error_msg)
                     self.stage_failed.emit("Requirements Generation", error_msg)
                     # Continue with analysis - this stage is optional
-                    self.progress_updated.emit(50)
+                    self._set_progress(50)
             else:
                 self.logger.warning("Skipping requirements generation - LLM backend not available")
                 self.stage_failed.emit("Requirements Generation", "LLM backend not available")
-                self.progress_updated.emit(50)
+                self._set_progress(50)
             
             # Stage 5: Hazard Identification (60%) - OPTIONAL STAGE
             if self.hazard_identifier:
                 try:
                     self._run_stage("Hazard Identification", self._stage_hazard_identification, 60)
                     stages_completed += 1
+                except AnalysisCancelledError:
+                    raise
                 except Exception as e:
                     error_msg = f"Hazard identification failed: {e}"
                     self.logger.warning(error_msg)
                     pipeline_errors.append(error_msg)
                     self.stage_failed.emit("Hazard Identification", error_msg)
                     # Continue with analysis - this stage is optional
-                    self.progress_updated.emit(60)
+                    self._set_progress(60)
             else:
                 self.logger.warning("Skipping hazard identification - LLM backend not available")
                 self.stage_failed.emit("Hazard Identification", "LLM backend not available")
-                self.progress_updated.emit(60)
+                self._set_progress(60)
             
             # Stage 6: Risk Analysis (70%) - OPTIONAL STAGE
             try:
                 self._run_stage("Risk Analysis", self._stage_risk_analysis, 70)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"Risk analysis failed: {e}"
                 self.logger.warning(error_msg)
                 pipeline_errors.append(error_msg)
                 self.stage_failed.emit("Risk Analysis", error_msg)
                 # Continue with analysis - this stage is optional
-                self.progress_updated.emit(70)
+                self._set_progress(70)
             
             # Stage 7: Test Generation (80%) - OPTIONAL STAGE
             try:
                 self._run_stage("Test Generation", self._stage_test_generation, 80)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"Test generation failed: {e}"
                 self.logger.warning(error_msg)
                 pipeline_errors.append(error_msg)
                 self.stage_failed.emit("Test Generation", error_msg)
                 # Continue with analysis - this stage is optional
-                self.progress_updated.emit(80)
+                self._set_progress(80)
             
             # Stage 8: SOUP Detection (85%) - OPTIONAL STAGE
             try:
                 self._run_stage("SOUP Detection", self._stage_soup_detection, 85)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"SOUP detection failed: {e}"
                 self.logger.warning(error_msg)
                 pipeline_errors.append(error_msg)
                 self.stage_failed.emit("SOUP Detection", error_msg)
                 # Continue with analysis - this stage is optional
-                self.progress_updated.emit(85)
+                self._set_progress(85)
             
             # Stage 9: Traceability Analysis (90%) - OPTIONAL STAGE
             try:
                 self._run_stage("Traceability Analysis", self._stage_traceability_analysis, 90)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"Traceability analysis failed: {e}"
                 self.logger.warning(error_msg)
                 pipeline_errors.append(error_msg)
                 self.stage_failed.emit("Traceability Analysis", error_msg)
                 # Continue with analysis - this stage is optional
-                self.progress_updated.emit(90)
+                self._set_progress(90)
             
             # Stage 10: Results Compilation (100%) - ALWAYS RUN
             try:
                 self._run_stage("Results Compilation", self._stage_results_compilation, 100)
                 stages_completed += 1
+            except AnalysisCancelledError:
+                raise
             except Exception as e:
                 error_msg = f"Results compilation failed: {e}"
                 self.logger.error(error_msg)
@@ -363,24 +474,34 @@ class AnalysisOrchestrator(QObject):
             
             self.analysis_completed.emit(final_results)
             
+        except AnalysisCancelledError:
+            self.logger.info("Analysis cancelled")
+            self.analysis_cancelled.emit()
         except Exception as e:
             self.logger.error(f"Unexpected error in analysis pipeline: {e}")
             self.analysis_failed.emit(str(e))
         finally:
+            self._current_stage = None
             self.is_running = False
     
     def _run_stage(self, stage_name: str, stage_function, progress_percentage: int):
         """Run a single analysis stage with error handling and progress reporting."""
+        self._check_cancelled()
         self.logger.info(f"Starting stage: {stage_name}")
+        self._current_stage = stage_name
+        self._stage_progress_range = (self._progress, progress_percentage)
         self.stage_started.emit(stage_name)
         
         try:
             results = stage_function()
+            self._check_cancelled()
             self.current_analysis['results'][stage_name.lower().replace(' ', '_')] = results
             self.stage_completed.emit(stage_name, results)
-            self.progress_updated.emit(progress_percentage)
+            self._set_progress(progress_percentage)
             self.logger.info(f"Completed stage: {stage_name} successfully")
             
+        except AnalysisCancelledError:
+            raise
         except Exception as e:
             error_msg = f"Stage '{stage_name}' failed: {str(e)}"
             self.logger.error(error_msg)
@@ -390,6 +511,43 @@ class AnalysisOrchestrator(QObject):
             self.logger.debug(f"Full traceback for {stage_name}: {traceback.format_exc()}")
             raise
     
+    def _set_progress(self, percentage: int) -> None:
+        """Report overall progress at a stage boundary."""
+        self._progress = percentage
+        self._last_progress_time = time.monotonic()
+        self.progress_updated.emit(percentage)
+    
+    def _check_cancelled(self) -> None:
+        """Stop the pipeline if cancellation was requested."""
+        if self._cancel_event.is_set():
+            raise AnalysisCancelledError("Analysis cancelled by user")
+    
+    def _report_stage_progress(self, done: int, total: int) -> None:
+        """
+        Report progress within the current stage and check for cancellation.
+        
+        Passed as progress callback to long-running services. Updates are
+        throttled to one per PROGRESS_INTERVAL, except for the last item, so
+        per-chunk callbacks do not flood the GUI event queue.
+        
+        Args:
+            done: Number of items processed
+            total: Total number of items in the stage
+        """
+        self._check_cancelled()
+        
+        now = time.monotonic()
+        if done < total and now - self._last_progress_time < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress_time = now
+        
+        fraction = done / total if total else 1.0
+        start, end = self._stage_progress_range
+        self._progress = start + int((end - start) * fraction)
+        if self._current_stage:
+            self.stage_progress.emit(self._current_stage, int(100 * fraction))
+        self.progress_updated.emit(self._progress)
+    
     def _stage_project_ingestion(self) -> Dict[str, Any]:
         """Stage 1: Project ingestion and file discovery."""
         project_path = self.current_analysis['project_path']
@@ -411,13 +569,19 @@ class AnalysisOrchestrator(QObject):
     def _stage_code_parsing(self) -> Dict[str, Any]:
         """Stage 2: Code parsing and chunk extraction."""
         project_structure = self.current_analysis['results']['project_ingestion']['project_structure']
-        parsed_files = self.parser_service.parse_project(project_structure)
+        parsed_files = self.parser_service.parse_project(
+            project_structure, progress_callback=self._report_stage_progress
+        )
         
         # Extract all code chunks
         all_chunks = []
         for parsed_file in parsed_files:
             all_chunks.extend(parsed_file.chunks)
         
+        # Index the chunks so later prompts can retrieve relevant code
+        if getattr(self, 'context_retriever', None) is not None:
+            self.context_retriever.index_chunks(all_chunks)
+        
         return {
             'parsed_files': parsed_files,
             'total_chunks': len(all_chunks),
@@ -427,7 +591,9 @@ class AnalysisOrchestrator(QObject):
     def _stage_feature_extraction(self) -> Dict[str, Any]:
         """Stage 3: Feature extraction from code."""
         chunks = self.current_analysis['results']['code_parsing']['chunks']
-        feature_result = self.feature_extractor.extract_features(chunks)
+        feature_result = self.feature_extractor.extract_features(
+            chunks, progress_callback=self._report_stage_progress
+        )
         
         return {
             'features': feature_result.features,
@@ -587,7 +753,12 @@ class AnalysisOrchestrator(QObject):
         
         try:
             # Update requirements in integration service
-            self.test_requirements_integration.set_requirements(updated_requirements)
+            changes = self.test_requirements_integration.set_requirements(updated_requirements)
+            
+            # Apply the same changes to the traceability matrix of the current analysis
+            traceability_update = self._apply_requirement_changes_to_traceability(
+                changes, updated_requirements
+            )
             
             # Get current test outline
             current_outline = self.test_requirements_integration.current_test_outline
@@ -606,13 +777,60 @@ class AnalysisOrchestrator(QObject):
                 "coverage_analysis": coverage_analysis,
                 "regeneration_recommended": any(
                     issue.severity.value == "error" for issue in validation_issues
-                ) if validation_issues else False
+                ) if validation_issues else False,
+                "traceability_update": traceability_update
             }
             
         except Exception as e:
             self.logger.error(f"Failed to update requirements and regenerate tests: {e}")
             return {"error": str(e)}
     
+    def _apply_requirement_changes_to_traceability(self, changes: List[Any],
+                                                   updated_requirements: List[Any]) -> Optional[Dict[str, Any]]:
+        """Update the traceability matrix and gaps of the current analysis for requirement changes.
+        
+        Args:
+            changes: Requirement changes detected by the integration service
+            updated_requirements: List of updated requirements
+            
+        Returns:
+            Summary of the traceability update, or None if there is no matrix to update
+        """
+        if not changes or not self.current_analysis:
+            return None
+        
+        results = self.current_analysis['results']
+        traceability_matrix = results.get('traceability_analysis', {}).get('traceability_matrix')
+        if not hasattr(traceability_matrix, 'links'):
+            return None
+        
+        features = results.get('feature_extraction', {}).get('features', [])
+        risk_items = []
+        risk_register = results.get('risk_analysis', {}).get('risk_register')
+        if hasattr(risk_register, 'risk_items'):
+            risk_items = risk_register.risk_items
+        
+        user_requirements = [req for req in updated_requirements if req.type == RequirementType.USER]
+        software_requirements = [req for req in updated_requirements if req.type == RequirementType.SOFTWARE]
+        
+        try:
+            update = self.traceability_service.apply_requirement_changes(
+                traceability_matrix, changes, features,
+                user_requirements, software_requirements, risk_items
+            )
+            gaps = self.traceability_service.detect_traceability_gaps(
+                traceability_matrix, features, user_requirements, software_requirements, risk_items
+            )
+        except Exception as e:
+            self.logger.warning(f"Incremental traceability update failed: {e}")
+            return {"error": str(e)}
+        
+        results['traceability_analysis']['total_links'] = len(traceability_matrix.links)
+        results['traceability_analysis']['gaps'] = gaps
+        update['total_links'] = len(traceability_matrix.links)
+        update['gaps'] = len(gaps)
+        return update
+    
     def export_test_cases(self, format_type: str = "text", **options) -> Optional[str]:
         """Export generated test cases in specified format.
         
@@ -1235,13 +1453,18 @@ class AnalysisOrchestrator(QObject):
         else:
             return f"Software component shall implement {feature_desc} according to design specifications"
     
+    @pyqtSlot()
     def cancel_analysis(self):
-        """Cancel the current analysis if running."""
-        if self.is_running:
+        """
+        Cancel the current analysis if running.
+        
+        Safe to call from any thread. The pipeline stops at the next check
+        between stages or analyzed chunks and emits analysis_cancelled. A
+        pending analysis (see mark_analysis_pending) does not start.
+        """
+        if self.is_running or self._analysis_pending:
             self.logger.info("Analysis cancelled by user")
-            self.is_running = False
-            # Note: In a real implementation, you'd want to implement proper cancellation
-            # for long-running operations
+            self._cancel_event.set()
     
     def get_analysis_status(self) -> Dict[str, Any]:
         """Get the current analysis status."""
@@ -1418,11 +1641,10 @@ class AnalysisOrchestrator(QObject):
             Cached analysis results or None if not found
         """
         try:
-            # Get analysis run metadata
             with self.db_manager.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
-                    SELECT metadata, artifacts_path FROM analysis_runs 
+                    SELECT artifacts_path FROM analysis_runs 
                     WHERE id = ? AND project_id = ? AND status = 'completed'
                 """, (analysis_run_id, project_id))
                 
@@ -1430,22 +1652,22 @@ class AnalysisOrchestrator(QObject):
                 if not row:
                     return None
                 
-                import json
-                metadata = json.loads(row['metadata'] or '{}')
                 artifacts_path = row['artifacts_path']
                 
-                # Check if artifacts file exists
+                # Check if artifacts file exists; sectioned files are read on demand
                 if artifacts_path and Path(artifacts_path).exists():
                     try:
-                        with open(artifacts_path, 'r', encoding='utf-8') as f:
-                            cached_results = json.load(f)
+                        cached_results = open_results(artifacts_path)
                         
                         self.logger.info(f"Successfully loaded cached results from {artifacts_path}")
                         return cached_results
                     except Exception as e:
                         self.logger.warning(f"Failed to load artifacts from {artifacts_path}: {e}")
                 
-                # Fallback: try to reconstruct results from metadata
+                # Fallback for older runs that embedded the results in the run metadata;
+                # the metadata column is only read and decoded when it is needed
+                cursor.execute("SELECT metadata FROM analysis_runs WHERE id = ?", (analysis_run_id,))
+                metadata = json.loads(cursor.fetchone()['metadata'] or '{}')
                 if 'final_results' in metadata:
                     self.logger.info("Using cached results from analysis run metadata")
                     return metadata['final_results']
@@ -1482,40 +1704,31 @@ class AnalysisOrchestrator(QObject):
             artifacts_dir = Path("analysis_artifacts")
             artifacts_dir.mkdir(exist_ok=True)
             
-            # Save results to artifacts file
-            artifacts_filename = f"analysis_{project_id}_{self._get_current_timestamp().replace(':', '-')}.json"
-            artifacts_path = artifacts_dir / artifacts_filename
-            
-            with open(artifacts_path, 'w', encoding='utf-8') as f:
-                import json
-                
-                def json_serializer(obj):
-                    """Custom JSON serializer to handle complex objects."""
-                    if hasattr(obj, '__dict__'):
-                        return obj.__dict__
-                    elif hasattr(obj, 'isoformat'):  # datetime objects
-                        return obj.isoformat()
-                    else:
-                        return str(obj)
-                
-                json.dump(final_results, f, indent=2, default=json_serializer)
+            # Save results to artifacts file, once, one section per results tab;
+            # the database only references it
+            artifacts_filename = f"analysis_{project_id}_{self._get_current_timestamp().replace(':', '-')}.results"
+            artifacts_path = save_sectioned_results(final_results, artifacts_dir / artifacts_filename,
+                                                    compress=self.compress_results)
             
             # Create analysis run record
             analysis_metadata = {
-                'final_results': final_results,
-                'analysis_stages': self.current_analysis['results'],
+                'results_format': RESULTS_FORMAT,
+                'completed_stages': list(self.current_analysis['results'].keys()),
                 'project_description': self.current_analysis.get('description', ''),
                 'selected_files_count': len(self.current_analysis.get('selected_files', [])) if self.current_analysis.get('selected_files') else 0
             }
             
-            analysis_run_id = self.project_persistence.create_analysis_run(
-                project_id=project_id,
-                artifacts_path=str(artifacts_path),
-                metadata=analysis_metadata
-            )
-            
-            # Update analysis run status to completed
-            self.db_manager.update_analysis_run_status(analysis_run_id, 'completed')
+            # Record the run and mark it completed as one unit, so a run is never
+            # visible without its final status
+            with self.db_manager.transaction():
+                analysis_run_id = self.project_persistence.create_analysis_run(
+                    project_id=project_id,
+                    artifacts_path=str(artifacts_path),
+                    metadata=analysis_metadata
+                )
+                
+                # Update analysis run status to completed
+                self.db_manager.update_analysis_run_status(analysis_run_id, 'completed')
             
             self.logger.info(f"Analysis results saved to database (run_id: {analysis_run_id}) and artifacts file: {artifacts_path}")
             
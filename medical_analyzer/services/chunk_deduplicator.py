@@ -0,0 +1,223 @@
+"""
+Near-duplicate code chunk clustering.
+
+Medical firmware often contains many near-identical functions: per-channel
+handlers, generated register accessors, copy-pasted validation. This module
+groups such chunks so feature extraction can analyze one representative per
+group instead of sending every copy to the LLM.
+
+Chunks are compared by MinHash signatures over shingles of normalized
+tokens, in which comments are dropped, literals are replaced by placeholders
+and digits are stripped from identifiers. Candidate groups are found with
+locality-sensitive hashing over bands of the signature, so clustering stays
+close to linear in the number of chunks.
+
+Chunks are only grouped when their safety-relevant literals are equal:
+strings, which carry messages and units, and numbers compared against,
+which are limits and thresholds. Checks that differ in limits, units or
+messages are therefore analyzed separately, while handlers that differ only
+in channel numbers, indices or register offsets are grouped.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..models.core import CodeChunk
+
+
+_COMMENT_RE = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`[^`]*`'  # string and character literals
+    r'|0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?'                  # numbers
+    r'|[A-Za-z_$][\w$]*'                                 # identifiers and keywords
+    r'|[^\s\w]'                                          # operators and punctuation
+)
+
+
+
+def _is_compared(tokens: List[str], index: int) -> bool:
+    """Check whether the token at index is an operand of a comparison operator."""
+    before = tokens[max(0, index - 3):index]
+    if before and before[-1] in '+-':
+        # Skip a sign, as in "x < -5"
+        before = before[:-1]
+    if before and before[-1] == '=':
+        # Operators are split into characters; "<=", ">=", "==" and "!=" compare,
+        # "<<=" and ">>=" assign
+        if len(before) > 1 and before[-2] in '<>=!':
+            return not (before[-2] in '<>' and len(before) > 2 and before[-3] == before[-2])
+        return False
+    if before and before[-1] in '<>':
+        # "<<" and ">>" shift
+        return len(before) < 2 or before[-2] != before[-1]
+    after = tokens[index + 1:index + 3]
+    if after and after[0] in '<>':
+        return after[1:] != [after[0]]
+    return bool(after) and after[0] in '=!' and after[1:] == ['=']
+
+
+@dataclass
+class ChunkCluster:
+    """Group of near-identical code chunks."""
+    representative: CodeChunk
+    members: List[CodeChunk] = field(default_factory=list)  # Includes the representative
+    
+    @property
+    def duplicates(self) -> List[CodeChunk]:
+        """Members other than the representative."""
+        return [chunk for chunk in self.members if chunk is not self.representative]
+
+
+class ChunkDeduplicator:
+    """Clusters code chunks by MinHash similarity of their normalized tokens."""
+    
+    def __init__(self, threshold: float = 0.85, num_perm: int = 128, bands: int = 32,
+                 shingle_size: int = 3, seed: int = 0):
+        """
+        Initialize the deduplicator.
+        
+        Args:
+            threshold: Minimum estimated Jaccard similarity to the cluster
+                representative for a chunk to join the cluster
+            num_perm: Number of MinHash permutations
+            bands: Number of LSH bands; num_perm must be divisible by it
+            shingle_size: Number of consecutive tokens per shingle
+            seed: Seed of the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        
+        # Multiply-add hashing modulo 2**64; odd multipliers are bijective
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._offsets = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+    
+    @staticmethod
+    def normalize_tokens(content: str) -> List[str]:
+        """
+        Split code into tokens that ignore incidental differences.
+        
+        Args:
+            content: Source code
+        
+        Returns:
+            Tokens with comments removed, literals replaced by placeholders and
+            digits removed from identifiers
+        """
+        tokens = []
+        for token in _TOKEN_RE.findall(_COMMENT_RE.sub(' ', content)):
+            if token[0] in '"\'`':
+                tokens.append('STR')
+            elif token[0].isdigit():
+                tokens.append('NUM')
+            elif token[0].isalpha() or token[0] in '_$':
+                tokens.append(re.sub(r'\d+', '', token))
+            else:
+                tokens.append(token)
+        return tokens
+    
+    @staticmethod
+    def safety_literals(content: str) -> Tuple[str, ...]:
+        """
+        Get the literals of code that matter for its safety behavior.
+        
+        Args:
+            content: Source code
+        
+        Returns:
+            String literals and the numbers that are operands of a comparison,
+            in order and as written, comments excluded
+        """
+        tokens = _TOKEN_RE.findall(_COMMENT_RE.sub(' ', content))
+        literals = []
+        for i, token in enumerate(tokens):
+            if token[0] in '"\'`':
+                literals.append(token)
+            elif token[0].isdigit() and _is_compared(tokens, i):
+                literals.append(token)
+        return tuple(literals)
+    
+    def signature(self, content: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of code.
+        
+        Args:
+            content: Source code
+        
+        Returns:
+            Array of num_perm minimum hash values
+        """
+        tokens = self.normalize_tokens(content)
+        size = self.shingle_size
+        shingles = {' '.join(tokens[i:i + size]) for i in range(max(1, len(tokens) - size + 1))}
+        
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=8).digest(), 'little')
+             for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        with np.errstate(over='ignore'):
+            return (hashes[:, None] * self._multipliers + self._offsets).min(axis=0)
+    
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """Estimate the Jaccard similarity of two signatures."""
+        return float(np.mean(first == second))
+    
+    def cluster(self, chunks: List[CodeChunk]) -> List[ChunkCluster]:
+        """
+        Group near-identical chunks.
+        
+        Chunks are visited in order; each joins the first existing cluster
+        whose representative is similar enough and shares an LSH band with
+        it, or starts a new cluster. Only chunks of the same language and
+        chunk type and with equal safety-relevant literals are grouped.
+        
+        Args:
+            chunks: Code chunks to cluster
+        
+        Returns:
+            Clusters in order of their representatives, covering every chunk once
+        """
+        rows = self.num_perm // self.bands
+        clusters: List[ChunkCluster] = []
+        signatures: List[np.ndarray] = []
+        buckets: Dict[Tuple, List[int]] = {}
+        
+        for chunk in chunks:
+            signature = self.signature(chunk.content)
+            kind = (chunk.metadata.get('language'), chunk.chunk_type, self.safety_literals(chunk.content))
+            keys = [(kind, band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+            
+            match = None
+            checked = set()
+            for key in keys:
+                for cluster_index in buckets.get(key, ()):
+                    if cluster_index in checked:
+                        continue
+                    checked.add(cluster_index)
+                    if self.similarity(signature, signatures[cluster_index]) >= self.threshold:
+                        match = cluster_index
+                        break
+                if match is not None:
+                    break
+            
+            if match is not None:
+                clusters[match].members.append(chunk)
+                continue
+            
+            cluster_index = len(clusters)
+            clusters.append(ChunkCluster(representative=chunk, members=[chunk]))
+            signatures.append(signature)
+            for key in keys:
+                buckets.setdefault(key, []).append(cluster_index)
+        
+        return clusters
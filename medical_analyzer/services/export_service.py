@@ -2,31 +2,97 @@
 Comprehensive export service for creating regulatory submission bundles.
 """
 
+import io
 import os
 import json
 import zipfile
 import csv
+import shutil
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import shutil
+from typing import Dict, List, Any, Optional, Iterator, TextIO
 
 from ..models.core import SOUPComponent
 from ..services.soup_service import SOUPService
 
 
+class ZipBundleWriter:
+    """
+    Writes export artifacts into a zip archive.
+    
+    A zip archive accepts one open entry at a time. Each entry is therefore
+    written to its own spool first, in memory up to SPOOL_MAX_SIZE and in a
+    temporary file beyond, and only copying the finished spool into the
+    archive holds the lock. Several producers can share one writer and
+    serialize their entries in parallel.
+    """
+    
+    # Entries up to this size are spooled in memory, larger ones on disk
+    SPOOL_MAX_SIZE = 8 * 1024 * 1024
+    
+    def __init__(self, zip_path: str, compression_level: int = 6):
+        """
+        Open a new zip archive for writing.
+        
+        Args:
+            zip_path: Path of the archive to create
+            compression_level: Deflate level from 0 (store) to 9 (smallest)
+        """
+        self.zip_path = zip_path
+        self.entries: List[str] = []
+        self._lock = threading.Lock()
+        self._zipf = zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compression_level)
+    
+    @contextmanager
+    def open_text(self, arcname: str) -> Iterator[TextIO]:
+        """Open a UTF-8 text entry; the entry is added to the archive when the block exits."""
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as spool:
+            f = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+            yield f
+            f.detach()
+            spool.seek(0)
+            
+            with self._lock:
+                # Entry sizes are not known up front, so allow them to grow past 2 GiB
+                with self._zipf.open(arcname, 'w', force_zip64=True) as entry:
+                    shutil.copyfileobj(spool, entry)
+                self.entries.append(arcname)
+    
+    def write_json(self, arcname: str, data: Any):
+        """Serialize data as indented JSON into an entry."""
+        with self.open_text(arcname) as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    def close(self):
+        """Finish the archive by writing its central directory."""
+        self._zipf.close()
+    
+    def __enter__(self) -> 'ZipBundleWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class ExportService:
     """Service for creating comprehensive export bundles for regulatory submissions."""
     
-    def __init__(self, soup_service: SOUPService):
+    def __init__(self, soup_service: SOUPService, compression_level: int = 6, max_workers: int = 4):
         """
         Initialize export service.
         
         Args:
             soup_service: SOUP service for accessing SOUP inventory
+            compression_level: Default deflate level for export bundles (0-9)
+            max_workers: Number of artifacts produced in parallel
         """
         self.soup_service = soup_service
+        self.compression_level = compression_level
+        self.max_workers = max_workers
         self.audit_log = []
     
     def log_action(self, action: str, details: str, user: str = "system", timestamp: Optional[datetime] = None):
@@ -53,15 +119,20 @@ class ExportService:
                                   analysis_results: Dict[str, Any],
                                   project_name: str,
                                   project_path: str,
-                                  output_dir: str = None) -> str:
+                                  output_dir: str = None,
+                                  compression_level: Optional[int] = None) -> str:
         """
         Create a comprehensive export bundle containing all analysis artifacts.
         
+        Artifacts are serialized straight into the zip bundle; independent
+        artifacts are produced in parallel.
+        
         Args:
             analysis_results: Complete analysis results dictionary
             project_name: Name of the project
             project_path: Path to the project root
             output_dir: Directory to save the export (defaults to temp directory)
+            compression_level: Deflate level (0-9), defaults to the service setting
             
         Returns:
             Path to the created export bundle
@@ -77,64 +148,71 @@ class ExportService:
         if output_dir is None:
             output_dir = tempfile.mkdtemp(prefix="medical_export_")
         
+        if compression_level is None:
+            compression_level = self.compression_level
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         bundle_name = f"{project_name}_export_{timestamp}"
-        bundle_path = os.path.join(output_dir, bundle_name)
+        zip_path = os.path.join(output_dir, f"{bundle_name}.zip")
         
         try:
-            # Create bundle directory
-            os.makedirs(bundle_path, exist_ok=True)
+            os.makedirs(output_dir, exist_ok=True)
             
             # Log export start
             self.log_action("export_started", f"Creating export bundle: {bundle_name}")
             
-            # Export each component
-            self._export_requirements(analysis_results, bundle_path)
-            self._export_risk_register(analysis_results, bundle_path)
-            self._export_traceability_matrix(analysis_results, bundle_path)
-            self._export_test_results(analysis_results, bundle_path)
-            self._export_soup_inventory(bundle_path)
-            self._export_project_metadata(analysis_results, project_name, project_path, bundle_path)
-            self._export_summary_report(analysis_results, bundle_path, project_name)
-            
-            # Log export completion
-            self.log_action("export_completed", f"Export bundle created: {bundle_name}")
-            
-            # Export audit log after all logging is complete
-            self._export_audit_log(bundle_path)
-            
-            # Create zip bundle
-            zip_path = self._create_zip_bundle(bundle_path, bundle_name)
+            with ZipBundleWriter(zip_path, compression_level) as bundle:
+                # Export each component; they share nothing but the bundle
+                exports = [
+                    (self._export_requirements, (analysis_results, bundle)),
+                    (self._export_risk_register, (analysis_results, bundle)),
+                    (self._export_traceability_matrix, (analysis_results, bundle)),
+                    (self._export_test_results, (analysis_results, bundle)),
+                    (self._export_soup_inventory, (bundle,)),
+                    (self._export_project_metadata, (analysis_results, project_name, project_path, bundle)),
+                    (self._export_summary_report, (analysis_results, bundle, project_name))
+                ]
+                with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="export") as pool:
+                    futures = [pool.submit(export, *args) for export, args in exports]
+                    for future in futures:
+                        future.result()
+                
+                # Log export completion
+                self.log_action("export_completed", f"Export bundle created: {bundle_name}")
+                
+                # Export audit log after all logging is complete
+                self._export_audit_log(bundle)
             
             return zip_path
             
         except Exception as e:
+            # Remove the incomplete bundle
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+            
             # Log export failure
             self.log_action("export_failed", f"Export failed: {str(e)}")
             raise
     
-    def _export_requirements(self, analysis_results: Dict[str, Any], bundle_path: str):
+    def _export_requirements(self, analysis_results: Dict[str, Any], bundle: ZipBundleWriter):
         """Export requirements to CSV and JSON formats."""
-        requirements_dir = os.path.join(bundle_path, "requirements")
-        os.makedirs(requirements_dir, exist_ok=True)
-        
         # Export user requirements
         user_reqs = analysis_results.get('requirements', {}).get('user_requirements', [])
         if user_reqs:
-            self._export_requirements_csv(user_reqs, os.path.join(requirements_dir, "user_requirements.csv"))
-            self._export_requirements_json(user_reqs, os.path.join(requirements_dir, "user_requirements.json"))
+            self._export_requirements_csv(user_reqs, bundle, "requirements/user_requirements.csv")
+            self._export_requirements_json(user_reqs, bundle, "requirements/user_requirements.json")
         
         # Export software requirements
         software_reqs = analysis_results.get('requirements', {}).get('software_requirements', [])
         if software_reqs:
-            self._export_requirements_csv(software_reqs, os.path.join(requirements_dir, "software_requirements.csv"))
-            self._export_requirements_json(software_reqs, os.path.join(requirements_dir, "software_requirements.json"))
+            self._export_requirements_csv(software_reqs, bundle, "requirements/software_requirements.csv")
+            self._export_requirements_json(software_reqs, bundle, "requirements/software_requirements.json")
         
         self.log_action("requirements_exported", f"Exported {len(user_reqs)} URs and {len(software_reqs)} SRs")
     
-    def _export_requirements_csv(self, requirements: List[Dict], file_path: str):
+    def _export_requirements_csv(self, requirements: List[Dict], bundle: ZipBundleWriter, arcname: str):
         """Export requirements to CSV format."""
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        with bundle.open_text(arcname) as f:
             writer = csv.writer(f)
             writer.writerow(['ID', 'Description', 'Acceptance Criteria', 'Derived From', 'Code References'])
             
@@ -152,21 +230,16 @@ class ExportService:
                     code_refs
                 ])
     
-    def _export_requirements_json(self, requirements: List[Dict], file_path: str):
+    def _export_requirements_json(self, requirements: List[Dict], bundle: ZipBundleWriter, arcname: str):
         """Export requirements to JSON format."""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(requirements, f, indent=2, ensure_ascii=False)
+        bundle.write_json(arcname, requirements)
     
-    def _export_risk_register(self, analysis_results: Dict[str, Any], bundle_path: str):
+    def _export_risk_register(self, analysis_results: Dict[str, Any], bundle: ZipBundleWriter):
         """Export risk register to CSV and JSON formats."""
-        risks_dir = os.path.join(bundle_path, "risk_register")
-        os.makedirs(risks_dir, exist_ok=True)
-        
         risks = analysis_results.get('risks', [])
         if risks:
             # Export to CSV
-            csv_path = os.path.join(risks_dir, "risk_register.csv")
-            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            with bundle.open_text("risk_register/risk_register.csv") as f:
                 writer = csv.writer(f)
                 writer.writerow([
                     'ID', 'Hazard', 'Cause', 'Effect', 'Severity', 
@@ -189,22 +262,16 @@ class ExportService:
                     ])
             
             # Export to JSON
-            json_path = os.path.join(risks_dir, "risk_register.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(risks, f, indent=2, ensure_ascii=False)
+            bundle.write_json("risk_register/risk_register.json", risks)
             
             self.log_action("risk_register_exported", f"Exported {len(risks)} risk items")
     
-    def _export_traceability_matrix(self, analysis_results: Dict[str, Any], bundle_path: str):
+    def _export_traceability_matrix(self, analysis_results: Dict[str, Any], bundle: ZipBundleWriter):
         """Export traceability matrix to CSV format."""
-        traceability_dir = os.path.join(bundle_path, "traceability")
-        os.makedirs(traceability_dir, exist_ok=True)
-        
         traceability = analysis_results.get('traceability', {})
         if traceability:
             # Export matrix
-            matrix_path = os.path.join(traceability_dir, "traceability_matrix.csv")
-            with open(matrix_path, 'w', newline='', encoding='utf-8') as f:
+            with bundle.open_text("traceability/traceability_matrix.csv") as f:
                 writer = csv.writer(f)
                 
                 # Write header
@@ -226,8 +293,7 @@ class ExportService:
             # Export gaps report if available
             gaps = traceability.get('gaps', [])
             if gaps:
-                gaps_path = os.path.join(traceability_dir, "traceability_gaps.csv")
-                with open(gaps_path, 'w', newline='', encoding='utf-8') as f:
+                with bundle.open_text("traceability/traceability_gaps.csv") as f:
                     writer = csv.writer(f)
                     writer.writerow(['Gap Type', 'Description', 'Severity', 'Recommendation'])
                     
@@ -241,16 +307,12 @@ class ExportService:
             
             self.log_action("traceability_exported", f"Exported traceability matrix with {len(links)} links")
     
-    def _export_test_results(self, analysis_results: Dict[str, Any], bundle_path: str):
+    def _export_test_results(self, analysis_results: Dict[str, Any], bundle: ZipBundleWriter):
         """Export test results and generated test files."""
-        tests_dir = os.path.join(bundle_path, "tests")
-        os.makedirs(tests_dir, exist_ok=True)
-        
         tests = analysis_results.get('tests', {})
         if tests:
             # Export test summary
-            summary_path = os.path.join(tests_dir, "test_summary.txt")
-            with open(summary_path, 'w', encoding='utf-8') as f:
+            with bundle.open_text("tests/test_summary.txt") as f:
                 f.write("TEST EXECUTION SUMMARY\n")
                 f.write("=" * 30 + "\n\n")
                 f.write(f"Total Tests: {tests.get('total_tests', 0)}\n")
@@ -282,23 +344,15 @@ class ExportService:
             # Export test files if available
             test_files = tests.get('generated_files', {})
             if test_files:
-                test_files_dir = os.path.join(tests_dir, "generated_tests")
-                os.makedirs(test_files_dir, exist_ok=True)
-                
                 for file_path, content in test_files.items():
-                    full_path = os.path.join(test_files_dir, file_path)
-                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
-                    
-                    with open(full_path, 'w', encoding='utf-8') as f:
+                    arcname = "tests/generated_tests/" + Path(file_path).as_posix()
+                    with bundle.open_text(arcname) as f:
                         f.write(content)
             
             self.log_action("test_results_exported", f"Exported test results with {len(suites)} test suites")
     
-    def _export_soup_inventory(self, bundle_path: str):
+    def _export_soup_inventory(self, bundle: ZipBundleWriter):
         """Export SOUP inventory to CSV and JSON formats."""
-        soup_dir = os.path.join(bundle_path, "soup_inventory")
-        os.makedirs(soup_dir, exist_ok=True)
-        
         try:
             # Get SOUP inventory
             soup_data = self.soup_service.export_inventory()
@@ -306,8 +360,7 @@ class ExportService:
             
             if components:
                 # Export to CSV
-                csv_path = os.path.join(soup_dir, "soup_inventory.csv")
-                with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                with bundle.open_text("soup_inventory/soup_inventory.csv") as f:
                     writer = csv.writer(f)
                     writer.writerow([
                         'ID', 'Name', 'Version', 'Usage Reason', 'Safety Justification',
@@ -335,15 +388,12 @@ class ExportService:
                         ])
                 
                 # Export to JSON
-                json_path = os.path.join(soup_dir, "soup_inventory.json")
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(soup_data, f, indent=2, ensure_ascii=False)
+                bundle.write_json("soup_inventory/soup_inventory.json", soup_data)
                 
                 self.log_action("soup_inventory_exported", f"Exported {len(components)} SOUP components")
             else:
                 # Create empty inventory file
-                empty_path = os.path.join(soup_dir, "soup_inventory_empty.txt")
-                with open(empty_path, 'w', encoding='utf-8') as f:
+                with bundle.open_text("soup_inventory/soup_inventory_empty.txt") as f:
                     f.write("No SOUP components have been added to the inventory.\n")
                     f.write("This file indicates that the SOUP inventory was checked but found empty.\n")
                 
@@ -353,18 +403,12 @@ class ExportService:
             # Log error but continue
             self.log_action("soup_export_error", f"Failed to export SOUP inventory: {str(e)}")
     
-    def _export_audit_log(self, bundle_path: str):
+    def _export_audit_log(self, bundle: ZipBundleWriter):
         """Export audit log to JSON format."""
-        audit_dir = os.path.join(bundle_path, "audit")
-        os.makedirs(audit_dir, exist_ok=True)
-        
-        audit_path = os.path.join(audit_dir, "audit_log.json")
-        with open(audit_path, 'w', encoding='utf-8') as f:
-            json.dump(self.audit_log, f, indent=2, ensure_ascii=False)
+        bundle.write_json("audit/audit_log.json", self.audit_log)
         
         # Also export as human-readable text
-        text_path = os.path.join(audit_dir, "audit_log.txt")
-        with open(text_path, 'w', encoding='utf-8') as f:
+        with bundle.open_text("audit/audit_log.txt") as f:
             f.write("AUDIT LOG\n")
             f.write("=" * 20 + "\n\n")
             
@@ -376,11 +420,8 @@ class ExportService:
                 f.write("-" * 40 + "\n\n")
     
     def _export_project_metadata(self, analysis_results: Dict[str, Any], project_name: str, 
-                                project_path: str, bundle_path: str):
+                                project_path: str, bundle: ZipBundleWriter):
         """Export project metadata and analysis configuration."""
-        metadata_dir = os.path.join(bundle_path, "metadata")
-        os.makedirs(metadata_dir, exist_ok=True)
-        
         # Create project metadata
         metadata = {
             "project_name": project_name,
@@ -393,15 +434,25 @@ class ExportService:
             "lines_of_code": analysis_results.get('lines_of_code', 0)
         }
         
-        metadata_path = os.path.join(metadata_dir, "project_metadata.json")
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        bundle.write_json("metadata/project_metadata.json", metadata)
     
-    def _export_summary_report(self, analysis_results: Dict[str, Any], bundle_path: str, project_name: str = "Unknown Project"):
+    def _export_summary_report(self, analysis_results: Dict[str, Any], bundle: ZipBundleWriter,
+                               project_name: str = "Unknown Project"):
         """Export a comprehensive summary report."""
-        summary_path = os.path.join(bundle_path, "summary_report.txt")
+        # Query the SOUP inventory before opening the entry, which holds the bundle lock
+        try:
+            soup_data = self.soup_service.export_inventory()
+            soup_components = soup_data.get('soup_inventory', {}).get('components', [])
+            
+            criticality_counts = {}
+            for comp in soup_components:
+                level = comp.get('criticality_level', 'Unknown')
+                criticality_counts[level] = criticality_counts.get(level, 0) + 1
+                
+        except Exception:
+            soup_components = None
         
-        with open(summary_path, 'w', encoding='utf-8') as f:
+        with bundle.open_text("summary_report.txt") as f:
             f.write("MEDICAL SOFTWARE ANALYSIS - COMPREHENSIVE REPORT\n")
             f.write("=" * 60 + "\n\n")
             
@@ -447,46 +498,19 @@ class ExportService:
             f.write(f"Coverage: {tests.get('coverage', 0)}%\n\n")
             
             # SOUP summary
-            try:
-                soup_data = self.soup_service.export_inventory()
-                soup_components = soup_data.get('soup_inventory', {}).get('components', [])
-                f.write("SOUP INVENTORY SUMMARY\n")
-                f.write("-" * 20 + "\n")
+            f.write("SOUP INVENTORY SUMMARY\n")
+            f.write("-" * 20 + "\n")
+            if soup_components is not None:
                 f.write(f"Total SOUP Components: {len(soup_components)}\n")
-                
-                criticality_counts = {}
-                for comp in soup_components:
-                    level = comp.get('criticality_level', 'Unknown')
-                    criticality_counts[level] = criticality_counts.get(level, 0) + 1
-                
                 for level, count in criticality_counts.items():
                     f.write(f"{level} Criticality: {count}\n")
                 f.write("\n")
-                
-            except Exception:
-                f.write("SOUP INVENTORY SUMMARY\n")
-                f.write("-" * 20 + "\n")
+            else:
                 f.write("SOUP inventory not available\n\n")
             
             # Export timestamp
             f.write(f"Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    def _create_zip_bundle(self, bundle_path: str, bundle_name: str) -> str:
-        """Create a zip file containing the entire export bundle."""
-        zip_path = f"{bundle_path}.zip"
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(bundle_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arc_name = os.path.relpath(file_path, bundle_path)
-                    zipf.write(file_path, arc_name)
-        
-        # Remove the uncompressed bundle directory
-        shutil.rmtree(bundle_path)
-        
-        return zip_path
-    
     def get_export_summary(self) -> Dict[str, Any]:
         """Get a summary of the export contents."""
         return {
@@ -5,8 +5,9 @@ This module handles the extraction of software features from code chunks
 using both LLM-based analysis and heuristic fallback methods.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
+import copy
 
 from ..models.core import CodeChunk, Feature, CodeReference
 from ..models.enums import FeatureCategory
@@ -14,22 +15,31 @@ from ..llm.backend import LLMBackend, LLMError
 from ..llm.operation_configs import get_operation_params
 from ..models.result_models import FeatureExtractionResult
 from .llm_response_parser import LLMResponseParser
+from .chunk_deduplicator import ChunkDeduplicator
 
 
 class FeatureExtractor:
     """Service for extracting software features from code chunks."""
     
-    def __init__(self, llm_backend: LLMBackend, min_confidence: float = 0.3):
+    def __init__(self, llm_backend: LLMBackend, min_confidence: float = 0.3,
+                 deduplicator: Optional[ChunkDeduplicator] = None, deduplicate_chunks: bool = False):
         """
         Initialize the feature extractor.
         
         Args:
             llm_backend: LLM backend for analysis
             min_confidence: Minimum confidence threshold for features
+            deduplicator: Clusters near-identical chunks, a default one if None
+            deduplicate_chunks: Analyze one representative per cluster of
+                near-identical chunks and copy its features to the others;
+                off by default, since copied features are never checked
+                against the copies' own code
         """
         self.llm_backend = llm_backend
         self.min_confidence = min_confidence
         self.feature_counter = 0
+        self.deduplicate_chunks = deduplicate_chunks
+        self.deduplicator = deduplicator or ChunkDeduplicator()
         
         # Feature extraction prompts
         self.system_prompt = """You are an expert software analyst specializing in medical device software. Your task is to analyze code chunks and identify implemented software features. Focus on functional capabilities that would be relevant for medical device documentation and requirements traceability.
@@ -76,12 +86,15 @@ Respond with a JSON array of features in this format:
 
 Only include features you can clearly identify from the code. If no clear features are present, return an empty array."""
     
-    def extract_features(self, chunks: List[CodeChunk]) -> FeatureExtractionResult:
+    def extract_features(self, chunks: List[CodeChunk],
+                         progress_callback: Optional[Callable[[int, int], None]] = None) -> FeatureExtractionResult:
         """
         Extract features from a list of code chunks.
         
         Args:
             chunks: List of code chunks to analyze
+            progress_callback: Called with (chunks done, total chunks) after
+                each analyzed chunk; exceptions it raises stop the extraction
             
         Returns:
             FeatureExtractionResult with extracted features and metadata
@@ -91,15 +104,33 @@ Only include features you can clearly identify from the code. If no clear featur
         errors = []
         chunks_processed = 0
         
-        for chunk in chunks:
+        # Near-identical chunks are analyzed once through a representative
+        if self.deduplicate_chunks and len(chunks) > 1:
+            clusters = [(cluster.representative, cluster.duplicates) for cluster in self.deduplicator.cluster(chunks)]
+        else:
+            clusters = [(chunk, []) for chunk in chunks]
+        
+        chunks_done = 0
+        for chunk, duplicates in clusters:
+            chunks_done += 1 + len(duplicates)
             try:
                 features = self._extract_features_from_chunk(chunk)
                 all_features.extend(features)
                 chunks_processed += 1
             except Exception as e:
                 error_msg = f"Error processing chunk {chunk.file_path}:{chunk.start_line}: {str(e)}"
+                if duplicates:
+                    error_msg += f" (and {len(duplicates)} near-duplicate chunks)"
                 errors.append(error_msg)
-                continue
+                features = None
+            
+            if features is not None:
+                for duplicate in duplicates:
+                    all_features.extend(self._copy_features_to_chunk(features, chunk, duplicate))
+                    chunks_processed += 1
+            
+            if progress_callback is not None:
+                progress_callback(chunks_done, len(chunks))
         
         # Calculate overall confidence score
         if all_features:
@@ -120,6 +151,8 @@ Only include features you can clearly identify from the code. If no clear featur
                 'successful_chunks': chunks_processed,
                 'failed_chunks': len(chunks) - chunks_processed,
                 'features_per_chunk': len(all_features) / max(chunks_processed, 1),
+                'analyzed_chunks': len(clusters),
+                'duplicate_chunks': len(chunks) - len(clusters),
                 'llm_backend': self.llm_backend.__class__.__name__
             }
         )
@@ -175,6 +208,60 @@ Only include features you can clearly identify from the code. If no clear featur
         except Exception as e:
             raise Exception(f"Feature extraction failed: {str(e)}")
     
+    def _copy_features_to_chunk(self, features: List[Feature], representative: CodeChunk,
+                                chunk: CodeChunk) -> List[Feature]:
+        """
+        Copy the features of a cluster representative to a near-duplicate chunk.
+        
+        Each copy gets its own ID and evidence pointing at the duplicate chunk.
+        
+        Args:
+            features: Features extracted from the representative
+            representative: Chunk the features were extracted from
+            chunk: Near-duplicate chunk
+            
+        Returns:
+            Features of the near-duplicate chunk
+        """
+        copies = []
+        for feature in features:
+            evidence = [
+                CodeReference(
+                    file_path=chunk.file_path,
+                    start_line=chunk.start_line,
+                    end_line=chunk.end_line,
+                    function_name=chunk.function_name,
+                    context=reference.context
+                )
+                for reference in feature.evidence[:1]
+            ]
+            
+            metadata = copy.deepcopy(feature.metadata)
+            metadata['source_chunk'] = {
+                'file_path': chunk.file_path,
+                'start_line': chunk.start_line,
+                'end_line': chunk.end_line,
+                'function_name': chunk.function_name
+            }
+            metadata['duplicate_of'] = {
+                'feature_id': feature.id,
+                'file_path': representative.file_path,
+                'start_line': representative.start_line,
+                'function_name': representative.function_name
+            }
+            
+            self.feature_counter += 1
+            copies.append(Feature(
+                id=f"FEAT_{self.feature_counter:04d}",
+                description=feature.description,
+                confidence=feature.confidence,
+                evidence=evidence,
+                category=feature.category,
+                metadata=metadata
+            ))
+        
+        return copies
+    
     def _create_feature_from_data(self, feature_data: Dict[str, Any], chunk: CodeChunk) -> Optional[Feature]:
         """
         Create a Feature object from parsed data.
@@ -7,11 +7,13 @@ following ISO 14971 risk management principles for medical device software.
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from ..models.core import Requirement, RiskItem
 from ..models.enums import Severity, Probability, RiskLevel
 from ..llm.backend import LLMBackend, LLMError
 from ..llm.operation_configs import get_operation_params
+from ..llm.context_retriever import ContextRetriever
 from ..models.result_models import HazardIdentificationResult
 from .llm_response_parser import LLMResponseParser
 
@@ -19,15 +21,31 @@ from .llm_response_parser import LLMResponseParser
 class HazardIdentifier:
     """Service for identifying hazards from Software Requirements."""
     
-    def __init__(self, llm_backend: LLMBackend):
+    # Fallbacks used when the backend cannot report its own limits
+    DEFAULT_CONTEXT_LENGTH = 4096
+    CHARS_PER_TOKEN = 4
+    
+    def __init__(self, llm_backend: LLMBackend, max_concurrent_batches: int = 4,
+                 max_batch_size: int = 25, context_retriever: Optional[ContextRetriever] = None,
+                 code_context_tokens: int = 800):
         """
         Initialize the hazard identifier.
         
         Args:
             llm_backend: LLM backend for analysis
+            max_concurrent_batches: Maximum number of batches sent to the LLM at once
+            max_batch_size: Upper bound on requirements per batch, so the hazard
+                list for a batch still fits in the generation token limit
+            context_retriever: Optional retriever that adds the code chunks most
+                relevant to each batch to its prompt
+            code_context_tokens: Token budget of the retrieved code per prompt
         """
         self.llm_backend = llm_backend
         self.risk_counter = 0
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self.max_batch_size = max(1, max_batch_size)
+        self.context_retriever = context_retriever
+        self.code_context_tokens = max(0, code_context_tokens)
         
         # Hazard identification prompts
         self.system_prompt = """You are an expert risk analyst specializing in medical device software safety. Your task is to identify potential hazards from Software Requirements following ISO 14971 risk management principles. Focus on hazards that could lead to harm to patients, users, or other persons.
@@ -51,6 +69,12 @@ Consider these types of medical device hazards:
 
 Respond in JSON format with an array of hazards."""
         
+        # Appended to the requirements list when code context is retrieved
+        self.code_context_template = """
+
+Source code most relevant to these requirements:
+{code_context}"""
+        
         self.prompt_template = """Identify potential hazards from the following Software Requirements for a medical device:
 
 Project Context: {project_description}
@@ -100,6 +124,7 @@ Focus on realistic hazards that are relevant to medical device safety. If no cle
         all_risk_items = []
         errors = []
         requirements_processed = 0
+        batches = []
         
         if not software_requirements:
             return HazardIdentificationResult(
@@ -112,18 +137,18 @@ Focus on realistic hazards that are relevant to medical device safety. If no cle
             )
         
         try:
-            # Process requirements in batches for better context
-            batch_size = 3
-            for i in range(0, len(software_requirements), batch_size):
-                batch = software_requirements[i:i + batch_size]
-                try:
-                    risk_items = self._identify_hazards_for_batch(batch, project_description)
-                    all_risk_items.extend(risk_items)
-                    requirements_processed += len(batch)
-                except Exception as e:
-                    error_msg = f"Error identifying hazards for batch {i//batch_size + 1}: {str(e)}"
+            # Size batches from the model's token budget and run them concurrently
+            batches = self._plan_batches(software_requirements)
+            responses = self._request_batches(batches, project_description)
+            
+            for batch_index, (batch, response) in enumerate(zip(batches, responses)):
+                if isinstance(response, Exception):
+                    error_msg = f"Error identifying hazards for batch {batch_index + 1}: {str(response)}"
                     errors.append(error_msg)
                     continue
+                # Risk items are built in batch order so risk IDs stay deterministic
+                all_risk_items.extend(self._build_risk_items(batch, response))
+                requirements_processed += len(batch)
         
         except Exception as e:
             error_msg = f"Error in hazard identification pipeline: {str(e)}"
@@ -149,21 +174,149 @@ Focus on realistic hazards that are relevant to medical device safety. If no cle
                 'failed_requirements': len(software_requirements) - requirements_processed,
                 'hazards_per_requirement': len(all_risk_items) / max(requirements_processed, 1),
                 'llm_backend': self.llm_backend.__class__.__name__,
-                'identification_method': 'llm'
+                'identification_method': 'llm',
+                'batch_count': len(batches)
             }
         )
     
+    def _plan_batches(self, requirements: List[Requirement]) -> List[List[Requirement]]:
+        """
+        Group requirements into batches that fit the model's context window.
+        
+        The prompt budget is the context length minus the tokens reserved for
+        generation and the fixed system prompt/template overhead. Requirements
+        are packed greedily in order until the next one would exceed it.
+        """
+        generation_tokens = get_operation_params("hazard_identification").get('max_tokens', 2000)
+        overhead_tokens = self._estimate_tokens(self.system_prompt) + self._estimate_tokens(
+            self.prompt_template.format(project_description="", requirements_list="")
+        )
+        budget = self._get_context_length() - generation_tokens - overhead_tokens
+        if self._uses_code_context():
+            budget -= self.code_context_tokens + self._estimate_tokens(self.code_context_template)
+        
+        batches = []
+        current_batch = []
+        current_tokens = 0
+        for req in requirements:
+            req_tokens = self._estimate_tokens(self._format_requirement(req))
+            if current_batch and (current_tokens + req_tokens > budget or
+                                  len(current_batch) >= self.max_batch_size):
+                batches.append(current_batch)
+                current_batch = []
+                current_tokens = 0
+            # An oversized requirement still gets a batch of its own
+            current_batch.append(req)
+            current_tokens += req_tokens
+        
+        if current_batch:
+            batches.append(current_batch)
+        
+        return batches
+    
+    def _request_batches(self, batches: List[List[Requirement]], project_description: str) -> List[Any]:
+        """
+        Send batches to the LLM, concurrently when there is more than one.
+        
+        Returns:
+            One entry per batch, in batch order: the parsed hazard data, None if
+            the heuristic fallback should be used, or the exception raised
+        """
+        def request(batch):
+            try:
+                return self._request_hazards_for_batch(batch, project_description)
+            except Exception as e:
+                return e
+        
+        if len(batches) <= 1 or self.max_concurrent_batches == 1:
+            return [request(batch) for batch in batches]
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_batches, len(batches))) as executor:
+            return list(executor.map(request, batches))
+    
+    def _get_context_length(self) -> int:
+        """Get the model context length, falling back to a conservative default."""
+        try:
+            context_length = self.llm_backend.get_model_info().context_length
+            if isinstance(context_length, int) and context_length > 0:
+                return context_length
+        except Exception:
+            pass
+        return self.DEFAULT_CONTEXT_LENGTH
+    
+    def _estimate_tokens(self, text: str) -> int:
+        """Estimate token count, preferring the backend's own estimator."""
+        estimator = getattr(self.llm_backend, 'estimate_tokens', None)
+        if callable(estimator):
+            try:
+                tokens = estimator(text)
+                if isinstance(tokens, int):
+                    return tokens
+            except Exception:
+                pass
+        return max(1, len(text) // self.CHARS_PER_TOKEN)
+    
+    def _uses_code_context(self) -> bool:
+        """Check whether prompts get retrieved code context."""
+        return (self.context_retriever is not None and self.code_context_tokens > 0
+                and self.context_retriever.has_code_index())
+    
+    def _format_code_context(self, requirements: List[Requirement]) -> str:
+        """
+        Format the code chunks most relevant to a batch within the token budget.
+        
+        Returns:
+            Code context section for the prompt, empty if nothing was retrieved
+        """
+        if not self._uses_code_context():
+            return ""
+        
+        entries = []
+        remaining_tokens = self.code_context_tokens
+        for chunk, _ in self.context_retriever.relevant_chunks([req.text for req in requirements]):
+            location = f"{chunk.file_path}:{chunk.start_line}-{chunk.end_line}"
+            if chunk.function_name:
+                location += f" ({chunk.function_name})"
+            entry = f"- {location}\n{chunk.content.strip()}\n"
+            
+            entry_tokens = self._estimate_tokens(entry + "\n")
+            if entry_tokens > remaining_tokens:
+                # Cut the chunk to the remaining budget instead of dropping it
+                entry = entry[:remaining_tokens * self.CHARS_PER_TOKEN - 1]
+                entry_tokens = remaining_tokens
+            if entry_tokens <= 0 or not entry:
+                break
+            entries.append(entry)
+            remaining_tokens -= entry_tokens
+        
+        if not entries:
+            return ""
+        return self.code_context_template.format(code_context="\n".join(entries))
+    
+    def _format_requirement(self, req: Requirement) -> str:
+        """Format a single Software Requirement for the prompt."""
+        criteria_text = '; '.join(req.acceptance_criteria[:2])  # Limit criteria for brevity
+        lines = [f"- {req.id}: {req.text}"]
+        if criteria_text:
+            lines.append(f"  Acceptance Criteria: {criteria_text}")
+        return "\n".join(lines)
+    
     def _identify_hazards_for_batch(self, requirements: List[Requirement], project_description: str) -> List[RiskItem]:
         """Identify hazards for a batch of Software Requirements."""
-        # Prepare requirements list for prompt
-        req_list = []
-        for req in requirements:
-            criteria_text = '; '.join(req.acceptance_criteria[:2])  # Limit criteria for brevity
-            req_list.append(f"- {req.id}: {req.text}")
-            if criteria_text:
-                req_list.append(f"  Acceptance Criteria: {criteria_text}")
+        hazards_data = self._request_hazards_for_batch(requirements, project_description)
+        return self._build_risk_items(requirements, hazards_data)
+    
+    def _request_hazards_for_batch(self, requirements: List[Requirement],
+                                   project_description: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Query the LLM for hazards of a batch and parse the response.
         
-        req_text = "\n".join(req_list)
+        Returns:
+            Parsed hazard data, or None if a recoverable LLM error occurred and
+            the heuristic fallback should be used instead
+        """
+        req_text = "\n".join(self._format_requirement(req) for req in requirements)
+        req_text += self._format_code_context(requirements)
         
         prompt = self.prompt_template.format(
             project_description=project_description or "Medical device software project",
@@ -179,25 +332,30 @@ Focus on realistic hazards that are relevant to medical device safety. If no cle
             )
             
             # Parse JSON response
-            hazards_data = LLMResponseParser.parse_json_response(response)
-            
-            # Convert to RiskItem objects
-            risk_items = []
-            for hazard_data in hazards_data:
-                risk_item = self._create_risk_item_from_data(hazard_data, requirements)
-                if risk_item:
-                    risk_items.append(risk_item)
-            
-            return risk_items
+            return LLMResponseParser.parse_json_response(response)
             
         except LLMError as e:
             if not e.recoverable:
                 raise
-            # Try fallback hazard identification for recoverable errors
-            return self._fallback_hazard_identification(requirements)
+            return None
         except Exception as e:
             raise Exception(f"Hazard identification failed: {str(e)}")
     
+    def _build_risk_items(self, requirements: List[Requirement],
+                          hazards_data: Optional[List[Dict[str, Any]]]) -> List[RiskItem]:
+        """Convert parsed hazard data for a batch into RiskItem objects."""
+        if hazards_data is None:
+            # Try fallback hazard identification for recoverable errors
+            return self._fallback_hazard_identification(requirements)
+        
+        risk_items = []
+        for hazard_data in hazards_data:
+            risk_item = self._create_risk_item_from_data(hazard_data, requirements)
+            if risk_item:
+                risk_items.append(risk_item)
+        
+        return risk_items
+    
     def _create_risk_item_from_data(self, hazard_data: Dict[str, Any], requirements: List[Requirement]) -> Optional[RiskItem]:
         """Create a RiskItem object from parsed hazard data."""
         try:
@@ -279,6 +279,26 @@ class IngestionService:
             
         return False
     
+    @classmethod
+    def is_excluded_directory_name(cls, dir_name: str) -> bool:
+        """
+        Check if a directory name is one of the excluded directories.
+        
+        Unlike the scan filter, names are matched whole, so directories such
+        as checkout/ or layout/ are not taken for out/.
+        
+        Args:
+            dir_name: Directory name to check
+            
+        Returns:
+            True if the directory should be skipped
+        """
+        if dir_name.lower() in cls.EXCLUDED_PATTERNS:
+            return True
+        
+        # Exclude hidden directories (starting with .)
+        return dir_name.startswith('.') and dir_name not in {'.kiro'}
+    
     def _should_exclude_file(self, file_name: str) -> bool:
         """
         Check if a file should be excluded from discovery.
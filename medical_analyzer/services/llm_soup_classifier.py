@@ -4,13 +4,17 @@ Replaces keyword-based classification with intelligent LLM analysis.
 """
 
 import json
-from typing import Dict, Any, List, Optional
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 
 from ..models.soup_models import (
     DetectedSOUPComponent, IEC62304SafetyClass, IEC62304Classification
 )
-from ..llm.backend import LLMBackend
+from ..database.schema import DatabaseManager
+from ..llm.backend import LLMBackend, FallbackLLMBackend
 from ..llm.config import LLMConfig, load_config
 from ..llm.operation_configs import get_operation_params
 from ..llm.response_handler import get_response_handler, ResponseFormat
@@ -29,19 +33,215 @@ class SOUPAnalysisContext:
             self.additional_context = {}
 
 
+class SOUPClassificationCache:
+    """
+    Persistent cache of LLM SOUP classifications.
+    
+    Entries are keyed by package manager, name and version so a dependency is
+    only classified once across runs and projects sharing the same database.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize the classification cache.
+        
+        Args:
+            db_manager: Database manager whose database holds the cache table
+        """
+        self.db_manager = db_manager
+        self._ensure_table()
+    
+    def _ensure_table(self):
+        """Ensure the classification cache table exists."""
+        create_cache_table_sql = """
+        CREATE TABLE IF NOT EXISTS soup_classification_cache (
+            package_manager TEXT NOT NULL,
+            name TEXT NOT NULL,
+            version TEXT NOT NULL,
+            safety_class TEXT NOT NULL,
+            classification TEXT NOT NULL,
+            safety_impact TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (package_manager, name, version)
+        )
+        """
+        
+        with self.db_manager.get_connection() as conn:
+            conn.execute(create_cache_table_sql)
+            conn.commit()
+    
+    @staticmethod
+    def make_key(component: DetectedSOUPComponent) -> Tuple[str, str, str]:
+        """Build the cache key for a component."""
+        return ((component.package_manager or "unknown").lower(), component.name, component.version)
+    
+    def get(self, component: DetectedSOUPComponent) -> Optional[IEC62304Classification]:
+        """
+        Get the cached classification for a component.
+        
+        Args:
+            component: Component to look up
+            
+        Returns:
+            Cached classification or None if not cached
+        """
+        return self.get_many([component]).get(self.make_key(component))
+    
+    def get_many(self, components: List[DetectedSOUPComponent]) -> Dict[Tuple[str, str, str], IEC62304Classification]:
+        """
+        Get cached classifications for several components in bulk.
+        
+        Args:
+            components: Components to look up
+            
+        Returns:
+            Dictionary mapping cache keys to cached classifications
+        """
+        keys = sorted({self.make_key(component) for component in components})
+        results = {}
+        
+        try:
+            with self.db_manager.get_connection() as conn:
+                # Pass the keys as one JSON array and join on the full primary key,
+                # so each key is a single index lookup regardless of how many are asked
+                cursor = conn.execute("""
+                    SELECT c.package_manager, c.name, c.version, c.classification
+                    FROM json_each(?) AS k
+                    JOIN soup_classification_cache AS c
+                        ON c.package_manager = json_extract(k.value, '$[0]')
+                        AND c.name = json_extract(k.value, '$[1]')
+                        AND c.version = json_extract(k.value, '$[2]')
+                """, (json.dumps(keys),))
+                for package_manager, name, version, classification_json in cursor.fetchall():
+                    results[(package_manager, name, version)] = self._deserialize_classification(
+                        json.loads(classification_json)
+                    )
+        except (sqlite3.Error, ValueError, KeyError):
+            # The cache is an optimization only; treat failures as misses
+            return results
+        
+        return results
+    
+    def put(self, component: DetectedSOUPComponent, classification: IEC62304Classification):
+        """Store a classification for a component."""
+        self.put_many([(component, classification)])
+    
+    def put_many(self, entries: List[Tuple[DetectedSOUPComponent, IEC62304Classification]]):
+        """
+        Store several classifications in a single transaction.
+        
+        Args:
+            entries: List of (component, classification) pairs
+        """
+        if not entries:
+            return
+        
+        insert_sql = """
+        INSERT OR REPLACE INTO soup_classification_cache (
+            package_manager, name, version, safety_class, classification,
+            safety_impact, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, NULL, ?, ?)
+        """
+        
+        now = datetime.now().isoformat()
+        values = [
+            (*self.make_key(component), classification.safety_class.value,
+             json.dumps(self._serialize_classification(classification)), now, now)
+            for component, classification in entries
+        ]
+        
+        try:
+            with self.db_manager.get_connection() as conn:
+                conn.executemany(insert_sql, values)
+                conn.commit()
+        except sqlite3.Error:
+            pass
+    
+    def get_safety_impact(self, component: DetectedSOUPComponent,
+                          safety_class: IEC62304SafetyClass) -> Optional[Dict[str, Any]]:
+        """Get the cached safety impact analysis for a component and safety class."""
+        select_sql = """
+        SELECT safety_impact FROM soup_classification_cache
+        WHERE package_manager = ? AND name = ? AND version = ? AND safety_class = ?
+        """
+        
+        try:
+            with self.db_manager.get_connection() as conn:
+                row = conn.execute(select_sql, (*self.make_key(component), safety_class.value)).fetchone()
+        except sqlite3.Error:
+            return None
+        
+        if row and row[0]:
+            return json.loads(row[0])
+        return None
+    
+    def put_safety_impact(self, component: DetectedSOUPComponent, safety_class: IEC62304SafetyClass,
+                          safety_impact: Dict[str, Any]):
+        """Attach a safety impact analysis to a cached classification."""
+        update_sql = """
+        UPDATE soup_classification_cache SET safety_impact = ?, updated_at = ?
+        WHERE package_manager = ? AND name = ? AND version = ? AND safety_class = ?
+        """
+        
+        try:
+            with self.db_manager.get_connection() as conn:
+                conn.execute(update_sql, (json.dumps(safety_impact), datetime.now().isoformat(),
+                                          *self.make_key(component), safety_class.value))
+                conn.commit()
+        except sqlite3.Error:
+            pass
+    
+    def clear(self):
+        """Remove all cached classifications."""
+        with self.db_manager.get_connection() as conn:
+            conn.execute("DELETE FROM soup_classification_cache")
+            conn.commit()
+    
+    def _serialize_classification(self, classification: IEC62304Classification) -> Dict[str, Any]:
+        """Convert a classification to a JSON-serializable dictionary."""
+        return {
+            "safety_class": classification.safety_class.value,
+            "justification": classification.justification,
+            "risk_assessment": classification.risk_assessment,
+            "verification_requirements": classification.verification_requirements,
+            "documentation_requirements": classification.documentation_requirements,
+            "change_control_requirements": classification.change_control_requirements,
+            "metadata": getattr(classification, 'metadata', {})
+        }
+    
+    def _deserialize_classification(self, data: Dict[str, Any]) -> IEC62304Classification:
+        """Rebuild a classification from its cached dictionary form."""
+        classification = IEC62304Classification(
+            safety_class=IEC62304SafetyClass(data["safety_class"]),
+            justification=data["justification"],
+            risk_assessment=data["risk_assessment"],
+            verification_requirements=data.get("verification_requirements", []),
+            documentation_requirements=data.get("documentation_requirements", []),
+            change_control_requirements=data.get("change_control_requirements", [])
+        )
+        classification.metadata = dict(data.get("metadata") or {}, cached=True)
+        return classification
+
+
 class LLMSOUPClassifier:
     """LLM-based SOUP component classifier for IEC 62304 compliance."""
     
-    def __init__(self, llm_backend: Optional[LLMBackend] = None, config: Optional[LLMConfig] = None):
+    def __init__(self, llm_backend: Optional[LLMBackend] = None, config: Optional[LLMConfig] = None,
+                 classification_cache: Optional[SOUPClassificationCache] = None, max_workers: int = 4):
         """
         Initialize LLM SOUP classifier.
         
         Args:
             llm_backend: Optional LLM backend instance
             config: Optional LLM configuration
+            classification_cache: Optional persistent cache of previous classifications
+            max_workers: Maximum number of concurrent LLM classification requests
         """
         self.config = config or load_config()
         self.llm_backend = llm_backend
+        self.classification_cache = classification_cache
+        self.max_workers = max(1, max_workers)
         
         # Classification prompts
         self.classification_prompt_template = """
@@ -132,6 +332,20 @@ Respond in JSON format:
         Raises:
             ValueError: If classification fails or is invalid
         """
+        if self.classification_cache is not None:
+            cached = self.classification_cache.get(component)
+            if cached is not None:
+                return cached
+        
+        classification = self._classify_uncached(component, context)
+        if self._is_cacheable(classification):
+            self.classification_cache.put(component, classification)
+        
+        return classification
+    
+    def _classify_uncached(self, component: DetectedSOUPComponent,
+                           context: Optional[SOUPAnalysisContext] = None) -> IEC62304Classification:
+        """Classify a component with the LLM, bypassing the classification cache."""
         if context is None:
             context = SOUPAnalysisContext(component=component)
         
@@ -198,6 +412,11 @@ Respond in JSON format:
             component_description=component.description or "No description available"
         )
         
+        if self.classification_cache is not None:
+            cached = self.classification_cache.get_safety_impact(component, classification.safety_class)
+            if cached is not None:
+                return cached
+        
         try:
             if self.llm_backend is None:
                 self.llm_backend = self._get_available_backend()
@@ -209,7 +428,11 @@ Respond in JSON format:
                 **params
             )
             
-            return self._parse_safety_impact_response(response)
+            safety_impact = self._parse_safety_impact_response(response)
+            if self.classification_cache is not None and not isinstance(self.llm_backend, FallbackLLMBackend):
+                self.classification_cache.put_safety_impact(component, classification.safety_class, safety_impact)
+            
+            return safety_impact
             
         except Exception as e:
             # Return basic safety impact analysis as fallback
@@ -220,6 +443,9 @@ Respond in JSON format:
         """
         Classify multiple SOUP components efficiently.
         
+        Cached classifications are reused; each remaining (package manager,
+        name, version) is classified once, with requests sent concurrently.
+        
         Args:
             components: List of components to classify
             context: Optional shared analysis context
@@ -227,18 +453,53 @@ Respond in JSON format:
         Returns:
             List of classifications in the same order as input
         """
-        classifications = []
+        make_key = SOUPClassificationCache.make_key
+        classified: Dict[Tuple[str, str, str], IEC62304Classification] = {}
+        if self.classification_cache is not None:
+            classified.update(self.classification_cache.get_many(components))
         
+        # One representative component per uncached key
+        pending: Dict[Tuple[str, str, str], DetectedSOUPComponent] = {}
         for component in components:
-            try:
-                classification = self.classify_component(component, context)
-                classifications.append(classification)
-            except Exception as e:
-                # Use fallback for failed classifications
-                fallback_classification = self._fallback_classification(component, context, str(e))
-                classifications.append(fallback_classification)
-        
-        return classifications
+            key = make_key(component)
+            if key not in classified and key not in pending:
+                pending[key] = component
+        
+        if pending:
+            # Resolve the backend once instead of racing on it from worker threads
+            if self.llm_backend is None:
+                self.llm_backend = self._get_available_backend()
+            
+            def classify(component):
+                try:
+                    return self._classify_uncached(component, context)
+                except Exception as e:
+                    # Use fallback for failed classifications
+                    return self._fallback_classification(component, context, str(e))
+            
+            pending_components = list(pending.values())
+            if len(pending_components) == 1 or self.max_workers == 1:
+                results = [classify(component) for component in pending_components]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending_components))) as executor:
+                    results = list(executor.map(classify, pending_components))
+            
+            classified.update(zip(pending.keys(), results))
+            
+            if self.classification_cache is not None:
+                self.classification_cache.put_many([
+                    (component, classification)
+                    for component, classification in zip(pending_components, results)
+                    if self._is_cacheable(classification)
+                ])
+        
+        return [classified[make_key(component)] for component in components]
+    
+    def _is_cacheable(self, classification: IEC62304Classification) -> bool:
+        """Only genuine LLM classifications are worth persisting."""
+        if self.classification_cache is None or isinstance(self.llm_backend, FallbackLLMBackend):
+            return False
+        return getattr(classification, 'metadata', {}).get("analysis_method") == "llm_based"
     
     def _prepare_classification_prompt(self, component: DetectedSOUPComponent, 
                                      context: SOUPAnalysisContext) -> str:
@@ -13,9 +13,17 @@ from ..database.schema import DatabaseManager
 class ProjectPersistenceService:
     """Service for persisting and retrieving ProjectStructure data."""
     
-    def __init__(self, db_path: str = "medical_analyzer.db"):
-        """Initialize the persistence service with database manager."""
-        self.db_manager = DatabaseManager(db_path)
+    def __init__(self, db_path: str = "medical_analyzer.db",
+                 db_manager: Optional[DatabaseManager] = None):
+        """
+        Initialize the persistence service with database manager.
+        
+        Args:
+            db_path: Path to the SQLite database
+            db_manager: Existing manager to share, so its connection pool and
+                transactions are shared as well
+        """
+        self.db_manager = db_manager or DatabaseManager(db_path)
     
     def save_project(self, project: ProjectStructure) -> int:
         """
@@ -36,32 +44,35 @@ class ProjectPersistenceService:
         if not os.path.exists(project.root_path):
             raise ValueError(f"Project root path does not exist: {project.root_path}")
         
-        # Check if project already exists
-        existing_project = self.db_manager.get_project_by_path(project.root_path)
-        
-        if existing_project:
-            # Update existing project
-            project_id = existing_project['id']
-            self._update_project(project_id, project)
-        else:
-            # Create new project
-            project_name = os.path.basename(project.root_path) or "Unnamed Project"
+        # Look up and create or update in one transaction, so concurrent saves
+        # of the same project cannot both insert it
+        with self.db_manager.transaction():
+            # Check if project already exists
+            existing_project = self.db_manager.get_project_by_path(project.root_path)
             
-            # Prepare metadata including file metadata
-            metadata = project.metadata.copy()
-            metadata.update({
-                'selected_files_count': len(project.selected_files),
-                'file_metadata': [self._file_metadata_to_dict(fm) for fm in project.file_metadata],
-                'timestamp': project.timestamp.isoformat(),
-                'selected_files': project.selected_files
-            })
-            
-            project_id = self.db_manager.create_project(
-                name=project_name,
-                root_path=project.root_path,
-                description=project.description,
-                metadata=metadata
-            )
+            if existing_project:
+                # Update existing project
+                project_id = existing_project['id']
+                self._update_project(project_id, project)
+            else:
+                # Create new project
+                project_name = os.path.basename(project.root_path) or "Unnamed Project"
+                
+                # Prepare metadata including file metadata
+                metadata = project.metadata.copy()
+                metadata.update({
+                    'selected_files_count': len(project.selected_files),
+                    'file_metadata': [self._file_metadata_to_dict(fm) for fm in project.file_metadata],
+                    'timestamp': project.timestamp.isoformat(),
+                    'selected_files': project.selected_files
+                })
+                
+                project_id = self.db_manager.create_project(
+                    name=project_name,
+                    root_path=project.root_path,
+                    description=project.description,
+                    metadata=metadata
+                )
         
         return project_id
     
@@ -162,14 +173,13 @@ class ProjectPersistenceService:
         Returns:
             True if project was deleted, False if not found
         """
-        project = self.db_manager.get_project(project_id)
-        if not project:
-            return False
-        
-        with self.db_manager.get_connection() as conn:
+        with self.db_manager.transaction() as conn:
+            project = self.db_manager.get_project(project_id)
+            if not project:
+                return False
+            
             cursor = conn.cursor()
             cursor.execute("DELETE FROM projects WHERE id = ?", (project_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
     def create_analysis_run(self, project_id: int, artifacts_path: str = "",
@@ -16,6 +16,7 @@ from ..llm.backend import LLMBackend, LLMError
 from ..llm.api_response_validator import APIResponseValidator, ValidationResult
 from ..llm.operation_configs import get_operation_params
 from ..llm.response_handler import get_response_handler, ResponseFormat
+from ..llm.context_retriever import ContextRetriever
 from ..models.result_models import RequirementsGenerationResult
 from .llm_response_parser import LLMResponseParser
 
@@ -25,14 +26,17 @@ logger = logging.getLogger(__name__)
 class RequirementsGenerator:
     """Service for generating requirements from extracted features."""
     
-    def __init__(self, llm_backend: LLMBackend):
+    def __init__(self, llm_backend: LLMBackend, context_retriever: Optional[ContextRetriever] = None):
         """
         Initialize the requirements generator.
         
         Args:
             llm_backend: LLM backend for analysis
+            context_retriever: Optional retriever that limits each prompt to
+                the most relevant features
         """
         self.llm_backend = llm_backend
+        self.context_retriever = context_retriever
         self.ur_counter = 0
         self.sr_counter = 0
         
@@ -55,6 +59,10 @@ class RequirementsGenerator:
         self._validator = validator
         self._setup_requirements_validation_schemas()
     
+    def set_context_retriever(self, context_retriever: Optional[ContextRetriever]):
+        """Set the retriever that selects prompt features, None to include all."""
+        self.context_retriever = context_retriever
+    
     def _setup_requirements_validation_schemas(self) -> None:
         """Setup validation schemas specific to requirements generation."""
         
@@ -277,6 +285,7 @@ Generate 2-5 software requirements for this user requirement."""
                 'software_requirements_generated': len(software_requirements),
                 'generation_method': 'llm_based',
                 'llm_backend': self.llm_backend.__class__.__name__,
+                'context_retrieval': self.context_retriever is not None,
                 'project_description_provided': bool(project_description)
             }
         )
@@ -292,7 +301,14 @@ Generate 2-5 software requirements for this user requirement."""
         feature_groups = self._group_features_by_category(features)
         user_requirements = []
         
-        for category, category_features in feature_groups.items():
+        # Large categories are split into prompts of related features
+        prompt_groups = [
+            (category, group)
+            for category, category_features in feature_groups.items()
+            for group in self._split_features_for_prompts(category_features)
+        ]
+        
+        for category, category_features in prompt_groups:
             if not category_features:
                 continue
                 
@@ -375,6 +391,8 @@ Generate 2-5 software requirements for this user requirement."""
             if not related_features:
                 continue
             
+            related_features = self._select_features_for_requirement(ur, related_features)
+            
             # Format related features for prompt
             related_features_text = self._format_features_for_prompt(related_features)
             
@@ -449,6 +467,19 @@ Generate 2-5 software requirements for this user requirement."""
         
         return groups
     
+    def _split_features_for_prompts(self, features: List[Feature]) -> List[List[Feature]]:
+        """Split a feature group so each prompt holds at most top_k related features."""
+        if self.context_retriever is None or not self.context_retriever.is_available():
+            return [features]
+        return self.context_retriever.group_features(features)
+    
+    def _select_features_for_requirement(self, requirement: Requirement, features: List[Feature]) -> List[Feature]:
+        """Select the features most relevant to a user requirement."""
+        if self.context_retriever is None or not self.context_retriever.is_available():
+            return features
+        query = ' '.join([requirement.text] + list(requirement.acceptance_criteria))
+        return self.context_retriever.select_features(query, features)
+    
     def _format_features_for_prompt(self, features: List[Feature]) -> str:
         """Format features for inclusion in prompts."""
         formatted = []
@@ -4,16 +4,20 @@ Automatically detects SOUP components from project dependency files.
 """
 
 import json
+import os
 import re
 import toml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
 from xml.etree import ElementTree as ET
 
 from ..models.soup_models import (
     DetectedSOUPComponent, DetectionMethod, IEC62304SafetyClass, IEC62304Classification, SafetyAssessment
 )
-from .llm_soup_classifier import LLMSOUPClassifier, SOUPAnalysisContext
+from .llm_soup_classifier import LLMSOUPClassifier, SOUPAnalysisContext, SOUPClassificationCache
+from .ingestion import IngestionService
+from ..utils.streaming_json import iter_json_events, MAP_KEY, END_MAP, VALUE, DEFAULT_CHUNK_SIZE
 
 
 class DependencyParser:
@@ -333,11 +337,297 @@ class CargoTomlParser(DependencyParser):
         return components
 
 
+class PackageLockJsonParser(DependencyParser):
+    """
+    Parser for package-lock.json files (npm).
+    
+    Lockfiles list the full transitive dependency set and can be very large,
+    so they are read with a streaming tokenizer one package entry at a time.
+    """
+    
+    # Scalar fields kept from each lockfile entry
+    ENTRY_FIELDS = {'name', 'version', 'resolved', 'integrity', 'license', 'dev', 'optional', 'link'}
+    
+    # Characters read from the lockfile at a time
+    CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+    
+    def parse(self, file_path: Path) -> List[DetectedSOUPComponent]:
+        """Parse package-lock.json file."""
+        packages_components = []
+        legacy_components = []
+        entries: Dict[tuple, Dict[str, Any]] = {}
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for path, event, value in iter_json_events(f, self.CHUNK_SIZE):
+                    depth = len(path)
+                    
+                    if event == MAP_KEY and self._is_entry_container(path):
+                        entries[path + (value,)] = {}
+                    elif event == VALUE and depth >= 3 and path[:-1] in entries:
+                        if path[-1] in self.ENTRY_FIELDS:
+                            entries[path[:-1]][path[-1]] = value
+                    elif event == END_MAP and path in entries:
+                        entry = entries.pop(path)
+                        if path[0] == 'packages':
+                            component = self._create_component(path[-1], entry, file_path, lockfile_format='packages')
+                            if component:
+                                packages_components.append(component)
+                        elif not packages_components:
+                            # lockfileVersion 1 nests dependencies; v2 repeats them for old npm
+                            component = self._create_component(path[-1], entry, file_path, lockfile_format='dependencies')
+                            if component:
+                                legacy_components.append(component)
+                                
+        except (ValueError, UnicodeDecodeError, FileNotFoundError):
+            # Keep whatever was parsed before the error
+            pass
+        
+        return packages_components or legacy_components
+    
+    def _is_entry_container(self, path: tuple) -> bool:
+        """Check whether keys of the map at path are package entries."""
+        if path == ('packages',):
+            return True
+        # ('dependencies',), ('dependencies', name, 'dependencies'), ...
+        return len(path) % 2 == 1 and all(part == 'dependencies' for part in path[::2])
+    
+    def _create_component(self, key: str, entry: Dict[str, Any], file_path: Path,
+                          lockfile_format: str) -> Optional[DetectedSOUPComponent]:
+        """Create a component from a lockfile entry."""
+        if lockfile_format == 'packages':
+            # Skip the root project, workspaces and symlinked local packages
+            if 'node_modules/' not in key or entry.get('link'):
+                return None
+            name = entry.get('name') or key.rsplit('node_modules/', 1)[1]
+        else:
+            name = key
+        
+        version = entry.get('version')
+        if not name or not isinstance(version, str):
+            return None
+        
+        if entry.get('dev'):
+            dependency_type = 'devDependencies'
+        elif entry.get('optional'):
+            dependency_type = 'optionalDependencies'
+        else:
+            dependency_type = 'dependencies'
+        
+        return DetectedSOUPComponent(
+            name=name,
+            version=version,
+            source_file=str(file_path),
+            detection_method=DetectionMethod.PACKAGE_LOCK_JSON,
+            confidence=0.98,
+            package_manager="npm",
+            license=entry.get('license') if isinstance(entry.get('license'), str) else None,
+            metadata={
+                "dependency_type": dependency_type,
+                "lockfile_path": key,
+                "resolved": entry.get('resolved'),
+                "integrity": entry.get('integrity')
+            }
+        )
+
+
+class YarnLockParser(DependencyParser):
+    """
+    Parser for yarn.lock files (Yarn classic and Berry).
+    
+    The file is processed line by line, so only the current entry is held
+    in memory.
+    """
+    
+    VERSION_RE = re.compile(r'^\s+version:?\s+"?([^"\s]+)"?')
+    FIELD_RE = re.compile(r'^\s+(resolved|integrity|checksum|resolution):?\s+"?([^"\s]+)"?')
+    
+    def parse(self, file_path: Path) -> List[DetectedSOUPComponent]:
+        """Parse yarn.lock file."""
+        components = []
+        header = None
+        fields: Dict[str, str] = {}
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip() or line.lstrip().startswith('#'):
+                        continue
+                    
+                    if not line[0].isspace():
+                        # A new entry header ends the previous entry
+                        component = self._create_component(header, fields, file_path)
+                        if component:
+                            components.append(component)
+                        header = line.strip()
+                        fields = {}
+                        continue
+                    
+                    match = self.VERSION_RE.match(line)
+                    if match:
+                        fields.setdefault('version', match.group(1))
+                        continue
+                    
+                    match = self.FIELD_RE.match(line)
+                    if match:
+                        fields[match.group(1)] = match.group(2)
+            
+            component = self._create_component(header, fields, file_path)
+            if component:
+                components.append(component)
+                
+        except (UnicodeDecodeError, FileNotFoundError):
+            pass
+        
+        return components
+    
+    def _create_component(self, header: Optional[str], fields: Dict[str, str],
+                          file_path: Path) -> Optional[DetectedSOUPComponent]:
+        """Create a component from an entry header and its fields."""
+        if not header or 'version' not in fields:
+            return None
+        
+        # '"@babel/core@^7.0.0", "@babel/core@^7.1.0":' -> '@babel/core@^7.0.0'
+        specifier = header.rstrip(':').split(',')[0].strip().strip('"')
+        separator = specifier.find('@', 1)
+        if separator <= 0:
+            return None
+        
+        name = specifier[:separator]
+        range_spec = specifier[separator + 1:]
+        
+        # Skip Berry workspace and local link entries, which are project code
+        if range_spec.startswith(('workspace:', 'link:', 'portal:')):
+            return None
+        
+        return DetectedSOUPComponent(
+            name=name,
+            version=fields['version'],
+            source_file=str(file_path),
+            detection_method=DetectionMethod.YARN_LOCK,
+            confidence=0.98,
+            package_manager="npm",
+            metadata={
+                "lockfile_entry": specifier,
+                "resolved": fields.get('resolved') or fields.get('resolution'),
+                "integrity": fields.get('integrity') or fields.get('checksum')
+            }
+        )
+
+
+class PnpmLockParser(DependencyParser):
+    """
+    Parser for pnpm-lock.yaml files.
+    
+    Only the `packages:` section is needed, and its layout is fixed by pnpm,
+    so the YAML is tokenized line by line instead of being loaded whole.
+    """
+    
+    LOCKFILE_VERSION_RE = re.compile(r"^lockfileVersion:\s*'?([0-9.]+)'?")
+    INTEGRITY_RE = re.compile(r'integrity:\s*([^,}\s]+)')
+    
+    def parse(self, file_path: Path) -> List[DetectedSOUPComponent]:
+        """Parse pnpm-lock.yaml file."""
+        components = []
+        lockfile_version = 6.0
+        in_packages = False
+        key = None
+        fields: Dict[str, str] = {}
+        
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    stripped = line.strip()
+                    if not stripped or stripped.startswith('#'):
+                        continue
+                    
+                    indent = len(line) - len(line.lstrip(' '))
+                    
+                    if indent == 0:
+                        component = self._create_component(key, fields, lockfile_version, file_path)
+                        if component:
+                            components.append(component)
+                        key, fields = None, {}
+                        
+                        match = self.LOCKFILE_VERSION_RE.match(stripped)
+                        if match:
+                            lockfile_version = float(match.group(1))
+                        in_packages = stripped == 'packages:'
+                        continue
+                    
+                    if not in_packages:
+                        continue
+                    
+                    if indent == 2 and stripped.endswith(':'):
+                        component = self._create_component(key, fields, lockfile_version, file_path)
+                        if component:
+                            components.append(component)
+                        key, fields = stripped[:-1].strip('\'"'), {}
+                    elif indent == 4 and key and ':' in stripped:
+                        field, _, value = stripped.partition(':')
+                        fields[field.strip()] = value.strip().strip('\'"')
+            
+            component = self._create_component(key, fields, lockfile_version, file_path)
+            if component:
+                components.append(component)
+                
+        except (ValueError, UnicodeDecodeError, FileNotFoundError):
+            pass
+        
+        return components
+    
+    def _create_component(self, key: Optional[str], fields: Dict[str, str], lockfile_version: float,
+                          file_path: Path) -> Optional[DetectedSOUPComponent]:
+        """Create a component from a package key and its fields."""
+        if not key:
+            return None
+        
+        package_id = key.lstrip('/')
+        if lockfile_version < 6:
+            # '/@scope/name/1.2.3_peer@1.0.0'
+            name, _, version = package_id.rpartition('/')
+            version = version.split('_', 1)[0]
+        else:
+            # '/@scope/name@1.2.3(peer@1.0.0)' or '@scope/name@1.2.3'
+            name, _, version = package_id.split('(', 1)[0].rpartition('@')
+        
+        # Tarball and git dependencies carry explicit name/version fields
+        name = fields.get('name') or name
+        version = fields.get('version') or version
+        if not name or not version:
+            return None
+        
+        integrity = self.INTEGRITY_RE.search(fields.get('resolution', ''))
+        
+        return DetectedSOUPComponent(
+            name=name,
+            version=version,
+            source_file=str(file_path),
+            detection_method=DetectionMethod.PNPM_LOCK,
+            confidence=0.98,
+            package_manager="npm",
+            metadata={
+                "dependency_type": "devDependencies" if fields.get('dev') == 'true' else "dependencies",
+                "lockfile_entry": key,
+                "integrity": integrity.group(1) if integrity else None
+            }
+        )
+
+
 class SOUPDetector:
     """Main SOUP detection service."""
     
-    def __init__(self, use_llm_classification: bool = True):
-        """Initialize SOUP detector with parsers."""
+    def __init__(self, use_llm_classification: bool = True,
+                 classification_cache: Optional[SOUPClassificationCache] = None,
+                 max_workers: int = 4):
+        """
+        Initialize SOUP detector with parsers.
+        
+        Args:
+            use_llm_classification: Whether to classify components with the LLM
+            classification_cache: Optional persistent cache shared with the LLM classifier
+            max_workers: Maximum number of concurrent LLM classification requests
+        """
         self.parsers: Dict[str, DependencyParser] = {
             'package.json': PackageJsonParser(),
             'requirements.txt': RequirementsTxtParser(),
@@ -345,11 +635,20 @@ class SOUPDetector:
             'build.gradle': GradleBuildParser(),
             'pom.xml': PomXmlParser(),
             'Cargo.toml': CargoTomlParser(),
+            'package-lock.json': PackageLockJsonParser(),
+            'yarn.lock': YarnLockParser(),
+            'pnpm-lock.yaml': PnpmLockParser(),
         }
         
+        # Directory exclusion rules are shared with project ingestion
+        self.ingestion_service = IngestionService()
+        
         # Initialize LLM classifier
         self.use_llm_classification = use_llm_classification
-        self.llm_classifier = LLMSOUPClassifier() if use_llm_classification else None
+        self.max_workers = max(1, max_workers)
+        self.llm_classifier = LLMSOUPClassifier(
+            classification_cache=classification_cache, max_workers=self.max_workers
+        ) if use_llm_classification else None
         
         # Fallback safety classification heuristics (used when LLM is unavailable)
         self.safety_classification_rules = {
@@ -390,24 +689,95 @@ class SOUPDetector:
         project_root = Path(project_path)
         all_components = []
         
-        # Search for dependency files
-        for filename, parser in self.parsers.items():
-            dependency_files = list(project_root.rglob(filename))
-            
-            for file_path in dependency_files:
-                components = parser.parse(file_path)
-                
-                # Add safety classification suggestions
-                for component in components:
-                    component.suggested_classification = self._suggest_safety_classification(component)
-                
-                all_components.extend(components)
+        # Find every dependency file in a single walk, then parse them in parallel
+        dependency_files = self._find_dependency_files(project_root)
+        
+        def parse(item):
+            file_path, parser = item
+            return parser.parse(file_path)
+        
+        if len(dependency_files) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(dependency_files))) as executor:
+                parsed = list(executor.map(parse, dependency_files))
+        else:
+            parsed = [parse(item) for item in dependency_files]
+        
+        for components in parsed:
+            all_components.extend(components)
+        
+        # Add safety classification suggestions in one batch
+        self._suggest_safety_classifications(all_components)
         
         # Deduplicate and consolidate versions
         deduplicated = self._deduplicate_components(all_components)
         
         return deduplicated
     
+    def _find_dependency_files(self, project_root: Path) -> List[Tuple[Path, DependencyParser]]:
+        """
+        Walk the project once and collect every known dependency file.
+        
+        Directories excluded from ingestion (node_modules, .git, build output,
+        etc.) are pruned rather than descended into.
+        
+        Args:
+            project_root: Project root directory
+            
+        Returns:
+            (file path, parser) pairs ordered by parser registration, then path
+        """
+        parser_order = {filename: index for index, filename in enumerate(self.parsers)}
+        found = []
+        pending_dirs = [str(project_root)]
+        
+        while pending_dirs:
+            current_dir = pending_dirs.pop()
+            try:
+                with os.scandir(current_dir) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not self.ingestion_service.is_excluded_directory_name(entry.name):
+                                    pending_dirs.append(entry.path)
+                            elif entry.name in self.parsers and entry.is_file():
+                                found.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                # Unreadable directories are skipped, as rglob would
+                continue
+        
+        found.sort(key=lambda path: (parser_order[os.path.basename(path)], path))
+        return [(Path(path), self.parsers[os.path.basename(path)]) for path in found]
+    
+    def _suggest_safety_classifications(self, components: List[DetectedSOUPComponent]):
+        """
+        Set suggested classifications for many components at once.
+        
+        LLM classification goes through the classifier's batch API so cached
+        results are reused and cache misses are classified concurrently.
+        """
+        if not components:
+            return
+        
+        if self.use_llm_classification and self.llm_classifier:
+            try:
+                context = SOUPAnalysisContext(
+                    component=components[0],
+                    project_type="medical_device",
+                    safety_critical=True
+                )
+                classifications = self.llm_classifier.batch_classify_components(components, context)
+                for component, classification in zip(components, classifications):
+                    component.suggested_classification = classification.safety_class
+                return
+            except Exception:
+                # Fall back to per-component classification if the batch fails
+                pass
+        
+        for component in components:
+            component.suggested_classification = self._suggest_safety_classification(component)
+    
     def _suggest_safety_classification(self, component: DetectedSOUPComponent) -> Optional[IEC62304SafetyClass]:
         """
         Suggest IEC 62304 safety classification using LLM analysis or fallback rules.
@@ -453,24 +823,37 @@ class SOUPDetector:
         Returns:
             Deduplicated list of components
         """
-        component_map: Dict[str, DetectedSOUPComponent] = {}
+        # Each version of a package is its own SOUP item, so lockfiles pinning
+        # several versions keep one record per version
+        component_map: Dict[Tuple[str, str], DetectedSOUPComponent] = {}
+        # Hash index of the source files already merged into each entry
+        source_index: Dict[Tuple[str, str], Tuple[List[str], Set[str]]] = {}
         
         for component in components:
-            key = component.name
+            key = (component.name, component.version)
+            existing = component_map.get(key)
             
-            if key in component_map:
-                existing = component_map[key]
-                
-                # Keep the component with higher confidence
-                if component.confidence > existing.confidence:
-                    component_map[key] = component
-                elif component.confidence == existing.confidence:
-                    # Merge metadata and source files
-                    existing.metadata.update(component.metadata)
-                    if component.source_file not in existing.metadata.get('source_files', []):
-                        existing.metadata.setdefault('source_files', []).append(component.source_file)
-            else:
+            if existing is None:
                 component_map[key] = component
+                continue
+            
+            # Keep the component with higher confidence
+            if component.confidence > existing.confidence:
+                component_map[key] = component
+                source_index.pop(key, None)
+            elif component.confidence == existing.confidence:
+                # Add metadata the kept component lacks, without overwriting its
+                # own lockfile details, and record the other source file
+                for name, value in component.metadata.items():
+                    existing.metadata.setdefault(name, value)
+                source_files = existing.metadata.setdefault('source_files', [existing.source_file])
+                indexed_list, seen_sources = source_index.get(key, (None, None))
+                if indexed_list is not source_files:
+                    seen_sources = set(source_files)
+                    source_index[key] = (source_files, seen_sources)
+                if component.source_file not in seen_sources:
+                    seen_sources.add(component.source_file)
+                    source_files.append(component.source_file)
         
         return list(component_map.values())
     
@@ -669,55 +1052,65 @@ class SOUPDetector:
             }
         
         try:
-            # Prepare analysis context
-            context = SOUPAnalysisContext(
-                component=component,
-                project_type=project_context.get("project_type", "medical_device") if project_context else "medical_device",
-                safety_critical=project_context.get("safety_critical", True) if project_context else True,
-                additional_context=project_context or {}
-            )
+            context = self._build_analysis_context(component, project_context)
             
             # Get LLM classification
             classification = self.llm_classifier.classify_component(component, context)
             
-            # Get safety impact analysis
-            safety_impact = self.llm_classifier.analyze_safety_impact(component, classification)
-            
-            return {
-                "classification": {
-                    "safety_class": classification.safety_class.value,
-                    "justification": classification.justification,
-                    "risk_assessment": classification.risk_assessment,
-                    "verification_requirements": classification.verification_requirements,
-                    "documentation_requirements": classification.documentation_requirements,
-                    "change_control_requirements": classification.change_control_requirements,
-                    "metadata": getattr(classification, 'metadata', {})
-                },
-                "safety_impact": safety_impact,
-                "method": "llm_based",
-                "component_info": {
-                    "name": component.name,
-                    "version": component.version,
-                    "source_file": component.source_file,
-                    "detection_method": component.detection_method.value,
-                    "confidence": component.confidence
-                }
-            }
+            return self._build_detailed_classification(component, classification)
             
         except Exception as e:
-            # Return fallback classification with error info
-            return {
-                "error": f"LLM classification failed: {str(e)}",
-                "fallback_classification": self._suggest_safety_classification(component),
-                "method": "rule_based_fallback",
-                "component_info": {
-                    "name": component.name,
-                    "version": component.version,
-                    "source_file": component.source_file,
-                    "detection_method": component.detection_method.value,
-                    "confidence": component.confidence
-                }
-            }
+            return self._build_classification_error(component, e)
+    
+    def _build_analysis_context(self, component: DetectedSOUPComponent,
+                                project_context: Optional[Dict[str, Any]]) -> SOUPAnalysisContext:
+        """Prepare the LLM analysis context for a component."""
+        return SOUPAnalysisContext(
+            component=component,
+            project_type=project_context.get("project_type", "medical_device") if project_context else "medical_device",
+            safety_critical=project_context.get("safety_critical", True) if project_context else True,
+            additional_context=project_context or {}
+        )
+    
+    def _build_detailed_classification(self, component: DetectedSOUPComponent,
+                                       classification: IEC62304Classification) -> Dict[str, Any]:
+        """Combine a classification with its safety impact analysis."""
+        # Get safety impact analysis
+        safety_impact = self.llm_classifier.analyze_safety_impact(component, classification)
+        
+        return {
+            "classification": {
+                "safety_class": classification.safety_class.value,
+                "justification": classification.justification,
+                "risk_assessment": classification.risk_assessment,
+                "verification_requirements": classification.verification_requirements,
+                "documentation_requirements": classification.documentation_requirements,
+                "change_control_requirements": classification.change_control_requirements,
+                "metadata": getattr(classification, 'metadata', {})
+            },
+            "safety_impact": safety_impact,
+            "method": "llm_based",
+            "component_info": self._component_info(component)
+        }
+    
+    def _build_classification_error(self, component: DetectedSOUPComponent, error: Exception) -> Dict[str, Any]:
+        """Return fallback classification with error info."""
+        return {
+            "error": f"LLM classification failed: {str(error)}",
+            "fallback_classification": self._suggest_safety_classification(component),
+            "method": "rule_based_fallback",
+            "component_info": self._component_info(component)
+        }
+    
+    def _component_info(self, component: DetectedSOUPComponent) -> Dict[str, Any]:
+        """Summarize component details for classification results."""
+        return {
+            "name": component.name,
+            "version": component.version,
+            "source_file": component.source_file,
+            "detection_method": component.detection_method.value,
+            "confidence": component.confidence
+        }
     
     def batch_classify_components(self, components: List[DetectedSOUPComponent],
                                 project_context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
@@ -737,23 +1130,34 @@ class SOUPDetector:
                     "error": "LLM classification not available",
                     "fallback_classification": self._suggest_safety_classification(comp),
                     "method": "rule_based",
-                    "component_info": {
-                        "name": comp.name,
-                        "version": comp.version,
-                        "source_file": comp.source_file,
-                        "detection_method": comp.detection_method.value,
-                        "confidence": comp.confidence
-                    }
+                    "component_info": self._component_info(comp)
                 }
                 for comp in components
             ]
         
-        results = []
-        for component in components:
-            result = self.get_detailed_classification(component, project_context)
-            results.append(result)
+        if not components:
+            return []
+        
+        try:
+            context = self._build_analysis_context(components[0], project_context)
+            classifications = self.llm_classifier.batch_classify_components(components, context)
+        except Exception:
+            # Fall back to classifying components individually
+            return [self.get_detailed_classification(component, project_context) for component in components]
+        
+        def build(item):
+            component, classification = item
+            try:
+                return self._build_detailed_classification(component, classification)
+            except Exception as e:
+                return self._build_classification_error(component, e)
+        
+        items = list(zip(components, classifications))
+        if len(items) == 1 or self.max_workers == 1:
+            return [build(item) for item in items]
         
-        return results
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(build, items))
     
     def _generate_classification_justification(self, component: DetectedSOUPComponent, 
                                              safety_class: IEC62304SafetyClass) -> str:
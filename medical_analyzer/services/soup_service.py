@@ -7,7 +7,7 @@ import json
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 
 from ..models.core import SOUPComponent
@@ -18,13 +18,37 @@ from ..models.soup_models import (
 )
 from ..database.schema import DatabaseManager
 from .soup_detector import SOUPDetector
-from .llm_soup_classifier import LLMSOUPClassifier, SOUPAnalysisContext
+from .llm_soup_classifier import LLMSOUPClassifier, SOUPAnalysisContext, SOUPClassificationCache
 from .iec62304_compliance_manager import IEC62304ComplianceManager
 
 
 class SOUPService:
     """Service for managing SOUP (Software of Unknown Provenance) components with IEC 62304 compliance."""
     
+    INSERT_COMPONENT_SQL = """
+    INSERT INTO soup_components (
+        id, name, version, usage_reason, safety_justification,
+        supplier, license, website, description, installation_date,
+        last_updated, criticality_level, verification_method,
+        anomaly_list, metadata, created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    INSERT_CLASSIFICATION_SQL = """
+    INSERT OR REPLACE INTO soup_classifications (
+        id, component_id, safety_class, justification, risk_assessment,
+        verification_requirements, documentation_requirements,
+        change_control_requirements, created_at, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    INSERT_AUDIT_ENTRY_SQL = """
+    INSERT INTO soup_audit_trail (
+        id, component_id, action, timestamp, user, details,
+        old_values, new_values, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
     def __init__(self, db_manager: DatabaseManager):
         """
         Initialize SOUP service.
@@ -33,8 +57,10 @@ class SOUPService:
             db_manager: Database manager instance
         """
         self.db_manager = db_manager
-        self.soup_detector = SOUPDetector(use_llm_classification=True)
-        self.llm_classifier = LLMSOUPClassifier()
+        self.classification_cache = SOUPClassificationCache(db_manager)
+        self.soup_detector = SOUPDetector(use_llm_classification=True,
+                                          classification_cache=self.classification_cache)
+        self.llm_classifier = LLMSOUPClassifier(classification_cache=self.classification_cache)
         self.compliance_manager = IEC62304ComplianceManager()
         self._ensure_soup_tables()
     
@@ -121,8 +147,68 @@ class SOUPService:
             conn.execute(create_classification_table_sql)
             conn.execute(create_version_changes_table_sql)
             conn.execute(create_audit_table_sql)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_soup_classifications_component "
+                "ON soup_classifications(component_id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_soup_audit_trail_component "
+                "ON soup_audit_trail(component_id)"
+            )
+            self.fts_enabled = self._ensure_search_index(conn)
             conn.commit()
     
+    def _ensure_search_index(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create the FTS5 search index over component name, supplier and description.
+        
+        The index is an external-content table kept in sync by triggers. The
+        trigram tokenizer gives the same case-insensitive substring matching as
+        the LIKE search it replaces.
+        
+        Args:
+            conn: Open database connection
+            
+        Returns:
+            True if the index is available, False if SQLite lacks FTS5 support
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'soup_components_fts'"
+        ).fetchone()
+        
+        try:
+            conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS soup_components_fts USING fts5(
+                name, supplier, description,
+                content='soup_components', content_rowid='rowid', tokenize='trigram'
+            )
+            """)
+        except sqlite3.OperationalError:
+            return False
+        
+        conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS soup_components_fts_insert AFTER INSERT ON soup_components BEGIN
+            INSERT INTO soup_components_fts(rowid, name, supplier, description)
+            VALUES (new.rowid, new.name, new.supplier, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS soup_components_fts_delete AFTER DELETE ON soup_components BEGIN
+            INSERT INTO soup_components_fts(soup_components_fts, rowid, name, supplier, description)
+            VALUES ('delete', old.rowid, old.name, old.supplier, old.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS soup_components_fts_update AFTER UPDATE ON soup_components BEGIN
+            INSERT INTO soup_components_fts(soup_components_fts, rowid, name, supplier, description)
+            VALUES ('delete', old.rowid, old.name, old.supplier, old.description);
+            INSERT INTO soup_components_fts(rowid, name, supplier, description)
+            VALUES (new.rowid, new.name, new.supplier, new.description);
+        END;
+        """)
+        
+        if not exists:
+            # Index components stored before the search table existed
+            conn.execute("INSERT INTO soup_components_fts(soup_components_fts) VALUES ('rebuild')")
+        
+        return True
+    
     def add_component(self, component: SOUPComponent) -> str:
         """
         Add a new SOUP component to the inventory.
@@ -146,43 +232,76 @@ class SOUPService:
         if validation_errors:
             raise ValueError(f"Component validation failed: {', '.join(validation_errors)}")
         
-        # Prepare data for database
-        now = datetime.now().isoformat()
+        with self.db_manager.get_connection() as conn:
+            conn.execute(self.INSERT_COMPONENT_SQL, self._component_values(component, datetime.now().isoformat()))
+            conn.commit()
         
-        insert_sql = """
-        INSERT INTO soup_components (
-            id, name, version, usage_reason, safety_justification,
-            supplier, license, website, description, installation_date,
-            last_updated, criticality_level, verification_method,
-            anomaly_list, metadata, created_at, updated_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        return component.id
+    
+    def add_components_bulk(self, components: List[SOUPComponent], user: str = "system",
+                            classifications: Optional[Dict[str, IEC62304Classification]] = None,
+                            audit_details: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
         """
+        Add many SOUP components in a single transaction.
         
-        values = (
-            component.id,
-            component.name,
-            component.version,
-            component.usage_reason,
-            component.safety_justification,
-            component.supplier,
-            component.license,
-            component.website,
-            component.description,
-            component.installation_date.isoformat() if component.installation_date else None,
-            component.last_updated.isoformat() if component.last_updated else None,
-            component.criticality_level,
-            component.verification_method,
-            json.dumps(component.anomaly_list),
-            json.dumps(component.metadata),
-            now,
-            now
-        )
+        Components, their classifications and their audit entries are written
+        with executemany on one connection, so either all components are added
+        or none are.
         
-        with self.db_manager.get_connection() as conn:
-            conn.execute(insert_sql, values)
-            conn.commit()
+        Args:
+            components: SOUPComponent instances to add
+            user: User performing the import
+            classifications: Optional classifications keyed by component ID
+            audit_details: Optional audit entry details keyed by component ID
+            
+        Returns:
+            Component IDs in input order
+            
+        Raises:
+            ValueError: If any component fails validation
+            sqlite3.Error: If database operation fails
+        """
+        classifications = classifications or {}
+        audit_details = audit_details or {}
         
-        return component.id
+        for component in components:
+            if not component.id:
+                component.id = str(uuid.uuid4())
+            
+            validation_errors = component.validate()
+            if validation_errors:
+                raise ValueError(
+                    f"Component validation failed for {component.name}: {', '.join(validation_errors)}"
+                )
+        
+        now = datetime.now().isoformat()
+        component_rows = [self._component_values(component, now) for component in components]
+        classification_rows = [
+            self._classification_values(component.id, classifications[component.id], now)
+            for component in components if component.id in classifications
+        ]
+        audit_rows = [
+            self._audit_entry_values(
+                component.id,
+                "created_with_classification" if component.id in classifications else "created",
+                user,
+                details=audit_details.get(component.id),
+                timestamp=now
+            )
+            for component in components
+        ]
+        
+        with self.db_manager.get_connection() as conn:
+            try:
+                conn.executemany(self.INSERT_COMPONENT_SQL, component_rows)
+                conn.executemany(self.INSERT_CLASSIFICATION_SQL, classification_rows)
+                conn.executemany(self.INSERT_AUDIT_ENTRY_SQL, audit_rows)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+        
+        return [component.id for component in components]
     
     def update_component(self, component: SOUPComponent) -> bool:
         """
@@ -313,20 +432,34 @@ class SOUPService:
         Returns:
             List of matching SOUPComponent instances
         """
-        search_sql = """
+        select_sql = """
         SELECT id, name, version, usage_reason, safety_justification,
                supplier, license, website, description, installation_date,
                last_updated, criticality_level, verification_method,
                anomaly_list, metadata
         FROM soup_components
-        WHERE name LIKE ? OR supplier LIKE ? OR description LIKE ?
-        ORDER BY name, version
         """
         
-        search_pattern = f"%{query}%"
+        # Trigrams need at least three characters; shorter queries use LIKE
+        if self.fts_enabled and len(query) >= 3:
+            search_sql = select_sql + """
+            WHERE rowid IN (
+                SELECT rowid FROM soup_components_fts WHERE soup_components_fts MATCH ?
+            )
+            ORDER BY name, version
+            """
+            # Quote the query as a single phrase so FTS syntax characters match literally
+            params = ('"' + query.replace('"', '""') + '"',)
+        else:
+            search_sql = select_sql + """
+            WHERE name LIKE ? OR supplier LIKE ? OR description LIKE ?
+            ORDER BY name, version
+            """
+            search_pattern = f"%{query}%"
+            params = (search_pattern, search_pattern, search_pattern)
         
         with self.db_manager.get_connection() as conn:
-            cursor = conn.execute(search_sql, (search_pattern, search_pattern, search_pattern))
+            cursor = conn.execute(search_sql, params)
             rows = cursor.fetchall()
             
             return [self._row_to_component(row) for row in rows]
@@ -420,24 +553,8 @@ class SOUPService:
         classification = self.compliance_manager.classify_component_automatically(detected_component)
         
         # Convert to SOUPComponent
-        component_id = str(uuid.uuid4())
-        soup_component = SOUPComponent(
-            id=component_id,
-            name=detected_component.name,
-            version=detected_component.version,
-            usage_reason=f"Automatically detected from {detected_component.source_file}",
-            safety_justification=classification.justification,
-            supplier=detected_component.metadata.get('supplier', ''),
-            license=detected_component.license or '',
-            website=detected_component.homepage or '',
-            description=detected_component.description or '',
-            installation_date=datetime.now(),
-            last_updated=datetime.now(),
-            criticality_level=self._map_safety_class_to_criticality(classification.safety_class),
-            verification_method='',
-            anomaly_list=[],
-            metadata=detected_component.metadata
-        )
+        soup_component = self._detected_to_soup_component(detected_component, classification)
+        component_id = soup_component.id
         
         # Add component to database
         self.add_component(soup_component)
@@ -460,6 +577,81 @@ class SOUPService:
         
         return component_id
     
+    def add_components_with_classification_bulk(self, detected_components: List[DetectedSOUPComponent],
+                                                user: str = "system") -> Tuple[List[str], List[str]]:
+        """
+        Add detected SOUP components with automatic IEC 62304 classification in bulk.
+        
+        Invalid components are skipped and reported; the rest are written in a
+        single transaction through add_components_bulk.
+        
+        Args:
+            detected_components: Detected SOUP components
+            user: User performing the import
+            
+        Returns:
+            Tuple of (component IDs added, error messages for skipped components)
+            
+        Raises:
+            sqlite3.Error: If database operation fails
+        """
+        components = []
+        classifications = {}
+        audit_details = {}
+        errors = []
+        
+        for detected_component in detected_components:
+            try:
+                validation_errors = detected_component.validate()
+                if validation_errors:
+                    raise ValueError(f"Detected component validation failed: {', '.join(validation_errors)}")
+                
+                classification = self.compliance_manager.classify_component_automatically(detected_component)
+                soup_component = self._detected_to_soup_component(detected_component, classification)
+                
+                validation_errors = soup_component.validate()
+                if validation_errors:
+                    raise ValueError(f"Component validation failed: {', '.join(validation_errors)}")
+            except Exception as e:
+                errors.append(f"{detected_component.name}: {str(e)}")
+                continue
+            
+            components.append(soup_component)
+            classifications[soup_component.id] = classification
+            audit_details[soup_component.id] = {
+                "detection_method": detected_component.detection_method.value,
+                "confidence": detected_component.confidence,
+                "safety_class": classification.safety_class.value,
+                "source_file": detected_component.source_file
+            }
+        
+        component_ids = self.add_components_bulk(
+            components, user=user, classifications=classifications, audit_details=audit_details
+        ) if components else []
+        
+        return component_ids, errors
+    
+    def _detected_to_soup_component(self, detected_component: DetectedSOUPComponent,
+                                    classification: IEC62304Classification) -> SOUPComponent:
+        """Convert a detected component and its classification to a SOUPComponent."""
+        return SOUPComponent(
+            id=str(uuid.uuid4()),
+            name=detected_component.name,
+            version=detected_component.version,
+            usage_reason=f"Automatically detected from {detected_component.source_file}",
+            safety_justification=classification.justification,
+            supplier=detected_component.metadata.get('supplier', ''),
+            license=detected_component.license or '',
+            website=detected_component.homepage or '',
+            description=detected_component.description or '',
+            installation_date=datetime.now(),
+            last_updated=datetime.now(),
+            criticality_level=self._map_safety_class_to_criticality(classification.safety_class),
+            verification_method='',
+            anomaly_list=[],
+            metadata=detected_component.metadata
+        )
+    
     def classify_existing_component(self, component_id: str, user: str = "system") -> IEC62304Classification:
         """
         Classify an existing SOUP component according to IEC 62304.
@@ -1145,43 +1337,46 @@ class SOUPService:
                           details: Dict[str, Any] = None, old_values: Dict[str, Any] = None,
                           new_values: Dict[str, Any] = None):
         """Create audit trail entry."""
-        insert_sql = """
-        INSERT INTO soup_audit_trail (
-            id, component_id, action, timestamp, user, details,
-            old_values, new_values, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        now = datetime.now()
-        values = (
-            str(uuid.uuid4()),
-            component_id,
-            action,
-            now.isoformat(),
-            user,
-            json.dumps(details) if details else None,
-            json.dumps(old_values) if old_values else None,
-            json.dumps(new_values) if new_values else None,
-            now.isoformat()
-        )
+        values = self._audit_entry_values(component_id, action, user, details, old_values, new_values)
         
         with self.db_manager.get_connection() as conn:
-            conn.execute(insert_sql, values)
+            conn.execute(self.INSERT_AUDIT_ENTRY_SQL, values)
             conn.commit()
     
     def _store_classification(self, component_id: str, classification: IEC62304Classification):
         """Store IEC 62304 classification in database."""
-        insert_sql = """
-        INSERT OR REPLACE INTO soup_classifications (
-            id, component_id, safety_class, justification, risk_assessment,
-            verification_requirements, documentation_requirements, 
-            change_control_requirements, created_at, updated_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        now = datetime.now().isoformat()
+        values = self._classification_values(component_id, classification, datetime.now().isoformat())
         
-        values = (
+        with self.db_manager.get_connection() as conn:
+            conn.execute(self.INSERT_CLASSIFICATION_SQL, values)
+            conn.commit()
+    
+    def _component_values(self, component: SOUPComponent, now: str) -> tuple:
+        """Build INSERT_COMPONENT_SQL parameters for a component."""
+        return (
+            component.id,
+            component.name,
+            component.version,
+            component.usage_reason,
+            component.safety_justification,
+            component.supplier,
+            component.license,
+            component.website,
+            component.description,
+            component.installation_date.isoformat() if component.installation_date else None,
+            component.last_updated.isoformat() if component.last_updated else None,
+            component.criticality_level,
+            component.verification_method,
+            json.dumps(component.anomaly_list),
+            json.dumps(component.metadata),
+            now,
+            now
+        )
+    
+    def _classification_values(self, component_id: str, classification: IEC62304Classification,
+                               now: str) -> tuple:
+        """Build INSERT_CLASSIFICATION_SQL parameters for a classification."""
+        return (
             str(uuid.uuid4()),
             component_id,
             classification.safety_class.value,
@@ -1193,10 +1388,23 @@ class SOUPService:
             now,
             now
         )
-        
-        with self.db_manager.get_connection() as conn:
-            conn.execute(insert_sql, values)
-            conn.commit()
+    
+    def _audit_entry_values(self, component_id: str, action: str, user: str,
+                            details: Dict[str, Any] = None, old_values: Dict[str, Any] = None,
+                            new_values: Dict[str, Any] = None, timestamp: Optional[str] = None) -> tuple:
+        """Build INSERT_AUDIT_ENTRY_SQL parameters for an audit entry."""
+        now = timestamp or datetime.now().isoformat()
+        return (
+            str(uuid.uuid4()),
+            component_id,
+            action,
+            now,
+            user,
+            json.dumps(details) if details else None,
+            json.dumps(old_values) if old_values else None,
+            json.dumps(new_values) if new_values else None,
+            now
+        )
     
     def _store_safety_assessment(self, assessment: SafetyAssessment):
         """Store safety assessment in database."""
@@ -91,17 +91,22 @@ class RequirementsIntegrationService:
         self.current_requirements: List[Requirement] = []
         self.current_test_outline: Optional[CaseOutline] = None
         
-    def set_requirements(self, requirements: List[Requirement]) -> None:
+    def set_requirements(self, requirements: List[Requirement]) -> List[RequirementChange]:
         """Set the current requirements and detect changes.
         
         Args:
             requirements: Updated requirements list
+            
+        Returns:
+            List of detected changes
         """
         changes = self._detect_requirement_changes(self.current_requirements, requirements)
         self.current_requirements = requirements
         
         if changes:
             self._handle_requirement_changes(changes)
+        
+        return changes
     
     def _detect_requirement_changes(self, old_requirements: List[Requirement], new_requirements: List[Requirement]) -> List[RequirementChange]:
         """Detect changes between old and new requirements.
@@ -172,6 +177,8 @@ class RequirementsIntegrationService:
             return True
         if req1.type != req2.type:
             return True
+        if req1.derived_from != req2.derived_from:
+            return True
         
         return False
     
@@ -196,6 +203,9 @@ class RequirementsIntegrationService:
         if old_req.type != new_req.type:
             changes.append(f"type changed from {old_req.type.value} to {new_req.type.value}")
         
+        if old_req.derived_from != new_req.derived_from:
+            changes.append("derivation changed")
+        
         return "; ".join(changes) if changes else "minor changes"
     
     def _handle_requirement_changes(self, changes: List[RequirementChange]) -> None:
@@ -9,13 +9,15 @@ import logging
 import csv
 import json
 import os
-from typing import List, Dict, Any, Optional
+from itertools import chain, islice
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from datetime import datetime
 from io import StringIO
 import tempfile
 
 try:
     import openpyxl
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
     from openpyxl.utils import get_column_letter
     EXCEL_AVAILABLE = True
@@ -25,7 +27,7 @@ except ImportError:
 try:
     from reportlab.lib import colors
     from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
     PDF_AVAILABLE = True
@@ -38,12 +40,93 @@ from .traceability_models import TraceabilityMatrix, TraceabilityTableRow, Trace
 logger = logging.getLogger(__name__)
 
 
+if PDF_AVAILABLE:
+    class _ChunkedTable(Flowable):
+        """
+        Table flowable that materializes its rows one bounded chunk at a time.
+        
+        The flowable never fits a frame as a whole, so the document asks it
+        to split; each split emits the next page-sized Table followed by the
+        flowable itself until the rows are exhausted. Only the chunk being
+        laid out is held in memory.
+        """
+        
+        def __init__(self, header: List[str], rows: Iterable[List[str]], rows_per_chunk: int,
+                     colWidths: List[float], style: TableStyle):
+            super().__init__()
+            self._header = header
+            self._rows: Iterator[List[str]] = iter(rows)
+            self._rows_per_chunk = rows_per_chunk
+            self._col_widths = colWidths
+            self._style = style
+            self._pending = None
+            # First row of the next chunk, read ahead so the last chunk is known as such
+            self._next_row = next(self._rows, None)
+            self._exhausted = False
+            self._started = False
+        
+        def _next_table(self):
+            """Build the table for the next chunk of rows, or None when done."""
+            if self._pending is not None:
+                table, self._pending = self._pending, None
+                return table
+            
+            chunk = [] if self._next_row is None else [self._next_row]
+            chunk.extend(islice(self._rows, self._rows_per_chunk - len(chunk)))
+            self._next_row = next(self._rows, None)
+            if self._next_row is None:
+                self._exhausted = True
+            if not chunk and self._started:
+                return None
+            
+            self._started = True
+            table = Table([self._header] + chunk, colWidths=self._col_widths, repeatRows=1)
+            table.setStyle(self._style)
+            return table
+        
+        def wrap(self, availWidth, availHeight):
+            if self._exhausted and self._pending is None:
+                return 0, 0
+            # Report more height than is available so the frame asks for a split
+            return availWidth, availHeight + 1
+        
+        def split(self, availWidth, availHeight):
+            table = self._next_table()
+            if table is None:
+                return []
+            
+            _, height = table.wrap(availWidth, availHeight)
+            parts = [table] if height <= availHeight else table.split(availWidth, availHeight)
+            if not parts:
+                # Not even the header and one row fit; continue on the next page
+                self._pending = table
+                return [PageBreak(), self]
+            
+            if self._exhausted:
+                return parts
+            return parts + [self]
+        
+        def draw(self):
+            pass
+
+
 class TraceabilityExportService:
     """Service for exporting traceability matrices in multiple formats."""
     
+    # Rows sampled to estimate Excel column widths
+    EXCEL_WIDTH_SAMPLE_ROWS = 1000
+    
+    # Matrix rows per PDF table chunk; only one chunk is held in memory
+    PDF_ROWS_PER_CHUNK = 40
+    
+    GAP_STATUS_LABELS = {"none": "OK", "high": "HIGH", "medium": "MED", "low": "LOW"}
+    GAP_FILL_COLORS = {"high": "FFD6D6", "medium": "FFFFD6", "low": "D6FFD6"}
+    GAP_SEVERITY_FILL_COLORS = {"high": "FF6B6B", "medium": "FFD93D", "low": "6BCF7F"}
+    
     def __init__(self):
         """Initialize the export service."""
         self.logger = logging.getLogger(__name__)
+        self._fills: Dict[str, Any] = {}
         
     def export_csv(
         self, 
@@ -145,7 +228,7 @@ class TraceabilityExportService:
             
     def export_excel(
         self,
-        table_rows: List[TraceabilityTableRow],
+        table_rows: Iterable[TraceabilityTableRow],
         gaps: List[TraceabilityGap],
         filename: str,
         include_formatting: bool = True
@@ -153,8 +236,12 @@ class TraceabilityExportService:
         """
         Export traceability matrix to Excel format with conditional formatting.
         
+        The workbook is written in openpyxl's write-only mode, so rows are
+        streamed to disk as they are produced and memory use does not grow
+        with the size of the matrix.
+        
         Args:
-            table_rows: List of traceability table rows
+            table_rows: Traceability table rows, consumed once
             gaps: List of detected gaps
             filename: Output filename
             include_formatting: Whether to apply conditional formatting
@@ -169,20 +256,15 @@ class TraceabilityExportService:
         try:
             self.logger.info(f"Exporting traceability matrix to Excel: {filename}")
             
-            # Create workbook and worksheets
-            wb = openpyxl.Workbook()
+            # Create write-only workbook; sheets must be filled in order
+            wb = openpyxl.Workbook(write_only=True)
             
             # Main matrix sheet
-            ws_matrix = wb.active
-            ws_matrix.title = "Traceability Matrix"
+            ws_matrix = wb.create_sheet("Traceability Matrix")
+            self._export_excel_matrix(ws_matrix, table_rows, gaps, include_formatting)
             
             # Gap analysis sheet
             ws_gaps = wb.create_sheet("Gap Analysis")
-            
-            # Export main matrix
-            self._export_excel_matrix(ws_matrix, table_rows, gaps, include_formatting)
-            
-            # Export gap analysis
             self._export_excel_gaps(ws_gaps, gaps, include_formatting)
             
             # Save workbook
@@ -198,11 +280,11 @@ class TraceabilityExportService:
     def _export_excel_matrix(
         self,
         worksheet,
-        table_rows: List[TraceabilityTableRow],
+        table_rows: Iterable[TraceabilityTableRow],
         gaps: List[TraceabilityGap],
         include_formatting: bool
     ):
-        """Export matrix data to Excel worksheet."""
+        """Stream matrix data into a write-only Excel worksheet."""
         # Headers
         headers = [
             "Code Reference", "File Path", "Function Name", "Feature ID",
@@ -211,87 +293,77 @@ class TraceabilityExportService:
             "Risk Hazard", "Confidence", "Gap Status"
         ]
         
-        # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=1, column=col, value=header)
-            if include_formatting:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-        
         # Create gap lookup
         gap_lookup = self._create_gap_lookup(gaps)
+        rows = (
+            (row, self._get_row_gap_info(row, gap_lookup)["severity"])
+            for row in table_rows
+        )
+        
+        # Column widths must be set before the first row is written, so
+        # estimate them from a sample of leading rows
+        sample = list(islice(rows, self.EXCEL_WIDTH_SAMPLE_ROWS))
+        if include_formatting:
+            widths = self._estimate_column_widths(
+                headers, (self._excel_matrix_values(row, severity) for row, severity in sample), 50
+            )
+            self._set_column_widths(worksheet, widths)
+        
+        worksheet.append(self._excel_header_cells(worksheet, headers, include_formatting, centered=True))
         
         # Write data rows
-        for row_idx, row in enumerate(table_rows, 2):
-            data = [
-                row.code_reference,
-                row.file_path,
-                row.function_name,
-                row.feature_id,
-                row.feature_description,
-                row.user_requirement_id,
-                row.user_requirement_text,
-                row.software_requirement_id,
-                row.software_requirement_text,
-                row.risk_id,
-                row.risk_hazard,
-                row.confidence,
-                self._get_row_gap_status(row, gap_lookup)
-            ]
+        for row, severity in chain(sample, rows):
+            values = self._excel_matrix_values(row, severity)
+            if not include_formatting:
+                worksheet.append(values)
+                continue
             
-            for col_idx, value in enumerate(data, 1):
-                cell = worksheet.cell(row=row_idx, column=col_idx, value=value)
-                
-                if include_formatting:
-                    # Apply gap highlighting
-                    gap_severity = self._get_row_gap_severity(row, gap_lookup)
-                    if gap_severity:
-                        if gap_severity == "high":
-                            cell.fill = PatternFill(start_color="FFD6D6", end_color="FFD6D6", fill_type="solid")
-                        elif gap_severity == "medium":
-                            cell.fill = PatternFill(start_color="FFFFD6", end_color="FFFFD6", fill_type="solid")
-                        elif gap_severity == "low":
-                            cell.fill = PatternFill(start_color="D6FFD6", end_color="D6FFD6", fill_type="solid")
-                    
-                    # Confidence color coding
-                    if col_idx == 12:  # Confidence column
-                        if row.confidence >= 0.8:
-                            cell.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                        elif row.confidence >= 0.5:
-                            cell.fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-                        else:
-                            cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        
-        # Auto-adjust column widths
-        if include_formatting:
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+            # Apply gap highlighting
+            row_fill = self._solid_fill(self.GAP_FILL_COLORS[severity]) if severity in self.GAP_FILL_COLORS else None
+            
+            # Confidence color coding
+            if row.confidence >= 0.8:
+                confidence_fill = self._solid_fill("C6EFCE")
+            elif row.confidence >= 0.5:
+                confidence_fill = self._solid_fill("FFEB9C")
+            else:
+                confidence_fill = self._solid_fill("FFC7CE")
+            
+            cells = []
+            for col_idx, value in enumerate(values, 1):
+                cell = WriteOnlyCell(worksheet, value=value)
+                if col_idx == 12:  # Confidence column
+                    cell.fill = confidence_fill
+                elif row_fill:
+                    cell.fill = row_fill
+                cells.append(cell)
+            worksheet.append(cells)
+    
+    def _excel_matrix_values(self, row: TraceabilityTableRow, severity: str) -> List[Any]:
+        """Get the cell values of one matrix row."""
+        return [
+            row.code_reference,
+            row.file_path,
+            row.function_name,
+            row.feature_id,
+            row.feature_description,
+            row.user_requirement_id,
+            row.user_requirement_text,
+            row.software_requirement_id,
+            row.software_requirement_text,
+            row.risk_id,
+            row.risk_hazard,
+            row.confidence,
+            self.GAP_STATUS_LABELS.get(severity, "LOW")
+        ]
                 
     def _export_excel_gaps(self, worksheet, gaps: List[TraceabilityGap], include_formatting: bool):
-        """Export gap analysis to Excel worksheet."""
+        """Stream gap analysis into a write-only Excel worksheet."""
         # Headers
         headers = ["Gap Type", "Severity", "Source Type", "Source ID", "Target Type", "Target ID", "Description", "Recommendation"]
         
-        # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = worksheet.cell(row=1, column=col, value=header)
-            if include_formatting:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        
-        # Write gap data
-        for row_idx, gap in enumerate(gaps, 2):
-            data = [
+        rows = (
+            (gap, [
                 gap.gap_type.replace('_', ' ').title(),
                 gap.severity.title(),
                 gap.source_type,
@@ -300,33 +372,65 @@ class TraceabilityExportService:
                 gap.target_id or "",
                 gap.description,
                 gap.recommendation
-            ]
-            
-            for col_idx, value in enumerate(data, 1):
-                cell = worksheet.cell(row=row_idx, column=col_idx, value=value)
-                
-                if include_formatting and col_idx == 2:  # Severity column
-                    if gap.severity == "high":
-                        cell.fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")
-                        cell.font = Font(color="FFFFFF", bold=True)
-                    elif gap.severity == "medium":
-                        cell.fill = PatternFill(start_color="FFD93D", end_color="FFD93D", fill_type="solid")
-                    elif gap.severity == "low":
-                        cell.fill = PatternFill(start_color="6BCF7F", end_color="6BCF7F", fill_type="solid")
-        
-        # Auto-adjust column widths
+            ])
+            for gap in gaps
+        )
+        
+        sample = list(islice(rows, self.EXCEL_WIDTH_SAMPLE_ROWS))
         if include_formatting:
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 60)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+            self._set_column_widths(
+                worksheet, self._estimate_column_widths(headers, (data for _, data in sample), 60)
+            )
+        
+        worksheet.append(self._excel_header_cells(worksheet, headers, include_formatting))
+        
+        # Write gap data
+        for gap, data in chain(sample, rows):
+            if include_formatting and gap.severity in self.GAP_SEVERITY_FILL_COLORS:
+                # Severity column
+                cell = WriteOnlyCell(worksheet, value=data[1])
+                cell.fill = self._solid_fill(self.GAP_SEVERITY_FILL_COLORS[gap.severity])
+                if gap.severity == "high":
+                    cell.font = Font(color="FFFFFF", bold=True)
+                data[1] = cell
+            worksheet.append(data)
+    
+    def _excel_header_cells(self, worksheet, headers: List[str], include_formatting: bool,
+                            centered: bool = False) -> List[Any]:
+        """Create the header row for a write-only worksheet."""
+        if not include_formatting:
+            return list(headers)
+        
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(worksheet, value=header)
+            cell.font = Font(bold=True, color="FFFFFF")
+            cell.fill = self._solid_fill("366092")
+            if centered:
+                cell.alignment = Alignment(horizontal="center", vertical="center")
+            cells.append(cell)
+        return cells
+    
+    def _estimate_column_widths(self, headers: List[str], sample_rows: Iterable[List[Any]],
+                                max_width: int) -> List[int]:
+        """Estimate column widths from the header and a sample of rows."""
+        lengths = [len(str(header)) for header in headers]
+        for values in sample_rows:
+            for col_idx, value in enumerate(values):
+                lengths[col_idx] = max(lengths[col_idx], len(str(value)))
+        return [min(length + 2, max_width) for length in lengths]
+    
+    def _set_column_widths(self, worksheet, widths: List[int]):
+        """Set column widths on a worksheet before any rows are written."""
+        for col_idx, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = width
+    
+    def _solid_fill(self, color: str):
+        """Get a shared solid fill for a color."""
+        fill = self._fills.get(color)
+        if fill is None:
+            fill = self._fills[color] = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        return fill
                 
     def export_pdf(
         self,
@@ -463,19 +567,17 @@ class TraceabilityExportService:
             story.append(Paragraph(finding, styles['Normal']))
             
     def _add_pdf_matrix(self, story, table_rows: List[TraceabilityTableRow], gaps: List[TraceabilityGap], styles):
-        """Add traceability matrix to PDF."""
+        """Add traceability matrix to PDF as a sequence of page-sized tables."""
         story.append(Paragraph("Traceability Matrix", styles['Heading2']))
         story.append(Spacer(1, 12))
         
         # Create gap lookup
         gap_lookup = self._create_gap_lookup(gaps)
         
-        # Prepare table data (limit columns for PDF width)
-        matrix_data = [["Code Ref", "File", "Feature", "User Req", "SW Req", "Risk", "Conf", "Gaps"]]
-        
-        for row in table_rows[:50]:  # Limit rows for PDF
-            gap_status = self._get_row_gap_status(row, gap_lookup)
-            matrix_data.append([
+        # Prepare table data lazily (limit columns for PDF width)
+        header = ["Code Ref", "File", "Feature", "User Req", "SW Req", "Risk", "Conf", "Gaps"]
+        matrix_data = (
+            [
                 row.code_reference[:15] + "..." if len(row.code_reference) > 15 else row.code_reference,
                 os.path.basename(row.file_path),
                 row.feature_id,
@@ -483,27 +585,28 @@ class TraceabilityExportService:
                 row.software_requirement_id,
                 row.risk_id,
                 f"{row.confidence:.2f}",
-                gap_status
+                self._get_row_gap_status(row, gap_lookup)
+            ]
+            for row in table_rows
+        )
+        
+        story.append(_ChunkedTable(
+            header,
+            matrix_data,
+            rows_per_chunk=self.PDF_ROWS_PER_CHUNK,
+            colWidths=[0.8*inch, 0.8*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.4*inch, 0.6*inch],
+            style=TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
             ])
-        
-        if len(table_rows) > 50:
-            matrix_data.append(["...", "...", "...", "...", "...", "...", "...", f"({len(table_rows) - 50} more rows)"])
-        
-        # Create table
-        matrix_table = Table(matrix_data, colWidths=[0.8*inch, 0.8*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.4*inch, 0.6*inch])
-        matrix_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')
-        ]))
-        
-        story.append(matrix_table)
+        ))
         
     def _add_pdf_gaps(self, story, gaps: List[TraceabilityGap], styles):
         """Add gap analysis to PDF."""
@@ -664,14 +767,7 @@ class TraceabilityExportService:
     def _get_row_gap_status(self, row: TraceabilityTableRow, gap_lookup: Dict[str, List[TraceabilityGap]]) -> str:
         """Get concise gap status for a row."""
         gap_info = self._get_row_gap_info(row, gap_lookup)
-        if gap_info["severity"] == "none":
-            return "OK"
-        elif gap_info["severity"] == "high":
-            return "HIGH"
-        elif gap_info["severity"] == "medium":
-            return "MED"
-        else:
-            return "LOW"
+        return self.GAP_STATUS_LABELS.get(gap_info["severity"], "LOW")
             
     def _get_row_gap_severity(self, row: TraceabilityTableRow, gap_lookup: Dict[str, List[TraceabilityGap]]) -> Optional[str]:
         """Get the highest gap severity for a row."""
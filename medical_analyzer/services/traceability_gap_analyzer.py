@@ -7,7 +7,7 @@ relationships in the traceability matrix with severity assessment and recommenda
 
 import logging
 from typing import List, Dict, Any, Optional, Set, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 from ..models.core import (
@@ -63,6 +63,33 @@ class CoverageMetrics:
     completeness_score: float  # Overall completeness percentage
 
 
+@dataclass
+class GapLinkIndex:
+    """Link index built in one pass over the matrix and shared by all gap detectors."""
+    # Linked element sets for orphan detection and coverage
+    linked_code: Set[str] = field(default_factory=set)
+    linked_features: Set[str] = field(default_factory=set)
+    linked_user_requirements: Set[str] = field(default_factory=set)
+    software_requirements_from_ur: Set[str] = field(default_factory=set)
+    software_requirements_to_risk: Set[str] = field(default_factory=set)
+    linked_risks: Set[str] = field(default_factory=set)
+    # Sources of links to requirements, and of links to software requirements
+    requirement_link_sources: Set[str] = field(default_factory=set)
+    software_requirement_link_sources: Set[str] = field(default_factory=set)
+    # target_id -> number of links from requirements
+    requirement_link_counts: Dict[str, int] = field(default_factory=dict)
+    # Chain adjacency
+    feature_to_ur: Dict[str, List[str]] = field(default_factory=dict)
+    ur_to_sr: Dict[str, List[str]] = field(default_factory=dict)  # UR -> SR links only
+    ur_to_requirements: Dict[str, List[str]] = field(default_factory=dict)  # any link from a UR
+    sr_to_risk: Dict[str, List[str]] = field(default_factory=dict)
+    # Per-link findings
+    weak_links: List[TraceabilityLink] = field(default_factory=list)
+    duplicate_links: List[TraceabilityLink] = field(default_factory=list)
+    confidence_total: float = 0.0
+    confidence_count: int = 0
+
+
 class TraceabilityGapAnalyzer:
     """Comprehensive traceability gap analysis service."""
     
@@ -102,35 +129,38 @@ class TraceabilityGapAnalyzer:
         
         gaps = []
         
+        # Index all links once; every detector below reads from the index
+        index = self._build_link_index(matrix)
+        
         # 1. Detect orphaned elements
         orphaned_gaps = self._detect_orphaned_elements(
-            matrix, features, user_requirements, software_requirements, risk_items
+            index, features, user_requirements, software_requirements, risk_items
         )
         gaps.extend(orphaned_gaps)
         
         # 2. Detect missing links
         missing_link_gaps = self._detect_missing_links(
-            matrix, features, user_requirements, software_requirements, risk_items
+            index, features, user_requirements, software_requirements, risk_items
         )
         gaps.extend(missing_link_gaps)
         
         # 3. Detect weak links
-        weak_link_gaps = self._detect_weak_links(matrix)
+        weak_link_gaps = self._detect_weak_links(index)
         gaps.extend(weak_link_gaps)
         
         # 4. Detect broken chains
         broken_chain_gaps = self._detect_broken_chains(
-            matrix, features, user_requirements, software_requirements, risk_items
+            index, features, user_requirements, software_requirements, risk_items
         )
         gaps.extend(broken_chain_gaps)
         
         # 5. Detect duplicate links
-        duplicate_gaps = self._detect_duplicate_links(matrix)
+        duplicate_gaps = self._detect_duplicate_links(index)
         gaps.extend(duplicate_gaps)
         
         # 6. Calculate coverage metrics
         coverage_metrics = self._calculate_coverage_metrics(
-            matrix, features, user_requirements, software_requirements, risk_items
+            index, features, user_requirements, software_requirements, risk_items
         )
         
         # 7. Generate recommendations
@@ -160,7 +190,7 @@ class TraceabilityGapAnalyzer:
         
     def _detect_orphaned_elements(
         self,
-        matrix: TraceabilityMatrix,
+        index: GapLinkIndex,
         features: List[Feature],
         user_requirements: List[Requirement],
         software_requirements: List[Requirement],
@@ -169,17 +199,12 @@ class TraceabilityGapAnalyzer:
         """Detect orphaned elements (elements without proper links)."""
         gaps = []
         
-        # Build sets of linked elements
-        linked_elements = self._build_linked_elements_sets(matrix)
-        
         # 1. Orphaned code references
-        all_code_refs = set()
         for feature in features:
             for evidence in feature.evidence:
                 code_ref_id = f"{evidence.file_path}:{evidence.start_line}-{evidence.end_line}"
-                all_code_refs.add(code_ref_id)
                 
-                if code_ref_id not in linked_elements["code"]:
+                if code_ref_id not in index.linked_code:
                     gaps.append(TraceabilityGap(
                         gap_type=GapType.ORPHANED_CODE.value,
                         source_type="code",
@@ -191,7 +216,7 @@ class TraceabilityGapAnalyzer:
         
         # 2. Orphaned features
         for feature in features:
-            if feature.id not in linked_elements["features"]:
+            if feature.id not in index.linked_features:
                 gaps.append(TraceabilityGap(
                     gap_type=GapType.ORPHANED_FEATURE.value,
                     source_type="feature",
@@ -203,7 +228,7 @@ class TraceabilityGapAnalyzer:
         
         # 3. Orphaned user requirements
         for ur in user_requirements:
-            if ur.type == RequirementType.USER and ur.id not in linked_elements["user_requirements"]:
+            if ur.type == RequirementType.USER and ur.id not in index.linked_user_requirements:
                 gaps.append(TraceabilityGap(
                     gap_type=GapType.ORPHANED_REQUIREMENT.value,
                     source_type="requirement",
@@ -217,9 +242,9 @@ class TraceabilityGapAnalyzer:
         for sr in software_requirements:
             if sr.type == RequirementType.SOFTWARE:
                 # Check if linked to user requirements (backward)
-                has_ur_link = sr.id in linked_elements["software_requirements_from_ur"]
+                has_ur_link = sr.id in index.software_requirements_from_ur
                 # Check if linked to risks (forward)
-                has_risk_link = sr.id in linked_elements["software_requirements_to_risk"]
+                has_risk_link = sr.id in index.software_requirements_to_risk
                 
                 if not has_ur_link:
                     gaps.append(TraceabilityGap(
@@ -243,7 +268,7 @@ class TraceabilityGapAnalyzer:
         
         # 5. Orphaned risks
         for risk in risk_items:
-            if risk.id not in linked_elements["risks"]:
+            if risk.id not in index.linked_risks:
                 gaps.append(TraceabilityGap(
                     gap_type=GapType.ORPHANED_RISK.value,
                     source_type="risk",
@@ -257,7 +282,7 @@ class TraceabilityGapAnalyzer:
         
     def _detect_missing_links(
         self,
-        matrix: TraceabilityMatrix,
+        index: GapLinkIndex,
         features: List[Feature],
         user_requirements: List[Requirement],
         software_requirements: List[Requirement],
@@ -269,10 +294,7 @@ class TraceabilityGapAnalyzer:
         # 1. Features with code but no requirements
         for feature in features:
             has_code = len(feature.evidence) > 0
-            has_ur_link = any(
-                link.source_id == feature.id and link.target_type == "requirement"
-                for link in matrix.links
-            )
+            has_ur_link = feature.id in index.requirement_link_sources
             
             if has_code and not has_ur_link:
                 gaps.append(TraceabilityGap(
@@ -288,12 +310,7 @@ class TraceabilityGapAnalyzer:
         # 2. User requirements without software requirements
         for ur in user_requirements:
             if ur.type == RequirementType.USER:
-                has_sr_link = any(
-                    link.source_id == ur.id and 
-                    link.target_type == "requirement" and
-                    link.metadata.get("target_requirement_type") == "software"
-                    for link in matrix.links
-                )
+                has_sr_link = ur.id in index.software_requirement_link_sources
                 
                 if not has_sr_link:
                     gaps.append(TraceabilityGap(
@@ -309,37 +326,32 @@ class TraceabilityGapAnalyzer:
         # 3. High-risk items without sufficient requirement coverage
         high_risks = [r for r in risk_items if hasattr(r.severity, 'value') and r.severity.value in ['Serious', 'Catastrophic']]
         for risk in high_risks:
-            linked_requirements = [
-                link.source_id for link in matrix.links
-                if link.target_id == risk.id and link.source_type == "requirement"
-            ]
+            linked_requirement_count = index.requirement_link_counts.get(risk.id, 0)
             
-            if len(linked_requirements) < 2:  # High risks should have multiple mitigating requirements
+            if linked_requirement_count < 2:  # High risks should have multiple mitigating requirements
                 gaps.append(TraceabilityGap(
                     gap_type=GapType.MISSING_LINK.value,
                     source_type="risk",
                     source_id=risk.id,
                     target_type="requirement",
-                    description=f"High severity risk '{risk.hazard}' has insufficient requirement coverage ({len(linked_requirements)} requirements)",
+                    description=f"High severity risk '{risk.hazard}' has insufficient requirement coverage ({linked_requirement_count} requirements)",
                     severity=GapSeverity.HIGH.value,
                     recommendation="Add additional software requirements to adequately mitigate this high-severity risk"
                 ))
         
         return gaps
         
-    def _detect_weak_links(self, matrix: TraceabilityMatrix) -> List[TraceabilityGap]:
+    def _detect_weak_links(self, index: GapLinkIndex) -> List[TraceabilityGap]:
         """Detect weak traceability links based on confidence scores."""
         gaps = []
         
-        for link in matrix.links:
+        for link in index.weak_links:
             if link.confidence < self.low_confidence_threshold:
                 severity = GapSeverity.HIGH.value
                 recommendation = "Review and strengthen this link with additional evidence or remove if invalid"
-            elif link.confidence < self.weak_confidence_threshold:
+            else:
                 severity = GapSeverity.MEDIUM.value
                 recommendation = "Review this link and provide additional evidence to increase confidence"
-            else:
-                continue  # Link is strong enough
                 
             gaps.append(TraceabilityGap(
                 gap_type=GapType.WEAK_LINK.value,
@@ -356,7 +368,7 @@ class TraceabilityGapAnalyzer:
         
     def _detect_broken_chains(
         self,
-        matrix: TraceabilityMatrix,
+        index: GapLinkIndex,
         features: List[Feature],
         user_requirements: List[Requirement],
         software_requirements: List[Requirement],
@@ -364,35 +376,9 @@ class TraceabilityGapAnalyzer:
     ) -> List[TraceabilityGap]:
         """Detect broken traceability chains."""
         gaps = []
-        
-        # Build chain mappings
-        code_to_feature = {}
-        feature_to_ur = {}
-        ur_to_sr = {}
-        sr_to_risk = {}
-        
-        for link in matrix.links:
-            if link.source_type == "code" and link.target_type == "feature":
-                if link.source_id not in code_to_feature:
-                    code_to_feature[link.source_id] = []
-                code_to_feature[link.source_id].append(link.target_id)
-                
-            elif link.source_type == "feature" and link.target_type == "requirement":
-                if link.source_id not in feature_to_ur:
-                    feature_to_ur[link.source_id] = []
-                feature_to_ur[link.source_id].append(link.target_id)
-                
-            elif (link.source_type == "requirement" and link.target_type == "requirement" and
-                  link.metadata.get("source_requirement_type") == "user" and
-                  link.metadata.get("target_requirement_type") == "software"):
-                if link.source_id not in ur_to_sr:
-                    ur_to_sr[link.source_id] = []
-                ur_to_sr[link.source_id].append(link.target_id)
-                
-            elif link.source_type == "requirement" and link.target_type == "risk":
-                if link.source_id not in sr_to_risk:
-                    sr_to_risk[link.source_id] = []
-                sr_to_risk[link.source_id].append(link.target_id)
+        feature_to_ur = index.feature_to_ur
+        ur_to_sr = index.ur_to_sr
+        sr_to_risk = index.sr_to_risk
         
         # Check for broken chains starting from features with code
         for feature in features:
@@ -433,65 +419,88 @@ class TraceabilityGapAnalyzer:
         
         return gaps
         
-    def _detect_duplicate_links(self, matrix: TraceabilityMatrix) -> List[TraceabilityGap]:
+    def _detect_duplicate_links(self, index: GapLinkIndex) -> List[TraceabilityGap]:
         """Detect duplicate traceability links."""
         gaps = []
+        
+        for link in index.duplicate_links:
+            gaps.append(TraceabilityGap(
+                gap_type=GapType.DUPLICATE_LINK.value,
+                source_type=link.source_type,
+                source_id=link.source_id,
+                target_type=link.target_type,
+                target_id=link.target_id,
+                description=f"Duplicate link between {link.source_type} '{link.source_id}' and {link.target_type} '{link.target_id}'",
+                severity=GapSeverity.LOW.value,
+                recommendation="Remove duplicate link to clean up traceability matrix"
+            ))
+        
+        return gaps
+        
+    def _build_link_index(self, matrix: TraceabilityMatrix) -> GapLinkIndex:
+        """Build the shared link index in a single pass over the matrix links."""
+        index = GapLinkIndex()
         seen_links = set()
         
         for link in matrix.links:
-            link_signature = (link.source_type, link.source_id, link.target_type, link.target_id)
+            source_type = link.source_type
+            target_type = link.target_type
+            metadata = link.metadata
             
+            # Linked elements for orphan detection
+            if source_type == "code":
+                index.linked_code.add(link.source_id)
+            elif source_type == "feature":
+                index.linked_features.add(link.source_id)
+            elif source_type == "requirement":
+                if metadata.get("source_requirement_type") == "user":
+                    index.linked_user_requirements.add(link.source_id)
+                elif metadata.get("requirement_type") == "software":
+                    index.software_requirements_to_risk.add(link.source_id)
+            
+            if target_type == "feature":
+                index.linked_features.add(link.target_id)
+            elif target_type == "requirement":
+                if metadata.get("target_requirement_type") == "software":
+                    index.software_requirements_from_ur.add(link.target_id)
+                    index.software_requirement_link_sources.add(link.source_id)
+                index.requirement_link_sources.add(link.source_id)
+            elif target_type == "risk":
+                index.linked_risks.add(link.target_id)
+            
+            if source_type == "requirement":
+                index.requirement_link_counts[link.target_id] = index.requirement_link_counts.get(link.target_id, 0) + 1
+            
+            # Chain adjacency
+            if source_type == "feature" and target_type == "requirement":
+                index.feature_to_ur.setdefault(link.source_id, []).append(link.target_id)
+            elif source_type == "requirement" and target_type == "requirement":
+                if metadata.get("source_requirement_type") == "user":
+                    index.ur_to_requirements.setdefault(link.source_id, []).append(link.target_id)
+                    if metadata.get("target_requirement_type") == "software":
+                        index.ur_to_sr.setdefault(link.source_id, []).append(link.target_id)
+            elif source_type == "requirement" and target_type == "risk":
+                index.sr_to_risk.setdefault(link.source_id, []).append(link.target_id)
+            
+            # Weak and duplicate links
+            if link.confidence < self.weak_confidence_threshold:
+                index.weak_links.append(link)
+            
+            link_signature = (source_type, link.source_id, target_type, link.target_id)
             if link_signature in seen_links:
-                gaps.append(TraceabilityGap(
-                    gap_type=GapType.DUPLICATE_LINK.value,
-                    source_type=link.source_type,
-                    source_id=link.source_id,
-                    target_type=link.target_type,
-                    target_id=link.target_id,
-                    description=f"Duplicate link between {link.source_type} '{link.source_id}' and {link.target_type} '{link.target_id}'",
-                    severity=GapSeverity.LOW.value,
-                    recommendation="Remove duplicate link to clean up traceability matrix"
-                ))
+                index.duplicate_links.append(link)
             else:
                 seen_links.add(link_signature)
-        
-        return gaps
-        
-    def _build_linked_elements_sets(self, matrix: TraceabilityMatrix) -> Dict[str, Set[str]]:
-        """Build sets of linked elements for orphan detection."""
-        linked = {
-            "code": set(),
-            "features": set(),
-            "user_requirements": set(),
-            "software_requirements_from_ur": set(),
-            "software_requirements_to_risk": set(),
-            "risks": set()
-        }
-        
-        for link in matrix.links:
-            if link.source_type == "code":
-                linked["code"].add(link.source_id)
-            elif link.source_type == "feature":
-                linked["features"].add(link.source_id)
-            elif link.source_type == "requirement":
-                if link.metadata.get("source_requirement_type") == "user":
-                    linked["user_requirements"].add(link.source_id)
-                elif link.metadata.get("requirement_type") == "software":
-                    linked["software_requirements_to_risk"].add(link.source_id)
             
-            if link.target_type == "feature":
-                linked["features"].add(link.target_id)
-            elif link.target_type == "requirement":
-                if link.metadata.get("target_requirement_type") == "software":
-                    linked["software_requirements_from_ur"].add(link.target_id)
-            elif link.target_type == "risk":
-                linked["risks"].add(link.target_id)
+            if link.confidence > 0:
+                index.confidence_total += link.confidence
+                index.confidence_count += 1
         
-        return linked
+        return index
         
     def _calculate_coverage_metrics(
         self,
-        matrix: TraceabilityMatrix,
+        index: GapLinkIndex,
         features: List[Feature],
         user_requirements: List[Requirement],
         software_requirements: List[Requirement],
@@ -499,29 +508,25 @@ class TraceabilityGapAnalyzer:
     ) -> CoverageMetrics:
         """Calculate comprehensive coverage metrics."""
         
-        # Count elements with links
-        linked_elements = self._build_linked_elements_sets(matrix)
-        
         # Code coverage (features with code evidence that have requirement links)
         features_with_code = [f for f in features if f.evidence]
-        linked_features_with_code = [f for f in features_with_code if f.id in linked_elements["features"]]
+        linked_features_with_code = [f for f in features_with_code if f.id in index.linked_features]
         code_coverage = len(linked_features_with_code) / len(features_with_code) if features_with_code else 0.0
         
         # Feature coverage (features linked to requirements)
-        feature_coverage = len(linked_elements["features"]) / len(features) if features else 0.0
+        feature_coverage = len(index.linked_features) / len(features) if features else 0.0
         
         # Requirement coverage (software requirements linked to risks)
         sr_count = len([r for r in software_requirements if r.type == RequirementType.SOFTWARE])
-        requirement_coverage = len(linked_elements["software_requirements_to_risk"]) / sr_count if sr_count else 0.0
+        requirement_coverage = len(index.software_requirements_to_risk) / sr_count if sr_count else 0.0
         
         # End-to-end coverage (complete chains from code to risk)
-        complete_chains = self._count_complete_chains(matrix, features)
+        complete_chains = self._count_complete_chains(index, features)
         total_possible_chains = len(features_with_code)
         end_to_end_coverage = complete_chains / total_possible_chains if total_possible_chains else 0.0
         
         # Average confidence
-        confidences = [link.confidence for link in matrix.links if link.confidence > 0]
-        confidence_score = sum(confidences) / len(confidences) if confidences else 0.0
+        confidence_score = index.confidence_total / index.confidence_count if index.confidence_count else 0.0
         
         # Overall completeness
         completeness_score = (code_coverage + feature_coverage + requirement_coverage + end_to_end_coverage) / 4.0
@@ -535,47 +540,20 @@ class TraceabilityGapAnalyzer:
             completeness_score=completeness_score
         )
         
-    def _count_complete_chains(self, matrix: TraceabilityMatrix, features: List[Feature]) -> int:
-        """Count the number of complete traceability chains."""
+    def _count_complete_chains(self, index: GapLinkIndex, features: List[Feature]) -> int:
+        """Count the number of features with at least one complete traceability chain."""
         complete_chains = 0
         
-        # Build chain mappings
-        feature_to_ur = {}
-        ur_to_sr = {}
-        sr_to_risk = {}
-        
-        for link in matrix.links:
-            if link.source_type == "feature" and link.target_type == "requirement":
-                if link.source_id not in feature_to_ur:
-                    feature_to_ur[link.source_id] = []
-                feature_to_ur[link.source_id].append(link.target_id)
-                
-            elif (link.source_type == "requirement" and link.target_type == "requirement" and
-                  link.metadata.get("source_requirement_type") == "user"):
-                if link.source_id not in ur_to_sr:
-                    ur_to_sr[link.source_id] = []
-                ur_to_sr[link.source_id].append(link.target_id)
-                
-            elif link.source_type == "requirement" and link.target_type == "risk":
-                if link.source_id not in sr_to_risk:
-                    sr_to_risk[link.source_id] = []
-                sr_to_risk[link.source_id].append(link.target_id)
-        
-        # Count complete chains
         for feature in features:
             if not feature.evidence:  # Only count features with code
                 continue
-                
-            ur_ids = feature_to_ur.get(feature.id, [])
-            for ur_id in ur_ids:
-                sr_ids = ur_to_sr.get(ur_id, [])
-                for sr_id in sr_ids:
-                    risk_ids = sr_to_risk.get(sr_id, [])
-                    if risk_ids:  # Complete chain found
-                        complete_chains += 1
-                        break  # Count each feature only once
-                if risk_ids:
-                    break
+            
+            if any(
+                index.sr_to_risk.get(sr_id)
+                for ur_id in index.feature_to_ur.get(feature.id, [])
+                for sr_id in index.ur_to_requirements.get(ur_id, [])
+            ):
+                complete_chains += 1
         
         return complete_chains
         
@@ -4,21 +4,155 @@ Shared data models for traceability services.
 This module contains data models used across traceability services to avoid circular imports.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+
+class LinkList(list):
+    """List of traceability links that counts its modifications."""
+    
+    version = 0
+    
+    def _modified(self) -> None:
+        self.version += 1
+    
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._modified()
+    
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._modified()
+    
+    def __iadd__(self, links):
+        result = super().__iadd__(links)
+        self._modified()
+        return result
+    
+    def __imul__(self, count):
+        result = super().__imul__(count)
+        self._modified()
+        return result
+    
+    def append(self, link):
+        super().append(link)
+        self._modified()
+    
+    def extend(self, links):
+        super().extend(links)
+        self._modified()
+    
+    def insert(self, index, link):
+        super().insert(index, link)
+        self._modified()
+    
+    def remove(self, link):
+        super().remove(link)
+        self._modified()
+    
+    def pop(self, index=-1):
+        link = super().pop(index)
+        self._modified()
+        return link
+    
+    def clear(self):
+        super().clear()
+        self._modified()
+    
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._modified()
+    
+    def reverse(self):
+        super().reverse()
+        self._modified()
 
 
 @dataclass
 class TraceabilityMatrix:
     """Complete traceability matrix for an analysis run."""
     analysis_run_id: int
-    links: List[Any]  # TraceabilityLink objects
+    links: List[Any]  # TraceabilityLink objects, kept as a LinkList
     code_to_requirements: Dict[str, List[str]]  # code_ref_id -> requirement_ids
     user_to_software_requirements: Dict[str, List[str]]  # ur_id -> sr_ids
     requirements_to_risks: Dict[str, List[str]]  # requirement_id -> risk_ids
     metadata: Dict[str, Any]
     created_at: datetime
+    
+    # Adjacency indexes over links, built on first lookup
+    _links_by_source: Dict[Tuple[str, str], List[Any]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )  # (source_type, source_id) -> links
+    _links_by_target: Dict[Tuple[str, str], List[Any]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )  # (target_type, target_id) -> links
+    _link_type_counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _source_type_counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_state: Optional[Tuple[int, int]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any):
+        # Assigned link lists are copied into a LinkList, so every change to them is counted
+        if name == 'links' and not isinstance(value, LinkList):
+            value = LinkList(value)
+        super().__setattr__(name, value)
+    
+    def rebuild_indexes(self):
+        """
+        Rebuild the adjacency indexes from links.
+        
+        Indexes are rebuilt automatically when links is replaced or modified;
+        call this after editing the link objects themselves.
+        """
+        links_by_source: Dict[Tuple[str, str], List[Any]] = {}
+        links_by_target: Dict[Tuple[str, str], List[Any]] = {}
+        link_type_counts: Dict[str, int] = {}
+        source_type_counts: Dict[str, int] = {}
+        
+        for link in self.links:
+            links_by_source.setdefault((link.source_type, link.source_id), []).append(link)
+            links_by_target.setdefault((link.target_type, link.target_id), []).append(link)
+            link_type_counts[link.link_type] = link_type_counts.get(link.link_type, 0) + 1
+            source_type_counts[link.source_type] = source_type_counts.get(link.source_type, 0) + 1
+        
+        self._links_by_source = links_by_source
+        self._links_by_target = links_by_target
+        self._link_type_counts = link_type_counts
+        self._source_type_counts = source_type_counts
+        self._indexed_state = (id(self.links), self.links.version)
+    
+    def _ensure_indexes(self):
+        """Build the indexes if links changed since they were last built."""
+        if self._indexed_state != (id(self.links), self.links.version):
+            self.rebuild_indexes()
+    
+    def get_outgoing_links(self, source_type: str, source_id: str,
+                           target_type: Optional[str] = None) -> List[Any]:
+        """Get links leaving an artifact, optionally only those to target_type."""
+        self._ensure_indexes()
+        links = self._links_by_source.get((source_type, source_id), [])
+        if target_type is None:
+            return list(links)
+        return [link for link in links if link.target_type == target_type]
+    
+    def get_incoming_links(self, target_type: str, target_id: str,
+                           source_type: Optional[str] = None) -> List[Any]:
+        """Get links entering an artifact, optionally only those from source_type."""
+        self._ensure_indexes()
+        links = self._links_by_target.get((target_type, target_id), [])
+        if source_type is None:
+            return list(links)
+        return [link for link in links if link.source_type == source_type]
+    
+    def get_link_type_counts(self) -> Dict[str, int]:
+        """Get the number of links of each link_type."""
+        self._ensure_indexes()
+        return dict(self._link_type_counts)
+    
+    def get_source_type_counts(self) -> Dict[str, int]:
+        """Get the number of links leaving each source_type."""
+        self._ensure_indexes()
+        return dict(self._source_type_counts)
 
 
 @dataclass
@@ -48,4 +182,28 @@ class TraceabilityTableRow:
     software_requirement_text: str
     risk_id: str
     risk_hazard: str
-    confidence: float
\ No newline at end of file
+    confidence: float
+
+
+@dataclass
+class TraceabilityArtifactIndex:
+    """ID index over the artifacts of one traceability matrix build."""
+    features: Dict[str, Any] = field(default_factory=dict)  # feature_id -> Feature
+    user_requirements: Dict[str, Any] = field(default_factory=dict)  # ur_id -> Requirement
+    software_requirements: Dict[str, Any] = field(default_factory=dict)  # sr_id -> Requirement
+    risks: Dict[str, Any] = field(default_factory=dict)  # risk_id -> RiskItem
+    feature_to_user_requirements: Dict[str, List[str]] = field(default_factory=dict)  # feature_id -> ur_ids
+    user_to_software_requirements: Dict[str, List[str]] = field(default_factory=dict)  # ur_id -> sr_ids
+    
+    @classmethod
+    def build(cls, features: List[Any] = (), user_requirements: List[Any] = (),
+              software_requirements: List[Any] = (), risk_items: List[Any] = ()) -> 'TraceabilityArtifactIndex':
+        """Index artifacts by ID, keeping the first artifact when IDs repeat."""
+        index = cls()
+        for items, lookup in ((features, index.features),
+                              (user_requirements, index.user_requirements),
+                              (software_requirements, index.software_requirements),
+                              (risk_items, index.risks)):
+            for item in items:
+                lookup.setdefault(item.id, item)
+        return index
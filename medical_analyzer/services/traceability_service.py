@@ -18,7 +18,9 @@ from ..models.core import (
     RequirementType
 )
 from ..database.schema import DatabaseManager
-from .traceability_models import TraceabilityMatrix, TraceabilityGap, TraceabilityTableRow
+from .traceability_models import (
+    TraceabilityMatrix, TraceabilityGap, TraceabilityTableRow, TraceabilityArtifactIndex
+)
 
 
 logger = logging.getLogger(__name__)
@@ -79,6 +81,11 @@ class TraceabilityService:
         user_to_software_requirements = {}
         requirements_to_risks = {}
         
+        # Index artifacts by ID once; every link builder resolves IDs through it
+        index = TraceabilityArtifactIndex.build(
+            features, user_requirements, software_requirements, risk_items
+        )
+        
         # 1. Create code-to-feature links
         code_feature_links = self._create_code_to_feature_links(
             analysis_run_id, features
@@ -87,43 +94,35 @@ class TraceabilityService:
         
         # 2. Create feature-to-user-requirement links
         feature_ur_links = self._create_feature_to_user_requirement_links(
-            analysis_run_id, features, user_requirements
+            analysis_run_id, features, user_requirements, index
         )
         links.extend(feature_ur_links)
         
         # 3. Create user-requirement-to-software-requirement links
         ur_sr_links = self._create_user_to_software_requirement_links(
-            analysis_run_id, user_requirements, software_requirements
+            analysis_run_id, user_requirements, software_requirements, index
         )
         links.extend(ur_sr_links)
         user_to_software_requirements = self._build_ur_to_sr_mapping(ur_sr_links)
         
         # 4. Create software-requirement-to-risk links
         sr_risk_links = self._create_software_requirement_to_risk_links(
-            analysis_run_id, software_requirements, risk_items
+            analysis_run_id, software_requirements, risk_items, index
         )
         links.extend(sr_risk_links)
         requirements_to_risks = self._build_requirement_to_risk_mapping(sr_risk_links)
         
         # 5. Create transitive code-to-software-requirement links
         code_sr_links = self._create_transitive_code_to_requirement_links(
-            analysis_run_id, features, software_requirements, feature_ur_links, ur_sr_links
+            analysis_run_id, features, software_requirements, feature_ur_links, ur_sr_links, index
         )
         links.extend(code_sr_links)
         code_to_requirements = self._build_code_to_requirement_mapping(code_sr_links)
         
-        # Store all links in database
-        for link in links:
-            self.db_manager.create_traceability_link(
-                analysis_run_id=link.source_id if link.source_type == "analysis_run" else analysis_run_id,
-                source_type=link.source_type,
-                source_id=link.source_id,
-                target_type=link.target_type,
-                target_id=link.target_id,
-                link_type=link.link_type,
-                confidence=link.confidence,
-                metadata=link.metadata
-            )
+        # Store all links in database in a single transaction
+        self.db_manager.create_traceability_links(
+            self._link_record(analysis_run_id, link) for link in links
+        )
         
         matrix = TraceabilityMatrix(
             analysis_run_id=analysis_run_id,
@@ -145,6 +144,177 @@ class TraceabilityService:
         self.logger.info(f"Created traceability matrix with {len(links)} total links")
         return matrix
     
+    def apply_requirement_changes(
+        self,
+        matrix: TraceabilityMatrix,
+        changes: List[Any],
+        features: List[Feature],
+        user_requirements: List[Requirement],
+        software_requirements: List[Requirement],
+        risk_items: List[RiskItem],
+        persist: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Update a traceability matrix in place for edited requirements.
+        
+        Only links that start at, end at or pass through a changed
+        requirement are dropped and rebuilt; all other links are kept as
+        they are. With persist, the stored links of the changed requirements
+        are replaced in a single transaction.
+        
+        Args:
+            matrix: Matrix built from the previous requirements
+            changes: RequirementChange objects from the requirements integration service
+            features: List of extracted features
+            user_requirements: Updated list of user requirements
+            software_requirements: Updated list of software requirements
+            risk_items: List of identified risks
+            persist: Write the delta to the database
+            
+        Returns:
+            Dictionary with the affected requirement IDs and the number of
+            links removed and added
+        """
+        affected = {
+            change.requirement_id for change in changes
+            if getattr(change.change_type, 'value', change.change_type) != "unchanged"
+        }
+        if not affected:
+            return {"affected_requirements": [], "removed_links": 0, "added_links": 0}
+        
+        self.logger.info(f"Applying {len(affected)} requirement changes to traceability matrix "
+                         f"for analysis run {matrix.analysis_run_id}")
+        analysis_run_id = matrix.analysis_run_id
+        
+        # 1. Drop links touching a changed requirement, including transitive code links through one
+        kept_links = []
+        removed_links = []
+        for link in matrix.links:
+            if ((link.source_type == "requirement" and link.source_id in affected) or
+                    (link.target_type == "requirement" and link.target_id in affected) or
+                    link.metadata.get("via_user_requirement") in affected):
+                removed_links.append(link)
+            else:
+                kept_links.append(link)
+        
+        # 2. Rebuild the direct links of the changed requirements
+        index = TraceabilityArtifactIndex.build(
+            features, user_requirements, software_requirements, risk_items
+        )
+        changed_urs = [ur for ur in user_requirements if ur.id in affected]
+        changed_srs = [sr for sr in software_requirements if sr.id in affected]
+        
+        feature_ur_links = self._create_feature_to_user_requirement_links(
+            analysis_run_id, features, changed_urs, index
+        )
+        ur_sr_links = self._create_user_to_software_requirement_links(
+            analysis_run_id, user_requirements, changed_srs, index
+        )
+        # Unchanged SRs may derive from a changed UR; only those UR ends need new links
+        dependent_srs = [
+            sr for sr in software_requirements
+            if sr.id not in affected and not affected.isdisjoint(sr.derived_from)
+        ]
+        ur_sr_links.extend(self._create_user_to_software_requirement_links(
+            analysis_run_id, changed_urs, dependent_srs,
+            TraceabilityArtifactIndex.build(user_requirements=changed_urs)
+        ))
+        sr_risk_links = self._create_software_requirement_to_risk_links(
+            analysis_run_id, changed_srs, risk_items,
+            TraceabilityArtifactIndex.build(software_requirements=changed_srs)
+        )
+        
+        matrix.links = kept_links + feature_ur_links + ur_sr_links + sr_risk_links
+        
+        # 3. Rebuild transitive code links for chains through a changed requirement
+        feature_to_ur = {}
+        ur_to_sr = {}
+        for feature in features:
+            for ur_link in matrix.get_outgoing_links("feature", feature.id, target_type="requirement"):
+                sr_ids = [
+                    link.target_id
+                    for link in matrix.get_outgoing_links("requirement", ur_link.target_id, target_type="requirement")
+                    if ur_link.target_id in affected or link.target_id in affected
+                ]
+                if sr_ids:
+                    feature_to_ur.setdefault(feature.id, []).append(ur_link.target_id)
+                    ur_to_sr[ur_link.target_id] = sr_ids
+        
+        code_sr_links = self._create_transitive_code_to_requirement_links(
+            analysis_run_id, [f for f in features if f.id in feature_to_ur], software_requirements, [], [],
+            TraceabilityArtifactIndex(feature_to_user_requirements=feature_to_ur, user_to_software_requirements=ur_to_sr)
+        )
+        
+        added_links = feature_ur_links + ur_sr_links + sr_risk_links + code_sr_links
+        self._assign_link_ids(kept_links + removed_links, added_links)
+        matrix.links.extend(code_sr_links)
+        matrix.rebuild_indexes()
+        
+        matrix.code_to_requirements = self._build_code_to_requirement_mapping(matrix.links)
+        matrix.user_to_software_requirements = self._build_ur_to_sr_mapping(matrix.links)
+        matrix.requirements_to_risks = self._build_requirement_to_risk_mapping(matrix.links)
+        
+        # Keep the per-kind link counts of create_traceability_matrix in step
+        for links, delta in ((removed_links, -1), (added_links, 1)):
+            for link in links:
+                key = f"{self._link_kind(link)}_links"
+                if key in matrix.metadata:
+                    matrix.metadata[key] += delta
+        matrix.metadata["total_links"] = len(matrix.links)
+        
+        if persist:
+            self.db_manager.replace_traceability_links(
+                analysis_run_id, "requirement", affected,
+                [self._link_record(analysis_run_id, link) for link in added_links]
+            )
+        
+        if analysis_run_id in self._matrix_cache:
+            self._cache_matrix(analysis_run_id, matrix)
+        
+        self.logger.info(f"Replaced {len(removed_links)} links with {len(added_links)} links "
+                         f"for {len(affected)} changed requirements")
+        return {
+            "affected_requirements": sorted(affected),
+            "removed_links": len(removed_links),
+            "added_links": len(added_links)
+        }
+    
+    def _assign_link_ids(self, existing_links: List[TraceabilityLink], new_links: List[TraceabilityLink]):
+        """Renumber new links so their IDs continue the numbering of existing links of the same kind."""
+        next_numbers: Dict[str, int] = {}
+        for link in existing_links:
+            prefix, _, number = link.id.rpartition("_")
+            if prefix and number.isdigit():
+                next_numbers[prefix] = max(next_numbers.get(prefix, 0), int(number) + 1)
+        
+        for link in new_links:
+            prefix = link.id.rpartition("_")[0]
+            link.id = f"{prefix}_{next_numbers.get(prefix, 0)}"
+            next_numbers[prefix] = next_numbers.get(prefix, 0) + 1
+    
+    def _link_kind(self, link: TraceabilityLink) -> str:
+        """Get the builder kind of a link, e.g. 'feature_ur', from its endpoints."""
+        if link.source_type == "code":
+            return "code_feature" if link.target_type == "feature" else "code_sr"
+        if link.source_type == "feature":
+            return "feature_ur"
+        if link.target_type == "risk":
+            return "sr_risk"
+        return "ur_sr"
+    
+    def _link_record(self, analysis_run_id: int, link: TraceabilityLink) -> Dict[str, Any]:
+        """Convert a link to the dict stored by the database manager."""
+        return {
+            "analysis_run_id": link.source_id if link.source_type == "analysis_run" else analysis_run_id,
+            "source_type": link.source_type,
+            "source_id": link.source_id,
+            "target_type": link.target_type,
+            "target_id": link.target_id,
+            "link_type": link.link_type,
+            "confidence": link.confidence,
+            "metadata": link.metadata
+        }
+    
     def _create_code_to_feature_links(
         self, 
         analysis_run_id: int, 
@@ -182,17 +352,20 @@ class TraceabilityService:
         self,
         analysis_run_id: int,
         features: List[Feature],
-        user_requirements: List[Requirement]
+        user_requirements: List[Requirement],
+        index: Optional[TraceabilityArtifactIndex] = None
     ) -> List[TraceabilityLink]:
         """Create traceability links from features to user requirements."""
         links = []
+        if index is None:
+            index = TraceabilityArtifactIndex.build(features=features)
         
         # Create mapping of features to user requirements based on derived_from
         for ur in user_requirements:
             if ur.type == RequirementType.USER:
                 for derived_feature_id in ur.derived_from:
                     # Find the feature
-                    feature = next((f for f in features if f.id == derived_feature_id), None)
+                    feature = index.features.get(derived_feature_id)
                     if feature:
                         link_id = f"feature_ur_{len(links)}"
                         
@@ -211,6 +384,7 @@ class TraceabilityService:
                             }
                         )
                         links.append(link)
+                        index.feature_to_user_requirements.setdefault(feature.id, []).append(ur.id)
         
         return links
     
@@ -218,16 +392,19 @@ class TraceabilityService:
         self,
         analysis_run_id: int,
         user_requirements: List[Requirement],
-        software_requirements: List[Requirement]
+        software_requirements: List[Requirement],
+        index: Optional[TraceabilityArtifactIndex] = None
     ) -> List[TraceabilityLink]:
         """Create traceability links from user requirements to software requirements."""
         links = []
+        if index is None:
+            index = TraceabilityArtifactIndex.build(user_requirements=user_requirements)
         
         for sr in software_requirements:
             if sr.type == RequirementType.SOFTWARE:
                 for derived_ur_id in sr.derived_from:
                     # Find the user requirement
-                    ur = next((r for r in user_requirements if r.id == derived_ur_id), None)
+                    ur = index.user_requirements.get(derived_ur_id)
                     if ur and ur.type == RequirementType.USER:
                         link_id = f"ur_sr_{len(links)}"
                         
@@ -247,6 +424,7 @@ class TraceabilityService:
                             }
                         )
                         links.append(link)
+                        index.user_to_software_requirements.setdefault(ur.id, []).append(sr.id)
         
         return links
     
@@ -254,15 +432,18 @@ class TraceabilityService:
         self,
         analysis_run_id: int,
         software_requirements: List[Requirement],
-        risk_items: List[RiskItem]
+        risk_items: List[RiskItem],
+        index: Optional[TraceabilityArtifactIndex] = None
     ) -> List[TraceabilityLink]:
         """Create traceability links from software requirements to risks."""
         links = []
+        if index is None:
+            index = TraceabilityArtifactIndex.build(software_requirements=software_requirements)
         
         for risk in risk_items:
             for related_req_id in risk.related_requirements:
                 # Find the software requirement
-                sr = next((r for r in software_requirements if r.id == related_req_id), None)
+                sr = index.software_requirements.get(related_req_id)
                 if sr and sr.type == RequirementType.SOFTWARE:
                     link_id = f"sr_risk_{len(links)}"
                     
@@ -292,26 +473,25 @@ class TraceabilityService:
         features: List[Feature],
         software_requirements: List[Requirement],
         feature_ur_links: List[TraceabilityLink],
-        ur_sr_links: List[TraceabilityLink]
+        ur_sr_links: List[TraceabilityLink],
+        index: Optional[TraceabilityArtifactIndex] = None
     ) -> List[TraceabilityLink]:
         """Create transitive traceability links from code to software requirements."""
         links = []
         
-        # Build mapping from features to user requirements
-        feature_to_ur = {}
-        for link in feature_ur_links:
-            if link.source_type == "feature" and link.target_type == "requirement":
-                if link.source_id not in feature_to_ur:
-                    feature_to_ur[link.source_id] = []
-                feature_to_ur[link.source_id].append(link.target_id)
-        
-        # Build mapping from user requirements to software requirements
-        ur_to_sr = {}
-        for link in ur_sr_links:
-            if link.source_type == "requirement" and link.target_type == "requirement":
-                if link.source_id not in ur_to_sr:
-                    ur_to_sr[link.source_id] = []
-                ur_to_sr[link.source_id].append(link.target_id)
+        if index is not None:
+            # Adjacency recorded by the link builders during this matrix build
+            feature_to_ur = index.feature_to_user_requirements
+            ur_to_sr = index.user_to_software_requirements
+        else:
+            # Build mapping from features to user requirements
+            feature_to_ur = {}
+            for link in feature_ur_links:
+                if link.source_type == "feature" and link.target_type == "requirement":
+                    feature_to_ur.setdefault(link.source_id, []).append(link.target_id)
+            
+            # Build mapping from user requirements to software requirements
+            ur_to_sr = self._build_ur_to_sr_mapping(ur_sr_links)
         
         # Create transitive links from code to software requirements
         for feature in features:
@@ -466,28 +646,19 @@ class TraceabilityService:
         """
         issues = []
         
-        # Check for orphaned links
-        source_ids = set()
-        target_ids = set()
-        
-        for link in matrix.links:
-            source_ids.add(f"{link.source_type}:{link.source_id}")
-            target_ids.add(f"{link.target_type}:{link.target_id}")
-        
         # Check for broken chains
-        feature_links = [l for l in matrix.links if l.source_type == "feature"]
-        requirement_links = [l for l in matrix.links if l.source_type == "requirement"]
+        source_type_counts = matrix.get_source_type_counts()
         
-        if not feature_links:
+        if not source_type_counts.get("feature"):
             issues.append("No feature-to-requirement traceability links found")
         
-        if not requirement_links:
+        if not source_type_counts.get("requirement"):
             issues.append("No requirement-to-requirement or requirement-to-risk links found")
         
         # Check confidence levels
-        low_confidence_links = [l for l in matrix.links if l.confidence < 0.5]
-        if low_confidence_links:
-            issues.append(f"Found {len(low_confidence_links)} links with low confidence (<0.5)")
+        low_confidence_count = sum(1 for link in matrix.links if link.confidence < 0.5)
+        if low_confidence_count:
+            issues.append(f"Found {low_confidence_count} links with low confidence (<0.5)")
         
         return issues
     
@@ -520,44 +691,18 @@ class TraceabilityService:
         sr_lookup = {r.id: r for r in software_requirements if r.type == RequirementType.SOFTWARE}
         risk_lookup = {r.id: r for r in risk_items}
         
-        # Build reverse mappings for easier traversal
-        feature_to_code = {}
-        for link in matrix.links:
-            if link.source_type == "code" and link.target_type == "feature":
-                if link.target_id not in feature_to_code:
-                    feature_to_code[link.target_id] = []
-                feature_to_code[link.target_id].append(link)
-        
-        ur_to_features = {}
-        for link in matrix.links:
-            if link.source_type == "feature" and link.target_type == "requirement":
-                if link.target_id not in ur_to_features:
-                    ur_to_features[link.target_id] = []
-                ur_to_features[link.target_id].append(link)
-        
-        sr_to_ur = {}
-        for link in matrix.links:
-            if (link.source_type == "requirement" and link.target_type == "requirement" and
-                link.metadata.get("source_requirement_type") == "user" and
-                link.metadata.get("target_requirement_type") == "software"):
-                if link.target_id not in sr_to_ur:
-                    sr_to_ur[link.target_id] = []
-                sr_to_ur[link.target_id].append(link)
-        
-        risk_to_sr = {}
-        for link in matrix.links:
-            if link.source_type == "requirement" and link.target_type == "risk":
-                if link.target_id not in risk_to_sr:
-                    risk_to_sr[link.target_id] = []
-                risk_to_sr[link.target_id].append(link)
-        
         rows = []
         
-        # Start from code references and trace forward
+        # Walk the link graph feature -> code, feature -> UR -> SR -> risk
         processed_combinations = set()
         
         for feature in features:
-            code_links = feature_to_code.get(feature.id, [])
+            code_links = matrix.get_incoming_links("feature", feature.id, source_type="code")
+            if not code_links:
+                continue
+            
+            # Find user requirements linked to this feature
+            ur_links = matrix.get_outgoing_links("feature", feature.id, target_type="requirement")
             
             for code_link in code_links:
                 # Get code reference details from metadata
@@ -565,8 +710,6 @@ class TraceabilityService:
                 function_name = code_link.metadata.get("function_name", "")
                 code_ref = code_link.source_id
                 
-                # Find user requirements linked to this feature
-                ur_links = ur_to_features.get(feature.id, [])
                 if not ur_links:
                     # Create row with no UR/SR/Risk
                     row = TraceabilityTableRow(
@@ -592,10 +735,7 @@ class TraceabilityService:
                         continue
                     
                     # Find software requirements linked to this UR
-                    sr_links = [link for link in matrix.links 
-                              if (link.source_type == "requirement" and 
-                                  link.target_type == "requirement" and
-                                  link.source_id == ur.id)]
+                    sr_links = matrix.get_outgoing_links("requirement", ur.id, target_type="requirement")
                     
                     if not sr_links:
                         # Create row with UR but no SR/Risk
@@ -622,10 +762,7 @@ class TraceabilityService:
                             continue
                         
                         # Find risks linked to this SR
-                        risk_links = [link for link in matrix.links
-                                    if (link.source_type == "requirement" and
-                                        link.target_type == "risk" and
-                                        link.source_id == sr.id)]
+                        risk_links = matrix.get_outgoing_links("requirement", sr.id, target_type="risk")
                         
                         if not risk_links:
                             # Create row with UR/SR but no Risk
@@ -652,7 +789,7 @@ class TraceabilityService:
                                 continue
                             
                             # Create complete row
-                            combination_key = f"{code_ref}|{feature.id}|{ur.id}|{sr.id}|{risk.id}"
+                            combination_key = (code_ref, feature.id, ur.id, sr.id, risk.id)
                             if combination_key not in processed_combinations:
                                 row = TraceabilityTableRow(
                                     code_reference=code_ref,
@@ -793,42 +930,12 @@ class TraceabilityService:
         self.logger.info("Detecting traceability gaps")
         gaps = []
         
-        # Create sets of linked entities
-        linked_features = set()
-        linked_user_requirements = set()
-        linked_software_requirements = set()
-        linked_risks = set()
-        linked_code_refs = set()
-        
-        for link in matrix.links:
-            if link.source_type == "code":
-                linked_code_refs.add(link.source_id)
-            elif link.source_type == "feature":
-                linked_features.add(link.source_id)
-            elif link.source_type == "requirement":
-                if link.metadata.get("source_requirement_type") == "user":
-                    linked_user_requirements.add(link.source_id)
-                elif link.metadata.get("requirement_type") == "software":
-                    linked_software_requirements.add(link.source_id)
-            
-            if link.target_type == "feature":
-                linked_features.add(link.target_id)
-            elif link.target_type == "requirement":
-                if link.metadata.get("target_requirement_type") == "software":
-                    linked_software_requirements.add(link.target_id)
-                elif link.metadata.get("requirement_type") == "user":
-                    linked_user_requirements.add(link.target_id)
-            elif link.target_type == "risk":
-                linked_risks.add(link.target_id)
-        
         # 1. Check for orphaned features (no code evidence)
-        all_code_refs = set()
         for feature in features:
             for evidence in feature.evidence:
                 code_ref_id = self._generate_code_reference_id(evidence)
-                all_code_refs.add(code_ref_id)
                 
-                if code_ref_id not in linked_code_refs:
+                if not matrix.get_outgoing_links("code", code_ref_id):
                     gaps.append(TraceabilityGap(
                         gap_type="orphaned_code",
                         source_type="code",
@@ -840,7 +947,8 @@ class TraceabilityService:
         
         # 2. Check for features without user requirements
         for feature in features:
-            if feature.id not in linked_features:
+            if not (matrix.get_outgoing_links("feature", feature.id) or
+                    matrix.get_incoming_links("feature", feature.id)):
                 gaps.append(TraceabilityGap(
                     gap_type="orphaned_feature",
                     source_type="feature",
@@ -852,7 +960,7 @@ class TraceabilityService:
         
         # 3. Check for user requirements without software requirements
         for ur in user_requirements:
-            if ur.type == RequirementType.USER and ur.id not in linked_user_requirements:
+            if ur.type == RequirementType.USER and not self._is_linked_requirement(matrix, ur.id, "user"):
                 gaps.append(TraceabilityGap(
                     gap_type="orphaned_requirement",
                     source_type="requirement",
@@ -864,7 +972,7 @@ class TraceabilityService:
         
         # 4. Check for software requirements without risks
         for sr in software_requirements:
-            if sr.type == RequirementType.SOFTWARE and sr.id not in linked_software_requirements:
+            if sr.type == RequirementType.SOFTWARE and not self._is_linked_requirement(matrix, sr.id, "software"):
                 gaps.append(TraceabilityGap(
                     gap_type="orphaned_requirement",
                     source_type="requirement",
@@ -876,7 +984,7 @@ class TraceabilityService:
         
         # 5. Check for risks without requirements
         for risk in risk_items:
-            if risk.id not in linked_risks:
+            if not matrix.get_incoming_links("risk", risk.id):
                 gaps.append(TraceabilityGap(
                     gap_type="orphaned_risk",
                     source_type="risk",
@@ -905,8 +1013,7 @@ class TraceabilityService:
         # Find features with code but no direct software requirement links
         for feature in features:
             has_code = len(feature.evidence) > 0
-            has_ur_link = any(link.source_id == feature.id and link.target_type == "requirement" 
-                            for link in matrix.links)
+            has_ur_link = bool(matrix.get_outgoing_links("feature", feature.id, target_type="requirement"))
             
             if has_code and not has_ur_link:
                 gaps.append(TraceabilityGap(
@@ -922,6 +1029,30 @@ class TraceabilityService:
         self.logger.info(f"Detected {len(gaps)} traceability gaps")
         return gaps
     
+    def _is_linked_requirement(self, matrix: TraceabilityMatrix, requirement_id: str,
+                               requirement_type: str) -> bool:
+        """
+        Check whether a requirement has a link recorded as user or software.
+        
+        Link metadata tags the requirement end of each link with its type, so
+        only links carrying the matching tag count.
+        """
+        for link in matrix.get_outgoing_links("requirement", requirement_id):
+            if link.metadata.get("source_requirement_type") == "user":
+                if requirement_type == "user":
+                    return True
+            elif link.metadata.get("requirement_type") == requirement_type == "software":
+                return True
+        
+        for link in matrix.get_incoming_links("requirement", requirement_id):
+            if link.metadata.get("target_requirement_type") == "software":
+                if requirement_type == "software":
+                    return True
+            elif link.metadata.get("requirement_type") == requirement_type == "user":
+                return True
+        
+        return False
+    
     def generate_gap_report(self, gaps: List[TraceabilityGap]) -> str:
         """
         Generate a human-readable gap analysis report.
@@ -1063,28 +1194,35 @@ class TraceabilityService:
         total_links = len(matrix.links)
         
         # Link type distribution
-        link_types = {}
-        confidence_scores = []
+        link_types = matrix.get_link_type_counts()
+        
+        # Confidence distribution in a single pass
+        confidence_total = 0.0
+        confidence_count = 0
+        distribution = {"high": 0, "medium": 0, "low": 0}
         
         for link in matrix.links:
-            link_types[link.link_type] = link_types.get(link.link_type, 0) + 1
-            if link.confidence > 0:
-                confidence_scores.append(link.confidence)
+            confidence = link.confidence
+            if confidence > 0:
+                confidence_total += confidence
+                confidence_count += 1
+                if confidence >= 0.8:
+                    distribution["high"] += 1
+                elif confidence >= 0.5:
+                    distribution["medium"] += 1
+                else:
+                    distribution["low"] += 1
         
         # Calculate metrics
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0.0
-        low_confidence_count = sum(1 for c in confidence_scores if c < 0.5)
+        avg_confidence = confidence_total / confidence_count if confidence_count else 0.0
+        low_confidence_count = distribution["low"]
         
         validation_results["metrics"] = {
             "total_links": total_links,
             "link_types": link_types,
             "average_confidence": avg_confidence,
             "low_confidence_links": low_confidence_count,
-            "confidence_distribution": {
-                "high": sum(1 for c in confidence_scores if c >= 0.8),
-                "medium": sum(1 for c in confidence_scores if 0.5 <= c < 0.8),
-                "low": sum(1 for c in confidence_scores if c < 0.5)
-            }
+            "confidence_distribution": distribution
         }
         
         # Validation checks
@@ -24,6 +24,7 @@ from ..services.export_service import ExportService
 from ..services.test_case_generator import CaseGenerator
 from ..services.traceability_service import TraceabilityService
 from ..llm.backend import LLMBackend
+from ..utils.result_serialization import LazyResults
 
 
 class MainWindow(QMainWindow):
@@ -353,10 +354,15 @@ class MainWindow(QMainWindow):
             "risk_analysis": AnalysisStage.RISK_ANALYSIS,
             "traceability_mapping": AnalysisStage.TRACEABILITY_MAPPING,
             "test_generation": AnalysisStage.TEST_GENERATION,
-            "finalization": AnalysisStage.FINALIZATION
+            "finalization": AnalysisStage.FINALIZATION,
+            # Stage names reported by the analysis orchestrator
+            "project_ingestion": AnalysisStage.FILE_SCANNING,
+            "hazard_identification": AnalysisStage.RISK_ANALYSIS,
+            "traceability_analysis": AnalysisStage.TRACEABILITY_MAPPING,
+            "results_compilation": AnalysisStage.FINALIZATION
         }
         
-        stage = stage_mapping.get(stage_name.lower())
+        stage = stage_mapping.get(stage_name.lower().replace(' ', '_'))
         if stage:
             # Map status string to StageStatus enum
             status_mapping = {
@@ -750,8 +756,10 @@ class MainWindow(QMainWindow):
                 req_data.get('software_requirements', [])
             )
         
-        # Update traceability matrix widget
-        if self.traceability_matrix_widget and 'traceability' in results:
+        # Update traceability matrix widget; stored results only hold plain matrix data,
+        # so their traceability section is left on disk until the results tab needs it
+        if (self.traceability_matrix_widget and 'traceability' in results
+                and not isinstance(results, LazyResults)):
             traceability_data = results['traceability']
             if hasattr(traceability_data, 'matrix_data'):
                 self.traceability_matrix_widget.update_matrix(
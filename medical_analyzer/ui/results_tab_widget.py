@@ -20,6 +20,7 @@ import io
 from datetime import datetime
 
 from ..services.soup_service import SOUPService
+from ..utils.result_serialization import LazyResults
 from .soup_widget import SOUPWidget
 from .requirements_tab_widget import RequirementsTabWidget
 import csv
@@ -1543,6 +1544,7 @@ class ResultsTabWidget(QTabWidget):
         super().__init__()
         self.analysis_results = {}
         self.soup_service = soup_service
+        self._pending_tabs = set()
         self.setup_tabs()
         self.setup_connections()
         
@@ -1636,42 +1638,78 @@ class ResultsTabWidget(QTabWidget):
             self.soup_tab.component_updated.connect(self.on_soup_component_updated)
             self.soup_tab.component_deleted.connect(self.on_soup_component_deleted)
         
+        # Fill tabs deferred by update_results when they are first shown
+        self.currentChanged.connect(self._on_current_tab_changed)
+        
     def update_results(self, results: Dict[str, Any]):
-        """Update all tabs with analysis results."""
+        """
+        Update all tabs with analysis results.
+        
+        Results loaded from a stored run read their sections on demand, so
+        only the visible tab is filled immediately; the other tabs are filled
+        when they are first shown.
+        """
         self.analysis_results = results
         
         # Enable the widget
         self.setEnabled(True)
         
+        tabs = [self.summary_tab, self.requirements_tab, self.risk_tab,
+                self.traceability_tab, self.test_tab]
+        self._pending_tabs = set()
+        
+        if isinstance(results, LazyResults):
+            current = self.currentWidget()
+            self._pending_tabs = {tab for tab in tabs if tab is not current}
+            tabs = [tab for tab in tabs if tab is current]
+        
         # Update each tab
-        if 'summary' in results:
-            # Pass analysis stages data to summary tab for detailed logging
-            if 'analysis_stages' in results:
+        for tab in tabs:
+            self._populate_tab(tab)
+            
+        # SOUP tab doesn't need updates from analysis results
+        # as it's managed independently by the user
+        
+    def _populate_tab(self, tab: QWidget):
+        """Update a single tab from its section of the analysis results."""
+        results = self.analysis_results
+        
+        if tab is self.summary_tab and 'summary' in results:
+            # Pass analysis stages data to summary tab for detailed logging; stored
+            # results keep a per-stage overview so the full stage data stays on disk
+            if isinstance(results, LazyResults) and not results.is_loaded('analysis_stages'):
+                self.summary_tab._analysis_stages = results.stage_overview
+            elif 'analysis_stages' in results:
                 self.summary_tab._analysis_stages = results['analysis_stages']
             self.summary_tab.update_summary(results['summary'])
             
-        if 'requirements' in results:
+        elif tab is self.requirements_tab and 'requirements' in results:
             req_data = results['requirements']
             self.requirements_tab.update_requirements(
                 req_data.get('user_requirements', []),
                 req_data.get('software_requirements', [])
             )
             
-        if 'risks' in results:
+        elif tab is self.risk_tab and 'risks' in results:
             self.risk_tab.update_risks(results['risks'])
             
-        if 'traceability' in results:
+        elif tab is self.traceability_tab and 'traceability' in results:
             self.traceability_tab.update_traceability(results['traceability'])
             
-        if 'tests' in results:
+        elif tab is self.test_tab and 'tests' in results:
             self.test_tab.update_test_results(results['tests'])
             
-        # SOUP tab doesn't need updates from analysis results
-        # as it's managed independently by the user
+    def _on_current_tab_changed(self, index: int):
+        """Fill a tab deferred by update_results when it is shown."""
+        tab = self.widget(index)
+        if tab in self._pending_tabs:
+            self._pending_tabs.discard(tab)
+            self._populate_tab(tab)
             
     def clear_results(self):
         """Clear all results and disable the widget."""
         self.analysis_results = {}
+        self._pending_tabs = set()
         self.setEnabled(False)
         
         # Clear individual tabs
@@ -838,16 +838,12 @@ class SOUPWidget(QWidget):
             if not selected_components:
                 return
             
-            # Import selected components
-            imported_count = 0
-            errors = []
-            
-            for component in selected_components:
-                try:
-                    component_id = self.soup_service.add_component_with_classification(component)
-                    imported_count += 1
-                except Exception as e:
-                    errors.append(f"{component.name}: {str(e)}")
+            # Import selected components in a single transaction
+            try:
+                component_ids, errors = self.soup_service.add_components_with_classification_bulk(selected_components)
+            except Exception as e:
+                component_ids, errors = [], [str(e)]
+            imported_count = len(component_ids)
             
             # Show results
             if imported_count > 0:
@@ -0,0 +1,296 @@
+"""
+Compact serialization of analysis results.
+
+Analysis results mix plain dictionaries with the model dataclasses from
+medical_analyzer.models. They are encoded as compact JSON with orjson when
+it is installed, falling back to the standard library otherwise, and can be
+wrapped in a gzip container. Files are decoded by content, so compressed and
+plain files load the same way.
+
+Results of completed runs are stored in a sectioned file: each top-level
+section (summary, requirements, risks, traceability, tests, SOUP, ...) is
+encoded on its own and a small header records where it starts. Opening such
+a file only reads the header; sections are decoded when they are first
+accessed, so the summary of a very large result is available immediately.
+"""
+
+import dataclasses
+import gzip
+import json
+import os
+import struct
+import threading
+from collections.abc import MutableMapping
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Version of the on-disk layout, recorded next to the file path in the database
+RESULTS_FORMAT = "sections-v1"
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+# Sectioned files start with the magic followed by the header length
+_SECTIONS_MAGIC = b'MAR\x01'
+_SECTIONS_PREFIX = struct.Struct('<4sI')
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=None)
+def _public_fields(cls: type) -> Tuple[str, ...]:
+    """Get the names of the public dataclass fields of a class."""
+    return tuple(f.name for f in dataclasses.fields(cls) if not f.name.startswith('_'))
+
+
+def _default(obj: Any) -> Any:
+    """
+    Convert objects the JSON encoder does not handle natively.
+    
+    Dataclasses are encoded from their public fields, so private caches such
+    as index fields are never written.
+    """
+    if isinstance(obj, LazyResults):
+        return obj.load_all()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {name: getattr(obj, name) for name in _public_fields(type(obj))}
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, 'isoformat'):  # datetime objects
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    if hasattr(obj, 'tolist'):  # numpy arrays and scalars
+        return obj.tolist()
+    if hasattr(obj, '__dict__'):
+        return {key: value for key, value in vars(obj).items() if not key.startswith('_')}
+    return str(obj)
+
+
+def dumps_results(results: Any) -> bytes:
+    """Encode analysis results as compact UTF-8 JSON."""
+    if isinstance(results, LazyResults):
+        results = results.load_all()
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            results,
+            default=_default,
+            option=orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(results, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads_results(data: bytes) -> Any:
+    """Decode analysis results written by dumps_results, compressed or not."""
+    if data[:2] == _GZIP_MAGIC:
+        data = gzip.decompress(data)
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def save_results(results: Any, path: Union[str, Path], compress: bool = False) -> Path:
+    """
+    Write analysis results to a file.
+    
+    The file is written under a temporary name and renamed into place, so a
+    failed save never leaves a truncated results file behind.
+    
+    Args:
+        results: Results to encode
+        path: Destination file
+        compress: Wrap the JSON in a gzip container
+    
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    data = dumps_results(results)
+    if compress:
+        data = gzip.compress(data, compresslevel=6)
+    
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_results(path: Union[str, Path]) -> Any:
+    """Read analysis results written by save_results or save_sectioned_results."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(_SECTIONS_MAGIC)] == _SECTIONS_MAGIC:
+        return open_results(path).load_all()
+    return loads_results(data)
+
+
+def _stage_overview(analysis_stages: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Extract the scalar fields of each analysis stage.
+    
+    The summary log only reports counts and flags per stage, so these are
+    kept in the header and the full stage data is only read on request.
+    """
+    overview = {}
+    if not isinstance(analysis_stages, dict):
+        return overview
+    
+    for stage, data in analysis_stages.items():
+        if not isinstance(data, dict):
+            continue
+        fields = {}
+        for key, value in data.items():
+            if isinstance(value, _SCALAR_TYPES):
+                fields[key] = value
+            elif isinstance(value, dict) and all(isinstance(v, _SCALAR_TYPES) for v in value.values()):
+                fields[key] = value
+        overview[str(stage)] = fields
+    return overview
+
+
+def save_sectioned_results(results: Dict[str, Any], path: Union[str, Path], compress: bool = False) -> Path:
+    """
+    Write analysis results as independently readable sections.
+    
+    Args:
+        results: Results to encode, keyed by section name
+        path: Destination file
+        compress: Compress each section with gzip
+    
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    if isinstance(results, LazyResults):
+        results = results.load_all()
+    
+    sections = {}
+    blobs = []
+    offset = 0
+    for name, value in results.items():
+        data = dumps_results(value)
+        if compress:
+            data = gzip.compress(data, compresslevel=6)
+        sections[str(name)] = [offset, len(data)]
+        blobs.append(data)
+        offset += len(data)
+    
+    header = dumps_results({
+        'format': RESULTS_FORMAT,
+        'sections': sections,
+        'stage_overview': _stage_overview(results.get('analysis_stages'))
+    })
+    
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(_SECTIONS_PREFIX.pack(_SECTIONS_MAGIC, len(header)))
+        f.write(header)
+        for data in blobs:
+            f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+def open_results(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Open stored analysis results.
+    
+    Sectioned files are returned as LazyResults, which only reads the header
+    here. Files in the older single-document layout are decoded completely.
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(_SECTIONS_PREFIX.size)
+        if len(prefix) == _SECTIONS_PREFIX.size:
+            magic, header_length = _SECTIONS_PREFIX.unpack(prefix)
+            if magic == _SECTIONS_MAGIC:
+                header = loads_results(f.read(header_length))
+                return LazyResults(path, header, _SECTIONS_PREFIX.size + header_length)
+        f.seek(0)
+        return loads_results(f.read())
+
+
+class LazyResults(MutableMapping):
+    """
+    Analysis results whose sections are read from disk on first access.
+    
+    Behaves like the results dictionary produced by the analysis pipeline:
+    membership tests, iteration and len() cover every stored section, while
+    item access and get() decode a section the first time it is requested.
+    Assigned values replace stored sections.
+    
+    This is a mapping rather than a dict subclass, so encoders that read
+    dict storage directly cannot skip the unloaded sections; dumps_results
+    encodes it through load_all.
+    """
+    
+    def __init__(self, path: Union[str, Path], header: Dict[str, Any], data_offset: int):
+        self.path = Path(path)
+        self.stage_overview: Dict[str, Dict[str, Any]] = header.get('stage_overview', {})
+        self._sections: Dict[str, Tuple[int, int]] = {
+            name: (data_offset + offset, length) for name, (offset, length) in header['sections'].items()
+        }
+        self._loaded: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+    
+    def is_loaded(self, key: str) -> bool:
+        """Check whether a section is in memory."""
+        return key in self._loaded
+    
+    def _load_section(self, key: str) -> Any:
+        offset, length = self._sections[key]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return loads_results(f.read(length))
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self._sections:
+            raise KeyError(key)
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = self._load_section(key)
+            return self._loaded[key]
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._loaded[key] = value
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._loaded or key in self._sections
+    
+    def __iter__(self) -> Iterator[str]:
+        yield from self._sections
+        for key in self._loaded:
+            if key not in self._sections:
+                yield key
+    
+    def __len__(self) -> int:
+        return len(self._sections) + sum(1 for key in self._loaded if key not in self._sections)
+    
+    def __delitem__(self, key: str) -> None:
+        found = self._sections.pop(key, None) is not None
+        if key in self._loaded:
+            del self._loaded[key]
+        elif not found:
+            raise KeyError(key)
+    
+    def copy(self) -> Dict[str, Any]:
+        return self.load_all()
+    
+    def load_all(self) -> Dict[str, Any]:
+        """Read every remaining section and return the results as a plain dictionary."""
+        return {key: self[key] for key in self}
+    
+    def __repr__(self) -> str:
+        loaded = [key for key in self if self.is_loaded(key)]
+        return f"LazyResults({str(self.path)!r}, sections={list(self)}, loaded={loaded})"
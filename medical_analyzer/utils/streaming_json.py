@@ -0,0 +1,166 @@
+"""
+Incremental JSON tokenizer for reading very large JSON documents.
+
+Lockfiles such as package-lock.json can be hundreds of megabytes. Instead of
+loading the whole document with json.load, the file is read in fixed-size
+chunks and turned into a stream of parse events, so memory use is bounded by
+the chunk size and the nesting depth rather than the document size.
+"""
+
+import json
+import re
+from typing import Any, Iterator, List, TextIO, Tuple
+
+# Event names yielded by iter_json_events
+START_MAP = 'start_map'
+END_MAP = 'end_map'
+START_ARRAY = 'start_array'
+END_ARRAY = 'end_array'
+MAP_KEY = 'map_key'
+VALUE = 'value'
+
+# Path element used for array items
+ITEM = 'item'
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+_PUNCTUATION = '{}[]:,'
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_NUMBER_RE = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?')
+_BARE_RE = re.compile(r'[^\s{}\[\]:,"]+')
+_LITERALS = {'true': True, 'false': False, 'null': None}
+
+
+def _iter_json_tokens(stream: TextIO, chunk_size: int) -> Iterator[Tuple[str, Any]]:
+    """
+    Split a JSON text stream into tokens.
+    
+    Yields:
+        (token, value) pairs where token is a punctuation character,
+        'string', 'number' or 'literal'
+    """
+    buffer = ''
+    pos = 0
+    eof = False
+    
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        
+        if pos >= len(buffer):
+            if eof:
+                return
+            buffer = stream.read(chunk_size)
+            pos = 0
+            if not buffer:
+                return
+            continue
+        
+        char = buffer[pos]
+        token = None
+        end = pos
+        
+        if char in _PUNCTUATION:
+            token, end = (char, None), pos + 1
+        elif char == '"':
+            match = _STRING_RE.match(buffer, pos)
+            if match:
+                token, end = ('string', json.loads(match.group(0))), match.end()
+        else:
+            # Numbers and literals end at the next delimiter, which may be in the next chunk
+            match = _BARE_RE.match(buffer, pos)
+            if match and (match.end() < len(buffer) or eof):
+                text = match.group(0)
+                if text in _LITERALS:
+                    token = ('literal', _LITERALS[text])
+                elif _NUMBER_RE.fullmatch(text):
+                    number = float(text) if any(c in text for c in '.eE') else int(text)
+                    token = ('number', number)
+                else:
+                    raise ValueError(f"Invalid JSON token: {text[:20]!r}")
+                end = match.end()
+        
+        if token:
+            yield token
+            pos = end
+            continue
+        
+        # Token is incomplete: keep the tail and read more data
+        if eof:
+            raise ValueError("Unexpected end of JSON data")
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_json_events(stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[Tuple[str, ...], str, Any]]:
+    """
+    Stream parse events from a JSON document.
+    
+    Each event carries the path of the value it belongs to as a tuple of map
+    keys, with ITEM standing in for array positions. For example, the
+    version of "node_modules/a" in a lockfile is reported as
+    (('packages', 'node_modules/a', 'version'), 'value', '1.0.0').
+    
+    Args:
+        stream: Text stream positioned at the start of the document
+        chunk_size: Number of characters read at a time
+    
+    Yields:
+        (path, event, value) tuples
+    
+    Raises:
+        ValueError: If the document is not valid JSON
+    """
+    path: List[str] = []
+    containers: List[str] = []
+    expect_key = False
+    
+    for token, value in _iter_json_tokens(stream, chunk_size):
+        if token == ':':
+            continue
+        
+        if token == ',':
+            expect_key = bool(containers) and containers[-1] == 'map'
+            continue
+        
+        if token == '}':
+            if not containers or containers.pop() != 'map':
+                raise ValueError("Unexpected '}' in JSON data")
+            path.pop()
+            expect_key = False
+            yield tuple(path), END_MAP, None
+            continue
+        
+        if token == ']':
+            if not containers or containers.pop() != 'array':
+                raise ValueError("Unexpected ']' in JSON data")
+            path.pop()
+            yield tuple(path), END_ARRAY, None
+            continue
+        
+        if expect_key:
+            if token != 'string':
+                raise ValueError("Expected a string key in JSON object")
+            path[-1] = value
+            expect_key = False
+            yield tuple(path[:-1]), MAP_KEY, value
+            continue
+        
+        if token == '{':
+            yield tuple(path), START_MAP, None
+            containers.append('map')
+            path.append('')
+            expect_key = True
+        elif token == '[':
+            yield tuple(path), START_ARRAY, None
+            containers.append('array')
+            path.append(ITEM)
+        else:
+            yield tuple(path), VALUE, value
+    
+    if containers:
+        raise ValueError("Unexpected end of JSON data")
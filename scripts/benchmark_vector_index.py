@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Recall vs latency benchmark for the embedding vector index types.
+
+Builds each index type over the same synthetic, clustered corpus of
+normalized vectors and reports build time, query latency (single and
+batched) and recall@k against exact search:
+
+    python scripts/benchmark_vector_index.py --size 200000 --dim 384
+
+Use the results to tune the HNSW_MIN_VECTORS / IVFPQ_MIN_VECTORS thresholds
+and the ef_search / nprobe options for a machine.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from medical_analyzer.llm.vector_index import FAISS_AVAILABLE, create_vector_index
+
+
+def make_corpus(size: int, dimension: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """Create normalized vectors grouped around random centres, like code embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, size)] + 0.5 * rng.standard_normal((size, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def recall_at_k(found: np.ndarray, expected: np.ndarray) -> float:
+    """Fraction of the exact top-k neighbours that were found."""
+    hits = sum(len(set(row_found) & set(row_expected)) for row_found, row_expected in zip(found, expected))
+    return hits / expected.size
+
+
+def run_benchmark(index_type: str, options: dict, vectors: np.ndarray, ids: np.ndarray,
+                  queries: np.ndarray, expected: np.ndarray, k: int) -> dict:
+    """Build one index and measure it."""
+    start = time.perf_counter()
+    index = create_vector_index(vectors.shape[1], index_type, len(vectors), options)
+    index.add(ids, vectors)
+    build_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for query in queries[:100]:
+        index.search(query.reshape(1, -1), k)
+    single_latency = (time.perf_counter() - start) / min(len(queries), 100)
+    
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    batched_latency = (time.perf_counter() - start) / len(queries)
+    
+    return {
+        'index': f"{index.index_type} {options or ''}".strip(),
+        'build_s': build_time,
+        'single_ms': single_latency * 1000,
+        'batched_ms': batched_latency * 1000,
+        'recall': recall_at_k(found, expected)
+    }
+
+
+def main():
+    """Run the vector index benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=100_000, help='number of indexed vectors')
+    parser.add_argument('--dim', type=int, default=384, help='vector dimension')
+    parser.add_argument('--queries', type=int, default=1000, help='number of queries')
+    parser.add_argument('--k', type=int, default=10, help='neighbours per query')
+    args = parser.parse_args()
+    
+    print(f"=== Vector Index Benchmark: {args.size} x {args.dim}, {args.queries} queries, k={args.k} ===\n")
+    vectors = make_corpus(args.size, args.dim)
+    ids = np.arange(args.size, dtype=np.int64)
+    queries = make_corpus(args.queries, args.dim, seed=1)
+    
+    # Exact neighbours are the reference for recall
+    exact = create_vector_index(args.dim, 'numpy')
+    exact.add(ids, vectors)
+    _, expected = exact.search(queries, args.k)
+    
+    configurations = [('numpy', {})]
+    if not FAISS_AVAILABLE:
+        print("FAISS not available, only the NumPy index is measured. Install with: pip install faiss-cpu\n")
+    else:
+        configurations += [
+            ('flat', {}),
+            ('hnsw', {'ef_search': 32}),
+            ('hnsw', {'ef_search': 64}),
+            ('hnsw', {'ef_search': 128}),
+        ]
+    if FAISS_AVAILABLE and args.size >= 1000:
+        configurations += [
+            ('ivfpq', {'nprobe': 8}),
+            ('ivfpq', {'nprobe': 32}),
+        ]
+    
+    print(f"{'index':<28} {'build s':>8} {'single ms':>10} {'batched ms':>11} {'recall':>7}")
+    for index_type, options in configurations:
+        result = run_benchmark(index_type, options, vectors, ids, queries, expected, args.k)
+        print(f"{result['index']:<28} {result['build_s']:>8.2f} {result['single_ms']:>10.3f} "
+              f"{result['batched_ms']:>11.4f} {result['recall']:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,11 @@ This module provides:
 - Common mock configurations
 """
 
+import hashlib
 import pytest
 import sys
 import os
+import numpy as np
 from unittest.mock import Mock, patch
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
@@ -182,6 +184,79 @@ def mock_risk_register():
     return mock_service
 
 
+class FakeEmbeddingModel:
+    """
+    Deterministic stand-in for a sentence-transformers model.
+    
+    Each word maps to a fixed pseudo-random vector and a text embeds as the
+    sum of its words, so texts sharing words get similar vectors while
+    distinct texts never tie.
+    """
+    
+    def __init__(self, dimension=256):
+        self.dimension = dimension
+        self.encoded = []
+    
+    def _word_vector(self, word):
+        seed = int.from_bytes(hashlib.sha256(word.encode()).digest()[:8], 'little')
+        return np.random.default_rng(seed).standard_normal(self.dimension)
+    
+    def encode(self, texts, **kwargs):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().replace(':', ' ').replace('|', ' ').split():
+                vectors[row] += self._word_vector(word)
+        return vectors
+
+
+@pytest.fixture
+def make_chunk():
+    """
+    Factory for code chunks.
+    
+    A chunk is identified by its file and index; version changes only its
+    code, and a topic puts words into the function name and code.
+    """
+    from medical_analyzer.models.core import CodeChunk
+    from medical_analyzer.models.enums import ChunkType
+    
+    def _make_chunk(index, file_index=0, version=0, topic=None):
+        name = topic.replace(' ', '_') if topic else f"func_{file_index}"
+        function_name = f"{name}_{index}"
+        comment = f" /* {topic} */" if topic else ""
+        return CodeChunk(
+            file_path=f"src/file{file_index}.c",
+            start_line=index * 10,
+            end_line=index * 10 + 5,
+            content=f"int {function_name}(void) {{{comment} return {version}; }}",
+            function_name=function_name,
+            chunk_type=ChunkType.FUNCTION
+        )
+    
+    return _make_chunk
+
+
+@pytest.fixture
+def make_embedding_service(tmp_path):
+    """Factory for embedding services with a fake model and the NumPy index."""
+    from medical_analyzer.llm.embedding_service import EmbeddingService
+    
+    def _make_embedding_service(**kwargs):
+        kwargs.setdefault('index_type', 'numpy')
+        service = EmbeddingService(model_name="fake-model", cache_dir=str(tmp_path), **kwargs)
+        service._model = FakeEmbeddingModel()
+        return service
+    
+    return _make_embedding_service
+
+
+@pytest.fixture
+def embedding_service(make_embedding_service):
+    """Embedding service with a fake model and the NumPy index."""
+    return make_embedding_service()
+
+
 # Pytest markers for test categorization
 def pytest_configure(config):
     """Register custom pytest markers."""
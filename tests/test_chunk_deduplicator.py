@@ -0,0 +1,191 @@
+"""
+Unit tests for near-duplicate chunk clustering and its use in feature extraction.
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+from medical_analyzer.config.config_manager import ConfigManager
+from medical_analyzer.services.analysis_orchestrator import AnalysisOrchestrator
+from medical_analyzer.services.chunk_deduplicator import ChunkDeduplicator
+from medical_analyzer.services.feature_extractor import FeatureExtractor
+from medical_analyzer.models.core import CodeChunk
+from medical_analyzer.models.enums import ChunkType
+
+
+CHANNEL_HANDLER = """
+int handle_channel_{n}(const uint8_t *frame, size_t length) {{
+    /* Channel {n} sensor input */
+    if (frame == NULL || length < 4) {{
+        log_error("short sensor frame");
+        return -1;
+    }}
+    uint16_t value = (frame[0] << 8) | frame[1];
+    if (value > CHANNEL_{n}_LIMIT) {{
+        raise_alarm(ALARM_CHANNEL_{n});
+    }}
+    channel_state[{n}].last_value = value;
+    write_register(CHANNEL_BASE + 0x{n}4, value);
+    return 0;
+}}
+"""
+
+UNRELATED = [
+    "void display_message(const char *msg) { printf(\"%s\\n\", msg); fflush(stdout); }",
+    "int save_settings(FILE *f, const settings_t *s) { return fwrite(s, sizeof(*s), 1, f) == 1 ? 0 : -1; }",
+    "double compute_dose(double weight, double rate) { if (weight <= 0) return 0; return weight * rate / 60.0; }",
+]
+
+
+def make_chunk(content, index, file_path="src/channels.c"):
+    """Create a C function chunk for testing."""
+    return CodeChunk(
+        file_path=file_path,
+        start_line=index * 20 + 1,
+        end_line=index * 20 + 15,
+        content=content,
+        function_name=f"func_{index}",
+        chunk_type=ChunkType.FUNCTION,
+        metadata={'language': 'c'}
+    )
+
+
+def handler_chunks(count):
+    return [make_chunk(CHANNEL_HANDLER.format(n=n), n) for n in range(count)]
+
+
+def handler_chunks_in(chunks):
+    return [chunk for chunk in chunks if chunk.file_path == "src/channels.c"]
+
+
+class TestChunkDeduplicator:
+    """Test cases for ChunkDeduplicator."""
+    
+    def test_normalize_tokens_ignores_literals_comments_and_numbering(self):
+        """Test that per-instance differences disappear after normalization."""
+        deduplicator = ChunkDeduplicator()
+        first = deduplicator.normalize_tokens('x1 = read(0x10, "a"); // first')
+        second = deduplicator.normalize_tokens('x2 = read(32, "bb"); /* second */')
+        
+        assert first == second == ['x', '=', 'read', '(', 'NUM', ',', 'STR', ')', ';']
+    
+    def test_safety_literals_keep_strings_and_compared_numbers(self):
+        """Test that limits and messages count while indices, offsets and shifts do not."""
+        literals = ChunkDeduplicator.safety_literals(
+            'if (rate >= 2.5 && 10 > dose || id == -3) { log("high", "ml/h"); } '
+            'buf[4] = (x << 8) | REG[0x14]; mask >>= 2; count = 7;'
+        )
+        
+        assert literals == ('2.5', '10', '3', '"high"', '"ml/h"')
+    
+    def test_near_duplicates_share_a_cluster(self):
+        """Test that per-channel handlers collapse while distinct functions stay apart."""
+        unrelated = [make_chunk(content, 100 + i, "src/misc.c") for i, content in enumerate(UNRELATED)]
+        chunks = handler_chunks(8)
+        chunks = chunks[:4] + unrelated + chunks[4:]
+        
+        clusters = ChunkDeduplicator().cluster(chunks)
+        
+        assert len(clusters) == 4
+        assert clusters[0].representative is chunks[0]
+        assert clusters[0].members == handler_chunks_in(chunks)
+        assert sorted(len(cluster.members) for cluster in clusters) == [1, 1, 1, 8]
+    
+    def test_different_languages_are_not_grouped(self):
+        """Test that identical code in different languages stays in separate clusters."""
+        chunks = handler_chunks(2)
+        chunks[1].metadata['language'] = 'javascript'
+        
+        assert len(ChunkDeduplicator().cluster(chunks)) == 2
+    
+    def test_chunks_with_different_limits_are_not_grouped(self):
+        """Test that near-identical checks with different limit values stay separate."""
+        check = """
+int check_{name}_rate(double rate_ml_h) {{
+    if (rate_ml_h < 0.0 || rate_ml_h > {limit}) {{
+        log_error("rate out of range");
+        raise_alarm(ALARM_RATE_LIMIT);
+        return -1;
+    }}
+    pump_state.rate = rate_ml_h;
+    return 0;
+}}
+"""
+        deduplicator = ChunkDeduplicator()
+        infusion = make_chunk(check.format(name="infusion", limit=999), 0)
+        bolus = make_chunk(check.format(name="bolus", limit=25), 1)
+        
+        assert deduplicator.similarity(deduplicator.signature(infusion.content),
+                                       deduplicator.signature(bolus.content)) >= deduplicator.threshold
+        assert len(deduplicator.cluster([infusion, bolus])) == 2
+    
+    def test_register_accessors_differing_in_offsets_are_grouped(self):
+        """Test that generated accessors that differ only in numeric offsets share a cluster."""
+        accessor = """
+uint32_t read_status_{n}(void) {{
+    uint32_t value = *(volatile uint32_t *)(STATUS_BASE + 0x{n}0);
+    return (value >> {n}) & 0xFF;
+}}
+"""
+        chunks = [make_chunk(accessor.format(n=n), n) for n in range(1, 6)]
+        
+        assert len(ChunkDeduplicator().cluster(chunks)) == 1
+
+
+class TestFeatureExtractorDeduplication:
+    """Test cases for feature extraction over near-duplicate chunks."""
+    
+    def make_llm(self):
+        llm = Mock()
+        llm.generate.return_value = json.dumps([
+            {"description": "Validates sensor frames", "category": "validation", "confidence": 0.8,
+             "evidence": ["length check"]},
+            {"description": "Raises limit alarms", "category": "safety", "confidence": 0.9,
+             "evidence": ["raise_alarm"]}
+        ])
+        return llm
+    
+    def test_one_llm_call_per_cluster_with_fanned_out_evidence(self):
+        """Test that duplicates reuse the representative's features with their own evidence."""
+        llm = self.make_llm()
+        chunks = handler_chunks(6)
+        
+        result = FeatureExtractor(llm, deduplicate_chunks=True).extract_features(chunks)
+        
+        assert llm.generate.call_count == 1
+        assert result.chunks_processed == 6
+        assert result.metadata['analyzed_chunks'] == 1
+        assert result.metadata['duplicate_chunks'] == 5
+        assert len(result.features) == 12
+        assert len({feature.id for feature in result.features}) == 12
+        
+        for chunk in chunks:
+            features = [f for f in result.features if f.evidence[0].start_line == chunk.start_line]
+            assert [f.description for f in features] == ["Validates sensor frames", "Raises limit alarms"]
+            assert all(f.evidence[0].function_name == chunk.function_name for f in features)
+            assert all(f.metadata['source_chunk']['start_line'] == chunk.start_line for f in features)
+        
+        copied = [f for f in result.features if 'duplicate_of' in f.metadata]
+        assert len(copied) == 10
+        assert {f.metadata['duplicate_of']['function_name'] for f in copied} == {"func_0"}
+    
+    def test_deduplication_is_off_by_default(self):
+        """Test that every chunk is analyzed unless deduplication is enabled."""
+        llm = self.make_llm()
+        
+        result = FeatureExtractor(llm).extract_features(handler_chunks(3))
+        
+        assert llm.generate.call_count == 3
+        assert len(result.features) == 6
+    
+    def test_orchestrator_enables_deduplication_from_config(self):
+        """Test that the 'deduplicate_chunks' custom setting turns deduplication on."""
+        config_manager = Mock(spec=ConfigManager)
+        config_manager.get_llm_config.return_value = {}
+        for settings, expected in [({}, False), ({'deduplicate_chunks': True}, True)]:
+            config_manager.get_custom_setting.side_effect = lambda key, default=None: settings.get(key, default)
+            with patch('medical_analyzer.services.analysis_orchestrator.DatabaseManager'):
+                with patch('medical_analyzer.services.analysis_orchestrator.LLMBackend'):
+                    orchestrator = AnalysisOrchestrator(config_manager, Mock())
+            
+            assert orchestrator.feature_extractor.deduplicate_chunks is expected
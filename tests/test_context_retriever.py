@@ -0,0 +1,124 @@
+"""
+Unit tests for embedding-based prompt context retrieval.
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from medical_analyzer.llm.context_retriever import ContextRetriever
+from medical_analyzer.llm.embedding_service import EmbeddingService
+from medical_analyzer.services.hazard_identifier import HazardIdentifier
+from medical_analyzer.services.requirements_generator import RequirementsGenerator
+from medical_analyzer.models.core import CodeReference, Feature, Requirement
+from medical_analyzer.models.enums import FeatureCategory, RequirementType
+
+
+TOPICS = ["infusion pump rate", "alarm buzzer sound", "battery charge level", "network packet retry"]
+
+
+def make_feature(index, topic):
+    """Create a feature about a topic."""
+    return Feature(
+        id=f"FEAT_{index:04d}",
+        description=f"Controls the {topic} variant {index}",
+        confidence=0.9,
+        evidence=[CodeReference(file_path="src/device.c", start_line=index, end_line=index + 1)],
+        category=FeatureCategory.DEVICE_CONTROL
+    )
+
+
+@pytest.fixture
+def retriever(embedding_service):
+    """Create a retriever over an embedding service with a fake model."""
+    return ContextRetriever(embedding_service, top_k=3)
+
+
+@pytest.fixture
+def features():
+    return [make_feature(i, TOPICS[i % len(TOPICS)]) for i in range(12)]
+
+
+class TestContextRetriever:
+    """Test cases for ContextRetriever."""
+    
+    def test_select_features_keeps_the_most_relevant_in_order(self, retriever, features):
+        """Test that only the top-k features about the query are selected."""
+        selected = retriever.select_features("alarm buzzer sound volume", features)
+        
+        assert [f.id for f in selected] == ["FEAT_0001", "FEAT_0005", "FEAT_0009"]
+        assert retriever.select_features("anything", features[:2]) == features[:2]
+    
+    def test_group_features_covers_every_feature_once(self, retriever, features):
+        """Test that grouping bounds prompt size without losing features."""
+        groups = retriever.group_features(features)
+        
+        assert all(len(group) <= 3 for group in groups)
+        assert sorted(f.id for group in groups for f in group) == sorted(f.id for f in features)
+        # Features about the same topic end up together
+        for group in groups:
+            assert len({int(f.id[-4:]) % len(TOPICS) for f in group}) == 1
+    
+    def test_relevant_chunks_merges_batched_queries(self, retriever, make_chunk):
+        """Test that chunks are searched for several queries at once."""
+        chunks = [make_chunk(i, topic=TOPICS[i % len(TOPICS)]) for i in range(8)]
+        assert not retriever.has_code_index()
+        assert retriever.index_chunks(chunks)
+        
+        found = retriever.relevant_chunks(["battery charge level", "network packet retry"], k=4)
+        
+        assert len(found) == 4
+        assert {chunk.function_name.rsplit('_', 1)[0] for chunk, _ in found} == {
+            "battery_charge_level", "network_packet_retry"
+        }
+        similarities = [similarity for _, similarity in found]
+        assert similarities == sorted(similarities, reverse=True)
+    
+    def test_unavailable_embeddings_fall_back_to_all_features(self, tmp_path, features):
+        """Test that prompts keep every feature when nothing can be embedded."""
+        retriever = ContextRetriever(EmbeddingService(model_name="missing", cache_dir=str(tmp_path)), top_k=3)
+        retriever.embedding_service._model = None
+        
+        assert retriever.select_features("alarm", features) == features
+        assert retriever.group_features(features) == [features]
+
+
+class TestPromptRetrieval:
+    """Test cases for retrieval in the requirements and hazard prompts."""
+    
+    def test_software_requirement_prompt_gets_top_k_features(self, retriever, features):
+        """Test that the features of a user requirement are narrowed to the most relevant."""
+        generator = RequirementsGenerator(Mock(), context_retriever=retriever)
+        ur = Requirement(
+            id="UR_0001",
+            text="Users shall be warned by an alarm buzzer sound",
+            type=RequirementType.USER,
+            acceptance_criteria=["The alarm is audible"],
+            derived_from=[f.id for f in features]
+        )
+        
+        selected = generator._select_features_for_requirement(ur, features)
+        
+        assert [f.id for f in selected] == ["FEAT_0001", "FEAT_0005", "FEAT_0009"]
+        assert len(generator._split_features_for_prompts(features)) == 4
+        assert RequirementsGenerator(Mock())._split_features_for_prompts(features) == [features]
+    
+    def test_hazard_prompt_includes_code_within_budget(self, retriever, make_chunk):
+        """Test that hazard prompts carry the most relevant code, bounded by the token budget."""
+        retriever.index_chunks([make_chunk(i, topic=TOPICS[i % len(TOPICS)]) for i in range(8)])
+        llm = Mock()
+        llm.generate.return_value = "[]"
+        identifier = HazardIdentifier(llm, context_retriever=retriever, code_context_tokens=25)
+        requirement = Requirement(
+            id="SR_0001",
+            text="The infusion pump rate shall never exceed the prescribed limit",
+            type=RequirementType.SOFTWARE,
+            acceptance_criteria=["Rate is limited"]
+        )
+        
+        identifier.identify_hazards([requirement])
+        
+        prompt = llm.generate.call_args.kwargs['prompt']
+        assert "Source code most relevant to these requirements" in prompt
+        assert "(infusion_pump_rate_" in prompt
+        context = prompt.split("Source code most relevant to these requirements:")[1].split("For each")[0]
+        assert len(context.strip()) <= 25 * HazardIdentifier.CHARS_PER_TOKEN
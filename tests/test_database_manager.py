@@ -0,0 +1,139 @@
+"""
+Unit tests for DatabaseManager connection pooling and transactions.
+"""
+
+import sqlite3
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from medical_analyzer.database.schema import DatabaseManager
+from medical_analyzer.services.project_persistence import ProjectPersistenceService
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    """Create a database manager on a temporary database."""
+    manager = DatabaseManager(str(tmp_path / "test.db"))
+    yield manager
+    manager.close()
+
+
+def count_projects(db_manager):
+    """Count the stored projects."""
+    with db_manager.get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+
+class TestDatabaseManager:
+    """Test cases for DatabaseManager."""
+    
+    def test_connections_are_pooled_per_thread(self, db_manager):
+        """Test that a thread reuses its connection and other threads get their own."""
+        with db_manager.get_connection() as first:
+            pass
+        with db_manager.get_connection() as second:
+            assert second is first
+            assert second.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert second.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        
+        def thread_connection():
+            with db_manager.get_connection() as conn:
+                return conn
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            assert executor.submit(thread_connection).result() is not first
+    
+    def test_connections_of_finished_threads_are_closed(self, db_manager):
+        """Test that a thread's pooled connection is closed when the thread ends."""
+        connections = []
+        
+        def use_connection():
+            with db_manager.get_connection() as conn:
+                connections.append(conn)
+        
+        threads = [threading.Thread(target=use_connection) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert not any(conn in db_manager._connections for conn in connections)
+        with pytest.raises(sqlite3.ProgrammingError):
+            connections[0].execute("SELECT 1")
+    
+    def test_transaction_refuses_pending_changes(self, db_manager):
+        """Test that a transaction does not discard uncommitted writes of an enclosing block."""
+        with db_manager.get_connection() as conn:
+            conn.execute("INSERT INTO projects (name, root_path) VALUES ('a', '/a')")
+            with pytest.raises(sqlite3.ProgrammingError):
+                with db_manager.transaction():
+                    pass
+            conn.commit()
+        
+        assert count_projects(db_manager) == 1
+    
+    def test_uncommitted_changes_are_rolled_back(self, db_manager):
+        """Test that a block that does not commit leaves no changes behind."""
+        with db_manager.get_connection() as conn:
+            conn.execute("INSERT INTO projects (name, root_path) VALUES ('a', '/a')")
+        
+        assert count_projects(db_manager) == 0
+    
+    def test_transaction_commits_nested_calls_atomically(self, db_manager):
+        """Test that manager methods called in a transaction commit or roll back together."""
+        with pytest.raises(RuntimeError):
+            with db_manager.transaction():
+                project_id = db_manager.create_project("a", "/a")
+                db_manager.create_analysis_run(project_id)
+                raise RuntimeError("abort")
+        
+        assert count_projects(db_manager) == 0
+        
+        with db_manager.transaction() as conn:
+            project_id = db_manager.create_project("a", "/a")
+            with db_manager.transaction():
+                db_manager.create_analysis_run(project_id)
+            assert conn.in_transaction
+        
+        assert count_projects(db_manager) == 1
+        with db_manager.get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM analysis_runs").fetchone()[0] == 1
+    
+    def test_concurrent_writers_wait_for_the_lock(self, db_manager):
+        """Test that writes from several threads all succeed."""
+        barrier = threading.Barrier(8)
+        
+        def write(index):
+            barrier.wait()
+            for run in range(10):
+                with db_manager.transaction():
+                    db_manager.create_project(f"p{index}_{run}", f"/p{index}/{run}")
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write, range(8)))
+        
+        assert count_projects(db_manager) == 80
+    
+    def test_close_reconnects_on_next_use(self, db_manager):
+        """Test that the manager can be used again after closing its pool."""
+        with db_manager.get_connection() as conn:
+            pass
+        db_manager.close()
+        
+        with db_manager.get_connection() as reopened:
+            assert reopened is not conn
+        assert db_manager.create_project("a", "/a") > 0
+    
+    def test_persistence_service_shares_manager(self, db_manager):
+        """Test that a persistence service can join the manager's transactions."""
+        persistence = ProjectPersistenceService(db_manager=db_manager)
+        
+        with pytest.raises(RuntimeError):
+            with db_manager.transaction():
+                run_id = persistence.create_analysis_run(db_manager.create_project("a", "/a"))
+                assert persistence.get_project_analysis_runs(1)[0]['id'] == run_id
+                raise RuntimeError("abort")
+        
+        assert persistence.db_manager is db_manager
+        assert persistence.list_projects() == []
@@ -0,0 +1,91 @@
+"""
+Unit tests for the persistent embedding cache.
+"""
+
+import pytest
+import numpy as np
+
+from medical_analyzer.llm.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache."""
+    
+    @pytest.mark.parametrize("dtype", ["float32", "float16"])
+    def test_put_and_get_persist_across_instances(self, tmp_path, dtype):
+        """Test that stored vectors are found again by a new cache instance."""
+        vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+        cache = EmbeddingCache(str(tmp_path), "model", dtype=dtype)
+        
+        assert cache.put_many(["a", "b", "a"], vectors) == 2
+        assert cache.put_many(["b", "c"], vectors[1:]) == 1
+        cache.close()
+        
+        reopened = EmbeddingCache(str(tmp_path), "model", dtype=dtype)
+        found = reopened.get_many(["a", "b", "c", "d"])
+        
+        assert set(found) == {"a", "b", "c"}
+        np.testing.assert_allclose(found["a"], vectors[0])
+        np.testing.assert_allclose(found["c"], vectors[2])
+        assert found["a"].dtype == np.float32
+        assert len(reopened) == 3
+        assert EmbeddingCache(str(tmp_path), "other-model").get_many(["a"]) == {}
+    
+    def test_dimension_mismatch_is_rejected(self, tmp_path):
+        """Test that vectors of another dimension cannot be mixed into a model's matrix."""
+        cache = EmbeddingCache(str(tmp_path), "model")
+        cache.put_many(["a"], np.ones((1, 4)))
+        
+        with pytest.raises(ValueError):
+            cache.put_many(["b"], np.ones((1, 3)))
+
+
+class TestEmbeddingServiceCache:
+    """Test cases for cached chunk embedding in EmbeddingService."""
+    
+    def test_only_changed_chunks_are_encoded(self, embedding_service, make_chunk):
+        """Test that unchanged chunks reuse cached vectors."""
+        chunks = [make_chunk(i) for i in range(20)]
+        first = embedding_service.embed_chunks(chunks)
+        assert len(embedding_service._model.encoded) == 20
+        
+        chunks[5] = make_chunk(5, version=1)
+        embedding_service._model.encoded.clear()
+        second = embedding_service.embed_chunks(chunks)
+        
+        assert len(embedding_service._model.encoded) == 1
+        assert len(second) == 20
+        np.testing.assert_array_equal(second[0], first[0])
+        assert not np.array_equal(second[5], first[5])
+        assert embedding_service.get_stats()['embedding_cache']['entries'] == 21
+    
+    def test_duplicate_texts_are_encoded_once(self, embedding_service, make_chunk):
+        """Test that identical chunks in one call are encoded once."""
+        chunk = make_chunk(1)
+        
+        vectors = embedding_service.embed_chunks([chunk, chunk, make_chunk(2)])
+        
+        assert len(embedding_service._model.encoded) == 2
+        np.testing.assert_array_equal(vectors[0], vectors[1])
+    
+    def test_cache_can_be_disabled(self, make_embedding_service, make_chunk):
+        """Test that every chunk is encoded when the cache is off."""
+        embedding_service = make_embedding_service(use_embedding_cache=False)
+        chunks = [make_chunk(i) for i in range(3)]
+        
+        embedding_service.embed_chunks(chunks)
+        embedding_service.embed_chunks(chunks)
+        
+        assert len(embedding_service._model.encoded) == 6
+        assert 'embedding_cache' not in embedding_service.get_stats()
+    
+    def test_quantized_models_do_not_share_vectors(self, make_embedding_service, make_chunk):
+        """Test that vectors of a model are cached separately per quantization."""
+        chunks = [make_chunk(i) for i in range(3)]
+        services = [make_embedding_service(quantization=mode) for mode in (None, 'int8', 'float16', None)]
+        
+        for service in services:
+            service.embed_chunks(chunks)
+        
+        assert [len(service._model.encoded) for service in services] == [3, 3, 3, 0]
+        assert services[1].get_stats()['embedding_cache']['quantization'] == 'int8'
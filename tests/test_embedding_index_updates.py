@@ -0,0 +1,350 @@
+"""
+Unit tests for incremental updates of the embedding index.
+"""
+
+import random
+import sqlite3
+import pytest
+import numpy as np
+from unittest.mock import Mock
+
+from medical_analyzer.llm import vector_index
+from medical_analyzer.llm.vector_index import (
+    NumpyVectorIndex, select_index_type, create_vector_index, load_vector_index,
+    HNSW_MIN_VECTORS, IVFPQ_MIN_VECTORS
+)
+from medical_analyzer.models.core import CodeChunk
+from medical_analyzer.models.enums import ChunkType
+
+
+def assert_consistent(service, expected_chunks):
+    """Check the aligned stores against the chunks that should be indexed."""
+    expected = {service.chunk_id(chunk): chunk for chunk in expected_chunks}
+    
+    assert len(service._chunks) == len(service._index) == len(expected)
+    assert sorted(service._chunk_ids) == sorted(expected)
+    for position, chunk_id in enumerate(service._chunk_ids):
+        assert service._positions[chunk_id] == position
+        assert service.get_chunk_by_index(position) == expected[chunk_id]
+        np.testing.assert_allclose(service.stored_vectors(position, position + 1)[0],
+                                   service._index.get_vectors([chunk_id])[0])
+
+
+class TestEmbeddingIndexUpdates:
+    """Test cases for add_chunks, remove_chunks, replace_file and update_chunks."""
+    
+    def test_add_and_remove_chunks(self, embedding_service, make_chunk):
+        """Test that chunks can be added and removed by chunk or ID."""
+        chunks = [make_chunk(i, f) for f in range(3) for i in range(4)]
+        assert embedding_service.add_chunks(chunks)
+        
+        assert embedding_service.remove_chunks([chunks[0], embedding_service.chunk_id(chunks[5]), 12345]) == 2
+        assert_consistent(embedding_service, chunks[1:5] + chunks[6:])
+        
+        results = embedding_service.search(embedding_service._chunk_text(chunks[7]), k=1)
+        assert results[0].chunk == chunks[7]
+        assert results[0].similarity == pytest.approx(1.0)
+    
+    def test_vectors_are_stored_only_in_the_index(self, embedding_service, make_chunk):
+        """Test that the service reads vectors from the index instead of keeping a copy."""
+        chunks = [make_chunk(i, f) for f in range(2) for i in range(5)]
+        embedding_service.build_index(chunks)
+        embedding_service.remove_chunks(chunks[:3])
+        
+        assert not hasattr(embedding_service, '_vector_buffer')
+        vectors = embedding_service.stored_vectors()
+        assert vectors.shape == (7, embedding_service._index.dimension)
+        np.testing.assert_array_equal(vectors, embedding_service._index.get_vectors(embedding_service._chunk_ids))
+    
+    def test_replace_file_only_touches_that_file(self, embedding_service, make_chunk):
+        """Test that replacing a file drops its stale chunks and encodes only changed ones."""
+        chunks = [make_chunk(i, f) for f in range(3) for i in range(4)]
+        embedding_service.build_index(chunks)
+        embedding_service._model.encoded.clear()
+        
+        new_file_chunks = [make_chunk(0, 1), make_chunk(1, 1, version=1), make_chunk(9, 1)]
+        assert embedding_service.replace_file("src/file1.c", new_file_chunks)
+        
+        expected = [chunk for chunk in chunks if chunk.file_path != "src/file1.c"] + new_file_chunks
+        assert_consistent(embedding_service, expected)
+        assert len(embedding_service._model.encoded) == 2
+    
+    def test_update_chunks_applies_only_the_difference(self, embedding_service, make_chunk):
+        """Test that update_chunks matches a full rebuild through random edits."""
+        rng = random.Random(7)
+        current = {(f, i): 0 for f in range(4) for i in range(10)}
+        embedding_service.update_chunks([make_chunk(i, f, v) for (f, i), v in current.items()])
+        
+        for _ in range(5):
+            for key in rng.sample(sorted(current), 6):
+                del current[key]
+            for key in rng.sample(sorted(current), 4):
+                current[key] += 1
+            for _ in range(5):
+                current[(rng.randrange(4), rng.randrange(10, 20))] = 0
+            
+            chunks = [make_chunk(i, f, v) for (f, i), v in current.items()]
+            embedding_service._model.encoded.clear()
+            assert embedding_service.update_chunks(chunks)
+            
+            assert_consistent(embedding_service, chunks)
+            assert len(embedding_service._model.encoded) <= 9
+
+
+class TestIndexTypeSelection:
+    """Test cases for choosing and creating index types."""
+    
+    def test_select_index_type_by_corpus_size(self):
+        """Test that larger corpora get more scalable index types."""
+        assert select_index_type(0) == 'flat'
+        assert select_index_type(HNSW_MIN_VECTORS - 1) == 'flat'
+        assert select_index_type(HNSW_MIN_VECTORS) == 'hnsw'
+        assert select_index_type(IVFPQ_MIN_VECTORS) == 'ivfpq'
+    
+    def test_unknown_index_type_is_rejected(self):
+        """Test that misspelled index types fail early."""
+        with pytest.raises(ValueError):
+            create_vector_index(8, 'annoy')
+    
+    @pytest.mark.parametrize("index_type,options", [
+        ('auto', {'ef_search': 128}), ('ivfpq', {'nprobe': 8}), ('flat', {'ef_search': 128, 'nprobe': 8})
+    ])
+    def test_options_of_other_index_types_are_ignored(self, monkeypatch, index_type, options):
+        """Test that a small corpus falling back to a flat FAISS index accepts tuning options."""
+        monkeypatch.setattr(vector_index, 'FAISS_AVAILABLE', True)
+        monkeypatch.setattr(vector_index, 'faiss', Mock(), raising=False)
+        
+        index = create_vector_index(16, index_type, corpus_size=100, options=options)
+        
+        assert isinstance(index, vector_index.FaissVectorIndex)
+    
+    def test_unknown_index_options_are_rejected(self, make_embedding_service):
+        """Test that misspelled options fail early instead of being ignored."""
+        with pytest.raises(ValueError, match="ef_serach"):
+            create_vector_index(8, 'numpy', options={'ef_serach': 128})
+        with pytest.raises(ValueError, match="nprobes"):
+            make_embedding_service(index_options={'nprobes': 8})
+        
+        index = create_vector_index(8, 'numpy', options={'block_size': 16, 'ef_search': 128})
+        assert index.block_size == 16
+    
+    @pytest.mark.parametrize("index_type,options", [
+        ('flat', {}), ('hnsw', {'ef_search': 128}), ('ivfpq', {'nprobe': 16})
+    ])
+    def test_faiss_index_types_find_neighbours(self, index_type, options):
+        """Test that each FAISS index type supports add, remove and search by ID."""
+        pytest.importorskip("faiss")
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((4000, 32)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = np.arange(4000, dtype=np.int64) * 7 + 3
+        
+        index = create_vector_index(32, index_type, corpus_size=len(vectors), options=options)
+        index.add(ids, vectors)
+        assert index.index_type == index_type
+        assert index.remove(ids[:10]) == 10
+        assert len(index) == 3990
+        
+        similarities, found = index.search(vectors[10:60], 5)
+        assert found.shape == (50, 5)
+        assert not np.isin(found, ids[:10]).any()
+        # Each query vector is its own nearest neighbour for most queries
+        assert np.mean(found[:, 0] == ids[10:60]) >= 0.8
+
+
+class TestNumpyVectorIndex:
+    """Test cases for the pure NumPy index."""
+    
+    @pytest.fixture
+    def data(self):
+        rng = np.random.default_rng(1)
+        vectors = rng.standard_normal((1000, 24)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        ids = rng.permutation(10 ** 6)[:1000].astype(np.int64)
+        return ids, vectors
+    
+    def test_search_matches_brute_force(self, data):
+        """Test that blocked top-k search returns the exact neighbours in order."""
+        ids, vectors = data
+        index = NumpyVectorIndex(24, block_size=128)
+        index.add(ids, vectors)
+        queries = vectors[:40] + 0.1
+        
+        similarities, found = index.search(queries, 7)
+        
+        scores = queries @ vectors.T
+        expected = np.argsort(-scores, axis=1)[:, :7]
+        np.testing.assert_array_equal(found, ids[expected])
+        np.testing.assert_allclose(similarities, np.take_along_axis(scores, expected, axis=1), rtol=1e-5)
+    
+    def test_remove_and_small_corpus(self, data):
+        """Test removal by ID and searches asking for more neighbours than stored."""
+        ids, vectors = data
+        index = NumpyVectorIndex(24, block_size=4)
+        index.add(ids[:10], vectors[:10])
+        
+        assert index.remove([ids[0], ids[5], -1]) == 2
+        assert len(index) == 8
+        np.testing.assert_array_equal(index.get_vectors([ids[9]]), vectors[9:10])
+        
+        similarities, found = index.search(vectors[:3], 20)
+        assert found.shape == (3, 8)
+        assert not np.isin(found, [ids[0], ids[5]]).any()
+        assert found[1, 0] == ids[1]
+        assert np.all(np.diff(similarities, axis=1) <= 0)
+    
+    def test_save_and_load(self, data, tmp_path):
+        """Test that a saved NumPy index loads without FAISS."""
+        ids, vectors = data
+        index = NumpyVectorIndex(24)
+        index.add(ids, vectors)
+        index.save(str(tmp_path / "index.faiss"))
+        
+        loaded = load_vector_index(str(tmp_path / "index.faiss"))
+        assert loaded.index_type == "numpy"
+        np.testing.assert_array_equal(loaded.search(vectors[:5], 3)[1], index.search(vectors[:5], 3)[1])
+
+
+class TestBatchedSearch:
+    """Test cases for search_many, similar_for_all and get_similar_chunks."""
+    
+    def test_search_many_matches_single_searches(self, embedding_service, make_chunk):
+        """Test that a batched search returns the same results as one search per query."""
+        chunks = [make_chunk(i, f) for f in range(3) for i in range(5)]
+        embedding_service.build_index(chunks)
+        queries = [embedding_service._chunk_text(chunk) for chunk in chunks[:4]] + ["unrelated query"]
+        
+        batched = embedding_service.search_many(queries, k=3)
+        
+        assert len(batched) == len(queries)
+        for query, results in zip(queries, batched):
+            single = embedding_service.search(query, k=3)
+            assert [result.index for result in results] == [result.index for result in single]
+            assert [result.similarity for result in results] == pytest.approx([result.similarity for result in single])
+        assert batched[2][0].chunk == chunks[2]
+        assert embedding_service.search_many([], k=3) == []
+    
+    def test_similar_for_all_uses_stored_vectors(self, embedding_service, make_chunk):
+        """Test that similar_for_all excludes each chunk itself and encodes nothing."""
+        chunks = [make_chunk(i, f) for f in range(3) for i in range(5)]
+        embedding_service.build_index(chunks)
+        embedding_service._model.encoded.clear()
+        
+        neighbours = embedding_service.similar_for_all(k=4, min_similarity=-1.0)
+        
+        assert embedding_service._model.encoded == []
+        assert len(neighbours) == len(chunks)
+        for position, results in enumerate(neighbours):
+            assert len(results) == 4
+            assert all(result.index != position for result in results)
+            vectors = embedding_service.stored_vectors()
+            scores = vectors @ vectors[position]
+            scores[position] = -np.inf
+            assert [result.index for result in results] == list(np.argsort(-scores)[:4])
+    
+    def test_get_similar_chunks_does_not_reencode_indexed_chunks(self, embedding_service, make_chunk):
+        """Test that an indexed reference chunk is searched by its stored vector."""
+        chunks = [make_chunk(i, f) for f in range(2) for i in range(5)]
+        embedding_service.build_index(chunks)
+        embedding_service._model.encoded.clear()
+        
+        results = embedding_service.get_similar_chunks(chunks[3], k=3)
+        
+        assert embedding_service._model.encoded == []
+        assert [result.index for result in results] == [
+            result.index for result in embedding_service.similar_for_all(k=3)[embedding_service._positions[embedding_service.chunk_id(chunks[3])]]
+        ]
+        assert all(result.chunk != chunks[3] for result in results)
+        
+        with_self = embedding_service.get_similar_chunks(chunks[3], k=1, exclude_self=False)
+        assert with_self[0].chunk == chunks[3]
+
+
+class TestSavedIndex:
+    """Test cases for the SQLite and memory-mapped index files."""
+    
+    @pytest.fixture
+    def source_chunks(self, tmp_path):
+        """Create chunks whose text is a line range of a source file on disk."""
+        lines = [f"int func_{i}(void) {{ return {i}; }}" for i in range(20)]
+        source = tmp_path / "device.c"
+        source.write_text('\n'.join(lines) + '\n')
+        return [
+            CodeChunk(
+                file_path=str(source),
+                start_line=i * 2 + 1,
+                end_line=i * 2 + 2,
+                content='\n'.join(lines[i * 2:i * 2 + 2]),
+                function_name=f"func_{i * 2}",
+                chunk_type=ChunkType.FUNCTION,
+                metadata={'language': 'c'}
+            )
+            for i in range(10)
+        ]
+    
+    def test_round_trip_references_source_lines(self, embedding_service, make_embedding_service, make_chunk,
+                                                source_chunks, tmp_path):
+        """Test that only text missing from the source files is stored and the rest loads lazily."""
+        chunks = source_chunks + [make_chunk(i, 0) for i in range(3)]
+        embedding_service.build_index(chunks)
+        filepath = str(tmp_path / "index" / "code")
+        
+        assert embedding_service.save_index(filepath)
+        assert not (tmp_path / "index" / "code.pkl").exists()
+        assert not (tmp_path / "index" / "code.faiss").exists()
+        with sqlite3.connect(f"{filepath}.chunks.db") as conn:
+            assert conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 13
+            assert conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0] == 3
+        
+        loaded = make_embedding_service()
+        assert loaded.load_index(filepath)
+        
+        # The NumPy index uses the mapped file as its storage
+        assert isinstance(loaded._index._vectors, np.memmap)
+        assert all(chunk._content is None for chunk in loaded._chunks[:10])
+        assert_consistent(loaded, chunks)
+        assert [chunk.content for chunk in loaded._chunks] == [chunk.content for chunk in chunks]
+        
+        query = embedding_service._chunk_text(chunks[4])
+        assert [r.index for r in loaded.search(query, k=3)] == [r.index for r in embedding_service.search(query, k=3)]
+    
+    def test_faiss_index_is_saved_without_a_vector_matrix(self, make_embedding_service, make_chunk, tmp_path):
+        """Test that FAISS indexes hold the only copy of the vectors, in memory and on disk."""
+        pytest.importorskip("faiss")
+        service = make_embedding_service(index_type='hnsw')
+        chunks = [make_chunk(i, f) for f in range(3) for i in range(5)]
+        service.build_index(chunks)
+        filepath = str(tmp_path / "code")
+        
+        assert service.save_index(filepath)
+        assert (tmp_path / "code.faiss").exists()
+        assert not (tmp_path / "code.vectors.npy").exists()
+        
+        loaded = make_embedding_service(index_type='hnsw')
+        assert loaded.load_index(filepath)
+        assert_consistent(loaded, chunks)
+        query = service._chunk_text(chunks[4])
+        assert loaded.search(query, k=1)[0].chunk == chunks[4]
+    
+    def test_loaded_index_detects_edited_sources(self, embedding_service, source_chunks, tmp_path):
+        """Test that a chunk whose source changed after saving is re-embedded on update."""
+        embedding_service.build_index(source_chunks)
+        filepath = str(tmp_path / "code")
+        embedding_service.save_index(filepath)
+        assert embedding_service.load_index(filepath)
+        
+        source = tmp_path / "device.c"
+        source.write_text(source.read_text().replace("return 0;", "return -1;"))
+        edited = [
+            CodeChunk(**dict(vars(chunk), content=chunk.content.replace("return 0;", "return -1;")))
+            for chunk in source_chunks
+        ]
+        
+        assert embedding_service._chunks[0] != edited[0]
+        assert embedding_service._chunks[1] == edited[1]
+        
+        embedding_service._model.encoded.clear()
+        assert embedding_service.update_chunks(edited[:-1])
+        
+        assert embedding_service._model.encoded == [embedding_service._chunk_text(edited[0])]
+        assert_consistent(embedding_service, edited[:-1])
@@ -0,0 +1,118 @@
+"""
+Unit tests for lazy, shared embedding model loading.
+"""
+
+import threading
+import time
+import pytest
+import numpy as np
+from unittest.mock import patch
+
+from medical_analyzer.llm.embedding_models import (
+    get_embedding_model, register_embedding_model,
+    loaded_embedding_models, release_embedding_models
+)
+from medical_analyzer.llm.embedding_service import EmbeddingService
+
+
+class SlowModel:
+    """Model that records batch sizes and detects concurrent encode calls."""
+    
+    def __init__(self):
+        self.batch_sizes = []
+        self.active = 0
+        self.overlapped = False
+    
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.active += 1
+        self.overlapped |= self.active > 1
+        time.sleep(0.005)
+        self.batch_sizes.append(batch_size)
+        self.active -= 1
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float64)
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    release_embedding_models()
+    yield
+    release_embedding_models()
+
+
+class TestEmbeddingModelRegistry:
+    """Test cases for the process-wide embedding model registry."""
+    
+    def test_service_does_not_load_model_until_first_use(self, tmp_path):
+        """Test that creating a service loads nothing and checking availability loads once."""
+        with patch('medical_analyzer.llm.embedding_service.get_embedding_model') as get_model:
+            service = EmbeddingService(model_name="lazy-model", cache_dir=str(tmp_path))
+            get_model.assert_not_called()
+            assert service._model is None
+            
+            assert service.is_available()
+            assert service.is_available()
+        
+        get_model.assert_called_once()
+    
+    def test_is_available_attempts_the_load(self, tmp_path):
+        """Test that availability reflects an attempted load, not just an installed package."""
+        with patch('medical_analyzer.llm.embedding_service.get_embedding_model',
+                   side_effect=OSError("model download failed")) as get_model:
+            service = EmbeddingService(model_name="offline-model", cache_dir=str(tmp_path))
+            
+            assert not service.is_available()
+            assert not service.is_available()
+        
+        get_model.assert_called_once()
+    
+    def test_services_share_one_model(self, tmp_path):
+        """Test that services with the same model name use one loaded instance."""
+        shared = register_embedding_model("shared-model", SlowModel())
+        first = EmbeddingService(model_name="shared-model", cache_dir=str(tmp_path / "a"))
+        second = EmbeddingService(model_name="shared-model", cache_dir=str(tmp_path / "b"))
+        
+        assert first._get_model() is shared
+        assert second._get_model() is shared
+        assert get_embedding_model("shared-model") is shared
+        assert loaded_embedding_models() == [("shared-model", None)]
+    
+    def test_encode_is_serialized_and_uses_batch_size(self, tmp_path):
+        """Test that concurrent encode calls on a shared model never overlap."""
+        model = SlowModel()
+        register_embedding_model("threaded-model", model)
+        service = EmbeddingService(model_name="threaded-model", cache_dir=str(tmp_path),
+                                   use_embedding_cache=False, batch_size=7)
+        
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(service.embed_texts([f"text {i}", "x" * i])))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert not model.overlapped
+        assert model.batch_sizes == [7] * 8
+        assert len(results) == 8
+        assert all(vector.dtype == np.float32 for vectors in results for vector in vectors)
+    
+    def test_unknown_quantization_is_rejected(self, tmp_path):
+        """Test that misspelled quantization modes fail early."""
+        with pytest.raises(ValueError):
+            EmbeddingService(cache_dir=str(tmp_path), quantization="int4")
+        with pytest.raises(ValueError):
+            get_embedding_model("any-model", quantization="int4")
+    
+    def test_failed_load_makes_service_unavailable(self, tmp_path):
+        """Test that a model that cannot be loaded is not retried on every call."""
+        with patch('medical_analyzer.llm.embedding_service.get_embedding_model',
+                   side_effect=ImportError("missing")) as get_model:
+            service = EmbeddingService(model_name="missing-model", cache_dir=str(tmp_path))
+            
+            assert service.embed_text("a") is None
+            assert service.embed_texts(["b"]) == []
+        
+        assert get_model.call_count == 1
+        assert not service.is_available()
@@ -13,6 +13,7 @@ import numpy as np
 from unittest.mock import Mock, patch, MagicMock
 
 from medical_analyzer.llm.embedding_service import EmbeddingService, EmbeddingResult
+from medical_analyzer.llm.embedding_models import release_embedding_models
 from medical_analyzer.models.core import CodeChunk
 from medical_analyzer.models.enums import ChunkType
 
@@ -24,6 +25,8 @@ class TestEmbeddingService:
         """Test initialization when sentence-transformers is not available."""
         with patch('medical_analyzer.llm.embedding_service.logger') as mock_logger:
             with patch('sentence_transformers.SentenceTransformer', side_effect=ImportError("No module")):
+                # Make sure the load is really attempted, not served from the shared registry
+                release_embedding_models()
                 service = EmbeddingService()
                 
                 assert not service.is_available()
@@ -111,13 +114,13 @@ class TestEmbeddingService:
         # Simulate having some data
         service._chunks = [Mock()]
         service._index = Mock()
-        service._embeddings = np.array([[1, 2, 3]])
+        service._chunk_ids = [1]
         
         service.clear_index()
         
         assert service._chunks == []
         assert service._index is None
-        assert service._embeddings is None
+        assert service._chunk_ids == []
     
     def test_get_chunk_by_index(self):
         """Test getting chunk by index."""
@@ -171,7 +174,8 @@ class TestEmbeddingServiceWithMocks:
         service = EmbeddingService(model_name="all-MiniLM-L6-v2")
         # In our test environment, dependencies are available
         assert service.is_available()
-        assert service._model is not None
+        # The model is loaded on first use
+        assert service._get_model() is not None
     
     def test_embed_text_success(self):
         """Test successful text embedding."""
@@ -252,7 +256,7 @@ class TestEmbeddingServiceWithMocks:
         assert result is True
         assert service._index is not None
         assert len(service._chunks) == 2
-        assert service._embeddings is not None
+        assert len(service.stored_vectors()) == 2
     
     def test_build_index_no_embeddings(self):
         """Test index building when no embeddings are generated."""
@@ -360,8 +364,12 @@ class TestEmbeddingServiceWithMocks:
             result = service.save_index(filepath)
             
             assert result is True
-            assert os.path.exists(f"{filepath}.faiss")
-            assert os.path.exists(f"{filepath}.pkl")
+            # Only FAISS index types write a .faiss file
+            assert os.path.exists(f"{filepath}.faiss") == (service._index.index_type != 'numpy')
+            assert os.path.exists(f"{filepath}.chunks.db")
+            # FAISS index types hold their own vectors
+            assert os.path.exists(f"{filepath}.vectors.npy") == (service._index.index_type == 'numpy')
+            assert not os.path.exists(f"{filepath}.pkl")
     
     def test_load_index_success(self):
         """Test successful index loading."""
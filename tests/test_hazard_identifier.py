@@ -6,7 +6,7 @@ Tests hazard identification functionality from Software Requirements.
 
 import pytest
 import json
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 from datetime import datetime
 
 from medical_analyzer.services.hazard_identifier import HazardIdentifier
@@ -470,4 +470,92 @@ class TestHazardIdentifier:
         requirements = [self.create_sample_requirement("SR_001", "Test requirement")]
         
         with pytest.raises(LLMError):
-            identifier._identify_hazards_for_batch(requirements, "Test project")
\ No newline at end of file
+            identifier._identify_hazards_for_batch(requirements, "Test project")
+    
+    def test_plan_batches_respects_token_budget(self):
+        """Test that batch sizes follow the model context length and requirement lengths."""
+        short_requirements = [
+            self.create_sample_requirement(f"SR_{i:03d}", "The system shall log events")
+            for i in range(10)
+        ]
+        batches = self.identifier._plan_batches(short_requirements)
+        assert len(batches) == 1
+        assert len(batches[0]) == 10
+        
+        long_text = "The system shall validate every infusion parameter. " * 60
+        long_requirements = [
+            self.create_sample_requirement(f"SR_{i:03d}", long_text)
+            for i in range(6)
+        ]
+        batches = self.identifier._plan_batches(long_requirements)
+        assert len(batches) > 1
+        assert [req.id for batch in batches for req in batch] == [req.id for req in long_requirements]
+    
+    def test_plan_batches_respects_max_batch_size(self):
+        """Test that batches never exceed the configured maximum size."""
+        identifier = HazardIdentifier(self.mock_llm, max_batch_size=4)
+        requirements = [
+            self.create_sample_requirement(f"SR_{i:03d}", "The system shall log events")
+            for i in range(10)
+        ]
+        
+        batches = identifier._plan_batches(requirements)
+        
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+    
+    def test_identify_hazards_concurrent_batches(self):
+        """Test that concurrently processed batches keep deterministic ordering."""
+        hazard_response = json.dumps([{
+            "hazard": "Data validation failure",
+            "cause": "Insufficient input checking",
+            "effect": "System processes invalid data",
+            "severity": "Minor",
+            "probability": "Low",
+            "confidence": 0.7
+        }])
+        self.mock_llm.responses = {"SR_": hazard_response}
+        
+        identifier = HazardIdentifier(self.mock_llm, max_concurrent_batches=3, max_batch_size=2)
+        requirements = [
+            self.create_sample_requirement(f"SR_{i:03d}", "The system shall validate user input")
+            for i in range(6)
+        ]
+        
+        result = identifier.identify_hazards(requirements)
+        
+        assert self.mock_llm.call_count == 3
+        assert result.metadata['batch_count'] == 3
+        assert result.requirements_processed == 6
+        assert [risk.id for risk in result.risk_items] == ["RISK_0001", "RISK_0002", "RISK_0003"]
+        assert [risk.related_requirements[0] for risk in result.risk_items] == ["SR_000", "SR_002", "SR_004"]
+    
+    def test_identify_hazards_batch_error_is_isolated(self):
+        """Test that a failing batch does not prevent other batches from completing."""
+        class PartiallyFailingBackend(MockLLMBackend):
+            def generate(self, prompt, **kwargs):
+                if "SR_000" in prompt:
+                    raise LLMError("Fatal error", recoverable=False)
+                return super().generate(prompt, **kwargs)
+        
+        identifier = HazardIdentifier(PartiallyFailingBackend(), max_batch_size=1)
+        requirements = [
+            self.create_sample_requirement(f"SR_{i:03d}", "The system shall validate user input")
+            for i in range(3)
+        ]
+        
+        result = identifier.identify_hazards(requirements)
+        
+        assert result.requirements_processed == 2
+        assert len(result.errors) == 1
+        assert "batch 1" in result.errors[0]
+    
+    def test_identify_hazards_reports_batch_planning_errors(self):
+        """Test that an error while planning batches is reported instead of raising."""
+        requirements = [self.create_sample_requirement("SR_000", "The system shall validate user input")]
+        
+        with patch.object(self.identifier, '_plan_batches', side_effect=ValueError("no token budget")):
+            result = self.identifier.identify_hazards(requirements)
+        
+        assert result.risk_items == []
+        assert "no token budget" in result.errors[0]
+        assert result.metadata['batch_count'] == 0
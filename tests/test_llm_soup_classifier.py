@@ -0,0 +1,66 @@
+"""
+Unit tests for the persistent SOUP classification cache.
+"""
+
+import pytest
+
+from medical_analyzer.database.schema import DatabaseManager
+from medical_analyzer.models.soup_models import (
+    DetectedSOUPComponent, DetectionMethod, IEC62304Classification, IEC62304SafetyClass
+)
+from medical_analyzer.services.llm_soup_classifier import SOUPClassificationCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a classification cache on a temporary database."""
+    manager = DatabaseManager(str(tmp_path / "test.db"))
+    yield SOUPClassificationCache(manager)
+    manager.close()
+
+
+def make_component(name, version, package_manager="npm"):
+    """Create a detected component for testing."""
+    return DetectedSOUPComponent(
+        name=name,
+        version=version,
+        source_file="package.json",
+        detection_method=DetectionMethod.PACKAGE_JSON,
+        confidence=0.9,
+        package_manager=package_manager
+    )
+
+
+def make_classification(safety_class):
+    """Create a classification for testing."""
+    return IEC62304Classification(
+        safety_class=safety_class,
+        justification="Test justification",
+        risk_assessment="Test risk assessment"
+    )
+
+
+class TestSOUPClassificationCache:
+    """Test cases for SOUPClassificationCache."""
+    
+    def test_get_many_matches_the_full_key(self, cache):
+        """Test that only components with the same manager, name and version are hits."""
+        cache.put_many([
+            (make_component("lodash", "4.17.21"), make_classification(IEC62304SafetyClass.CLASS_A)),
+            (make_component("lodash", "4.17.20"), make_classification(IEC62304SafetyClass.CLASS_B)),
+            (make_component("requests", "2.31.0", "pip"), make_classification(IEC62304SafetyClass.CLASS_C)),
+        ])
+        components = [
+            make_component("lodash", "4.17.21"),
+            make_component("lodash", "4.17.19"),
+            make_component("lodash", "4.17.21", "yarn"),
+            make_component("requests", "2.31.0", "PIP"),
+        ] + [make_component(f"package-{i}", "1.0.0") for i in range(1000)]
+        
+        found = cache.get_many(components)
+        
+        assert set(found) == {("npm", "lodash", "4.17.21"), ("pip", "requests", "2.31.0")}
+        assert found[("npm", "lodash", "4.17.21")].safety_class == IEC62304SafetyClass.CLASS_A
+        assert cache.get(make_component("lodash", "4.17.20")).safety_class == IEC62304SafetyClass.CLASS_B
+        assert cache.get_many([]) == {}
+
@@ -0,0 +1,149 @@
+"""
+Unit tests for analysis result serialization.
+"""
+
+import gzip
+import json
+import pytest
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+from medical_analyzer.utils import result_serialization
+from medical_analyzer.utils.result_serialization import (
+    dumps_results, loads_results, save_results, load_results,
+    save_sectioned_results, open_results, LazyResults
+)
+from medical_analyzer.services.traceability_models import TraceabilityMatrix
+from medical_analyzer.models.core import (
+    TraceabilityLink, CodeReference, Requirement, RequirementType
+)
+
+
+@pytest.fixture
+def results():
+    """Create results mixing plain data with model dataclasses."""
+    links = [
+        TraceabilityLink(id="1", source_type="feature", source_id="F1", target_type="requirement",
+                         target_id="UR_1", link_type="derives_to", confidence=0.9)
+    ]
+    matrix = TraceabilityMatrix(
+        analysis_run_id=7, links=links, code_to_requirements={},
+        user_to_software_requirements={"UR_1": ["SR_1"]}, requirements_to_risks={},
+        metadata={"total_links": 1}, created_at=datetime(2024, 5, 1, 12, 30)
+    )
+    matrix.rebuild_indexes()
+    return {
+        "project_path": Path("/projects/pump"),
+        "requirements": [
+            Requirement(
+                id="UR_1", type=RequirementType.USER, text="Deliver the programmed dose",
+                derived_from=["F1"],
+                code_references=[CodeReference(file_path="pump.c", start_line=1, end_line=9)]
+            )
+        ],
+        "traceability": {"matrix": matrix, "tags": {"safety"}},
+        "counts": {1: "one"},
+        "analysis_stages": {
+            "project_ingestion": {"total_files": 2, "file_types": {".c": 2}, "files": ["a.c", "b.c"]}
+        }
+    }
+
+
+class TestResultSerialization:
+    """Test cases for result serialization."""
+    
+    def test_round_trip_encodes_model_dataclasses(self, results):
+        """Test that dataclasses, enums, datetimes and paths become plain JSON values."""
+        decoded = loads_results(dumps_results(results))
+        
+        assert decoded["project_path"] == "/projects/pump"
+        requirement = decoded["requirements"][0]
+        assert requirement["type"] == RequirementType.USER.value
+        assert requirement["code_references"][0]["file_path"] == "pump.c"
+        
+        matrix = decoded["traceability"]["matrix"]
+        assert matrix["created_at"] == "2024-05-01T12:30:00"
+        assert matrix["links"][0]["target_id"] == "UR_1"
+        # Private index fields are not written
+        assert not any(key.startswith("_") for key in matrix)
+        assert decoded["traceability"]["tags"] == ["safety"]
+        assert decoded["counts"] == {"1": "one"}
+    
+    def test_stdlib_fallback_matches_orjson(self, results):
+        """Test that the json fallback produces the same document."""
+        with patch.object(result_serialization, 'ORJSON_AVAILABLE', False):
+            data = dumps_results(results)
+            decoded = loads_results(data)
+        
+        assert b"\n" not in data
+        assert decoded == loads_results(dumps_results(results))
+    
+    def test_save_and_load_compressed(self, results, tmp_path):
+        """Test that compressed files are detected on load and saves leave no temp files."""
+        plain = save_results(results, tmp_path / "run.json")
+        packed = save_results(results, tmp_path / "run.json.gz", compress=True)
+        
+        with open(packed, "rb") as f:
+            assert json.loads(gzip.decompress(f.read()))["requirements"][0]["id"] == "UR_1"
+        assert load_results(packed) == load_results(plain)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["run.json", "run.json.gz"]
+    
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_sectioned_results_load_sections_on_demand(self, results, tmp_path, compress):
+        """Test that opening a sectioned file only decodes the sections that are accessed."""
+        path = save_sectioned_results(results, tmp_path / "run.results", compress=compress)
+        
+        with patch.object(LazyResults, '_load_section', autospec=True,
+                          side_effect=LazyResults._load_section) as load_section:
+            stored = open_results(path)
+            
+            assert isinstance(stored, LazyResults)
+            assert list(stored) == list(results)
+            assert "requirements" in stored and "missing" not in stored
+            assert load_section.call_count == 0
+            
+            assert stored["requirements"][0]["id"] == "UR_1"
+            assert stored.get("requirements") is stored["requirements"]
+            assert load_section.call_count == 1
+            assert not stored.is_loaded("traceability")
+        
+        # The summary log overview keeps per-stage counts without the stage data
+        assert stored.stage_overview == {
+            "project_ingestion": {"total_files": 2, "file_types": {".c": 2}}
+        }
+        assert stored.load_all() == loads_results(dumps_results(results))
+        assert load_results(path) == stored
+    
+    def test_sectioned_results_accept_updates(self, results, tmp_path):
+        """Test that assigned sections replace stored ones and survive a re-save."""
+        stored = open_results(save_sectioned_results(results, tmp_path / "run.results"))
+        
+        stored["soup"] = []
+        stored["requirements"] = []
+        del stored["counts"]
+        
+        assert len(stored) == len(results)
+        assert stored["requirements"] == []
+        resaved = load_results(save_sectioned_results(stored, tmp_path / "copy.results"))
+        assert resaved["soup"] == [] and "counts" not in resaved
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_nested_lazy_results_are_encoded_completely(self, results, tmp_path, use_orjson):
+        """Test that stored results inside another document keep their unloaded sections."""
+        if use_orjson and not result_serialization.ORJSON_AVAILABLE:
+            pytest.skip("orjson not installed")
+        stored = open_results(save_sectioned_results(results, tmp_path / "run.results"))
+        assert stored["counts"]
+        
+        with patch.object(result_serialization, 'ORJSON_AVAILABLE', use_orjson):
+            decoded = loads_results(dumps_results({"previous": stored}))
+        
+        assert not isinstance(stored, dict)
+        assert decoded["previous"] == loads_results(dumps_results(results))
+    
+    def test_open_results_reads_single_document_files(self, results, tmp_path):
+        """Test that files written before sectioning are still opened."""
+        path = save_results(results, tmp_path / "run.json")
+        
+        assert open_results(path) == load_results(path)
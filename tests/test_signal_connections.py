@@ -5,10 +5,12 @@ This test module verifies that all required signals are properly connected
 and that the analysis_requested signal issue is resolved.
 """
 
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import QObject, Qt, QThread, QTimer, pyqtSignal
 
 from medical_analyzer.ui.main_window import MainWindow
 from medical_analyzer.services.analysis_orchestrator import AnalysisOrchestrator
@@ -311,6 +313,99 @@ class TestSignalConnections(DeterministicTestMixin):
                 )
 
 
+class AnalysisRequester(QObject):
+    """Emits analysis requests from the test (main) thread."""
+    requested = pyqtSignal(str, str, list)
+
+
+class TestAnalysisWorkerThread:
+    """Test the orchestrator running on a worker thread."""
+    
+    @pytest.fixture
+    def orchestrator(self):
+        """Create an orchestrator whose first two stages are stubbed."""
+        config_manager = Mock(spec=ConfigManager)
+        config_manager.get_llm_config.return_value = {}
+        with patch('medical_analyzer.services.analysis_orchestrator.DatabaseManager'):
+            with patch('medical_analyzer.services.analysis_orchestrator.LLMBackend'):
+                orchestrator = AnalysisOrchestrator(config_manager, Mock(spec=AppSettings))
+        orchestrator.project_persistence = Mock()
+        orchestrator.project_persistence.load_project_by_path.return_value = None
+        orchestrator._stage_project_ingestion = lambda: {}
+        return orchestrator
+    
+    def test_progress_within_a_stage_is_throttled(self, orchestrator):
+        """Test that per-item progress is rate limited but always reports the last item."""
+        emitted = []
+        orchestrator.progress_updated.connect(emitted.append)
+        orchestrator.PROGRESS_INTERVAL = 3600
+        orchestrator._set_progress(20)
+        orchestrator._stage_progress_range = (20, 40)
+        
+        for done in range(1, 1001):
+            orchestrator._report_stage_progress(done, 1000)
+        
+        assert emitted == [20, 40]
+    
+    def test_cancel_from_main_thread_stops_worker_between_items(self, app, qtbot, orchestrator):
+        """Test that a queued analysis runs off the main thread and stops promptly when cancelled."""
+        started = threading.Event()
+        worker_threads = []
+        
+        def slow_parsing():
+            worker_threads.append(threading.current_thread())
+            for done in range(1, 10001):
+                started.set()
+                time.sleep(0.001)
+                orchestrator._report_stage_progress(done, 10000)
+            return {}
+        
+        orchestrator._stage_code_parsing = slow_parsing
+        orchestrator._stage_feature_extraction = Mock()
+        stage_failures = []
+        orchestrator.stage_failed.connect(lambda stage, error: stage_failures.append(stage))
+        
+        thread = QThread()
+        orchestrator.moveToThread(thread)
+        thread.start()
+        requester = AnalysisRequester()
+        requester.requested.connect(orchestrator.start_analysis)
+        try:
+            with qtbot.waitSignal(orchestrator.analysis_cancelled, timeout=10000):
+                requester.requested.emit("/test/project", "", [])
+                assert started.wait(5)
+                orchestrator.cancel_analysis()
+        finally:
+            thread.quit()
+            thread.wait()
+        
+        assert worker_threads and worker_threads[0] is not threading.main_thread()
+        assert not orchestrator.is_running
+        orchestrator._stage_feature_extraction.assert_not_called()
+        assert stage_failures == []
+    
+    def test_cancel_before_worker_starts_is_kept(self, app, qtbot, orchestrator):
+        """Test that a cancellation between the request and the queued start stops the analysis."""
+        orchestrator._stage_project_ingestion = Mock(return_value={})
+        
+        thread = QThread()
+        orchestrator.moveToThread(thread)
+        requester = AnalysisRequester()
+        requester.requested.connect(orchestrator.mark_analysis_pending, Qt.ConnectionType.DirectConnection)
+        requester.requested.connect(orchestrator.start_analysis)
+        try:
+            with qtbot.waitSignal(orchestrator.analysis_cancelled, timeout=10000):
+                requester.requested.emit("/test/project", "", [])
+                orchestrator.cancel_analysis()
+                thread.start()
+        finally:
+            thread.quit()
+            thread.wait()
+        
+        orchestrator._stage_project_ingestion.assert_not_called()
+        assert not orchestrator.is_running
+
+
 class TestSignalConnectionIntegration:
     """Integration tests for signal connections in the full application context."""
     
@@ -12,6 +12,7 @@ Tests cover:
 import pytest
 import tempfile
 import os
+import json
 from pathlib import Path
 from unittest.mock import Mock, patch, mock_open
 from medical_analyzer.services.soup_detector import SOUPDetector
@@ -573,6 +574,137 @@ dependencies {
                 os.unlink(f.name)
 
 
+    def test_parse_package_lock_json(self, detector):
+        """Test streaming parse of a v3 package-lock.json."""
+        lock_content = {
+            "name": "app",
+            "lockfileVersion": 3,
+            "packages": {
+                "": {"name": "app", "dependencies": {"lodash": "^4.17.0"}},
+                "node_modules/lodash": {"version": "4.17.21", "license": "MIT", "integrity": "sha512-abc"},
+                "node_modules/@babel/core": {"version": "7.1.0", "dev": True},
+                "node_modules/ws": {"resolved": "packages/ws", "link": True}
+            }
+        }
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lock_file = Path(temp_dir) / 'package-lock.json'
+            lock_file.write_text(json.dumps(lock_content))
+            
+            components = detector.parsers['package-lock.json'].parse(lock_file)
+            
+            assert [c.name for c in components] == ['lodash', '@babel/core']
+            lodash = components[0]
+            assert lodash.version == '4.17.21'
+            assert lodash.license == 'MIT'
+            assert lodash.detection_method == DetectionMethod.PACKAGE_LOCK_JSON
+            assert lodash.metadata['integrity'] == 'sha512-abc'
+            assert components[1].metadata['dependency_type'] == 'devDependencies'
+    
+    def test_parse_package_lock_json_small_chunks(self, detector):
+        """Test that lockfile parsing does not depend on read chunk boundaries."""
+        lock_content = json.dumps({
+            "lockfileVersion": 1,
+            "dependencies": {
+                "a": {"version": "1.0.0", "dependencies": {"b": {"version": "2.0.0-rc.1"}}}
+            }
+        })
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lock_file = Path(temp_dir) / 'package-lock.json'
+            lock_file.write_text(lock_content)
+            
+            parser = detector.parsers['package-lock.json']
+            with patch.object(parser, 'CHUNK_SIZE', 3):
+                components = parser.parse(lock_file)
+            
+            assert sorted((c.name, c.version) for c in components) == [('a', '1.0.0'), ('b', '2.0.0-rc.1')]
+    
+    def test_parse_yarn_lock(self, detector):
+        """Test parsing Yarn classic and Berry lockfiles."""
+        yarn_content = '''# yarn lockfile v1
+
+
+"@babel/core@^7.0.0", "@babel/core@^7.1.0":
+  version "7.1.0"
+  resolved "https://registry.yarnpkg.com/@babel/core/-/core-7.1.0.tgz"
+  integrity sha512-abc
+
+"app@workspace:.":
+  version: 0.0.0-use.local
+
+lodash@npm:^4.17.0:
+  version: 4.17.21
+  checksum: def
+'''
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lock_file = Path(temp_dir) / 'yarn.lock'
+            lock_file.write_text(yarn_content)
+            
+            components = detector.parsers['yarn.lock'].parse(lock_file)
+            
+            assert [(c.name, c.version) for c in components] == [('@babel/core', '7.1.0'), ('lodash', '4.17.21')]
+            assert components[0].metadata['integrity'] == 'sha512-abc'
+            assert components[1].metadata['integrity'] == 'def'
+    
+    def test_parse_pnpm_lock(self, detector):
+        """Test parsing pnpm-lock.yaml package keys."""
+        pnpm_content = '''lockfileVersion: '6.0'
+
+dependencies:
+  lodash:
+    specifier: ^4.17.0
+    version: 4.17.21
+
+packages:
+
+  /@babel/core@7.1.0(supports-color@5.0.0):
+    resolution: {integrity: sha512-abc}
+    dev: true
+
+  /lodash@4.17.21:
+    resolution: {integrity: sha512-def}
+    dev: false
+'''
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lock_file = Path(temp_dir) / 'pnpm-lock.yaml'
+            lock_file.write_text(pnpm_content)
+            
+            components = detector.parsers['pnpm-lock.yaml'].parse(lock_file)
+            
+            assert [(c.name, c.version) for c in components] == [('@babel/core', '7.1.0'), ('lodash', '4.17.21')]
+            assert components[0].metadata['dependency_type'] == 'devDependencies'
+            assert components[1].metadata['integrity'] == 'sha512-def'
+    
+    def test_deduplication_keeps_each_version(self, detector):
+        """Test that versions of one package stay separate records with their own lockfile details."""
+        def lock_entry(version, source_file, integrity):
+            return DetectedSOUPComponent(
+                name="a", version=version, source_file=source_file,
+                detection_method=DetectionMethod.PACKAGE_LOCK_JSON, confidence=0.98,
+                metadata={'resolved': f"https://registry.npmjs.org/a/-/a-{version}.tgz",
+                          'integrity': integrity, 'lockfile_path': source_file}
+            )
+        components = [
+            lock_entry("1.0.0", "/a/package-lock.json", "sha512-AAA"),
+            lock_entry("2.0.0", "/a/package-lock.json", "sha512-BBB"),
+            lock_entry("1.0.0", "/b/package-lock.json", "sha512-AAA"),
+        ]
+        
+        deduplicated = detector._deduplicate_components(components)
+        
+        assert [(c.name, c.version) for c in deduplicated] == [("a", "1.0.0"), ("a", "2.0.0")]
+        first, second = deduplicated
+        assert first.metadata['resolved'].endswith("a-1.0.0.tgz")
+        assert first.metadata['integrity'] == "sha512-AAA"
+        assert first.metadata['lockfile_path'] == "/a/package-lock.json"
+        assert first.metadata['source_files'] == ["/a/package-lock.json", "/b/package-lock.json"]
+        assert second.metadata['integrity'] == "sha512-BBB"
+        assert 'source_files' not in second.metadata
+
+
 class TestSOUPDetectorEdgeCases:
     """Test edge cases and error handling."""
     
@@ -661,4 +793,55 @@ class TestSOUPDetectorEdgeCases:
             
             flask_comp = next((c for c in components if c.name == 'flask'), None)
             assert flask_comp is not None
-            assert 'backend' in flask_comp.source_file
\ No newline at end of file
+            assert 'backend' in flask_comp.source_file
+    
+    def test_detect_skips_excluded_directories(self, detector):
+        """Test that dependency files inside excluded directories are ignored."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            import json
+            with open(os.path.join(temp_dir, 'package.json'), 'w') as f:
+                json.dump({"dependencies": {"express": "^4.18.0"}}, f)
+            
+            # Vendored and build directories that must not be scanned
+            for excluded in ('node_modules/lodash', '.git/hooks', 'build/vendor'):
+                excluded_dir = os.path.join(temp_dir, excluded)
+                os.makedirs(excluded_dir)
+                with open(os.path.join(excluded_dir, 'package.json'), 'w') as f:
+                    json.dump({"dependencies": {"left-pad": "1.0.0"}}, f)
+            
+            dependency_files = detector._find_dependency_files(Path(temp_dir))
+            components = detector.detect_soup_components(temp_dir)
+            
+            assert [path.name for path, _ in dependency_files] == ['package.json']
+            assert [c.name for c in components] == ['express']
+    
+    def test_find_dependency_files_matches_excluded_names_whole(self, detector):
+        """Test that directories merely containing an excluded name are still scanned."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ('checkout', 'routes', 'layout', 'out'):
+                os.makedirs(os.path.join(temp_dir, name))
+                with open(os.path.join(temp_dir, name, 'requirements.txt'), 'w') as f:
+                    f.write('')
+            
+            dependency_files = detector._find_dependency_files(Path(temp_dir))
+            
+            assert sorted(path.parent.name for path, _ in dependency_files) == ['checkout', 'layout', 'routes']
+    
+    def test_find_dependency_files_single_walk_order(self, detector):
+        """Test that all manifest types are found in parser registration order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            nested_dir = os.path.join(temp_dir, 'services', 'api')
+            os.makedirs(nested_dir)
+            for path in (os.path.join(nested_dir, 'requirements.txt'),
+                         os.path.join(temp_dir, 'requirements.txt'),
+                         os.path.join(temp_dir, 'Cargo.toml'),
+                         os.path.join(nested_dir, 'package.json')):
+                with open(path, 'w') as f:
+                    f.write('')
+            
+            dependency_files = detector._find_dependency_files(Path(temp_dir))
+            
+            assert [path.name for path, _ in dependency_files] == [
+                'package.json', 'requirements.txt', 'requirements.txt', 'Cargo.toml'
+            ]
+            assert isinstance(dependency_files[0][1], type(detector.parsers['package.json']))
@@ -7,13 +7,14 @@ import pytest
 import tempfile
 import os
 import json
+import threading
 import zipfile
 from datetime import datetime
 from unittest.mock import Mock, patch
 
 from medical_analyzer.models.core import SOUPComponent
 from medical_analyzer.services.soup_service import SOUPService
-from medical_analyzer.services.export_service import ExportService
+from medical_analyzer.services.export_service import ExportService, ZipBundleWriter
 from medical_analyzer.database.schema import DatabaseManager
 
 
@@ -496,3 +497,74 @@ class TestSOUPManagementAndExport:
                     content = f.read().decode('utf-8')
                     assert 'No SOUP components have been added' in content
                     assert 'SOUP inventory was checked but found empty' in content
+    
+    def test_export_streams_into_zip_with_compression_level(self, export_service, sample_analysis_results):
+        """Test that the bundle is written straight into the zip at the requested compression level."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bundle_path = export_service.create_comprehensive_export(
+                analysis_results=sample_analysis_results,
+                project_name="Test Medical Device",
+                project_path="/path/to/project",
+                output_dir=temp_dir,
+                compression_level=9
+            )
+            
+            # No staging directory is left next to the bundle
+            assert os.listdir(temp_dir) == [os.path.basename(bundle_path)]
+            
+            with zipfile.ZipFile(bundle_path, 'r') as zipf:
+                assert zipf.testzip() is None
+                info = zipf.getinfo('tests/generated_tests/tests/unit/test_heart_rate.c')
+                assert info.compress_type == zipfile.ZIP_DEFLATED
+                assert zipf.read(info).decode('utf-8').startswith('#include <unity.h>')
+                
+                names = zipf.namelist()
+                assert len(names) == len(set(names))
+                # The audit log is written last so it records every artifact
+                assert names[-2:] == ['audit/audit_log.json', 'audit/audit_log.txt']
+                audit_actions = [entry['action'] for entry in json.loads(zipf.read('audit/audit_log.json'))]
+                assert {'requirements_exported', 'risk_register_exported', 'traceability_exported',
+                        'test_results_exported', 'soup_inventory_exported'} <= set(audit_actions)
+    
+    def test_bundle_entries_are_written_in_parallel(self):
+        """Test that an entry being written does not block other producers."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            release = threading.Event()
+            
+            def slow_producer(bundle):
+                with bundle.open_text("slow.txt") as f:
+                    f.write("first part\n")
+                    release.wait(5)
+                    f.write("second part\n")
+            
+            with ZipBundleWriter(os.path.join(temp_dir, "bundle.zip")) as bundle:
+                slow = threading.Thread(target=slow_producer, args=(bundle,))
+                slow.start()
+                fast = threading.Thread(target=bundle.write_json, args=("fast.json", {"done": True}))
+                fast.start()
+                fast.join(5)
+                
+                assert not fast.is_alive()
+                assert bundle.entries == ["fast.json"]
+                release.set()
+                slow.join(5)
+            
+            with zipfile.ZipFile(os.path.join(temp_dir, "bundle.zip")) as zipf:
+                assert zipf.namelist() == ["fast.json", "slow.txt"]
+                assert zipf.read("slow.txt").decode('utf-8') == "first part\nsecond part\n"
+                assert json.loads(zipf.read("fast.json")) == {"done": True}
+    
+    def test_export_failure_removes_partial_bundle(self, export_service, sample_analysis_results):
+        """Test that a failing artifact leaves no partial zip behind."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with patch.object(export_service, '_export_risk_register', side_effect=OSError("disk full")):
+                with pytest.raises(OSError, match="disk full"):
+                    export_service.create_comprehensive_export(
+                        analysis_results=sample_analysis_results,
+                        project_name="Test Medical Device",
+                        project_path="/path/to/project",
+                        output_dir=temp_dir
+                    )
+            
+            assert os.listdir(temp_dir) == []
+            assert export_service.audit_log[-1]['action'] == 'export_failed'
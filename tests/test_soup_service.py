@@ -5,6 +5,7 @@ Unit tests for SOUP service.
 import pytest
 import tempfile
 import os
+import sqlite3
 from datetime import datetime
 from unittest.mock import Mock, patch
 
@@ -230,6 +231,76 @@ class TestSOUPService:
         results = soup_service.search_components("NonexistentComponent")
         assert results == []
     
+    def test_search_components_fts_tracks_updates_and_deletes(self, soup_service):
+        """Test that the search index follows component updates and deletes."""
+        component = SOUPComponent(
+            id="comp1", name="zlib", version="1.2.13",
+            usage_reason="Test", safety_justification="Safe",
+            description="Compression library"
+        )
+        soup_service.add_component(component)
+        
+        assert [c.id for c in soup_service.search_components("compress")] == ["comp1"]
+        
+        component.description = "Deflate codec"
+        soup_service.update_component(component)
+        assert soup_service.search_components("compress") == []
+        assert [c.id for c in soup_service.search_components("DEFLATE")] == ["comp1"]
+        
+        soup_service.delete_component("comp1")
+        assert soup_service.search_components("Deflate") == []
+    
+    def test_search_components_short_and_quoted_queries(self, soup_service):
+        """Test queries below trigram length and with FTS syntax characters."""
+        soup_service.add_component(SOUPComponent(
+            id="comp1", name="Qt", version="6.5",
+            usage_reason="Test", safety_justification="Safe",
+            description='GUI toolkit "widgets"'
+        ))
+        
+        assert [c.id for c in soup_service.search_components("Qt")] == ["comp1"]
+        assert [c.id for c in soup_service.search_components('"widgets"')] == ["comp1"]
+        assert soup_service.search_components("AND OR") == []
+    
+    def test_add_components_bulk(self, soup_service):
+        """Test adding many components in one transaction."""
+        components = [
+            SOUPComponent(
+                id=f"bulk-{i}", name=f"package-{i:03d}", version="1.0",
+                usage_reason="Test", safety_justification="Safe"
+            )
+            for i in range(50)
+        ]
+        
+        component_ids = soup_service.add_components_bulk(components, user="importer")
+        
+        assert component_ids == [f"bulk-{i}" for i in range(50)]
+        assert len(soup_service.get_all_components()) == 50
+        assert [c.id for c in soup_service.search_components("package-04")] == [f"bulk-{i}" for i in range(40, 50)]
+        
+        audit_trail = soup_service.get_component_audit_trail("bulk-7")
+        assert len(audit_trail) == 1
+        assert audit_trail[0].action == "created"
+        assert audit_trail[0].user == "importer"
+    
+    def test_add_components_bulk_is_atomic(self, soup_service, sample_component):
+        """Test that a failing bulk insert leaves the inventory unchanged."""
+        duplicate = SOUPComponent(
+            id=sample_component.id, name="Duplicate", version="1.0",
+            usage_reason="Test", safety_justification="Safe"
+        )
+        new_component = SOUPComponent(
+            id="new-id", name="New", version="1.0",
+            usage_reason="Test", safety_justification="Safe"
+        )
+        soup_service.add_component(sample_component)
+        
+        with pytest.raises(sqlite3.IntegrityError):
+            soup_service.add_components_bulk([new_component, duplicate])
+        
+        assert soup_service.get_component("new-id") is None
+        assert soup_service.get_component_audit_trail("new-id") == []
+    
     def test_get_components_by_criticality(self, soup_service):
         """Test getting components by criticality level."""
         high_comp = SOUPComponent(
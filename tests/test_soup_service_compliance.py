@@ -345,7 +345,8 @@ class TestSOUPServiceCompliance:
                 'soup_components',
                 'soup_classifications', 
                 'soup_version_changes',
-                'soup_audit_trail'
+                'soup_audit_trail',
+                'soup_classification_cache'
             ]
             
             for table in expected_tables:
@@ -370,4 +371,99 @@ class TestSOUPServiceCompliance:
         assert isinstance(classification.documentation_requirements, list)
         assert isinstance(classification.change_control_requirements, list)
         assert isinstance(classification.created_at, datetime)
-        assert isinstance(classification.updated_at, datetime)
\ No newline at end of file
+        assert isinstance(classification.updated_at, datetime)
+    
+    def test_add_components_with_classification_bulk(self, soup_service, sample_detected_component):
+        """Test bulk import of detected components with classification and audit entries."""
+        invalid_component = DetectedSOUPComponent(
+            name="",
+            version="1.0",
+            source_file="package.json",
+            detection_method=DetectionMethod.PACKAGE_JSON,
+            confidence=0.9
+        )
+        second_component = DetectedSOUPComponent(
+            name="lodash",
+            version="4.17.21",
+            source_file="package-lock.json",
+            detection_method=DetectionMethod.PACKAGE_LOCK_JSON,
+            confidence=0.98
+        )
+        
+        component_ids, errors = soup_service.add_components_with_classification_bulk(
+            [sample_detected_component, invalid_component, second_component], "test_user"
+        )
+        
+        assert len(component_ids) == 2
+        assert len(errors) == 1
+        
+        component = soup_service.get_component(component_ids[1])
+        assert component.name == "lodash"
+        assert soup_service.get_component_classification(component_ids[1]) is not None
+        
+        audit_trail = soup_service.get_component_audit_trail(component_ids[0])
+        assert len(audit_trail) == 1
+        assert audit_trail[0].action == "created_with_classification"
+        assert audit_trail[0].details["source_file"] == "requirements.txt"
+    
+    def test_classification_cache_round_trip(self, soup_service, sample_detected_component):
+        """Test that cached classifications are keyed by package manager, name and version."""
+        sample_detected_component.package_manager = "pip"
+        classification = IEC62304Classification(
+            safety_class=IEC62304SafetyClass.CLASS_C,
+            justification="Cryptographic library",
+            risk_assessment="Failure could expose patient data",
+            verification_requirements=["Security testing"]
+        )
+        classification.metadata = {"analysis_method": "llm_based"}
+        
+        soup_service.classification_cache.put(sample_detected_component, classification)
+        cached = soup_service.classification_cache.get(sample_detected_component)
+        
+        assert cached is not None
+        assert cached.safety_class == IEC62304SafetyClass.CLASS_C
+        assert cached.verification_requirements == ["Security testing"]
+        assert cached.metadata["cached"] is True
+        
+        other_version = DetectedSOUPComponent(
+            name="openssl", version="3.0.0", source_file="requirements.txt",
+            detection_method=DetectionMethod.REQUIREMENTS_TXT, confidence=0.95,
+            package_manager="pip"
+        )
+        assert soup_service.classification_cache.get(other_version) is None
+    
+    def test_batch_classification_uses_cache(self, soup_service):
+        """Test that batch classification only queries the LLM for cache misses."""
+        response = json.dumps({
+            "safety_class": "B",
+            "justification": "HTTP client library",
+            "risk_assessment": "Network failures may delay data transfer",
+            "confidence_score": 0.9
+        })
+        backend = Mock()
+        backend.generate.return_value = response
+        classifier = soup_service.llm_classifier
+        classifier.llm_backend = backend
+        
+        components = [
+            DetectedSOUPComponent(
+                name=f"package-{i}", version="1.0.0", source_file="package.json",
+                detection_method=DetectionMethod.PACKAGE_JSON, confidence=0.95,
+                package_manager="npm"
+            )
+            for i in range(5)
+        ]
+        # Duplicate dependency declared in another manifest
+        components.append(DetectedSOUPComponent(
+            name="package-0", version="1.0.0", source_file="packages/app/package.json",
+            detection_method=DetectionMethod.PACKAGE_JSON, confidence=0.95,
+            package_manager="npm"
+        ))
+        
+        first = classifier.batch_classify_components(components)
+        assert backend.generate.call_count == 5
+        assert [c.safety_class for c in first] == [IEC62304SafetyClass.CLASS_B] * 6
+        
+        second = classifier.batch_classify_components(components)
+        assert backend.generate.call_count == 5
+        assert all(c.metadata.get("cached") for c in second)
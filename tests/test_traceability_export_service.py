@@ -0,0 +1,132 @@
+"""
+Unit tests for the traceability export service.
+"""
+
+import re
+import pytest
+from unittest.mock import patch
+
+from medical_analyzer.services.traceability_export_service import TraceabilityExportService
+from medical_analyzer.services.traceability_models import TraceabilityTableRow, TraceabilityGap
+
+
+def make_rows(count):
+    """Create table rows; every third row is missing its user requirement."""
+    for i in range(count):
+        yield TraceabilityTableRow(
+            code_reference=f"src/module_{i}.c:{i}-{i + 5}",
+            file_path=f"src/module_{i}.c",
+            function_name=f"func_{i}",
+            feature_id=f"F{i % 10}",
+            feature_description=f"Feature {i % 10}",
+            user_requirement_id=f"UR_{i % 5}" if i % 3 else "",
+            user_requirement_text="User requirement",
+            software_requirement_id=f"SR_{i:04d}",
+            software_requirement_text="Software requirement",
+            risk_id="RISK_0",
+            risk_hazard="Wrong dose",
+            confidence=0.9 if i % 2 else 0.3
+        )
+
+
+@pytest.fixture
+def export_service():
+    """Create an export service."""
+    return TraceabilityExportService()
+
+
+@pytest.fixture
+def gaps():
+    """Create gaps of every severity."""
+    return [
+        TraceabilityGap(gap_type="weak_link", source_type="feature", source_id="F1", severity="high"),
+        TraceabilityGap(gap_type="orphaned_requirement", source_type="requirement", source_id="SR_0002",
+                        severity="medium"),
+        TraceabilityGap(gap_type="duplicate_link", source_type="requirement", source_id="SR_0004",
+                        severity="low", description="x" * 200)
+    ]
+
+
+class TestTraceabilityExportService:
+    """Test cases for TraceabilityExportService."""
+    
+    def test_export_excel_streams_rows_from_iterator(self, export_service, gaps, tmp_path):
+        """Test that Excel export writes every row of a generator with sampled column widths."""
+        openpyxl = pytest.importorskip("openpyxl")
+        filename = str(tmp_path / "matrix.xlsx")
+        
+        with patch.object(TraceabilityExportService, 'EXCEL_WIDTH_SAMPLE_ROWS', 10):
+            assert export_service.export_excel(make_rows(200), gaps, filename)
+        
+        wb = openpyxl.load_workbook(filename)
+        assert wb.sheetnames == ["Traceability Matrix", "Gap Analysis"]
+        
+        ws = wb["Traceability Matrix"]
+        assert ws.max_row == 201
+        assert ws["A1"].value == "Code Reference"
+        assert ws["A1"].font.bold
+        assert ws["H201"].value == "SR_0199"
+        # Row for F1 (index 1) has a high gap; its confidence cell keeps the confidence colour
+        assert ws["A3"].fill.start_color.rgb.endswith("FFD6D6")
+        assert ws["L3"].fill.start_color.rgb.endswith("C6EFCE")
+        assert ws["M3"].value == "HIGH"
+        # Widths come from the sampled rows only
+        assert ws.column_dimensions["A"].width == len("src/module_9.c:9-14") + 2
+        
+        ws_gaps = wb["Gap Analysis"]
+        assert ws_gaps.max_row == 4
+        assert ws_gaps["B2"].fill.start_color.rgb.endswith("FF6B6B")
+        assert ws_gaps.column_dimensions["G"].width == 60
+    
+    def test_export_excel_without_formatting(self, export_service, gaps, tmp_path):
+        """Test that unformatted Excel export writes plain values."""
+        openpyxl = pytest.importorskip("openpyxl")
+        filename = str(tmp_path / "plain.xlsx")
+        
+        assert export_service.export_excel(list(make_rows(5)), gaps, filename, include_formatting=False)
+        
+        ws = openpyxl.load_workbook(filename)["Traceability Matrix"]
+        assert [cell.value for cell in ws[2]][-2:] == [0.3, "HIGH"]
+        assert ws["A2"].fill.fill_type is None
+    
+    def test_export_pdf_renders_every_row_in_chunks(self, export_service, gaps, tmp_path):
+        """Test that the PDF matrix covers all rows, one bounded table chunk at a time."""
+        pytest.importorskip("reportlab")
+        filename = str(tmp_path / "matrix.pdf")
+        rows = list(make_rows(130))
+        
+        with patch("reportlab.rl_config.pageCompression", 0), \
+                patch.object(TraceabilityExportService, 'PDF_ROWS_PER_CHUNK', 30):
+            assert export_service.export_pdf(rows, gaps, filename)
+        
+        with open(filename, "rb") as f:
+            content = f.read()
+        
+        assert set(re.findall(rb"SR_(\d{4})", content)) == {f"{i:04d}".encode() for i in range(130)}
+        # One header per chunk at least; chunks that cross a page repeat it
+        assert content.count(b"(SW Req)") >= 5
+    
+    def test_export_pdf_has_no_blank_page_after_a_full_last_chunk(self, export_service, tmp_path):
+        """Test that a row count that is a multiple of the chunk size adds no trailing page."""
+        pytest.importorskip("reportlab")
+        page_counts = []
+        for count in (29, 30):
+            filename = str(tmp_path / f"matrix_{count}.pdf")
+            with patch("reportlab.rl_config.pageCompression", 0), \
+                    patch.object(TraceabilityExportService, 'PDF_ROWS_PER_CHUNK', 30):
+                assert export_service.export_pdf(list(make_rows(count)), [], filename)
+            with open(filename, "rb") as f:
+                page_counts.append(len(re.findall(rb"/Type /Page\b(?!s)", f.read())))
+        
+        assert page_counts[0] == page_counts[1]
+    
+    def test_export_pdf_empty_matrix(self, export_service, tmp_path):
+        """Test that an empty matrix still produces a PDF with the table header."""
+        pytest.importorskip("reportlab")
+        filename = str(tmp_path / "empty.pdf")
+        
+        with patch("reportlab.rl_config.pageCompression", 0):
+            assert export_service.export_pdf([], [], filename)
+        
+        with open(filename, "rb") as f:
+            assert f.read().count(b"(SW Req)") == 1
@@ -0,0 +1,124 @@
+"""
+Unit tests for the traceability gap analyzer.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from medical_analyzer.services.traceability_gap_analyzer import TraceabilityGapAnalyzer
+from medical_analyzer.services.traceability_models import TraceabilityMatrix
+from medical_analyzer.models.core import (
+    TraceabilityLink, CodeReference, Feature, Requirement, RiskItem,
+    RequirementType, FeatureCategory, Severity, Probability, RiskLevel
+)
+
+
+def make_link(link_id, source_type, source_id, target_type, target_id, confidence=0.9, **metadata):
+    """Create a traceability link for testing."""
+    return TraceabilityLink(
+        id=link_id,
+        source_type=source_type,
+        source_id=source_id,
+        target_type=target_type,
+        target_id=target_id,
+        link_type="implements",
+        confidence=confidence,
+        metadata=metadata
+    )
+
+
+@pytest.fixture
+def analyzer():
+    """Create a gap analyzer."""
+    return TraceabilityGapAnalyzer()
+
+
+@pytest.fixture
+def artifacts():
+    """Create features, requirements and risks for two chains."""
+    features = [
+        Feature(
+            id=f"F{i}",
+            description=f"Feature {i}",
+            confidence=0.9,
+            evidence=[CodeReference(file_path="src/main.c", start_line=i * 10, end_line=i * 10 + 5,
+                                    function_name=f"func_{i}", context="")],
+            category=FeatureCategory.SAFETY
+        )
+        for i in range(2)
+    ]
+    user_requirements = [
+        Requirement(id=f"UR_{i}", type=RequirementType.USER, text=f"User requirement {i}")
+        for i in range(3)
+    ]
+    software_requirements = [
+        Requirement(id=f"SR_{i}", type=RequirementType.SOFTWARE, text=f"Software requirement {i}")
+        for i in range(2)
+    ]
+    risk_items = [
+        RiskItem(
+            id="RISK_0", hazard="Wrong dose", cause="Overflow", effect="Injury",
+            severity=Severity.SERIOUS, probability=Probability.LOW, risk_level=RiskLevel.UNDESIRABLE,
+            mitigation="Bounds check", verification="Unit test"
+        )
+    ]
+    return features, user_requirements, software_requirements, risk_items
+
+
+@pytest.fixture
+def matrix():
+    """Create a matrix where F0 reaches a risk only through its second UR."""
+    links = [
+        make_link("1", "code", "src/main.c:0-5", "feature", "F0"),
+        make_link("2", "code", "src/main.c:10-15", "feature", "F1"),
+        make_link("3", "feature", "F0", "requirement", "UR_0", requirement_type="user"),
+        make_link("4", "feature", "F0", "requirement", "UR_1", requirement_type="user"),
+        make_link("5", "requirement", "UR_1", "requirement", "SR_0",
+                  source_requirement_type="user", target_requirement_type="software"),
+        make_link("6", "requirement", "SR_0", "risk", "RISK_0", confidence=0.2, requirement_type="software"),
+        make_link("7", "requirement", "SR_0", "risk", "RISK_0", confidence=0.2, requirement_type="software"),
+        make_link("8", "feature", "F1", "requirement", "UR_2", confidence=0.4, requirement_type="user")
+    ]
+    return TraceabilityMatrix(
+        analysis_run_id=1, links=links, code_to_requirements={},
+        user_to_software_requirements={}, requirements_to_risks={},
+        metadata={}, created_at=datetime.now()
+    )
+
+
+class TestTraceabilityGapAnalyzer:
+    """Test cases for TraceabilityGapAnalyzer."""
+    
+    def test_analyze_gaps_detects_gap_types(self, analyzer, matrix, artifacts):
+        """Test that each detector reports its gaps from the shared link index."""
+        result = analyzer.analyze_gaps(matrix, *artifacts)
+        
+        gap_keys = {(gap.gap_type, gap.source_id, gap.severity) for gap in result.gaps}
+        
+        assert ("duplicate_link", "SR_0", "low") in gap_keys
+        assert ("weak_link", "SR_0", "high") in gap_keys
+        assert ("weak_link", "F1", "medium") in gap_keys
+        assert ("orphaned_requirement", "SR_1", "high") in gap_keys
+        assert ("broken_chain", "F0", "high") in gap_keys  # F0 -> UR_0 has no SR
+        assert ("broken_chain", "F1", "high") in gap_keys  # F1 -> UR_2 has no SR
+        # Duplicate links still count toward high-risk coverage, as before
+        assert not any(gap.gap_type == "missing_link" and gap.source_id == "RISK_0" for gap in result.gaps)
+        assert result.total_gaps == len(result.gaps)
+        assert result.gaps_by_type["duplicate_link"] == 1
+    
+    def test_end_to_end_coverage_checks_every_chain(self, analyzer, matrix, artifacts):
+        """Test that a complete chain through any UR counts the feature once."""
+        result = analyzer.analyze_gaps(matrix, *artifacts)
+        
+        assert result.coverage_metrics["end_to_end_coverage"] == pytest.approx(0.5)
+        assert result.coverage_metrics["confidence_score"] == pytest.approx(
+            sum(link.confidence for link in matrix.links) / len(matrix.links)
+        )
+    
+    def test_links_are_indexed_once_per_analysis(self, analyzer, matrix, artifacts):
+        """Test that the link index is built a single time for an analysis."""
+        with patch.object(analyzer, '_build_link_index', wraps=analyzer._build_link_index) as build_index:
+            analyzer.analyze_gaps(matrix, *artifacts)
+        
+        assert build_index.call_count == 1
@@ -5,12 +5,15 @@ Unit tests for the traceability service.
 import pytest
 import tempfile
 import os
+import sqlite3
 from datetime import datetime
 from unittest.mock import Mock, patch
 
 from medical_analyzer.services.traceability_service import (
     TraceabilityService, TraceabilityMatrix, TraceabilityGap, TraceabilityTableRow
 )
+from medical_analyzer.services.traceability_models import TraceabilityArtifactIndex
+from medical_analyzer.services.test_requirements_integration import RequirementChange, ChangeType
 from medical_analyzer.models.core import (
     TraceabilityLink, CodeReference, Feature, Requirement, RiskItem,
     RequirementType, FeatureCategory, Severity, Probability, RiskLevel
@@ -320,6 +323,44 @@ class TestTraceabilityService:
         assert link.metadata["via_user_requirement"] == "UR_001"
         assert link.metadata["link_type"] == "transitive"
     
+    def test_indexed_link_builders_match_unindexed(
+        self, traceability_service, sample_features,
+        sample_user_requirements, sample_software_requirements, sample_risk_items
+    ):
+        """Test that link builders give the same links with a shared ID index."""
+        index = TraceabilityArtifactIndex.build(
+            sample_features, sample_user_requirements, sample_software_requirements, sample_risk_items
+        )
+        
+        feature_ur_links = traceability_service._create_feature_to_user_requirement_links(
+            1, sample_features, sample_user_requirements, index
+        )
+        ur_sr_links = traceability_service._create_user_to_software_requirement_links(
+            1, sample_user_requirements, sample_software_requirements, index
+        )
+        sr_risk_links = traceability_service._create_software_requirement_to_risk_links(
+            1, sample_software_requirements, sample_risk_items, index
+        )
+        code_sr_links = traceability_service._create_transitive_code_to_requirement_links(
+            1, sample_features, sample_software_requirements, feature_ur_links, ur_sr_links, index
+        )
+        
+        assert index.feature_to_user_requirements == {"feature_1": ["UR_001"], "feature_2": ["UR_002"]}
+        assert index.user_to_software_requirements == {"UR_001": ["SR_001"], "UR_002": ["SR_002"]}
+        
+        assert feature_ur_links == traceability_service._create_feature_to_user_requirement_links(
+            1, sample_features, sample_user_requirements
+        )
+        assert ur_sr_links == traceability_service._create_user_to_software_requirement_links(
+            1, sample_user_requirements, sample_software_requirements
+        )
+        assert sr_risk_links == traceability_service._create_software_requirement_to_risk_links(
+            1, sample_software_requirements, sample_risk_items
+        )
+        assert code_sr_links == traceability_service._create_transitive_code_to_requirement_links(
+            1, sample_features, sample_software_requirements, feature_ur_links, ur_sr_links
+        )
+    
     def test_build_mappings(self, traceability_service):
         """Test building of various traceability mappings."""
         # Test code-to-requirement mapping
@@ -522,6 +563,117 @@ class TestTraceabilityService:
         assert link.confidence == 0.8
         assert link.metadata["test"] == "data"
 
+    
+    def test_bulk_link_persistence(self, traceability_service, temp_db):
+        """Test storing many links in one transaction, inline and on the background writer."""
+        project_id = temp_db.create_project("Test Project", "/test/path", "Test description")
+        analysis_run_id = temp_db.create_analysis_run(project_id, "/test/artifacts")
+        
+        links = [
+            {
+                "analysis_run_id": analysis_run_id,
+                "source_type": "code",
+                "source_id": f"file.c:{i}-{i + 5}",
+                "target_type": "requirement",
+                "target_id": f"SR_{i:04d}",
+                "link_type": "implements",
+                "confidence": 0.9,
+                "metadata": {"index": i}
+            }
+            for i in range(500)
+        ]
+        
+        assert temp_db.create_traceability_links(links[:250]) == 250
+        future = temp_db.create_traceability_links(links[250:], background=True)
+        assert future.result(timeout=10) == 250
+        temp_db.close()
+        
+        stored = temp_db.get_traceability_links(analysis_run_id)
+        assert len(stored) == 500
+        assert [link["target_id"] for link in stored] == [f"SR_{i:04d}" for i in range(500)]
+        assert stored[42]["metadata"] == {"index": 42}
+        
+        # Bad rows roll back the whole batch
+        with pytest.raises(sqlite3.IntegrityError):
+            temp_db.create_traceability_links([links[0], dict(links[1], source_id=None)])
+        assert len(temp_db.get_traceability_links(analysis_run_id)) == 500
+    
+    def test_create_traceability_matrix_persists_links_in_bulk(
+        self, traceability_service, sample_features,
+        sample_user_requirements, sample_software_requirements, sample_risk_items
+    ):
+        """Test that matrix creation stores all links through the bulk API."""
+        with patch.object(traceability_service.db_manager, 'create_traceability_links',
+                          wraps=traceability_service.db_manager.create_traceability_links) as bulk_insert, \
+                patch.object(traceability_service.db_manager, 'create_traceability_link') as single_insert:
+            matrix = traceability_service.create_traceability_matrix(
+                analysis_run_id=1,
+                features=sample_features,
+                user_requirements=sample_user_requirements,
+                software_requirements=sample_software_requirements,
+                risk_items=sample_risk_items
+            )
+        
+        assert bulk_insert.call_count == 1
+        single_insert.assert_not_called()
+        assert len(traceability_service.db_manager.get_traceability_links(1)) == len(matrix.links)
+    
+    def test_apply_requirement_changes_matches_full_rebuild(
+        self, traceability_service, sample_features,
+        sample_user_requirements, sample_software_requirements, sample_risk_items
+    ):
+        """Test that an incremental delta yields the same links as rebuilding the matrix."""
+        matrix = traceability_service.create_traceability_matrix(
+            1, sample_features, sample_user_requirements, sample_software_requirements, sample_risk_items
+        )
+        
+        # Re-target SR_002 to UR_001, reword UR_001, drop UR_002 and add SR_003
+        user_requirements = [
+            Requirement(id="UR_001", type=RequirementType.USER,
+                        text="The system shall authenticate every user", derived_from=["feature_1"])
+        ]
+        software_requirements = [
+            sample_software_requirements[0],
+            Requirement(id="SR_002", type=RequirementType.SOFTWARE,
+                        text=sample_software_requirements[1].text, derived_from=["UR_001"]),
+            Requirement(id="SR_003", type=RequirementType.SOFTWARE,
+                        text="The module shall lock accounts", derived_from=["UR_001"])
+        ]
+        changes = [
+            RequirementChange("UR_001", ChangeType.MODIFIED),
+            RequirementChange("UR_002", ChangeType.DELETED),
+            RequirementChange("SR_001", ChangeType.UNCHANGED),
+            RequirementChange("SR_002", ChangeType.MODIFIED),
+            RequirementChange("SR_003", ChangeType.ADDED)
+        ]
+        
+        with patch.object(traceability_service, 'create_traceability_matrix') as full_rebuild:
+            update = traceability_service.apply_requirement_changes(
+                matrix, changes, sample_features, user_requirements, software_requirements, sample_risk_items
+            )
+        full_rebuild.assert_not_called()
+        
+        expected = TraceabilityService(Mock()).create_traceability_matrix(
+            1, sample_features, user_requirements, software_requirements, sample_risk_items
+        )
+        
+        def link_keys(links):
+            return sorted((link.source_type, link.source_id, link.target_type, link.target_id,
+                           link.link_type, link.confidence) for link in links)
+        
+        assert update["affected_requirements"] == ["SR_002", "SR_003", "UR_001", "UR_002"]
+        assert link_keys(matrix.links) == link_keys(expected.links)
+        assert len({link.id for link in matrix.links}) == len(matrix.links)
+        assert sorted(matrix.user_to_software_requirements["UR_001"]) == ["SR_001", "SR_002", "SR_003"]
+        assert list(matrix.user_to_software_requirements) == ["UR_001"]
+        assert matrix.requirements_to_risks == expected.requirements_to_risks
+        assert matrix.metadata == expected.metadata
+        assert matrix.get_incoming_links("requirement", "UR_002") == []
+        
+        stored = traceability_service.db_manager.get_traceability_links(1)
+        assert sorted((link["source_type"], link["source_id"], link["target_type"], link["target_id"],
+                       link["link_type"], link["confidence"]) for link in stored) == link_keys(expected.links)
+
 
 class TestTraceabilityMatrix:
     """Test cases for TraceabilityMatrix dataclass."""
@@ -558,6 +710,41 @@ class TestTraceabilityMatrix:
         assert matrix.metadata["total_links"] == 1
         assert isinstance(matrix.created_at, datetime)
 
+    
+    def test_traceability_matrix_adjacency_indexes(self):
+        """Test adjacency lookups and index refresh when links change."""
+        links = [
+            TraceabilityLink(id="1", source_type="code", source_id="a.c:1-5", target_type="feature",
+                             target_id="F1", link_type="implements", confidence=0.9),
+            TraceabilityLink(id="2", source_type="feature", source_id="F1", target_type="requirement",
+                             target_id="UR_001", link_type="derives_to", confidence=0.9),
+            TraceabilityLink(id="3", source_type="requirement", source_id="UR_001", target_type="requirement",
+                             target_id="SR_001", link_type="derives_to", confidence=0.95)
+        ]
+        matrix = TraceabilityMatrix(
+            analysis_run_id=1, links=links, code_to_requirements={},
+            user_to_software_requirements={}, requirements_to_risks={},
+            metadata={}, created_at=datetime.now()
+        )
+        
+        assert [l.id for l in matrix.get_incoming_links("feature", "F1")] == ["1"]
+        assert [l.id for l in matrix.get_outgoing_links("feature", "F1", target_type="requirement")] == ["2"]
+        assert matrix.get_outgoing_links("feature", "F1", target_type="risk") == []
+        assert matrix.get_link_type_counts() == {"implements": 1, "derives_to": 2}
+        
+        matrix.links.append(
+            TraceabilityLink(id="4", source_type="requirement", source_id="SR_001", target_type="risk",
+                             target_id="RISK_001", link_type="mitigated_by", confidence=0.9)
+        )
+        assert [l.id for l in matrix.get_incoming_links("risk", "RISK_001")] == ["4"]
+        assert matrix.get_source_type_counts() == {"code": 1, "feature": 1, "requirement": 2}
+        
+        # Replacing a link keeps the length but must still refresh the indexes
+        matrix.links[3] = TraceabilityLink(id="5", source_type="requirement", source_id="SR_001",
+                                           target_type="risk", target_id="RISK_002", link_type="mitigated_by",
+                                           confidence=0.9)
+        assert matrix.get_incoming_links("risk", "RISK_001") == []
+        assert [l.id for l in matrix.get_incoming_links("risk", "RISK_002")] == ["5"]
 
 class TestTraceabilityMatrixDisplay:
     """Test cases for traceability matrix display functionality."""
@@ -601,6 +788,13 @@ class TestTraceabilityMatrixDisplay:
         assert row.file_path != ""
         assert row.feature_id != ""
         assert 0.0 <= row.confidence <= 1.0
+        
+        # Rows follow the full code -> feature -> UR -> SR -> risk chain
+        auth_rows = [r for r in rows if r.code_reference == "src/auth.c:10-25"]
+        assert auth_rows
+        assert all(r.user_requirement_id == "UR_001" for r in auth_rows)
+        assert all(r.software_requirement_id == "SR_001" for r in auth_rows)
+        assert all(r.risk_id == "RISK_001" for r in auth_rows)
     
     def test_export_to_csv_basic(
         self, traceability_service, sample_features, sample_user_requirements,